@@ -0,0 +1,40 @@
+"""add prediction job status table
+
+Revision ID: 20261018_000008
+Revises: 20260710_000007
+Create Date: 2026-10-18 00:00:08
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "20261018_000008"
+down_revision = "20260710_000007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "prediction_jobs",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("kind", sa.Text(), nullable=False),
+        sa.Column("dedupe_key", sa.String(length=128), nullable=False),
+        sa.Column("status", sa.Text(), nullable=False),
+        sa.Column("params", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("result", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_prediction_jobs_dedupe_key", "prediction_jobs", ["dedupe_key"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_prediction_jobs_dedupe_key", table_name="prediction_jobs")
+    op.drop_table("prediction_jobs")
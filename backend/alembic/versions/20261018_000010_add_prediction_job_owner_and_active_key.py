@@ -0,0 +1,30 @@
+"""add owner and active dedupe key to prediction jobs
+
+Revision ID: 20261018_000010
+Revises: 20261018_000009
+Create Date: 2026-10-18 00:00:10
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261018_000010"
+down_revision = "20261018_000009"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("prediction_jobs", sa.Column("active_key", sa.String(length=128), nullable=True))
+    op.add_column("prediction_jobs", sa.Column("owner_id", sa.Text(), nullable=True))
+    op.create_index("ix_prediction_jobs_owner_id", "prediction_jobs", ["owner_id"], unique=False)
+    op.create_unique_constraint("uq_prediction_jobs_active_key", "prediction_jobs", ["active_key"])
+
+
+def downgrade() -> None:
+    op.drop_constraint("uq_prediction_jobs_active_key", "prediction_jobs", type_="unique")
+    op.drop_index("ix_prediction_jobs_owner_id", table_name="prediction_jobs")
+    op.drop_column("prediction_jobs", "owner_id")
+    op.drop_column("prediction_jobs", "active_key")
@@ -0,0 +1,582 @@
+"""Cross-user alert evaluation for the scheduler.
+
+Every user's alert rules live in an ``AlertIndex``: per ticker, the "above"
+and "below" thresholds are kept sorted, so the rules a price crosses are a
+bisect away and a tick costs O(tickers * log rules + triggered) rather than
+a pass over every rule. The index is built once and then kept current from
+the store's change feed (users whose rules changed since the last cursor).
+
+One tick syncs the index, downloads the latest close for each indexed ticker
+once (``ALERT_PRICE_CHUNK_SIZE`` tickers per request) and hands the triggered
+alerts to the store in batches of ``ALERT_TRIGGER_BATCH_SIZE``, one
+transaction per batch.
+
+News alerts go through a ``NewsPoller``: each distinct ticker is polled at
+most once per ``ALERT_NEWS_POLL_SECONDS`` however many users watch it, and a
+per-ticker publish-time cursor (persisted to a small JSON file) means only
+headlines newer than the last one seen fan out to the ticker's subscribers.
+
+Several worker processes can split the users between them: an index built
+with ``shard=(n, count)`` only keeps the users that hash to shard ``n`` (and
+any shard it adopted because no worker held it, until a standby worker
+wants it back), so each worker downloads
+prices for its own users' tickers. Sharded pollers share their latest news
+fetch per ticker through a common file, so a ticker is fetched once per poll
+interval across the shards. ``AlertCadence``
+sets the time between ticks from the exchange sessions: every few seconds
+while a watched market is open, sparsely (but never past the next open)
+while they are all closed.
+"""
+from __future__ import annotations
+
+import bisect
+import json
+import logging
+import math
+import os
+import threading
+import uuid
+import zlib
+from datetime import datetime
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+import pandas as pd
+import yfinance as yf
+
+import exchange_session_service
+
+DEFAULT_PRICE_CHUNK_SIZE = 200
+DEFAULT_TRIGGER_BATCH_SIZE = 500
+DEFAULT_NEWS_POLL_SECONDS = 300
+NEWS_WINDOW_SECONDS = 86400
+DEFAULT_OPEN_INTERVAL_SECONDS = 15
+DEFAULT_CLOSED_INTERVAL_SECONDS = 900
+FALLBACK_INTERVAL_SECONDS = 60
+DEFAULT_SHARD_ADOPT_SECONDS = 60
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(int(os.getenv(name, str(default))), 1)
+    except (TypeError, ValueError):
+        return default
+
+
+def _chunks(items: List[Any], size: int) -> Iterable[List[Any]]:
+    for offset in range(0, len(items), size):
+        yield items[offset:offset + size]
+
+
+def fetch_latest_prices(
+    tickers: Iterable[str],
+    *,
+    yf_module=yf,
+    chunk_size: int = DEFAULT_PRICE_CHUNK_SIZE,
+    logger=logging.getLogger("marketmind_api"),
+) -> Dict[str, float]:
+    """Latest close per ticker, one bulk download per chunk; failed chunks are skipped."""
+    prices: Dict[str, float] = {}
+    for chunk in _chunks(sorted(set(tickers)), max(int(chunk_size), 1)):
+        try:
+            data = yf_module.download(chunk, period="1d", progress=False)
+        except Exception as exc:
+            logger.error("Price check failed for %d tickers: %s", len(chunk), exc)
+            continue
+        if data is None or data.empty or "Close" not in data:
+            logger.warning("Price check: yfinance returned no data.")
+            continue
+        close = data["Close"]
+        if isinstance(close, pd.Series):
+            close = close.to_frame(chunk[0])
+        latest = close.ffill().iloc[-1]
+        for ticker, value in latest.items():
+            if value is not None and math.isfinite(float(value)):
+                prices[str(ticker)] = float(value)
+    return prices
+
+
+def shard_of(user_id: Hashable, shard_count: int) -> int:
+    """Stable shard of a user (the same in every worker process)."""
+    return zlib.crc32(str(user_id).encode("utf-8")) % max(int(shard_count), 1)
+
+
+def _target(alert: Dict[str, Any]) -> Optional[float]:
+    try:
+        target = float(alert.get("target_price"))
+    except (TypeError, ValueError):
+        return None
+    return target if math.isfinite(target) else None
+
+
+class _Thresholds:
+    """Rules of one ticker and condition, sorted by target price."""
+
+    __slots__ = ("targets", "keys")
+
+    def __init__(self) -> None:
+        self.targets: List[float] = []
+        self.keys: List[Tuple[Any, ...]] = []
+
+    def add(self, target: float, key: Tuple[Any, ...]) -> None:
+        position = bisect.bisect_right(self.targets, target)
+        self.targets.insert(position, target)
+        self.keys.insert(position, key)
+
+    def remove(self, target: float, key: Tuple[Any, ...]) -> None:
+        position = bisect.bisect_left(self.targets, target)
+        while position < len(self.targets) and self.targets[position] == target:
+            if self.keys[position] == key:
+                del self.targets[position]
+                del self.keys[position]
+                return
+            position += 1
+
+    def below(self, price: float) -> List[Tuple[Any, ...]]:
+        """Keys whose target is strictly below ``price``."""
+        return self.keys[:bisect.bisect_left(self.targets, price)]
+
+    def above(self, price: float) -> List[Tuple[Any, ...]]:
+        """Keys whose target is strictly above ``price``."""
+        return self.keys[bisect.bisect_right(self.targets, price):]
+
+
+class AlertIndex:
+    """In-memory index of every user's alert rules, keyed by ticker.
+
+    Rules are keyed by ``(user_id, alert id)``. ``sync`` applies the store's
+    change feed: the callable receives the last cursor and returns
+    ``(cursor, rules by user, full)``; each listed user's rules replace what
+    the index held for them, and ``full`` replaces the whole index. With a
+    ``shard`` of ``(n, count)`` users of other shards are ignored, unless
+    their shard was adopted with ``adopt_shard``.
+    """
+
+    def __init__(self, *, shard: Optional[Tuple[int, int]] = None) -> None:
+        self.shard = shard
+        self.adopted: set = set()
+        self.cursor: Any = None
+        self._rules: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+        self._by_user: Dict[Hashable, set] = {}
+        self._above: Dict[str, _Thresholds] = {}
+        self._below: Dict[str, _Thresholds] = {}
+        self._news: Dict[str, set] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._rules)
+
+    def owns(self, user_id: Hashable) -> bool:
+        if self.shard is None:
+            return True
+        owner = shard_of(user_id, self.shard[1])
+        return owner == self.shard[0] or owner in self.adopted
+
+    def assign_shard(self, shard: Optional[Tuple[int, int]]) -> None:
+        """Switch to another shard; the next sync reloads the index in full."""
+        with self._lock:
+            self.clear()
+            self.shard = shard
+            self.adopted = set()
+
+    def adopt_shard(self, shard: int) -> None:
+        """Also evaluate the users of ``shard``; the next sync reloads the index in full."""
+        with self._lock:
+            self.clear()
+            self.adopted.add(int(shard))
+
+    def release_shard(self, shard: int) -> None:
+        """Stop evaluating an adopted ``shard``; the next sync reloads the index in full."""
+        with self._lock:
+            self.clear()
+            self.adopted.discard(int(shard))
+
+    def holds_shard(self, shard: int) -> bool:
+        return self.shard is None or self.shard[0] == shard or shard in self.adopted
+
+    def sync(self, load_changes_fn: Callable[[Any], Tuple[Any, Dict[Hashable, List[Dict[str, Any]]], bool]]) -> int:
+        """Apply the changes since the last sync; returns the number of users reloaded."""
+        with self._lock:
+            cursor, changes, full = load_changes_fn(self.cursor)
+            if full:
+                self.clear()
+            owned = {user_id: rules for user_id, rules in changes.items() if self.owns(user_id)}
+            for user_id, rules in owned.items():
+                self.replace_user(user_id, rules)
+            self.cursor = cursor
+            return len(owned)
+
+    def replace_user(self, user_id: Hashable, rules: Iterable[Dict[str, Any]]) -> None:
+        with self._lock:
+            for key in list(self._by_user.pop(user_id, ())):
+                self._discard(key)
+            for rule in rules:
+                self._add(user_id, rule)
+
+    def remove(self, user_id: Hashable, alert_id: Any) -> None:
+        with self._lock:
+            self._by_user.get(user_id, set()).discard((user_id, alert_id))
+            self._discard((user_id, alert_id))
+
+    def clear(self) -> None:
+        with self._lock:
+            self.cursor = None
+            self._rules.clear()
+            self._by_user.clear()
+            self._above.clear()
+            self._below.clear()
+            self._news.clear()
+
+    def _add(self, user_id: Hashable, rule: Dict[str, Any]) -> None:
+        ticker = rule.get("ticker")
+        if not ticker or rule.get("id") is None:
+            return
+        key = (user_id, rule["id"])
+        self._discard(key)
+        rule = {**rule, "user_id": user_id}
+        if rule.get("type") == "news":
+            self._news.setdefault(ticker, set()).add(key)
+        else:
+            target = _target(rule)
+            book = {"above": self._above, "below": self._below}.get(rule.get("condition"))
+            if target is None or book is None:
+                return
+            book.setdefault(ticker, _Thresholds()).add(target, key)
+        self._rules[key] = rule
+        self._by_user.setdefault(user_id, set()).add(key)
+
+    def _discard(self, key: Tuple[Any, ...]) -> None:
+        rule = self._rules.pop(key, None)
+        if rule is None:
+            return
+        ticker = rule["ticker"]
+        if rule.get("type") == "news":
+            self._news.get(ticker, set()).discard(key)
+            return
+        book = self._above if rule.get("condition") == "above" else self._below
+        thresholds = book.get(ticker)
+        if thresholds is not None:
+            thresholds.remove(_target(rule), key)
+            if not thresholds.targets:
+                del book[ticker]
+
+    def price_tickers(self) -> List[str]:
+        with self._lock:
+            return sorted(set(self._above) | set(self._below))
+
+    def news_alerts(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [self._rules[key] for keys in self._news.values() for key in sorted(keys, key=str)]
+
+    def crossed(self, ticker: str, price: float) -> List[Dict[str, Any]]:
+        """Rules ``price`` satisfies: above-rules with a lower target, below-rules with a higher one."""
+        if not price or not math.isfinite(price):
+            return []
+        with self._lock:
+            keys = []
+            if ticker in self._above:
+                keys.extend(self._above[ticker].below(price))
+            if ticker in self._below:
+                keys.extend(self._below[ticker].above(price))
+            return [self._rules[key] for key in keys]
+
+
+def price_alert_message(alert: Dict[str, Any], price: float) -> str:
+    return (
+        f"{alert['ticker']} is now ${price:.2f} "
+        f"({alert['condition']} your target of ${float(alert['target_price']):.2f})"
+    )
+
+
+def _news_published(item: Dict[str, Any]) -> Optional[float]:
+    """Publish time (epoch seconds) of a yfinance news item, old or new payload shape."""
+    published = item.get("providerPublishTime")
+    if published:
+        return float(published)
+    pub_date = (item.get("content") or {}).get("pubDate")
+    if not pub_date:
+        return None
+    try:
+        return pd.Timestamp(pub_date).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def _read_json_dict(path: Optional[str]) -> Dict[str, Any]:
+    if not path:
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as handle:
+            payload = json.load(handle)
+    except (FileNotFoundError, OSError, ValueError):
+        return {}
+    return payload if isinstance(payload, dict) else {}
+
+
+def _write_json_atomic(path: str, payload: Dict[str, Any]) -> None:
+    """Replace ``path``; the temporary name is per process since shards share some files."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as handle:
+        json.dump(payload, handle, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def _news_title(item: Dict[str, Any]) -> Optional[str]:
+    return item.get("title") or (item.get("content") or {}).get("title")
+
+
+class NewsPoller:
+    """One shared news poll per ticker with a last-seen publish cursor.
+
+    ``poll`` returns the newest unseen headline of each due ticker as
+    ``(title, published)``; ``advance`` moves the ticker's cursor once the
+    alerts it triggered were saved, so a failed write is retried next poll.
+    Without a cursor (first poll of a ticker) a headline counts as new if it
+    is younger than ``window_seconds``.
+
+    Pollers given the same ``shared_path`` (one per shard) record each fetch
+    there and reuse one younger than ``poll_seconds`` instead of fetching the
+    ticker again; cursors stay per poller, since each fans out to its own users.
+    """
+
+    def __init__(
+        self,
+        *,
+        poll_seconds: float = DEFAULT_NEWS_POLL_SECONDS,
+        window_seconds: float = NEWS_WINDOW_SECONDS,
+        state_path: Optional[str] = None,
+        shared_path: Optional[str] = None,
+    ) -> None:
+        self.poll_seconds = max(float(poll_seconds), 0.0)
+        self.window_seconds = float(window_seconds)
+        self.state_path = state_path
+        self.shared_path = shared_path
+        self._cursors: Dict[str, float] = self._read_state()
+        self._polled_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _read_state(self) -> Dict[str, float]:
+        payload = _read_json_dict(self.state_path)
+        return {str(ticker): float(value) for ticker, value in payload.items()}
+
+    def _write_state(self) -> None:
+        if self.state_path:
+            _write_json_atomic(self.state_path, self._cursors)
+
+    def _fetch_latest(self, ticker: str, *, yf_module, now_ts: float, shared: Dict[str, Any], fetched: Dict[str, Any]) -> Dict[str, Any]:
+        """The ticker's newest headline, from a recent shared fetch or from yfinance (may raise)."""
+        entry = shared.get(ticker)
+        if isinstance(entry, dict) and now_ts - float(entry.get("polled_at", float("-inf"))) < self.poll_seconds:
+            return entry
+        news_items = yf_module.Ticker(ticker).news or []
+        dated = [(published, item) for item in news_items if (published := _news_published(item)) is not None]
+        entry = {"polled_at": now_ts, "title": None, "published": None}
+        if dated:
+            published, latest = max(dated, key=lambda pair: pair[0])
+            entry.update(title=_news_title(latest), published=published)
+        fetched[ticker] = entry
+        return entry
+
+    def _share(self, fetched: Dict[str, Any]) -> None:
+        if not self.shared_path or not fetched:
+            return
+        try:
+            _write_json_atomic(self.shared_path, {**_read_json_dict(self.shared_path), **fetched})
+        except OSError:
+            pass
+
+    def cursor(self, ticker: str) -> Optional[float]:
+        with self._lock:
+            return self._cursors.get(ticker)
+
+    def poll(self, tickers: Iterable[str], *, yf_module=yf, now_ts: float, logger=logging.getLogger("marketmind_api")) -> Dict[str, Tuple[str, float]]:
+        fresh: Dict[str, Tuple[str, float]] = {}
+        shared = _read_json_dict(self.shared_path)
+        fetched: Dict[str, Any] = {}
+        for ticker in sorted(set(tickers)):
+            with self._lock:
+                if now_ts - self._polled_at.get(ticker, float("-inf")) < self.poll_seconds:
+                    continue
+                self._polled_at[ticker] = now_ts
+                cursor = self._cursors.get(ticker)
+            try:
+                latest = self._fetch_latest(ticker, yf_module=yf_module, now_ts=now_ts, shared=shared, fetched=fetched)
+            except Exception as news_err:
+                logger.error("News check error: %s", news_err)
+                continue
+            if latest.get("published") is None:
+                continue
+            published = float(latest["published"])
+            is_new = published > cursor if cursor is not None else now_ts - published < self.window_seconds
+            if is_new and latest.get("title"):
+                fresh[ticker] = (latest["title"], published)
+            else:
+                self.advance(ticker, published)
+        self._share(fetched)
+        return fresh
+
+    def advance(self, ticker: str, published: float) -> None:
+        with self._lock:
+            if published <= self._cursors.get(ticker, float("-inf")):
+                return
+            self._cursors[ticker] = published
+            self._write_state()
+
+
+def build_news_poller(base_dir: str, *, shard: Optional[Tuple[int, int]] = None) -> NewsPoller:
+    """Env-configured poller.
+
+    Each shard keeps its own cursor file next to the configured path, and all
+    of them share ``<path>.latest`` so a ticker is fetched once per interval.
+    """
+    state_path = os.getenv("ALERT_NEWS_CURSOR_PATH", "").strip() or os.path.join(base_dir, "alert_state", "news_cursors.json")
+    shared_path = None
+    if shard is not None:
+        root, extension = os.path.splitext(state_path)
+        state_path = f"{root}.shard{shard[0]}of{shard[1]}{extension}"
+        shared_path = f"{root}.latest{extension}"
+    return NewsPoller(
+        poll_seconds=float(os.getenv("ALERT_NEWS_POLL_SECONDS", str(DEFAULT_NEWS_POLL_SECONDS))),
+        state_path=state_path,
+        shared_path=shared_path,
+    )
+
+
+class AlertCadence:
+    """Seconds until the next alert tick, from the watched markets' sessions.
+
+    ``open_seconds`` while any of ``markets`` is in its regular session;
+    otherwise ``closed_seconds``, shortened so the first tick after the next
+    open is at most ``open_seconds`` late. Session lookups that fail fall back
+    to the old fixed one-minute cadence.
+    """
+
+    def __init__(
+        self,
+        *,
+        markets: Iterable[str] = ("US",),
+        open_seconds: float = DEFAULT_OPEN_INTERVAL_SECONDS,
+        closed_seconds: float = DEFAULT_CLOSED_INTERVAL_SECONDS,
+        session_fn: Callable[..., Dict[str, Any]] = exchange_session_service.get_market_session,
+        logger=logging.getLogger("marketmind_api"),
+    ) -> None:
+        self.markets = tuple(markets) or ("US",)
+        self.open_seconds = max(float(open_seconds), 1.0)
+        self.closed_seconds = max(float(closed_seconds), self.open_seconds)
+        self.session_fn = session_fn
+        self.logger = logger
+
+    def next_interval(self, now: Optional[datetime] = None) -> float:
+        interval = self.closed_seconds
+        for market in self.markets:
+            try:
+                session = self.session_fn(market, now=now)
+            except Exception as exc:
+                self.logger.warning("Market session lookup failed for %s: %s", market, exc)
+                return float(FALLBACK_INTERVAL_SECONDS)
+            if session.get("status") == "open":
+                return self.open_seconds
+            next_open = session.get("nextOpen")
+            if next_open:
+                reference = pd.Timestamp(now) if now is not None else pd.Timestamp.now(tz="UTC")
+                if reference.tzinfo is None:
+                    reference = reference.tz_localize("UTC")
+                until_open = (pd.Timestamp(next_open) - reference).total_seconds()
+                interval = min(interval, max(until_open, self.open_seconds))
+        return interval
+
+
+def build_alert_cadence() -> AlertCadence:
+    return AlertCadence(
+        markets=[market.strip().upper() for market in os.getenv("ALERT_SCHEDULER_MARKETS", "US").split(",") if market.strip()],
+        open_seconds=float(os.getenv("ALERT_SCHEDULER_OPEN_SECONDS", str(DEFAULT_OPEN_INTERVAL_SECONDS))),
+        closed_seconds=float(os.getenv("ALERT_SCHEDULER_CLOSED_SECONDS", str(DEFAULT_CLOSED_INTERVAL_SECONDS))),
+    )
+
+
+def run_alert_tick(
+    *,
+    index: AlertIndex,
+    load_changes_fn: Callable[[Any], Tuple[Any, Dict[Hashable, List[Dict[str, Any]]], bool]],
+    apply_triggers_fn: Callable[[List[Dict[str, Any]]], Any],
+    yf_module=yf,
+    logger=logging.getLogger("marketmind_api"),
+    uuid_module=uuid,
+    datetime_cls=datetime,
+    news_poller: Optional[NewsPoller] = None,
+    chunk_size: Optional[int] = None,
+    batch_size: Optional[int] = None,
+) -> Dict[str, int]:
+    """Evaluate every user's alerts once; returns counts for logging and tests.
+
+    ``load_changes_fn`` feeds ``index.sync``; ``apply_triggers_fn`` persists
+    one batch of triggers atomically. Applied triggers leave the index at once
+    so they cannot fire again before the change feed reports them.
+    """
+    reloaded = index.sync(load_changes_fn)
+    tickers = index.price_tickers()
+    prices = fetch_latest_prices(
+        tickers,
+        yf_module=yf_module,
+        chunk_size=chunk_size or _env_int("ALERT_PRICE_CHUNK_SIZE", DEFAULT_PRICE_CHUNK_SIZE),
+        logger=logger,
+    ) if tickers else {}
+
+    hits = [
+        (alert, price_alert_message(alert, price))
+        for ticker, price in prices.items()
+        for alert in index.crossed(ticker, price)
+    ]
+    news_alerts = index.news_alerts()
+    headlines = (news_poller or NewsPoller(poll_seconds=0)).poll(
+        (alert["ticker"] for alert in news_alerts),
+        yf_module=yf_module,
+        now_ts=datetime_cls.now().timestamp(),
+        logger=logger,
+    ) if news_alerts else {}
+    hits += [
+        (alert, f"NEWS: {headlines[alert['ticker']][0]} ({alert['ticker']})")
+        for alert in news_alerts
+        if alert["ticker"] in headlines
+    ]
+    triggers = []
+    for alert, message in hits:
+        logger.info("Triggering alert for %s", alert["ticker"])
+        triggers.append(
+            {
+                "user_id": alert["user_id"],
+                "alert_id": alert["id"],
+                "ticker": alert["ticker"],
+                "type": alert.get("type") or "price",
+                "id": str(uuid_module.uuid4()),
+                "message": message,
+                "seen": False,
+                "timestamp": datetime_cls.now().isoformat(),
+            }
+        )
+
+    applied = 0
+    unsaved_news = set()
+    for batch in _chunks(triggers, batch_size or _env_int("ALERT_TRIGGER_BATCH_SIZE", DEFAULT_TRIGGER_BATCH_SIZE)):
+        try:
+            apply_triggers_fn(batch)
+        except Exception as exc:
+            logger.error("Failed to save %d triggered alerts: %s", len(batch), exc)
+            unsaved_news.update(trigger["ticker"] for trigger in batch if trigger["type"] == "news")
+            continue
+        applied += len(batch)
+        for trigger in batch:
+            index.remove(trigger["user_id"], trigger["alert_id"])
+    if news_poller is not None:
+        for ticker, (_title, published) in headlines.items():
+            if ticker not in unsaved_news:
+                news_poller.advance(ticker, published)
+    if applied:
+        logger.info("Triggered and moved %s alerts.", applied)
+    return {
+        "alerts": len(index),
+        "reloadedUsers": reloaded,
+        "tickers": len(tickers),
+        "prices": len(prices),
+        "triggered": applied,
+    }
@@ -2,8 +2,9 @@ from __future__ import annotations
 
 import logging
 import os
-from contextlib import contextmanager
-from typing import Callable, Iterator
+import time
+from contextlib import ExitStack, contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
 from sqlalchemy import create_engine, text
 
@@ -27,6 +28,23 @@ def scheduler_leader_lock(
     *,
     lock_path: str,
     blocking: bool = True,
+) -> Iterator[bool]:
+    with _advisory_lock(
+        database_url,
+        lock_id=SCHEDULER_ADVISORY_LOCK_ID,
+        lock_path=lock_path,
+        blocking=blocking,
+    ) as acquired:
+        yield acquired
+
+
+@contextmanager
+def _advisory_lock(
+    database_url: str,
+    *,
+    lock_id: int,
+    lock_path: str,
+    blocking: bool,
 ) -> Iterator[bool]:
     normalized_url = _normalized_database_url(database_url)
     if normalized_url.startswith("postgresql"):
@@ -36,21 +54,21 @@ def scheduler_leader_lock(
             if blocking:
                 connection.execute(
                     text("SELECT pg_advisory_lock(:lock_id)"),
-                    {"lock_id": SCHEDULER_ADVISORY_LOCK_ID},
+                    {"lock_id": lock_id},
                 )
                 acquired = True
             else:
                 acquired = bool(
                     connection.scalar(
                         text("SELECT pg_try_advisory_lock(:lock_id)"),
-                        {"lock_id": SCHEDULER_ADVISORY_LOCK_ID},
+                        {"lock_id": lock_id},
                     )
                 )
             yield acquired
             if acquired:
                 connection.execute(
                     text("SELECT pg_advisory_unlock(:lock_id)"),
-                    {"lock_id": SCHEDULER_ADVISORY_LOCK_ID},
+                    {"lock_id": lock_id},
                 )
         finally:
             connection.close()
@@ -73,14 +91,143 @@ def scheduler_leader_lock(
             fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
 
 
+class ShardClaims:
+    """The alert shards one worker holds, each as a lock kept until released or ``close``.
+
+    Shard ``n`` is the advisory lock ``SCHEDULER_ADVISORY_LOCK_ID + 1 + n`` on
+    Postgres and ``<lock_path>.shard<n>`` elsewhere, so a crashed worker's
+    shards free up as soon as its connection or file handles close. The first
+    shard claimed is the worker's own; later ones are adopted and handed back
+    while a standby worker is waiting for a shard.
+    """
+
+    def __init__(self, database_url: str, *, shard_count: int, lock_path: str) -> None:
+        self.database_url = database_url
+        self.shard_count = shard_count
+        self.lock_path = lock_path
+        self.owned: List[int] = []
+        self._locks: Dict[int, ExitStack] = {}
+
+    def __enter__(self) -> "ShardClaims":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def claim(self, *, limit: Optional[int] = None) -> List[int]:
+        """Take up to ``limit`` free shards (all of them by default); returns the new ones."""
+        claimed: List[int] = []
+        for shard in range(self.shard_count):
+            if shard in self.owned or (limit is not None and len(claimed) >= limit):
+                continue
+            lock = ExitStack()
+            if _hold(
+                lock,
+                _advisory_lock(
+                    self.database_url,
+                    lock_id=SCHEDULER_ADVISORY_LOCK_ID + 1 + shard,
+                    lock_path=f"{self.lock_path}.shard{shard}",
+                    blocking=False,
+                ),
+            ):
+                self._locks[shard] = lock
+                claimed.append(shard)
+        self.owned.extend(claimed)
+        return claimed
+
+    def release(self, shards: Iterable[int]) -> None:
+        for shard in list(shards):
+            if shard in self.owned:
+                self.owned.remove(shard)
+                self._locks.pop(shard).close()
+
+    def standby_waiting(self) -> bool:
+        """Whether a worker without a shard is waiting for one (see ``standby_signal``)."""
+        with standby_signal(self.database_url, lock_path=self.lock_path) as free:
+            return not free
+
+    def adopt_orphans(self) -> Tuple[List[int], List[int]]:
+        """Claim the shards no worker holds, or hand one adopted shard back while a standby waits.
+
+        Returns ``(adopted, released)``. While a standby is waiting nothing is
+        adopted, so a shard freed by any worker is left for the standby.
+        """
+        if self.standby_waiting():
+            released = self.owned[-1:] if len(self.owned) > 1 else []
+            self.release(released)
+            if released:
+                logger.info("Handing alert shard %s back to a waiting standby worker", released[0])
+            return [], released
+        adopted = self.claim()
+        if adopted:
+            logger.warning(
+                "Alert shards %s had no worker; this worker now holds %d of %d shards",
+                adopted,
+                len(self.owned),
+                self.shard_count,
+            )
+        return adopted, []
+
+    def close(self) -> None:
+        self.release(list(self.owned))
+
+
+def _hold(stack: ExitStack, lock) -> bool:
+    """Enter a non-blocking lock context; when acquired it is held until ``stack`` closes."""
+    with ExitStack() as attempt:
+        acquired = attempt.enter_context(lock)
+        if acquired:
+            stack.enter_context(attempt.pop_all())
+    return acquired
+
+
+@contextmanager
+def standby_signal(database_url: str, *, lock_path: str) -> Iterator[bool]:
+    """The lock a standby worker holds while it waits, so running workers hand a shard back."""
+    with _advisory_lock(
+        database_url,
+        lock_id=SCHEDULER_ADVISORY_LOCK_ID - 1,
+        lock_path=f"{lock_path}.standby",
+        blocking=False,
+    ) as acquired:
+        yield acquired
+
+
+@contextmanager
+def claim_alert_shard(
+    database_url: str,
+    *,
+    shard_count: int,
+    lock_path: str,
+) -> Iterator[Optional[Tuple[int, int]]]:
+    """Hold the first free shard lock; yields ``(shard, shard_count)`` or ``None``."""
+    with ShardClaims(database_url, shard_count=shard_count, lock_path=lock_path) as claims:
+        claimed = claims.claim(limit=1)
+        yield (claimed[0], shard_count) if claimed else None
+
+
 def run_alert_worker(
     *,
     database_url: str,
     lock_path: str,
     initialize_fn: Callable[[], None],
-    run_scheduler_fn: Callable[[], None],
+    run_scheduler_fn: Callable[..., None],
     blocking_lock: bool = True,
+    shard_count: int = 1,
+    retry_seconds: float = 5.0,
+    time_module=time,
 ) -> int:
+    if shard_count > 1:
+        return _run_sharded_alert_worker(
+            database_url=database_url,
+            lock_path=lock_path,
+            initialize_fn=initialize_fn,
+            run_scheduler_fn=run_scheduler_fn,
+            blocking_lock=blocking_lock,
+            shard_count=shard_count,
+            retry_seconds=retry_seconds,
+            time_module=time_module,
+        )
     logger.info("Waiting for the alert-worker leader lock")
     with scheduler_leader_lock(
         database_url,
@@ -96,6 +243,41 @@ def run_alert_worker(
     return 0
 
 
+def _run_sharded_alert_worker(
+    *,
+    database_url: str,
+    lock_path: str,
+    initialize_fn: Callable[[], None],
+    run_scheduler_fn: Callable[..., None],
+    blocking_lock: bool,
+    shard_count: int,
+    retry_seconds: float,
+    time_module,
+) -> int:
+    logger.info("Claiming one of %d alert shards", shard_count)
+    with ExitStack() as standby:
+        waiting = False
+        while True:
+            with ShardClaims(database_url, shard_count=shard_count, lock_path=lock_path) as claims:
+                if claims.claim(limit=1):
+                    standby.close()
+                    logger.info("Alert shard %d/%d acquired", claims.owned[0], shard_count)
+                    initialize_fn()
+                    # Shards still free once the scheduler is running (fewer
+                    # workers than shards, or a worker died with no standby) are
+                    # adopted periodically rather than left unevaluated, and
+                    # handed back one at a time while a standby waits.
+                    run_scheduler_fn(shard=(claims.owned[0], shard_count), adopt_shards_fn=claims.adopt_orphans)
+                    return 0
+            if not blocking_lock:
+                logger.info("Every alert shard is owned by another worker; exiting")
+                return 0
+            # One standby at a time signals that it is waiting; the others
+            # just retry until a shard frees up.
+            waiting = waiting or _hold(standby, standby_signal(database_url, lock_path=lock_path))
+            time_module.sleep(retry_seconds)
+
+
 def main() -> int:
     logging.basicConfig(
         level=os.getenv("LOG_LEVEL", "INFO").upper(),
@@ -123,6 +305,7 @@ def main() -> int:
         ),
         initialize_fn=initialize,
         run_scheduler_fn=run_scheduler,
+        shard_count=max(int(os.getenv("ALERT_WORKER_SHARDS", "1")), 1),
     )
 
 
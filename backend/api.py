@@ -47,7 +47,7 @@ from prediction_service import (
     lightgbm_predict,
     catboost_predict,
 )
-from models import ensemble_predict, lstm_train, lstm_predict, transformer_train, transformer_predict
+from models import ensemble_predict, lstm_train, lstm_predict, sequence_forecast_many, transformer_train, transformer_predict
 from professional_evaluation import rolling_window_backtest
 from forex_fetcher import get_exchange_rate, get_currency_list
 from crypto_fetcher import get_crypto_exchange_rate, get_crypto_list, get_target_currencies
@@ -64,10 +64,14 @@ from prediction_market_analysis import (
     analyze_prediction_market as pm_analyze_market,
 )
 import akshare_service
+import alert_engine
+import bar_store
+import evaluation_warehouse
 import exchange_session_service
 import portfolio_optimization_service
 import screener_query_service
 import sec_filings_service
+import prediction_jobs
 import prediction_service
 from asset_identity import parse_asset_reference
 from logger_config import setup_logger, log_api_error
@@ -111,7 +115,9 @@ from user_state_store import (
     execute_paper_trade_transaction as execute_paper_trade_transaction_db,
     get_public_api_client as get_public_api_client_db,
     get_public_api_key_by_prefix as get_public_api_key_by_prefix_db,
+    apply_alert_triggers as apply_alert_triggers_db,
     list_app_user_ids as list_app_user_ids_db,
+    load_alert_rule_changes as load_alert_rule_changes_db,
     list_public_api_clients as list_public_api_clients_db,
     list_public_api_daily_usage as list_public_api_daily_usage_db,
     list_public_api_keys as list_public_api_keys_db,
@@ -164,10 +170,12 @@ import api_prediction_runtime as api_prediction_runtime_helpers
 import api_scheduler as api_scheduler_helpers
 import api_state as api_state_helpers
 from request_contracts import (
+    BatchEnsemblePredictionPayload,
     DeliverableAssumptionsPayload,
     DeliverableCreatePayload,
     DeliverablePatchPayload,
     DeliverableReviewPayload,
+    EvaluationJobPayload,
     MarketMindArtifactPayload,
     MarketMindArtifactPreflightPayload,
     MarketMindChatPayload,
@@ -175,6 +183,7 @@ from request_contracts import (
     OptionTradePayload,
     PaperTradePayload,
     PortfolioOptimizationPayload,
+    PredictionJobPayload,
     PredictionMarketAnalysisPayload,
     PredictionMarketTradePayload,
     SmartNotificationPayload,
@@ -1632,6 +1641,19 @@ def predict_ensemble(ticker):
     return response
 
 
+@api_bp.route('/predict/ensemble', methods=['POST'])
+@require_auth
+@require_capability(authz.Capabilities.PREDICTIONS_RUN)
+@limiter.limit(RateLimits.HEAVY)
+@validate_json_payload(BatchEnsemblePredictionPayload)
+def predict_ensemble_batch():
+    return market_data_handlers.predict_ensemble_batch_handler(
+        request_obj=request,
+        forecast_many_fn=prediction_service.forecast_many,
+        sequence_forecast_many_fn=sequence_forecast_many,
+    )
+
+
 # --- Paper Trading Endpoints (Using JSON persistence) ---
 
 def _record_portfolio_snapshot_legacy(portfolio_data, user_id):
@@ -1765,6 +1787,7 @@ def get_paper_history():
         get_current_user_id_fn=get_current_user_id,
         load_portfolio_fn=load_portfolio,
         yf_module=yf,
+        load_bars_fn=bar_store.get_bar_store(BASE_DIR).get_many,
         date_cls=date,
         timedelta_cls=timedelta,
     )
@@ -1865,26 +1888,84 @@ def delete_triggered_notification(alert_id):
 
 
 # --- NEW: Background Price Checker ---
-def _check_alerts_for_user(user_id):
-    return api_scheduler_helpers.check_alerts_for_user(
-        user_id,
+_ALERT_INDEX = alert_engine.AlertIndex()
+_NEWS_POLLER = alert_engine.build_news_poller(BASE_DIR)
+_ALERT_CADENCE = alert_engine.build_alert_cadence()
+
+
+def _load_alert_changes(cursor):
+    return api_state_helpers.load_alert_changes(
+        cursor,
+        sql_enabled=_sql_persistence_enabled(),
+        ensure_user_state_storage_ready_fn=_ensure_user_state_storage_ready,
+        session_scope=user_state_session_scope,
+        database_url=DATABASE_URL,
+        load_alert_rule_changes_db_fn=load_alert_rule_changes_db,
+        iter_user_ids_fn=_iter_user_ids,
+        get_notifications_file_fn=_notifications_file,
+        load_notifications_fn=load_notifications,
+    )
+
+
+def _apply_alert_triggers(triggers):
+    return api_state_helpers.apply_alert_triggers(
+        triggers,
+        sql_enabled=_sql_persistence_enabled(),
+        ensure_user_state_storage_ready_fn=_ensure_user_state_storage_ready,
+        session_scope=user_state_session_scope,
+        database_url=DATABASE_URL,
+        apply_alert_triggers_db_fn=apply_alert_triggers_db,
+        json_mirror_enabled=_json_mirror_enabled(),
         load_notifications_fn=load_notifications,
         save_notifications_fn=save_notifications,
-        yf_module=yf,
+        save_notifications_json_fn=_save_notifications_json,
     )
 
 
 def check_alerts():
     return api_scheduler_helpers.check_alerts(
-        iter_user_ids_fn=_iter_user_ids,
-        check_alerts_for_user_fn=_check_alerts_for_user,
+        index=_ALERT_INDEX,
+        load_changes_fn=_load_alert_changes,
+        news_poller=_NEWS_POLLER,
+        apply_triggers_fn=_apply_alert_triggers,
+        yf_module=yf,
     )
 
 
-def run_scheduler():
+def refresh_evaluation_warehouse():
+    return evaluation_warehouse.start_background_refresh(BASE_DIR)
+
+
+def run_scheduler(shard=None, adopt_shards_fn=None):
+    global _NEWS_POLLER
+    if shard is not None:
+        # A sharded alert worker evaluates only its own users' alerts (plus any
+        # shard it adopts because no worker holds it) and keeps its own news
+        # cursors; whichever worker holds shard 0, its own or adopted, runs the
+        # daily evaluation refresh.
+        _ALERT_INDEX.assign_shard(shard)
+        _NEWS_POLLER = alert_engine.build_news_poller(BASE_DIR, shard=shard)
+
+    def adopt_orphan_shards():
+        adopted, released = adopt_shards_fn()
+        for handed_back in released:
+            _ALERT_INDEX.release_shard(handed_back)
+        for claimed in adopted:
+            _ALERT_INDEX.adopt_shard(claimed)
+
+    def refresh_evaluation_warehouse_on_shard_zero():
+        if _ALERT_INDEX.holds_shard(0):
+            return refresh_evaluation_warehouse()
+        return None
+
     return api_scheduler_helpers.run_scheduler(
         schedule_module=schedule,
         check_alerts_fn=check_alerts,
+        evaluation_refresh_fn=refresh_evaluation_warehouse if shard is None else refresh_evaluation_warehouse_on_shard_zero,
+        evaluation_refresh_at=os.getenv("EVALUATION_WAREHOUSE_SCHEDULE", "").strip() or None,
+        cadence=_ALERT_CADENCE,
+        adopt_shards_fn=adopt_orphan_shards if adopt_shards_fn is not None else None,
+        adopt_shards_every=float(os.getenv("ALERT_SHARD_ADOPT_SECONDS", str(alert_engine.DEFAULT_SHARD_ADOPT_SECONDS))),
     )
 
 
@@ -1911,6 +1992,71 @@ def evaluate_models(ticker):
     )
 
 
+_PREDICTION_JOB_QUEUE = None
+_PREDICTION_JOB_QUEUE_LOCK = threading.Lock()
+
+
+def _prediction_job_queue():
+    global _PREDICTION_JOB_QUEUE
+    with _PREDICTION_JOB_QUEUE_LOCK:
+        if _PREDICTION_JOB_QUEUE is None:
+            _PREDICTION_JOB_QUEUE = prediction_jobs.build_job_queue(
+                {
+                    "evaluation": lambda **params: rolling_window_backtest(**params),
+                    "prediction": lambda **params: prediction_service.get_prediction_snapshot(**params),
+                },
+                database_url=DATABASE_URL if _sql_persistence_enabled() else "",
+                logger=logger,
+            )
+        return _PREDICTION_JOB_QUEUE
+
+
+@api_bp.route('/jobs/evaluation', methods=['POST'])
+@require_auth
+@require_capability(authz.Capabilities.PREDICTIONS_RUN)
+@limiter.limit(RateLimits.HEAVY)
+@validate_json_payload(EvaluationJobPayload)
+def submit_evaluation_job():
+    return market_data_handlers.submit_prediction_job_handler(
+        "evaluation",
+        request_obj=request,
+        submit_job_fn=_prediction_job_queue().submit,
+        get_current_user_id_fn=get_current_user_id,
+    )
+
+
+@api_bp.route('/jobs/prediction', methods=['POST'])
+@require_auth
+@require_capability(authz.Capabilities.PREDICTIONS_RUN)
+@limiter.limit(RateLimits.HEAVY)
+@validate_json_payload(PredictionJobPayload)
+def submit_prediction_job():
+    return market_data_handlers.submit_prediction_job_handler(
+        "prediction",
+        request_obj=request,
+        submit_job_fn=_prediction_job_queue().submit,
+        get_current_user_id_fn=get_current_user_id,
+    )
+
+
+@api_bp.route('/jobs/<string:job_id>', methods=['GET'])
+@require_auth
+@require_capability(authz.Capabilities.PREDICTIONS_RUN)
+def get_prediction_job(job_id):
+    return market_data_handlers.get_prediction_job_handler(
+        job_id,
+        get_job_fn=_prediction_job_queue().get,
+        get_current_user_id_fn=get_current_user_id,
+    )
+
+
+@api_bp.route('/diagnostics/compute', methods=['GET'])
+@require_auth
+@require_capability(authz.Capabilities.PREDICTIONS_RUN)
+def compute_diagnostics():
+    return market_data_handlers.compute_diagnostics_handler()
+
+
 @api_bp.route('/forex/convert')
 def forex_convert():
     return reference_data_handlers.forex_convert_handler(
@@ -2574,6 +2720,9 @@ def public_api_v2_evaluations(ticker):
         cache_ttl_seconds=900,
         evaluate_models_handler_fn=market_data_handlers.evaluate_models_handler,
         rolling_window_backtest_fn=rolling_window_backtest,
+        load_stored_evaluation_fn=lambda symbol, **options: evaluation_warehouse.get_evaluation_warehouse(BASE_DIR).load_result(
+            symbol, **options
+        ),
     )
 
 
@@ -9,6 +9,9 @@ import numpy as np
 import requests
 import logging
 
+import compute_budget
+import evaluation_executor
+import prediction_service
 import sentiment_service
 from http_policy import DEFAULT_HTTP_TIMEOUT, ensure_success
 
@@ -526,17 +529,152 @@ def predict_ensemble_handler(
             "ensembleMethod": "weighted_average",
             "confidence": confidence,
         }
+        if signal_parts.get("modelSelection") is not None:
+            response["modelSelection"] = signal_parts["modelSelection"]
         return jsonify_fn(response)
     except Exception as exc:
         logger.error(f"Error in ensemble prediction for {ticker}: {exc}")
         return jsonify_fn({"error": f"Ensemble prediction failed: {str(exc)}"}), 500
 
 
+def predict_ensemble_batch_handler(
+    *,
+    request_obj,
+    forecast_many_fn,
+    sequence_forecast_many_fn=None,
+    jsonify_fn=jsonify,
+    logger=logging.getLogger("marketmind_api"),
+):
+    payload = request_obj.get_json(silent=True) or {}
+    tickers = [str(ticker).split(":")[0].upper() for ticker in payload.get("tickers") or []]
+    horizon = int(payload.get("horizon", 3))
+    global_model = bool(payload.get("globalModel", payload.get("global_model", False)))
+    sequence_models = bool(payload.get("sequenceModels", payload.get("sequence_models", False)))
+    try:
+        snapshots = forecast_many_fn(tickers, horizon=horizon, global_model=global_model)
+    except Exception as exc:
+        logger.error(f"Error in batch ensemble prediction for {tickers}: {exc}")
+        return jsonify_fn({"error": f"Batch ensemble prediction failed: {str(exc)}"}), 500
+
+    results = {ticker: snapshot for ticker, snapshot in snapshots.items() if snapshot is not None}
+    if sequence_models and sequence_forecast_many_fn is not None and results:
+        try:
+            sequence_forecasts = sequence_forecast_many_fn(list(results), days_ahead=horizon)
+        except Exception as exc:
+            logger.warning(f"Pooled sequence-model forecasts unavailable for {list(results)}: {exc}")
+            sequence_forecasts = {}
+        for ticker, forecasts in sequence_forecasts.items():
+            if ticker in results:
+                results[ticker] = dict(results[ticker], sequenceModels=forecasts)
+
+    return jsonify_fn(
+        {
+            "horizon": horizon,
+            "globalModel": global_model,
+            "results": results,
+            "unavailable": [ticker for ticker, snapshot in snapshots.items() if snapshot is None],
+        }
+    )
+
+
+def _cost_bps(value):
+    """Per-trade cost in basis points, clamped to 0-500 (missing -> 0)."""
+    try:
+        return min(max(float(value or 0.0), 0.0), 500.0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def submit_prediction_job_handler(
+    kind,
+    *,
+    request_obj,
+    submit_job_fn,
+    get_current_user_id_fn,
+    jsonify_fn=jsonify,
+    logger=logging.getLogger("marketmind_api"),
+):
+    payload = request_obj.get_json(silent=True) or {}
+    ticker = str(payload.get("ticker") or "").split(":")[0].upper()
+    params = {"ticker": ticker}
+    if kind == "evaluation":
+        fast_mode = bool(payload.get("fast_mode", True))
+        retrain_frequency, max_train_rows = prediction_service.evaluation_defaults(
+            fast_mode,
+            payload.get("retrain_frequency"),
+            payload.get("max_train_rows"),
+        )
+        params.update(
+            {
+                "test_days": int(payload.get("test_days", 60)),
+                "retrain_frequency": retrain_frequency,
+                "fast_mode": fast_mode,
+                "max_train_rows": max_train_rows,
+                "include_explanations": payload.get("include_explanations"),
+                "transaction_cost_bps": _cost_bps(payload.get("transaction_cost_bps")),
+                "slippage_bps": _cost_bps(payload.get("slippage_bps")),
+            }
+        )
+    try:
+        job, deduplicated = submit_job_fn(kind, params, owner_id=get_current_user_id_fn())
+    except Exception as exc:
+        logger.error(f"Could not queue {kind} job for {ticker}: {exc}")
+        return jsonify_fn({"error": f"Could not queue job: {str(exc)}"}), 503
+    return jsonify_fn(
+        {
+            "jobId": job["id"],
+            "kind": kind,
+            "status": job["status"],
+            "deduplicated": deduplicated,
+        }
+    ), 202
+
+
+def get_prediction_job_handler(job_id, *, get_job_fn, get_current_user_id_fn, jsonify_fn=jsonify):
+    job = get_job_fn(job_id, owner_id=get_current_user_id_fn())
+    if job is None:
+        return jsonify_fn({"error": "Job not found"}), 404
+    return jsonify_fn(
+        {
+            "jobId": job["id"],
+            "kind": job["kind"],
+            "status": job["status"],
+            "params": job["params"],
+            "result": job["result"],
+            "error": job["error"],
+            "createdAt": job["createdAt"],
+            "updatedAt": job["updatedAt"],
+            "finishedAt": job["finishedAt"],
+        }
+    )
+
+
+def compute_diagnostics_handler(
+    *,
+    get_compute_budget_fn=compute_budget.get_compute_budget,
+    get_evaluation_executor_fn=evaluation_executor.get_evaluation_executor,
+    single_flight_stats_fn=prediction_service.single_flight_stats,
+    jsonify_fn=jsonify,
+):
+    budget = get_compute_budget_fn()
+    executor = get_evaluation_executor_fn()
+    payload = budget.snapshot()
+    payload["evaluationPool"] = {
+        "mode": executor.mode,
+        "maxWorkers": executor.max_workers,
+        "maxConcurrentJobs": executor.max_concurrent_jobs,
+        "threadsPerProcess": max(budget.worker_cores // executor.max_workers, 1),
+    }
+    payload["singleFlight"] = single_flight_stats_fn()
+    return jsonify_fn(payload)
+
+
 def evaluate_models_handler(
     ticker,
     *,
     request_obj,
     rolling_window_backtest_fn,
+    client_disconnected_fn=evaluation_executor.client_disconnected_fn,
     jsonify_fn=jsonify,
     logger=logging.getLogger("marketmind_api"),
 ):
@@ -545,9 +683,11 @@ def evaluate_models_handler(
         test_days = int(request_obj.args.get("test_days", 60))
         fast_mode_raw = str(request_obj.args.get("fast_mode", "true")).strip().lower()
         fast_mode = fast_mode_raw in {"1", "true", "yes", "on"}
-        default_retrain = 10 if fast_mode else 5
-        retrain_frequency = int(request_obj.args.get("retrain_frequency", default_retrain))
-        max_train_rows = request_obj.args.get("max_train_rows", default=450 if fast_mode else None, type=int)
+        retrain_frequency, max_train_rows = prediction_service.evaluation_defaults(
+            fast_mode,
+            request_obj.args.get("retrain_frequency", type=int),
+            request_obj.args.get("max_train_rows", type=int),
+        )
         include_explanations_raw = request_obj.args.get("include_explanations")
         include_explanations = None
         if include_explanations_raw is not None:
@@ -560,10 +700,16 @@ def evaluate_models_handler(
             fast_mode=fast_mode,
             max_train_rows=max_train_rows,
             include_explanations=include_explanations,
+            should_cancel=client_disconnected_fn(request_obj.environ),
+            transaction_cost_bps=_cost_bps(request_obj.args.get("transaction_cost_bps")),
+            slippage_bps=_cost_bps(request_obj.args.get("slippage_bps")),
         )
         if result is None:
             return jsonify_fn({"error": "Insufficient data for evaluation"}), 404
         return jsonify_fn(result)
+    except evaluation_executor.EvaluationCancelled:
+        logger.info(f"Evaluation for {ticker} cancelled after client disconnect")
+        return jsonify_fn({"error": "Evaluation cancelled"}), 499
     except Exception as exc:
         logger.error(f"Evaluation error for {ticker}: {exc}")
         return jsonify_fn({"error": f"Evaluation failed: {str(exc)}"}), 500
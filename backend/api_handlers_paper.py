@@ -612,6 +612,21 @@ def _normalize_close_prices(close_prices_raw, *, all_tickers, hist_index, pd_mod
     return close_prices_raw
 
 
+def _stored_close_prices(load_bars_fn, all_tickers, *, start, end, pd_module):
+    """Closes from the local bar store, or None when it does not cover the window."""
+    if load_bars_fn is None:
+        return None
+    bars = load_bars_fn(all_tickers)
+    start_ts, end_ts = pd_module.Timestamp(start), pd_module.Timestamp(end)
+    closes = {}
+    for ticker in all_tickers:
+        frame = bars.get(ticker.upper())
+        if frame is None or frame.empty or frame.index[0] > start_ts:
+            return None
+        closes[ticker] = frame['Close'][(frame.index >= start_ts) & (frame.index < end_ts)]
+    return pd_module.DataFrame(closes)
+
+
 def _apply_equity_transaction(cash, positions, transaction):
     tx_type = transaction.get('type')
     if tx_type not in {'BUY', 'SELL'}:
@@ -727,6 +742,7 @@ def get_paper_history_handler(
     load_portfolio_fn,
     jsonify_fn=jsonify,
     yf_module=yf,
+    load_bars_fn=None,
     pd_module=pd,
     np_module=np,
     logger=logging.getLogger("marketmind_api"),
@@ -757,21 +773,29 @@ def get_paper_history_handler(
         return jsonify_fn(_empty_portfolio_history())
 
     try:
-        hist_data = yf_module.download(all_tickers, start=start_date - timedelta_cls(days=7), end=end_date + timedelta_cls(days=1))
-        if hist_data.empty:
-            return jsonify_fn({'error': 'Could not fetch historical data for portfolio tickers.'}), 500
-
-        close_prices_raw = hist_data.get('Close')
-        if close_prices_raw is None:
-            return jsonify_fn({'error': "Could not get 'Close' price data from yfinance."}), 500
-
-        close_prices = _normalize_close_prices(
-            close_prices_raw,
-            all_tickers=all_tickers,
-            hist_index=hist_data.index,
+        close_prices = _stored_close_prices(
+            load_bars_fn,
+            all_tickers,
+            start=start_date - timedelta_cls(days=7),
+            end=end_date + timedelta_cls(days=1),
             pd_module=pd_module,
-            np_module=np_module,
         )
+        if close_prices is None:
+            hist_data = yf_module.download(all_tickers, start=start_date - timedelta_cls(days=7), end=end_date + timedelta_cls(days=1))
+            if hist_data.empty:
+                return jsonify_fn({'error': 'Could not fetch historical data for portfolio tickers.'}), 500
+
+            close_prices_raw = hist_data.get('Close')
+            if close_prices_raw is None:
+                return jsonify_fn({'error': "Could not get 'Close' price data from yfinance."}), 500
+
+            close_prices = _normalize_close_prices(
+                close_prices_raw,
+                all_tickers=all_tickers,
+                hist_index=hist_data.index,
+                pd_module=pd_module,
+                np_module=np_module,
+            )
         initial_cash, initial_positions = _starting_ledger(
             transactions,
             start_date=start_date,
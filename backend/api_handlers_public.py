@@ -533,19 +533,34 @@ def evaluation_summary_handler(
     cache_ttl_seconds: int,
     evaluate_models_handler_fn,
     rolling_window_backtest_fn,
+    load_stored_evaluation_fn=None,
     logger=logging.getLogger("marketmind_api"),
 ):
     def producer():
         safe_request = _public_request_subset(request_obj, allowed_args=("test_days", "fast_mode"))
-        raw_payload, status_code = unwrap_handler_result(
-            evaluate_models_handler_fn(
-                ticker,
-                request_obj=safe_request,
-                rolling_window_backtest_fn=rolling_window_backtest_fn,
-                jsonify_fn=lambda payload: payload,
-                logger=logger,
+        fast_mode_raw = str(safe_request.args.get("fast_mode", "true")).strip().lower()
+        fast_mode = fast_mode_raw in {"1", "true", "yes", "on"}
+        test_days = safe_request.args.get("test_days", default=60, type=int)
+
+        # The evaluation warehouse answers without running a backtest; compute
+        # on demand only when it has no fresh result for these options.
+        raw_payload = None
+        if load_stored_evaluation_fn is not None:
+            try:
+                raw_payload = load_stored_evaluation_fn(ticker.split(":")[0].upper(), test_days=test_days, fast_mode=fast_mode)
+            except Exception as exc:
+                logger.warning(f"Evaluation warehouse read failed for {ticker}: {exc}")
+        status_code = 200
+        if raw_payload is None:
+            raw_payload, status_code = unwrap_handler_result(
+                evaluate_models_handler_fn(
+                    ticker,
+                    request_obj=safe_request,
+                    rolling_window_backtest_fn=rolling_window_backtest_fn,
+                    jsonify_fn=lambda payload: payload,
+                    logger=logger,
+                )
             )
-        )
         if status_code == 404:
             raise PublicApiError(404, "not_found", f"Evaluation summary is unavailable for ticker '{ticker}'.")
         if status_code == 400:
@@ -560,10 +575,6 @@ def evaluation_summary_handler(
                 "metrics": dict((model_payload or {}).get("metrics") or {}),
             }
 
-        fast_mode_raw = str(safe_request.args.get("fast_mode", "true")).strip().lower()
-        fast_mode = fast_mode_raw in {"1", "true", "yes", "on"}
-        test_days = safe_request.args.get("test_days", default=60, type=int)
-
         return (
             {
                 "symbol": raw_payload.get("ticker") or ticker.split(":")[0].upper(),
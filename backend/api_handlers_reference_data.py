@@ -495,7 +495,7 @@ def get_screener_presets_handler(
             yf_module=yf_module,
             logger=logger,
         )
-        sectors = screener_query_service_module.screener_snapshot_service.available_sectors(base_dir=base_dir)
+        sectors = screener_query_service_module.available_sectors(base_dir=base_dir)
         return jsonify_fn(screener_query_service_module.list_presets(sectors=sectors))
     except screener_query_service_module.screener_snapshot_service.ScreenerSnapshotError as exc:
         return jsonify_fn({"error": str(exc)}), 503
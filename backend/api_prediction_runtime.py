@@ -23,6 +23,8 @@ def live_ensemble_signal_components(
     *,
     create_dataset_fn,
     ensemble_predict_fn,
+    prediction_interval_bounds_fn=prediction_service.prediction_interval_bounds,
+    model_selection_fn=prediction_service.model_selection_report,
     np_module=np,
 ):
     df = create_dataset_fn(sanitized_ticker, period="1y")
@@ -50,6 +52,8 @@ def live_ensemble_signal_components(
         "recent_close": recent_close,
         "raw_signal": raw_signal,
         "disagreement": disagreement,
+        "intervals": prediction_interval_bounds_fn(df, ensemble_preds),
+        "modelSelection": model_selection_fn(sanitized_ticker),
     }
 
 
@@ -71,7 +75,7 @@ def chart_prediction_points(
     if not future_dates:
         recent_date = signal_parts["df"].index[-1]
         future_dates = [recent_date + pd_module.Timedelta(days=i + 1) for i in range(len(ensemble_preds))]
-    return [
+    points = [
         {
             "date": date.strftime("%Y-%m-%d 00:00:00"),
             "open": None,
@@ -82,3 +86,10 @@ def chart_prediction_points(
         }
         for date, pred in zip(future_dates, ensemble_preds)
     ]
+    intervals = signal_parts.get("intervals")
+    if intervals is not None:
+        lower, upper = intervals
+        for index, point in enumerate(points):
+            point["lower"] = round(float(lower[index]), 2)
+            point["upper"] = round(float(upper[index]), 2)
+    return points
@@ -3,120 +3,64 @@ from __future__ import annotations
 import time
 
 import yfinance as yf
-import uuid
-from datetime import datetime
 import logging
 
+import alert_engine
 
-def check_alerts_for_user(
-    user_id,
+
+def check_alerts(
     *,
-    load_notifications_fn,
-    save_notifications_fn,
+    index,
+    load_changes_fn,
+    apply_triggers_fn,
+    news_poller=None,
     yf_module=yf,
     logger=logging.getLogger("marketmind_api"),
-    uuid_module=uuid,
-    datetime_cls=datetime,
 ):
-    notifications_data = load_notifications_fn(user_id)
-    if not notifications_data["active"]:
-        return
-
-    active_alerts_copy = notifications_data["active"].copy()
-    tickers_to_check = list(set([alert["ticker"] for alert in active_alerts_copy]))
-
+    logger.info("Running price alert check...")
     try:
-        data = yf_module.download(tickers_to_check, period="1d")
-        if data.empty:
-            logger.warning("Price check: yfinance returned no data.")
-            return
-
-        current_prices = data["Close"].iloc[-1]
-        triggered_ids = []
-
-        for alert in active_alerts_copy:
-            try:
-                if alert.get("type") == "news":
-                    try:
-                        ticker_obj = yf_module.Ticker(alert["ticker"])
-                        news_items = ticker_obj.news
-                        if news_items:
-                            latest_news = news_items[0]
-                            pub_time = latest_news.get("providerPublishTime")
-                            if pub_time:
-                                pub_dt = datetime_cls.fromtimestamp(pub_time)
-                                if (datetime_cls.now() - pub_dt).total_seconds() < 86400:
-                                    triggered_alert = {
-                                        "id": str(uuid_module.uuid4()),
-                                        "message": f"NEWS: {latest_news.get('title')} ({alert['ticker']})",
-                                        "seen": False,
-                                        "timestamp": datetime_cls.now().isoformat(),
-                                    }
-                                    notifications_data["triggered"].append(triggered_alert)
-                                    triggered_ids.append(alert["id"])
-                    except Exception as news_err:
-                        logger.error("News check error: %s", news_err)
-                    continue
-
-                if len(tickers_to_check) == 1:
-                    current_price = float(current_prices)
-                else:
-                    current_price = float(current_prices.get(alert["ticker"], 0))
-
-                if current_price == 0:
-                    continue
-
-                target_price = alert["target_price"]
-                condition_met = False
-                message = ""
-
-                if alert["condition"] == "below" and current_price < target_price:
-                    condition_met = True
-                    message = (
-                        f"{alert['ticker']} is now ${current_price:.2f} "
-                        f"(below your target of ${target_price:.2f})"
-                    )
-                elif alert["condition"] == "above" and current_price > target_price:
-                    condition_met = True
-                    message = (
-                        f"{alert['ticker']} is now ${current_price:.2f} "
-                        f"(above your target of ${target_price:.2f})"
-                    )
-
-                if condition_met:
-                    logger.info("Triggering alert for %s", alert["ticker"])
-                    triggered_alert = {
-                        "id": str(uuid_module.uuid4()),
-                        "message": message,
-                        "seen": False,
-                        "timestamp": datetime_cls.now().isoformat(),
-                    }
-                    notifications_data["triggered"].append(triggered_alert)
-                    triggered_ids.append(alert["id"])
-            except Exception as exc:
-                logger.error("Error checking alert for %s: %s", alert["ticker"], exc)
-
-        if triggered_ids:
-            notifications_data["active"] = [
-                alert for alert in notifications_data["active"] if alert["id"] not in triggered_ids
-            ]
-            save_notifications_fn(notifications_data, user_id)
-            logger.info("Triggered and moved %s alerts.", len(triggered_ids))
+        return alert_engine.run_alert_tick(
+            index=index,
+            load_changes_fn=load_changes_fn,
+            news_poller=news_poller,
+            apply_triggers_fn=apply_triggers_fn,
+            yf_module=yf_module,
+            logger=logger,
+        )
     except Exception as exc:
         logger.error("Failed to check all alert prices: %s", exc)
+        return None
 
 
-def check_alerts(*, iter_user_ids_fn, check_alerts_for_user_fn, logger=logging.getLogger("marketmind_api")):
-    logger.info("Running price alert check...")
-    for user_id in iter_user_ids_fn():
-        try:
-            check_alerts_for_user_fn(user_id)
-        except Exception as exc:
-            logger.error("Alert check failed for user %s: %s", user_id, exc)
-
-
-def run_scheduler(*, schedule_module, check_alerts_fn, time_module=time):
-    schedule_module.every(1).minutes.do(check_alerts_fn)
+def run_scheduler(
+    *,
+    schedule_module,
+    check_alerts_fn,
+    evaluation_refresh_fn=None,
+    evaluation_refresh_at=None,
+    cadence=None,
+    adopt_shards_fn=None,
+    adopt_shards_every=alert_engine.DEFAULT_SHARD_ADOPT_SECONDS,
+    time_module=time,
+):
+    if adopt_shards_fn is not None:
+        # A sharded worker periodically claims shards no worker holds. The
+        # first check waits one interval so workers starting together can
+        # each claim their own shard first.
+        schedule_module.every(adopt_shards_every).seconds.do(adopt_shards_fn)
+    if evaluation_refresh_fn is not None and evaluation_refresh_at:
+        # Daily universe backtest into the evaluation warehouse ("HH:MM", local
+        # time). The hook returns immediately; the run happens on its own thread.
+        schedule_module.every().day.at(evaluation_refresh_at).do(evaluation_refresh_fn)
+    # Alert ticks run start-to-start every cadence interval (seconds while a
+    # market is open, sparse while closed); a tick that overruns is followed
+    # by the next one straight away rather than queueing several.
+    next_check = time_module.monotonic()
     while True:
+        if time_module.monotonic() >= next_check:
+            started = time_module.monotonic()
+            check_alerts_fn()
+            interval = cadence.next_interval() if cadence is not None else alert_engine.FALLBACK_INTERVAL_SECONDS
+            next_check = started + interval
         schedule_module.run_pending()
-        time_module.sleep(1)
+        time_module.sleep(min(1.0, max(next_check - time_module.monotonic(), 0.0)))
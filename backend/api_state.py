@@ -454,6 +454,85 @@ def save_notifications(
     )
 
 
+def load_alert_changes(
+    cursor,
+    *,
+    sql_enabled,
+    ensure_user_state_storage_ready_fn,
+    session_scope,
+    database_url,
+    load_alert_rule_changes_db_fn,
+    iter_user_ids_fn,
+    get_notifications_file_fn,
+    load_notifications_fn,
+):
+    """Alert rules of users changed since ``cursor``: ``(cursor, rules by user, full)``.
+
+    SQL-backed state reads the ``alert_rule_changes`` feed (a cursor of
+    the highest id read and the recently seen ids). JSON state compares
+    each user's notifications file mtime against the previous cursor (a
+    dict of mtimes).
+    """
+    if sql_enabled:
+        ensure_user_state_storage_ready_fn()
+        with session_scope(database_url) as session:
+            return load_alert_rule_changes_db_fn(session, cursor if isinstance(cursor, tuple) else None)
+
+    previous = cursor if isinstance(cursor, dict) else None
+    mtimes = {}
+    for user_id in iter_user_ids_fn():
+        try:
+            mtimes[user_id] = os.stat(get_notifications_file_fn(user_id)).st_mtime_ns
+        except OSError:
+            continue
+    changed = [
+        user_id for user_id in sorted(set(mtimes) | set(previous or ()))
+        if previous is None or mtimes.get(user_id) != previous.get(user_id)
+    ]
+    rules = {
+        user_id: [
+            {**alert, "user_id": user_id}
+            for alert in (load_notifications_fn(user_id).get("active", []) if user_id in mtimes else [])
+        ]
+        for user_id in changed
+    }
+    return mtimes, rules, previous is None
+
+
+def apply_alert_triggers(
+    triggers,
+    *,
+    sql_enabled,
+    ensure_user_state_storage_ready_fn,
+    session_scope,
+    database_url,
+    apply_alert_triggers_db_fn,
+    json_mirror_enabled,
+    load_notifications_fn,
+    save_notifications_fn,
+    save_notifications_json_fn,
+):
+    """Move triggered rules to each user's triggered list; SQL batches share one transaction."""
+    user_ids = sorted({str(trigger["user_id"]) for trigger in triggers})
+    if sql_enabled:
+        ensure_user_state_storage_ready_fn()
+        with session_scope(database_url) as session:
+            apply_alert_triggers_db_fn(session, triggers)
+        if json_mirror_enabled:
+            for user_id in user_ids:
+                save_notifications_json_fn(load_notifications_fn(user_id), user_id)
+        return
+    for user_id in user_ids:
+        user_triggers = [trigger for trigger in triggers if str(trigger["user_id"]) == user_id]
+        triggered_ids = {trigger["alert_id"] for trigger in user_triggers}
+        notifications = load_notifications_fn(user_id)
+        notifications["active"] = [alert for alert in notifications["active"] if alert["id"] not in triggered_ids]
+        notifications["triggered"].extend(
+            {key: trigger[key] for key in ("id", "message", "seen", "timestamp")} for trigger in user_triggers
+        )
+        save_notifications_fn(notifications, user_id)
+
+
 def load_watchlist_json(
     user_id=None,
     *,
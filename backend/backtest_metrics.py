@@ -0,0 +1,149 @@
+"""Vectorized backtest metrics.
+
+rolling_window_backtest scores every model against the same actuals, so the
+predictions arrive as a (models x days) matrix. Forecast-error metrics and the
+long/flat trading simulation are computed for all rows at once with numpy;
+nothing here loops over models or days.
+
+The trading rule is the one the /evaluate route has always used: go long when
+the model's next-day predicted move exceeds ``threshold``, go flat when it
+falls below ``-threshold``, otherwise hold. Each position change is charged
+``transaction_cost_bps + slippage_bps`` of the portfolio value. Open positions
+are marked at the last close.
+"""
+from __future__ import annotations
+
+import math
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+TRADING_DAYS_PER_YEAR = 252
+SIGNAL_THRESHOLD = 0.005
+
+
+def _as_matrix(predictions: np.ndarray) -> np.ndarray:
+    matrix = np.asarray(predictions, dtype=float)
+    return matrix.reshape(1, -1) if matrix.ndim == 1 else matrix
+
+
+def forecast_metrics(actuals: np.ndarray, predictions: np.ndarray) -> Dict[str, np.ndarray]:
+    """MAE / RMSE / MAPE / R^2 / directional accuracy, one value per model row.
+
+    Definitions match sklearn's mean_absolute_error, mean_squared_error,
+    mean_absolute_percentage_error and r2_score.
+    """
+    actual = np.asarray(actuals, dtype=float)
+    matrix = _as_matrix(predictions)
+    errors = matrix - actual
+    abs_errors = np.abs(errors)
+    eps = np.finfo(float).eps
+
+    ss_res = np.sum(errors ** 2, axis=1)
+    ss_tot = float(np.sum((actual - actual.mean()) ** 2))
+    if ss_tot > 0:
+        r_squared = 1.0 - ss_res / ss_tot
+    else:
+        r_squared = np.where(ss_res == 0, 1.0, 0.0)
+
+    if actual.size > 1:
+        agree = (np.diff(matrix, axis=1) > 0) == (np.diff(actual) > 0)
+        directional_accuracy = agree.mean(axis=1) * 100
+    else:
+        directional_accuracy = np.zeros(len(matrix))
+
+    return {
+        "mae": abs_errors.mean(axis=1),
+        "rmse": np.sqrt(ss_res / actual.size),
+        "mape": (abs_errors / np.maximum(np.abs(actual), eps)).mean(axis=1) * 100,
+        "r_squared": r_squared,
+        "directional_accuracy": directional_accuracy,
+    }
+
+
+def _positions(matrix: np.ndarray, threshold: float) -> np.ndarray:
+    """1 while long, 0 while flat, decided at each day's close (last day excluded)."""
+    previous = matrix[:, :-1]
+    predicted_move = np.divide(
+        matrix[:, 1:] - previous,
+        previous,
+        out=np.zeros_like(previous),
+        where=previous != 0,
+    )
+    signal = np.where(predicted_move > threshold, 1.0, np.where(predicted_move < -threshold, 0.0, np.nan))
+    # Hold the last buy/sell decision: forward-fill the signal along each row.
+    days = np.arange(signal.shape[1])
+    last_decision = np.maximum.accumulate(np.where(np.isnan(signal), -1, days), axis=1)
+    held = np.take_along_axis(signal, np.maximum(last_decision, 0), axis=1)
+    return np.where(last_decision < 0, 0.0, held)
+
+
+def simulate_trading(
+    predictions: np.ndarray,
+    actuals: np.ndarray,
+    *,
+    initial_capital: float = 10000.0,
+    transaction_cost_bps: float = 0.0,
+    slippage_bps: float = 0.0,
+    threshold: float = SIGNAL_THRESHOLD,
+) -> Optional[Dict[str, Any]]:
+    """Equity curves and trading statistics for every model row at once."""
+    matrix = _as_matrix(predictions)
+    actual = np.asarray(actuals, dtype=float)
+    if matrix.shape[1] < 2:
+        return None
+
+    positions = _positions(matrix, threshold)
+    trades = np.diff(np.concatenate((np.zeros((len(matrix), 1)), positions), axis=1), axis=1) != 0
+    price_returns = np.diff(actual) / actual[:-1]
+    cost = (float(transaction_cost_bps) + float(slippage_bps)) / 10_000.0
+    growth = (1.0 - cost * trades) * (1.0 + positions * price_returns)
+    equity = float(initial_capital) * np.concatenate(
+        (np.ones((len(matrix), 1)), np.cumprod(growth, axis=1)),
+        axis=1,
+    )
+
+    daily_returns = np.diff(equity, axis=1) / np.maximum(equity[:, :-1], 1e-9)
+    volatility = daily_returns.std(axis=1)
+    sharpe = np.divide(
+        daily_returns.mean(axis=1) * math.sqrt(TRADING_DAYS_PER_YEAR),
+        volatility,
+        out=np.zeros(len(matrix)),
+        where=volatility > 0,
+    )
+    running_max = np.maximum.accumulate(equity, axis=1)
+    drawdown = (equity - running_max) / np.maximum(running_max, 1e-9) * 100
+
+    total_return = (equity[:, -1] - initial_capital) / initial_capital * 100
+    buy_hold_return = (actual[-1] / actual[0] - 1.0) * 100
+    return {
+        "equity": equity,
+        "final_value": equity[:, -1],
+        "total_return": total_return,
+        "buy_hold_return": buy_hold_return,
+        "sharpe_ratio": sharpe,
+        "max_drawdown": drawdown.min(axis=1),
+        "num_trades": trades.sum(axis=1),
+        "initial_capital": float(initial_capital),
+        "transaction_cost_bps": float(transaction_cost_bps),
+        "slippage_bps": float(slippage_bps),
+    }
+
+
+def trading_summary(simulation: Dict[str, Any], row: int = 0) -> Dict[str, Any]:
+    """The JSON shape calculate_trading_returns has always returned, for one row."""
+    total_return = float(simulation["total_return"][row])
+    buy_hold_return = float(simulation["buy_hold_return"])
+    return {
+        "initial_capital": round(simulation["initial_capital"], 2),
+        "final_value": round(float(simulation["final_value"][row]), 2),
+        "total_return": round(total_return, 2),
+        "buy_hold_return": round(buy_hold_return, 2),
+        "outperformance": round(total_return - buy_hold_return, 2),
+        "sharpe_ratio": round(float(simulation["sharpe_ratio"][row]), 2),
+        "max_drawdown": round(float(simulation["max_drawdown"][row]), 2),
+        "num_trades": int(simulation["num_trades"][row]),
+        "transaction_cost_bps": simulation["transaction_cost_bps"],
+        "slippage_bps": simulation["slippage_bps"],
+        "portfolio_values": np.round(simulation["equity"][row], 2).tolist(),
+    }
@@ -0,0 +1,428 @@
+"""Canonical local store of daily OHLCV bars.
+
+Every consumer of daily history (prediction, options signals, portfolio
+optimization, paper-portfolio history and the screener) reads through this
+store instead of downloading years of bars on each cold call. Bars live in
+one uncompressed Arrow IPC file per ticker under ``BAR_STORE_DIR`` (default
+``backend/bar_store``). Reads memory-map the file and hand back read-only
+pandas columns over the mapping; copy before mutating in place.
+
+A ticker's file modification time records when it was last refreshed. Once
+that is older than ``BAR_STORE_REFRESH_SECONDS``, only bars from a few days
+before the stored watermark are downloaded and merged. If the overlapping
+closes moved (a split or dividend re-adjusted the series), the full history is
+refetched instead. Bars are standardized once, at write time, and the file is
+trimmed to ``BAR_STORE_FULL_PERIOD`` (three years, enough for the longest
+portfolio-optimization lookback); readers take their own trailing window.
+
+Downloads go out in ``DOWNLOAD_CHUNK_SIZE`` chunks. ``yfinance.download``
+collects results in module-global state, so calls to one provider are
+serialized process-wide; the parallelism comes from the provider itself, which
+fetches the tickers of a chunk on ``BAR_STORE_DOWNLOAD_WORKERS`` threads.
+Every chunk first takes a token from its provider's bucket
+(``BAR_STORE_DOWNLOAD_RATE_PER_SECOND``, shared by all stores in the
+process). A chunk that fails, or comes back without some of its tickers, is
+retried for those tickers ``BAR_STORE_DOWNLOAD_RETRIES`` times with jittered
+exponential backoff.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import random
+import threading
+import time
+from datetime import timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import yfinance as yf
+
+OHLCV_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+DEFAULT_REFRESH_SECONDS = 15 * 60
+DEFAULT_FULL_PERIOD = "3y"
+DOWNLOAD_CHUNK_SIZE = 40
+DEFAULT_DOWNLOAD_WORKERS = 4
+DEFAULT_DOWNLOAD_RATE_PER_SECOND = 2.0
+DEFAULT_DOWNLOAD_RETRIES = 2
+RETRY_BACKOFF_SECONDS = 0.5
+OVERLAP_DAYS = 7
+REVISION_RTOL = 1e-6
+BAR_SUFFIX = ".arrow"
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(int(os.getenv(name, str(default))), 0)
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return max(float(os.getenv(name, str(default))), 0.0)
+    except (TypeError, ValueError):
+        return default
+
+
+class RateLimiter:
+    """Token bucket: ``rate_per_second`` tokens refill continuously up to ``burst``."""
+
+    def __init__(self, rate_per_second: float, burst: int = 1) -> None:
+        self.rate_per_second = max(float(rate_per_second), 0.0)
+        self.burst = max(int(burst), 1)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take a token, sleeping until one is available; returns the seconds waited."""
+        if self.rate_per_second <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate_per_second)
+            self._updated = now
+            self._tokens -= 1.0
+            wait = 0.0 if self._tokens >= 0 else -self._tokens / self.rate_per_second
+        if wait:
+            time.sleep(wait)
+        return wait
+
+
+_UNLIMITED = RateLimiter(0)
+_RATE_LIMITERS: Dict[str, RateLimiter] = {}
+_RATE_LIMITERS_LOCK = threading.Lock()
+
+
+def provider_rate_limiter(provider: str) -> RateLimiter:
+    with _RATE_LIMITERS_LOCK:
+        limiter = _RATE_LIMITERS.get(provider)
+        if limiter is None:
+            limiter = _RATE_LIMITERS[provider] = RateLimiter(
+                _env_float("BAR_STORE_DOWNLOAD_RATE_PER_SECOND", DEFAULT_DOWNLOAD_RATE_PER_SECOND),
+                burst=max(_env_int("BAR_STORE_DOWNLOAD_WORKERS", DEFAULT_DOWNLOAD_WORKERS), 1),
+            )
+        return limiter
+
+
+_PROVIDER_LOCKS: Dict[str, threading.Lock] = {}
+
+
+def provider_lock(provider: str) -> threading.Lock:
+    """Serializes calls into one download provider across every store in the process."""
+    with _RATE_LIMITERS_LOCK:
+        return _PROVIDER_LOCKS.setdefault(provider, threading.Lock())
+
+
+def _provider_name(download_fn: Callable[..., Any]) -> str:
+    return str(getattr(download_fn, "__module__", None) or type(download_fn).__module__).split(".")[0]
+
+
+def empty_bars() -> pd.DataFrame:
+    return pd.DataFrame(columns=OHLCV_COLUMNS)
+
+
+def standardize_ohlcv(df: Optional[pd.DataFrame]) -> pd.DataFrame:
+    if df is None or getattr(df, "empty", True):
+        return empty_bars()
+    standardized = df.copy()
+    if isinstance(standardized.columns, pd.MultiIndex):
+        standardized.columns = [col[0] for col in standardized.columns]
+    if "Close" not in standardized.columns:
+        if len(standardized.columns) == 1:
+            standardized.columns = ["Close"]
+        else:
+            return empty_bars()
+    for column in ("Open", "High", "Low"):
+        if column not in standardized.columns:
+            standardized[column] = standardized["Close"]
+    if "Volume" not in standardized.columns:
+        standardized["Volume"] = 1.0
+    standardized = standardized[OHLCV_COLUMNS].copy()
+    standardized.index = pd.to_datetime(standardized.index)
+    standardized = standardized.sort_index()
+    for column in standardized.columns:
+        standardized[column] = pd.to_numeric(standardized[column], errors="coerce")
+    standardized["Close"] = standardized["Close"].ffill().bfill()
+    standardized["Open"] = standardized["Open"].ffill().bfill().fillna(standardized["Close"])
+    standardized["High"] = standardized["High"].ffill().bfill().fillna(standardized["Close"])
+    standardized["Low"] = standardized["Low"].ffill().bfill().fillna(standardized["Close"])
+    standardized["Volume"] = standardized["Volume"].ffill().bfill().fillna(1.0)
+    standardized = standardized.dropna(subset=["Close"])
+    return standardized
+
+
+def split_download(raw: Any, tickers: List[str]) -> Dict[str, pd.DataFrame]:
+    """Per-ticker frames from a (possibly multi-ticker) ``yfinance.download`` result."""
+    frames: Dict[str, pd.DataFrame] = {}
+    if not isinstance(raw, pd.DataFrame) or raw.empty:
+        return frames
+    if not isinstance(raw.columns, pd.MultiIndex):
+        if len(tickers) == 1:
+            frames[tickers[0]] = raw
+        return frames
+
+    fields_first = bool(set(raw.columns.get_level_values(0)).intersection(OHLCV_COLUMNS))
+    for ticker in tickers:
+        if fields_first:
+            columns = [field for field in OHLCV_COLUMNS if (field, ticker) in raw.columns]
+            if not columns:
+                continue
+            frame = raw.loc[:, [(field, ticker) for field in columns]].copy()
+            frame.columns = columns
+        else:
+            if ticker not in raw.columns.get_level_values(0):
+                continue
+            frame = raw[ticker].copy()
+        frames[ticker] = frame
+    return frames
+
+
+def _period_offset(period: str) -> pd.DateOffset:
+    period = str(period).strip().lower()
+    if period.endswith("y"):
+        return pd.DateOffset(years=int(period[:-1]))
+    if period.endswith("mo"):
+        return pd.DateOffset(months=int(period[:-2]))
+    if period.endswith("d"):
+        return pd.DateOffset(days=int(period[:-1]))
+    raise ValueError(f"Unsupported period: {period}")
+
+
+def tail_period(frame: pd.DataFrame, period: str) -> pd.DataFrame:
+    """The trailing ``period`` (yfinance notation: ``2y``, ``6mo``, ``428d``) of ``frame``."""
+    if frame is None or frame.empty:
+        return frame
+    return frame[frame.index > frame.index[-1] - _period_offset(period)]
+
+
+def _normalize_ticker(ticker: Any) -> str:
+    return str(ticker or "").strip().upper()
+
+
+class BarStore:
+    def __init__(
+        self,
+        directory: str,
+        *,
+        refresh_seconds: int = DEFAULT_REFRESH_SECONDS,
+        full_period: str = DEFAULT_FULL_PERIOD,
+        download_fn: Optional[Callable[..., Any]] = None,
+        download_workers: int = 1,
+        retries: int = 0,
+        backoff_seconds: float = RETRY_BACKOFF_SECONDS,
+        rate_limited: bool = False,
+        logger=logging.getLogger("marketmind_api"),
+    ) -> None:
+        self.directory = directory
+        self.refresh_seconds = max(int(refresh_seconds), 0)
+        self.full_period = full_period
+        self.download_fn = download_fn
+        self.download_workers = max(int(download_workers), 1)
+        self.retries = max(int(retries), 0)
+        self.backoff_seconds = max(float(backoff_seconds), 0.0)
+        self.rate_limited = bool(rate_limited)
+        self.logger = logger
+
+    def path(self, ticker: str) -> str:
+        safe = "".join(ch if ch.isalnum() or ch in "-." else "_" for ch in _normalize_ticker(ticker))
+        return os.path.join(self.directory, f"{safe}{BAR_SUFFIX}")
+
+    def read(self, ticker: str) -> Optional[pd.DataFrame]:
+        """Stored bars for ``ticker`` (memory-mapped, read-only) without refreshing."""
+        return self._read(ticker)[0]
+
+    def watermark(self, ticker: str) -> Optional[pd.Timestamp]:
+        frame = self.read(ticker)
+        return None if frame is None or frame.empty else frame.index[-1]
+
+    def _read(self, ticker: str) -> Tuple[Optional[pd.DataFrame], float]:
+        path = self.path(ticker)
+        try:
+            fetched_at = os.path.getmtime(path)
+            table = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+        except FileNotFoundError:
+            return None, 0.0
+        except (OSError, pa.ArrowInvalid) as exc:
+            self.logger.warning("Discarding unreadable bar file for %s: %s", ticker, exc)
+            return None, 0.0
+        frame = table.drop_columns(["Date"]).to_pandas(split_blocks=True)
+        frame.index = pd.DatetimeIndex(table.column("Date").to_numpy(), name="Date")
+        return frame, fetched_at
+
+    def write(self, ticker: str, bars: pd.DataFrame) -> pd.DataFrame:
+        """Standardize and persist ``bars`` as the full stored history for ``ticker``."""
+        standardized = tail_period(standardize_ohlcv(bars), self.full_period)
+        index = pd.DatetimeIndex(standardized.index)
+        if index.tz is not None:
+            index = index.tz_localize(None)
+        columns = {"Date": pa.array(index.values.astype("datetime64[ns]"))}
+        for column in OHLCV_COLUMNS:
+            columns[column] = pa.array(standardized[column].to_numpy(dtype=np.float64))
+        table = pa.table(columns)
+
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path(ticker)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with pa.OSFile(tmp_path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, path)
+        return self.read(ticker)
+
+    def get(self, ticker: str, **kwargs) -> pd.DataFrame:
+        """Bars for one ticker, refreshed if stale; an empty frame when none are available."""
+        normalized = _normalize_ticker(ticker)
+        frame = self.get_many([normalized], **kwargs).get(normalized)
+        return frame if frame is not None else empty_bars()
+
+    def get_many(
+        self,
+        tickers: Iterable[str],
+        *,
+        download_fn: Optional[Callable[..., Any]] = None,
+        max_age_seconds: Optional[int] = None,
+        allow_stale: bool = True,
+    ) -> Dict[str, pd.DataFrame]:
+        """Bars for every ticker, downloading only what is missing or stale.
+
+        Stale tickers are refreshed incrementally in batched downloads. When a
+        refresh fails, the previously stored bars are returned if
+        ``allow_stale`` and the ticker is omitted otherwise.
+        """
+        download_fn = download_fn or self.download_fn or yf.download
+        max_age = self.refresh_seconds if max_age_seconds is None else max(int(max_age_seconds), 0)
+        now = time.time()
+        results: Dict[str, pd.DataFrame] = {}
+        stored: Dict[str, pd.DataFrame] = {}
+        plans: Dict[Optional[str], List[str]] = {}
+
+        for ticker in dict.fromkeys(_normalize_ticker(ticker) for ticker in tickers if _normalize_ticker(ticker)):
+            frame, fetched_at = self._read(ticker)
+            if frame is not None and now - fetched_at < max_age:
+                results[ticker] = frame
+                continue
+            start = None
+            if frame is not None and not frame.empty:
+                stored[ticker] = frame
+                start = (frame.index[-1] - timedelta(days=OVERLAP_DAYS)).strftime("%Y-%m-%d")
+            plans.setdefault(start, []).append(ticker)
+
+        refetch: List[str] = []
+        for start, group in plans.items():
+            fetched = self._download(download_fn, group, start=start)
+            for ticker in group:
+                bars = fetched.get(ticker)
+                if bars is None or bars.empty:
+                    if allow_stale and ticker in stored:
+                        results[ticker] = stored[ticker]
+                    continue
+                merged = self._merge(stored.get(ticker), bars) if start is not None else bars
+                if merged is None:
+                    refetch.append(ticker)
+                    continue
+                results[ticker] = self.write(ticker, merged)
+
+        if refetch:
+            fetched = self._download(download_fn, refetch, start=None)
+            for ticker in refetch:
+                bars = fetched.get(ticker)
+                if bars is not None and not bars.empty:
+                    results[ticker] = self.write(ticker, bars)
+                elif allow_stale:
+                    results[ticker] = stored[ticker]
+        return results
+
+    def _download(self, download_fn, tickers: List[str], *, start: Optional[str]) -> Dict[str, pd.DataFrame]:
+        window = {"start": start} if start else {"period": self.full_period}
+        provider = _provider_name(download_fn)
+        limiter = provider_rate_limiter(provider) if self.rate_limited else _UNLIMITED
+        frames: Dict[str, pd.DataFrame] = {}
+        for offset in range(0, len(tickers), DOWNLOAD_CHUNK_SIZE):
+            chunk = tickers[offset:offset + DOWNLOAD_CHUNK_SIZE]
+            frames.update(self._download_chunk(download_fn, chunk, window, limiter, provider_lock(provider)))
+        return frames
+
+    def _download_chunk(
+        self,
+        download_fn,
+        chunk: List[str],
+        window: Dict[str, str],
+        limiter: RateLimiter,
+        lock: threading.Lock,
+    ) -> Dict[str, pd.DataFrame]:
+        frames: Dict[str, pd.DataFrame] = {}
+        remaining = list(chunk)
+        for attempt in range(self.retries + 1):
+            if attempt:
+                time.sleep(self.backoff_seconds * (2 ** (attempt - 1)) * random.uniform(0.5, 1.5))
+            limiter.acquire()
+            try:
+                with lock:
+                    raw = download_fn(
+                        remaining if len(remaining) > 1 else remaining[0],
+                        interval="1d",
+                        auto_adjust=True,
+                        progress=False,
+                        group_by="ticker",
+                        threads=min(self.download_workers, len(remaining)) if self.download_workers > 1 and len(remaining) > 1 else False,
+                        **window,
+                    )
+            except Exception as exc:
+                if attempt >= self.retries:
+                    self.logger.warning("Bar download failed for %s: %s", ",".join(remaining), exc)
+                continue
+            for ticker, frame in split_download(raw, remaining).items():
+                standardized = standardize_ohlcv(frame)
+                if not standardized.empty:
+                    frames[ticker] = standardized
+            remaining = [ticker for ticker in remaining if ticker not in frames]
+            if not remaining:
+                break
+        return frames
+
+    @staticmethod
+    def _merge(stored: Optional[pd.DataFrame], fetched: pd.DataFrame) -> Optional[pd.DataFrame]:
+        """Append ``fetched`` to ``stored``; None when the overlapping closes were revised."""
+        if stored is None or stored.empty:
+            return fetched
+        fetched = fetched.copy()
+        if fetched.index.tz is not None:
+            fetched.index = fetched.index.tz_localize(None)
+        overlap = stored.index.intersection(fetched.index)
+        if len(overlap) and not np.allclose(
+            stored.loc[overlap, "Close"].to_numpy(),
+            fetched.loc[overlap, "Close"].to_numpy(),
+            rtol=REVISION_RTOL,
+            atol=0.0,
+        ):
+            return None
+        head = stored[stored.index < fetched.index[0]]
+        return pd.concat([head, fetched])
+
+
+_STORES: Dict[str, BarStore] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def get_bar_store(base_dir: Optional[str] = None) -> BarStore:
+    """The shared store (``BAR_STORE_DIR`` or ``<base_dir>/bar_store``)."""
+    base_dir = base_dir or os.path.dirname(os.path.abspath(__file__))
+    directory = os.getenv("BAR_STORE_DIR", "").strip() or os.path.join(base_dir, "bar_store")
+    with _STORES_LOCK:
+        store = _STORES.get(directory)
+        if store is None:
+            store = BarStore(
+                directory,
+                refresh_seconds=_env_int("BAR_STORE_REFRESH_SECONDS", DEFAULT_REFRESH_SECONDS),
+                full_period=os.getenv("BAR_STORE_FULL_PERIOD", DEFAULT_FULL_PERIOD).strip() or DEFAULT_FULL_PERIOD,
+                download_workers=max(_env_int("BAR_STORE_DOWNLOAD_WORKERS", DEFAULT_DOWNLOAD_WORKERS), 1),
+                retries=_env_int("BAR_STORE_DOWNLOAD_RETRIES", DEFAULT_DOWNLOAD_RETRIES),
+                backoff_seconds=_env_float("BAR_STORE_DOWNLOAD_BACKOFF_SECONDS", RETRY_BACKOFF_SECONDS),
+                rate_limited=True,
+            )
+            _STORES[directory] = store
+        return store
@@ -0,0 +1,153 @@
+"""CPU thread budget for the forecasting libraries.
+
+RandomForest, XGBoost, LightGBM, CatBoost and torch each default to using
+every core, so a few concurrent forecasts across Gunicorn workers oversubscribe
+the host. This module splits a configured core budget evenly across the web
+workers (``COMPUTE_CORE_BUDGET`` / ``WEB_CONCURRENCY``) and then across the
+forecasts running concurrently inside a worker. Model builders ask for
+``threads_per_job()`` when they instantiate estimators, and
+``apply_torch_threads`` caps torch's intra-op pool before training or inference.
+
+Evaluation pool processes are pinned to their share of the worker budget when
+they start (see evaluation_executor), and the parent ``reserve``s those cores
+while it has work in the pool so its own forecasts do not count them twice.
+"""
+from __future__ import annotations
+
+import functools
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(int(os.getenv(name, str(default))), 1)
+    except (TypeError, ValueError):
+        return default
+
+
+class ComputeBudget:
+    def __init__(self, *, core_budget: int, workers: int = 1) -> None:
+        self.core_budget = max(int(core_budget), 1)
+        self.workers = max(int(workers), 1)
+        self.worker_cores = max(self.core_budget // self.workers, 1)
+        self._active = 0
+        self._peak = 0
+        self._reserved = 0
+        self._pinned: Optional[int] = None
+        self._torch_threads: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def threads_per_job(self) -> int:
+        """Threads one estimator may use given the forecasts currently running."""
+        if self._pinned is not None:
+            return self._pinned
+        with self._lock:
+            active = max(self._active, 1)
+            available = self.worker_cores - self._reserved
+        return max(available // active, 1)
+
+    @contextmanager
+    def forecast_slot(self) -> Iterator[int]:
+        """Count a forecast as running for its duration; yields its thread share."""
+        with self._lock:
+            self._active += 1
+            self._peak = max(self._peak, self._active)
+        try:
+            yield self.threads_per_job()
+        finally:
+            with self._lock:
+                self._active -= 1
+
+    @contextmanager
+    def reserve(self, cores: int) -> Iterator[None]:
+        """Withhold ``cores`` from in-process forecasts while pool processes use them."""
+        cores = max(int(cores), 0)
+        with self._lock:
+            self._reserved += cores
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._reserved -= cores
+
+    def pin(self, threads: int) -> None:
+        """Fix the per-job thread count (used inside evaluation pool processes)."""
+        self._pinned = max(int(threads), 1)
+
+    def apply_torch_threads(self, torch) -> int:
+        threads = self.threads_per_job()
+        if torch.get_num_threads() != threads:
+            torch.set_num_threads(threads)
+        self._torch_threads = threads
+        return threads
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            active, peak, reserved = self._active, self._peak, self._reserved
+        threads = self.threads_per_job()
+        return {
+            "coreBudget": self.core_budget,
+            "workers": self.workers,
+            "workerCores": self.worker_cores,
+            "activeForecasts": active,
+            "peakForecasts": peak,
+            "reservedCores": reserved,
+            "pinnedThreads": self._pinned,
+            "allocation": {
+                "sklearnNJobs": threads,
+                "xgboostNJobs": threads,
+                "lightgbmNJobs": threads,
+                "catboostThreadCount": threads,
+                "torchNumThreads": threads,
+            },
+            "torchThreadsApplied": self._torch_threads,
+            "pid": os.getpid(),
+        }
+
+
+def build_compute_budget() -> ComputeBudget:
+    return ComputeBudget(
+        core_budget=_env_int("COMPUTE_CORE_BUDGET", os.cpu_count() or 1),
+        workers=_env_int("WEB_CONCURRENCY", 1),
+    )
+
+
+_BUDGET = build_compute_budget()
+
+
+def get_compute_budget() -> ComputeBudget:
+    return _BUDGET
+
+
+def threads_per_job() -> int:
+    return _BUDGET.threads_per_job()
+
+
+def forecast_slot():
+    return _BUDGET.forecast_slot()
+
+
+def apply_torch_threads(torch) -> int:
+    return _BUDGET.apply_torch_threads(torch)
+
+
+def reserve_cores(cores: int):
+    return _BUDGET.reserve(cores)
+
+
+def pin_worker_threads(threads: int) -> None:
+    _BUDGET.pin(threads)
+
+
+def forecast_request(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Decorator: run ``fn`` inside a forecast slot."""
+
+    @functools.wraps(fn)
+    def _wrapped(*args, **kwargs):
+        with _BUDGET.forecast_slot():
+            return fn(*args, **kwargs)
+
+    return _wrapped
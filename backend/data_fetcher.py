@@ -5,6 +5,7 @@ import pandas as pd
 import requests
 import yfinance as yf
 
+import bar_store
 from config import ALPHA_VANTAGE_API_KEY
 from http_policy import timeout
 
@@ -137,14 +138,14 @@ def get_stock_data_with_fallback(ticker, min_days=300):
     Smart data fetcher with fallback
     
     Strategy:
-    1. Try yfinance first (auto-adjusted, good for ML)
+    1. Read the local bar store (auto-adjusted yfinance bars, 2 years,
+       topped up incrementally; see bar_store.py)
     2. If insufficient data, try Alpha Vantage for more history
     
     Returns:
         DataFrame or None
     """
-    # Try yfinance first (auto-adjusted prices, 2 years)
-    df = fetch_from_yfinance(ticker, period='2y')
+    df = bar_store.tail_period(bar_store.get_bar_store().get(ticker), '2y')
     
     if df is not None and len(df) >= min_days:
         print("✓ Using yfinance data (adjusted prices)")
@@ -0,0 +1,222 @@
+"""Worker pool for rolling-window evaluation stages.
+
+rolling_window_backtest splits an evaluation into independent stages (the
+StatsForecast CV, one MLForecast CV per model and the SHAP explainability
+step). This module fans those stages out over a small pool (by default the web
+worker's share of the core budget, at most ``DEFAULT_MAX_POOL_WORKERS``, so
+WEB_CONCURRENCY workers do not each spawn a process per core), records
+per-stage wall time and stops waiting as soon as the caller reports that the
+client went away.
+
+Stages must be module-level callables with picklable arguments when the
+process pool is used. Stages named in ``in_process`` (the SHAP step, whose
+explainer and summary caches live in this process) run on a thread here
+instead, alongside the pooled ones. ``EVALUATION_EXECUTOR_MODE=thread`` or
+``inline`` keeps everything in-process (useful for debugging and tests).
+"""
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import select
+import socket
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+import compute_budget
+
+EXECUTOR_MODES = ("process", "thread", "inline")
+DEFAULT_MAX_CONCURRENT_JOBS = 2
+DEFAULT_MAX_POOL_WORKERS = 4
+POLL_INTERVAL_SECONDS = 0.25
+
+StageTask = Tuple[Callable[..., Any], Tuple[Any, ...], Dict[str, Any]]
+
+
+class EvaluationCancelled(RuntimeError):
+    """Raised when the caller asked to abandon an evaluation in flight."""
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(int(os.getenv(name, str(default))), 1)
+    except (TypeError, ValueError):
+        return default
+
+
+def default_max_workers() -> int:
+    """Pool size for one web worker: its share of the core budget, capped."""
+    return max(min(compute_budget.get_compute_budget().worker_cores, DEFAULT_MAX_POOL_WORKERS), 1)
+
+
+def _timed_call(fn: Callable[..., Any], args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Tuple[float, Any]:
+    started = time.perf_counter()
+    with compute_budget.forecast_slot():
+        result = fn(*args, **kwargs)
+    return time.perf_counter() - started, result
+
+
+class EvaluationExecutor:
+    def __init__(
+        self,
+        *,
+        mode: str = "process",
+        max_workers: Optional[int] = None,
+        max_concurrent_jobs: int = DEFAULT_MAX_CONCURRENT_JOBS,
+        start_method: str = "spawn",
+        logger=logging.getLogger("marketmind_api"),
+    ) -> None:
+        self.mode = mode if mode in EXECUTOR_MODES else "process"
+        self.max_workers = max(int(max_workers or default_max_workers()), 1)
+        self.max_concurrent_jobs = max(int(max_concurrent_jobs), 1)
+        self.start_method = start_method
+        self.process_threads = max(compute_budget.get_compute_budget().worker_cores // self.max_workers, 1)
+        self.logger = logger
+        self._slots = threading.BoundedSemaphore(self.max_concurrent_jobs)
+        self._pool_lock = threading.Lock()
+        self._pool = None
+        self._local_pool = None
+
+    def _get_pool(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                return self._pool
+            if self.mode == "process":
+                try:
+                    self._pool = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        mp_context=multiprocessing.get_context(self.start_method),
+                        initializer=compute_budget.pin_worker_threads,
+                        initargs=(self.process_threads,),
+                    )
+                    return self._pool
+                except (OSError, ValueError) as exc:
+                    self.logger.warning("Evaluation process pool unavailable (%s). Falling back to threads.", exc)
+                    self.mode = "thread"
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="evaluation")
+            return self._pool
+
+    def _get_local_pool(self):
+        with self._pool_lock:
+            if self._local_pool is None:
+                self._local_pool = ThreadPoolExecutor(max_workers=self.max_concurrent_jobs, thread_name_prefix="evaluation-local")
+            return self._local_pool
+
+    def _reset_pool(self) -> None:
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def run(
+        self,
+        tasks: Dict[str, StageTask],
+        *,
+        should_cancel: Optional[Callable[[], bool]] = None,
+        in_process: Iterable[str] = (),
+    ) -> Tuple[Dict[str, Any], Dict[str, float]]:
+        """Run every stage and return ``(results, timings)`` keyed by stage name.
+
+        At most ``max_concurrent_jobs`` evaluations share the pool at once; the
+        rest wait for a slot. Stages named in ``in_process`` never leave this
+        process. Pending stages are cancelled when ``should_cancel`` turns
+        true. Stages already running in a worker finish on their own, but
+        their results are discarded.
+        """
+        with self._slots:
+            if self.mode == "inline":
+                return self._run_inline(tasks, should_cancel)
+            return self._run_pooled(tasks, should_cancel, frozenset(in_process))
+
+    def _run_inline(self, tasks, should_cancel):
+        results: Dict[str, Any] = {}
+        timings: Dict[str, float] = {}
+        for name, (fn, args, kwargs) in tasks.items():
+            if should_cancel is not None and should_cancel():
+                raise EvaluationCancelled("Evaluation cancelled by caller.")
+            timings[name], results[name] = _timed_call(fn, args, kwargs)
+        return results, timings
+
+    def _run_pooled(self, tasks, should_cancel, in_process):
+        pool = self._get_pool()
+        if self.mode != "process":
+            return self._collect({name: pool for name in tasks}, tasks, should_cancel)
+        local_pool = self._get_local_pool()
+        pools = {name: local_pool if name in in_process else pool for name in tasks}
+        pooled = sum(1 for name in tasks if name not in in_process)
+        # Pool processes keep their own per-process budgets, so the cores they
+        # are pinned to are withheld from this process while the stages run.
+        with compute_budget.reserve_cores(min(pooled, self.max_workers) * self.process_threads):
+            return self._collect(pools, tasks, should_cancel)
+
+    def _collect(self, pools, tasks, should_cancel):
+        futures: Dict[Future, str] = {
+            pools[name].submit(_timed_call, fn, args, kwargs): name for name, (fn, args, kwargs) in tasks.items()
+        }
+        results: Dict[str, Any] = {}
+        timings: Dict[str, float] = {}
+        pending = set(futures)
+        try:
+            while pending:
+                done, pending = wait(pending, timeout=POLL_INTERVAL_SECONDS, return_when=FIRST_COMPLETED)
+                for future in done:
+                    timings[futures[future]], results[futures[future]] = future.result()
+                if pending and should_cancel is not None and should_cancel():
+                    raise EvaluationCancelled("Evaluation cancelled by caller.")
+        except BrokenProcessPool:
+            self._reset_pool()
+            raise
+        finally:
+            for future in pending:
+                future.cancel()
+        return results, timings
+
+    def shutdown(self) -> None:
+        self._reset_pool()
+        with self._pool_lock:
+            local_pool, self._local_pool = self._local_pool, None
+        if local_pool is not None:
+            local_pool.shutdown(wait=False, cancel_futures=True)
+
+
+_EXECUTOR: Optional[EvaluationExecutor] = None
+_EXECUTOR_LOCK = threading.Lock()
+
+
+def get_evaluation_executor() -> EvaluationExecutor:
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = EvaluationExecutor(
+                mode=os.getenv("EVALUATION_EXECUTOR_MODE", "process").strip().lower(),
+                max_workers=_env_int("EVALUATION_MAX_WORKERS", default_max_workers()),
+                max_concurrent_jobs=_env_int("EVALUATION_MAX_CONCURRENT_JOBS", DEFAULT_MAX_CONCURRENT_JOBS),
+                start_method=os.getenv("EVALUATION_START_METHOD", "spawn").strip().lower() or "spawn",
+            )
+        return _EXECUTOR
+
+
+def client_disconnected_fn(environ: Dict[str, Any]) -> Callable[[], bool]:
+    """Build a cheap probe that reports whether the HTTP client hung up.
+
+    Works with the raw sockets Gunicorn and the Werkzeug dev server expose in
+    the WSGI environ; other servers never report a disconnect.
+    """
+    sock = environ.get("gunicorn.socket") or environ.get("werkzeug.socket")
+    if sock is None:
+        return lambda: False
+
+    def _disconnected() -> bool:
+        try:
+            readable, _, _ = select.select([sock], [], [], 0)
+            if not readable:
+                return False
+            return sock.recv(1, socket.MSG_PEEK) == b""
+        except (OSError, ValueError):
+            return True
+
+    return _disconnected
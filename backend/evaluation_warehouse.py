@@ -0,0 +1,396 @@
+"""Walk-forward evaluation across a ticker universe, persisted to Parquet.
+
+rolling_window_backtest evaluates one ticker per request and its result only
+lives in the forecast cache. This module runs it across a universe (the
+screener universe CSV by default) in a process pool and writes one Parquet file
+per ticker, holding one row per model with its forecast metrics and trading
+returns. The per-ticker files double as the checkpoint: a resumed run skips
+tickers that already have a fresh file for the same evaluation options.
+
+Readers get a single ticker back in rolling_window_backtest's shape minus
+dates/actuals/predictions (``load_result``). Cross-ticker questions go through
+DuckDB over the whole directory (``leaderboard``).
+
+CLI (from the repository root):
+
+    python backend/evaluation_warehouse.py --limit 50 --workers 4
+    python backend/evaluation_warehouse.py --report mape
+
+The API scheduler can run the same refresh daily (EVALUATION_WAREHOUSE_SCHEDULE).
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import compute_budget
+import evaluation_executor
+import prediction_service
+import screener_universe_service
+
+WAREHOUSE_SUFFIX = ".parquet"
+DEFAULT_MAX_AGE_SECONDS = 2 * 86400
+RUN_MODES = ("process", "thread", "inline")
+
+METRIC_FIELDS = ("mae", "rmse", "mape", "r_squared", "directional_accuracy")
+RETURN_FIELDS = (
+    "initial_capital",
+    "final_value",
+    "total_return",
+    "buy_hold_return",
+    "outperformance",
+    "sharpe_ratio",
+    "max_drawdown",
+    "num_trades",
+    "transaction_cost_bps",
+    "slippage_bps",
+)
+
+SCHEMA = pa.schema(
+    [
+        ("ticker", pa.string()),
+        ("model", pa.string()),
+        ("evaluated_at", pa.float64()),
+        ("feature_spec_version", pa.string()),
+        ("test_days", pa.int32()),
+        ("fast_mode", pa.bool_()),
+        ("retrain_frequency", pa.int32()),
+        ("max_train_rows", pa.int32()),
+        ("start_date", pa.string()),
+        ("end_date", pa.string()),
+        ("days", pa.int32()),
+        ("best_model", pa.string()),
+        *[(name, pa.float64()) for name in METRIC_FIELDS],
+        *[(name, pa.int64() if name == "num_trades" else pa.float64()) for name in RETURN_FIELDS],
+        ("portfolio_values", pa.list_(pa.float64())),
+    ]
+)
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(int(os.getenv(name, str(default))), 1)
+    except (TypeError, ValueError):
+        return default
+
+
+def evaluation_options(test_days: int = 60, fast_mode: bool = True) -> Dict[str, Any]:
+    retrain_frequency, max_train_rows = prediction_service.evaluation_defaults(fast_mode)
+    return {
+        "test_days": int(test_days),
+        "fast_mode": bool(fast_mode),
+        "retrain_frequency": retrain_frequency,
+        "max_train_rows": max_train_rows,
+    }
+
+
+def result_rows(ticker: str, result: Dict[str, Any], options: Dict[str, Any], evaluated_at: float) -> List[Dict[str, Any]]:
+    """Flatten a rolling_window_backtest result into one warehouse row per model."""
+    period = result.get("test_period") or {}
+    rows = []
+    for model_name, payload in (result.get("models") or {}).items():
+        metrics = payload.get("metrics") or {}
+        returns = payload.get("returns") or (result.get("returns") if model_name == "ensemble" else None) or {}
+        row = {
+            "ticker": ticker,
+            "model": model_name,
+            "evaluated_at": float(evaluated_at),
+            "feature_spec_version": result.get("featureSpecVersion"),
+            **options,
+            "start_date": period.get("start_date"),
+            "end_date": period.get("end_date"),
+            "days": period.get("days"),
+            "best_model": result.get("best_model"),
+            "portfolio_values": returns.get("portfolio_values"),
+        }
+        row.update({name: metrics.get(name) for name in METRIC_FIELDS})
+        row.update({name: returns.get(name) for name in RETURN_FIELDS})
+        rows.append(row)
+    return rows
+
+
+class EvaluationWarehouse:
+    def __init__(self, directory: str, *, max_age_seconds: int = DEFAULT_MAX_AGE_SECONDS) -> None:
+        self.directory = directory
+        self.max_age_seconds = max_age_seconds
+
+    def _path(self, ticker: str) -> str:
+        return os.path.join(self.directory, f"{ticker.upper()}{WAREHOUSE_SUFFIX}")
+
+    def write(self, ticker: str, rows: List[Dict[str, Any]]) -> None:
+        table = pa.Table.from_pylist(rows, schema=SCHEMA)
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        os.close(fd)
+        try:
+            pq.write_table(table, tmp_path)
+            os.replace(tmp_path, self._path(ticker))
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def rows(self, ticker: str) -> List[Dict[str, Any]]:
+        path = self._path(ticker)
+        if not os.path.exists(path):
+            return []
+        return pq.read_table(path).to_pylist()
+
+    def _fresh_rows(self, ticker: str, options: Dict[str, Any], max_age_seconds: Optional[int] = None) -> List[Dict[str, Any]]:
+        max_age = self.max_age_seconds if max_age_seconds is None else max_age_seconds
+        rows = self.rows(ticker)
+        if not rows or time.time() - rows[0]["evaluated_at"] > max_age:
+            return []
+        if any(rows[0][name] != value for name, value in options.items()):
+            return []
+        return rows
+
+    def is_fresh(self, ticker: str, options: Dict[str, Any], max_age_seconds: Optional[int] = None) -> bool:
+        return bool(self._fresh_rows(ticker, options, max_age_seconds))
+
+    def load_result(self, ticker: str, *, test_days: int = 60, fast_mode: bool = True) -> Optional[Dict[str, Any]]:
+        """Stored evaluation in rolling_window_backtest's shape, or None when missing/stale."""
+        rows = self._fresh_rows(ticker, evaluation_options(test_days, fast_mode))
+        if not rows:
+            return None
+        first = rows[0]
+        models = {}
+        for row in rows:
+            returns = {name: row[name] for name in RETURN_FIELDS if row[name] is not None}
+            if returns:
+                returns["portfolio_values"] = row["portfolio_values"] or []
+            models[row["model"]] = {"metrics": {name: row[name] for name in METRIC_FIELDS}, "returns": returns}
+        return {
+            "ticker": first["ticker"],
+            "featureSpecVersion": first["feature_spec_version"],
+            "test_period": {"start_date": first["start_date"], "end_date": first["end_date"], "days": first["days"]},
+            "models": models,
+            "returns": (models.get("ensemble") or {}).get("returns") or None,
+            "best_model": first["best_model"],
+            "evaluationOptions": {
+                "fastMode": first["fast_mode"],
+                "retrainFrequency": first["retrain_frequency"],
+                "maxTrainRows": first["max_train_rows"],
+            },
+            "evaluatedAt": first["evaluated_at"],
+        }
+
+    def leaderboard(self, *, model: str = "ensemble", metric: str = "mape", limit: int = 20) -> List[Dict[str, Any]]:
+        """Best tickers by ``metric`` for ``model`` across the whole warehouse (DuckDB)."""
+        if metric not in METRIC_FIELDS + RETURN_FIELDS:
+            raise ValueError(f"Unknown metric '{metric}'.")
+        pattern = os.path.join(self.directory, f"*{WAREHOUSE_SUFFIX}")
+        if not os.path.isdir(self.directory) or not any(name.endswith(WAREHOUSE_SUFFIX) for name in os.listdir(self.directory)):
+            return []
+        import duckdb
+
+        # Lower is better for error metrics; higher for returns, Sharpe and
+        # drawdown (stored as a negative percentage).
+        descending = metric not in ("mae", "rmse", "mape")
+        connection = duckdb.connect(database=":memory:")
+        try:
+            cursor = connection.execute(
+                f"""
+                SELECT ticker, {metric} AS value, evaluated_at, test_days, fast_mode
+                FROM read_parquet(?)
+                WHERE model = ? AND {metric} IS NOT NULL
+                ORDER BY value {"DESC" if descending else "ASC"}
+                LIMIT ?
+                """,
+                [pattern, model, int(limit)],
+            )
+            columns = [column[0] for column in cursor.description]
+            return [dict(zip(columns, record)) for record in cursor.fetchall()]
+        finally:
+            connection.close()
+
+
+_WAREHOUSES: Dict[str, EvaluationWarehouse] = {}
+_WAREHOUSES_LOCK = threading.Lock()
+
+
+def get_evaluation_warehouse(base_dir: Optional[str] = None) -> EvaluationWarehouse:
+    directory = os.getenv("EVALUATION_WAREHOUSE_DIR") or os.path.join(
+        base_dir or os.path.dirname(os.path.abspath(__file__)),
+        "evaluation_warehouse",
+    )
+    with _WAREHOUSES_LOCK:
+        warehouse = _WAREHOUSES.get(directory)
+        if warehouse is None:
+            warehouse = EvaluationWarehouse(
+                directory,
+                max_age_seconds=_env_int("EVALUATION_WAREHOUSE_MAX_AGE_SECONDS", DEFAULT_MAX_AGE_SECONDS),
+            )
+            _WAREHOUSES[directory] = warehouse
+        return warehouse
+
+
+def _init_worker(threads: int) -> None:
+    # Each pool process evaluates one ticker at a time, so its stages run
+    # inline rather than opening a nested pool.
+    os.environ["EVALUATION_EXECUTOR_MODE"] = "inline"
+    compute_budget.pin_worker_threads(threads)
+
+
+def evaluate_ticker(ticker: str, options: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Backtest one ticker and return its warehouse rows (empty without enough history)."""
+    result = prediction_service.rolling_window_backtest(ticker, include_explanations=False, **options)
+    if not result:
+        return []
+    return result_rows(ticker, result, options, time.time())
+
+
+def _process_threads(max_workers: int) -> int:
+    return max(compute_budget.get_compute_budget().worker_cores // max_workers, 1)
+
+
+def _build_pool(mode: str, max_workers: int):
+    if mode == "process":
+        return ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(_process_threads(max_workers),),
+        )
+    return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="evaluation-warehouse")
+
+
+def run_universe(
+    tickers: Optional[Iterable[str]] = None,
+    *,
+    warehouse: Optional[EvaluationWarehouse] = None,
+    test_days: int = 60,
+    fast_mode: bool = True,
+    max_workers: Optional[int] = None,
+    resume: bool = True,
+    mode: str = "process",
+    evaluate_fn: Callable[[str, Dict[str, Any]], List[Dict[str, Any]]] = evaluate_ticker,
+    logger=logging.getLogger("marketmind_api"),
+) -> Dict[str, Any]:
+    """Evaluate every ticker not already fresh in the warehouse; rows are written as each finishes."""
+    warehouse = warehouse or get_evaluation_warehouse()
+    if tickers is None:
+        tickers = [record["symbol"] for record in screener_universe_service.load_universe()]
+    options = evaluation_options(test_days, fast_mode)
+    universe = list(dict.fromkeys(str(ticker).strip().upper() for ticker in tickers if str(ticker).strip()))
+    pending = [ticker for ticker in universe if not (resume and warehouse.is_fresh(ticker, options))]
+    summary: Dict[str, Any] = {
+        "universe": len(universe),
+        "skipped": len(universe) - len(pending),
+        "evaluated": 0,
+        "insufficientData": [],
+        "failed": {},
+    }
+    started = time.perf_counter()
+
+    def _record(ticker: str, produce: Callable[[], List[Dict[str, Any]]]) -> None:
+        try:
+            rows = produce()
+        except Exception as exc:
+            logger.warning("Warehouse evaluation failed for %s: %s", ticker, exc)
+            summary["failed"][ticker] = str(exc)
+            return
+        if not rows:
+            summary["insufficientData"].append(ticker)
+            return
+        warehouse.write(ticker, rows)
+        summary["evaluated"] += 1
+
+    mode = mode if mode in RUN_MODES else "process"
+    if mode == "inline" or not pending:
+        for ticker in pending:
+            _record(ticker, lambda ticker=ticker: evaluate_fn(ticker, options))
+    else:
+        workers = max(int(max_workers or _env_int("EVALUATION_MAX_WORKERS", evaluation_executor.default_max_workers())), 1)
+        workers = min(workers, len(pending))
+        pool = _build_pool(mode, workers)
+        # Like the evaluation executor's pool, these processes are pinned to
+        # their share, so the web worker hosting the refresh withholds it.
+        reserved = workers * _process_threads(workers) if mode == "process" else 0
+        try:
+            with compute_budget.reserve_cores(reserved):
+                futures = {pool.submit(evaluate_fn, ticker, options): ticker for ticker in pending}
+                outstanding = set(futures)
+                while outstanding:
+                    done, outstanding = wait(outstanding, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        _record(futures[future], future.result)
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    summary["elapsedSeconds"] = round(time.perf_counter() - started, 3)
+    logger.info(
+        "Evaluation warehouse run: %s evaluated, %s skipped, %s failed in %.1fs",
+        summary["evaluated"],
+        summary["skipped"],
+        len(summary["failed"]),
+        summary["elapsedSeconds"],
+    )
+    return summary
+
+
+_REFRESH_LOCK = threading.Lock()
+
+
+def start_background_refresh(base_dir: Optional[str] = None, **kwargs: Any) -> bool:
+    """Scheduler hook: run ``run_universe`` in a daemon thread unless one is already running."""
+    if not _REFRESH_LOCK.acquire(blocking=False):
+        return False
+
+    def _run() -> None:
+        try:
+            run_universe(warehouse=get_evaluation_warehouse(base_dir), **kwargs)
+        except Exception as exc:
+            logging.getLogger("marketmind_api").error("Evaluation warehouse refresh failed: %s", exc)
+        finally:
+            _REFRESH_LOCK.release()
+
+    threading.Thread(target=_run, name="evaluation-warehouse-refresh", daemon=True).start()
+    return True
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Walk-forward evaluation across the screener universe.")
+    parser.add_argument("--tickers", nargs="*", help="Tickers to evaluate (default: the screener universe)")
+    parser.add_argument("--limit", type=int, default=None, help="Only evaluate the first N tickers")
+    parser.add_argument("--test-days", type=int, default=60)
+    parser.add_argument("--full", action="store_true", help="Full evaluation instead of fast mode")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--no-resume", action="store_true", help="Re-evaluate tickers that are already fresh")
+    parser.add_argument("--report", metavar="METRIC", help="Print the ensemble leaderboard for METRIC and exit")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper(), format="%(asctime)s | %(levelname)s | %(message)s")
+
+    warehouse = get_evaluation_warehouse()
+    if args.report:
+        for row in warehouse.leaderboard(metric=args.report, limit=args.limit or 20):
+            print(f"{row['ticker']:<8} {row['value']:>12.4f}")
+        return 0
+
+    tickers = args.tickers or [record["symbol"] for record in screener_universe_service.load_universe()]
+    if args.limit:
+        tickers = tickers[: args.limit]
+    summary = run_universe(
+        tickers,
+        warehouse=warehouse,
+        test_days=args.test_days,
+        fast_mode=not args.full,
+        max_workers=args.workers,
+        resume=not args.no_resume,
+    )
+    print(summary)
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
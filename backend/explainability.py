@@ -0,0 +1,196 @@
+"""SHAP explainability for the evaluation stack.
+
+prediction_service asks for two summaries per fitted model: the features that
+matter most across recent history and the top contributors to the latest
+prediction. This module keeps that cheap:
+
+* the SHAP background is a small systematic sample spread evenly over the
+  whole feature history (``SHAP_BACKGROUND_SAMPLES``), not the last 200 rows,
+  and global importance is estimated on a sample of the recent window
+  (``SHAP_EXPLAIN_ROWS``);
+* explainers are reused for as long as the same fitted model object is cached;
+* finished summaries are memoized per (ticker, data watermark, evaluation
+  point, model); failed ones are not, so the next request retries.
+
+``EXPLAINABILITY_MODE=background`` computes summaries on a worker thread.
+``request`` then returns ``PENDING`` until they are ready, so an evaluation
+doesn't wait for SHAP.
+"""
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+PENDING = "pending"
+READY = "ready"
+EXPLAIN_WINDOW_ROWS = 200
+TOP_FEATURES = 5
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(int(os.getenv(name, str(default))), 1)
+    except (TypeError, ValueError):
+        return default
+
+
+def systematic_sample(frame: pd.DataFrame, size: int) -> pd.DataFrame:
+    """``size`` rows spread evenly across ``frame`` (all rows when it is smaller)."""
+    if len(frame) <= size:
+        return frame
+    positions = np.unique(np.linspace(0, len(frame) - 1, size).round().astype(int))
+    return frame.iloc[positions]
+
+
+def data_watermark(ohlcv: pd.DataFrame) -> Tuple[Any, ...]:
+    if ohlcv.empty:
+        return (0, None, None)
+    return (len(ohlcv), str(ohlcv.index[-1]), float(ohlcv["Close"].iloc[-1]))
+
+
+class ExplainabilityEngine:
+    def __init__(
+        self,
+        *,
+        background_samples: int = 32,
+        explain_rows: int = 64,
+        max_entries: int = 256,
+        background: bool = False,
+    ) -> None:
+        self.background_samples = max(int(background_samples), 1)
+        self.explain_rows = max(int(explain_rows), 1)
+        self.max_entries = max(int(max_entries), 1)
+        self.background = bool(background)
+        self._explainers: "OrderedDict[Hashable, Tuple[Any, Any]]" = OrderedDict()
+        self._summaries: "OrderedDict[Hashable, Dict[str, Any]]" = OrderedDict()
+        self._results: "OrderedDict[Hashable, Dict[str, Any]]" = OrderedDict()
+        self._pending: Dict[Hashable, Any] = {}
+        self._lock = threading.Lock()
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    def _remember(self, store: "OrderedDict", key: Hashable, value: Any) -> None:
+        with self._lock:
+            store[key] = value
+            store.move_to_end(key)
+            while len(store) > self.max_entries:
+                store.popitem(last=False)
+
+    def _explainer(self, key: Hashable, model_name: str, model: Any, feature_frame: pd.DataFrame):
+        with self._lock:
+            entry = self._explainers.get(key)
+        if entry is not None and entry[0] is model:
+            return entry[1]
+        import shap
+
+        background = systematic_sample(feature_frame, self.background_samples)
+        if model_name == "linear_regression":
+            explainer = shap.LinearExplainer(model, background)
+        else:
+            explainer = shap.TreeExplainer(model, data=background)
+        self._remember(self._explainers, key, (model, explainer))
+        return explainer
+
+    def summarize(
+        self,
+        model_name: str,
+        model: Any,
+        feature_frame: pd.DataFrame,
+        latest_features: pd.DataFrame,
+        *,
+        cache_key: Tuple[Any, ...],
+        serialize_fn: Callable[[str, Any, Any], Dict[str, Any]],
+        clean_fn: Callable[[Any, int], Optional[float]],
+    ) -> Optional[Dict[str, Any]]:
+        """Global and latest-prediction SHAP summary for one fitted model (memoized)."""
+        if feature_frame is None or feature_frame.empty or latest_features is None or latest_features.empty:
+            return None
+        summary_key = (*cache_key, model_name)
+        with self._lock:
+            if summary_key in self._summaries:
+                return self._summaries[summary_key]
+        try:
+            explainer = self._explainer(cache_key[:2] + (model_name,), model_name, model, feature_frame)
+            explain_set = systematic_sample(feature_frame.tail(EXPLAIN_WINDOW_ROWS), self.explain_rows)
+            explain_values = np.atleast_2d(np.asarray(explainer.shap_values(explain_set)))
+            latest_values = np.atleast_2d(np.asarray(explainer.shap_values(latest_features)))
+
+            mean_abs = np.abs(explain_values).mean(axis=0)
+            top_indices = np.argsort(mean_abs)[::-1][:TOP_FEATURES]
+            latest_row = latest_features.iloc[0]
+            latest_impacts = latest_values[0]
+            latest_indices = np.argsort(np.abs(latest_impacts))[::-1][:TOP_FEATURES]
+            summary = {
+                "global_top_features": [
+                    {"feature": str(feature_frame.columns[idx]), "meanAbsImpact": clean_fn(mean_abs[idx], 4)}
+                    for idx in top_indices
+                ],
+                "latest_prediction_contributors": [
+                    serialize_fn(feature_frame.columns[idx], latest_row.iloc[idx], latest_impacts[idx])
+                    for idx in latest_indices
+                ],
+            }
+        except Exception:
+            # Not memoized: a transient failure should not hide the summary
+            # until the entry is evicted.
+            return None
+        self._remember(self._summaries, summary_key, summary)
+        return summary
+
+    def request(self, key: Hashable, compute_fn: Callable[[], Dict[str, Any]]) -> Tuple[str, Dict[str, Any]]:
+        """``(READY, explanations)`` when finished, else queue ``compute_fn`` and return ``(PENDING, {})``.
+
+        Outside background mode the explanations are computed inline.
+        """
+        with self._lock:
+            if key in self._results:
+                self._results.move_to_end(key)
+                return READY, self._results[key]
+        if not self.background:
+            result = compute_fn()
+            self._remember(self._results, key, result)
+            return READY, result
+        with self._lock:
+            if key not in self._pending:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="explainability")
+                self._pending[key] = self._pool.submit(self._run, key, compute_fn)
+        return PENDING, {}
+
+    def is_pending(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._pending
+
+    def ready(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._results.get(key)
+
+    def _run(self, key: Hashable, compute_fn: Callable[[], Dict[str, Any]]) -> None:
+        try:
+            self._remember(self._results, key, compute_fn())
+        except Exception:
+            # Dropping the key lets the next request retry.
+            pass
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._explainers.clear()
+            self._summaries.clear()
+            self._results.clear()
+
+
+def build_explainability_engine() -> ExplainabilityEngine:
+    return ExplainabilityEngine(
+        background_samples=_env_int("SHAP_BACKGROUND_SAMPLES", 32),
+        explain_rows=_env_int("SHAP_EXPLAIN_ROWS", 64),
+        max_entries=_env_int("SHAP_CACHE_MAX_ENTRIES", 256),
+        background=os.getenv("EXPLAINABILITY_MODE", "sync").strip().lower() == "background",
+    )
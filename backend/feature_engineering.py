@@ -0,0 +1,188 @@
+"""Shared lag / rolling-statistic feature builder.
+
+models.py (LSTM, Transformer) and options_model.py (the RF direction
+classifier) train on the same close-price features: ``lookback`` lagged
+closes, 7/14/30-session moving averages, 7-session volatility and the daily
+percent change. This module builds that matrix once with numpy: the lag block
+is a strided view from ``sliding_window_view`` copied into a single
+preallocated array, and the moving averages come from one cumulative sum with
+missing closes masked out.
+
+The matrix is memoized per (ticker, data watermark, lookback), so every model
+that asks for the same history reuses it; the options classifier's
+full-window variant is derived from that same matrix. Cached arrays are
+read-only and each caller gets its own frame around them.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, List, Tuple
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+MOVING_AVERAGE_WINDOWS = (7, 14, 30)
+VOLATILITY_WINDOW = 7
+CACHE_MAX_ENTRIES = max(int(os.getenv("FEATURE_CACHE_MAX_ENTRIES", "64")), 1)
+
+_CACHE: "OrderedDict[Tuple[Any, ...], pd.DataFrame]" = OrderedDict()
+_CACHE_LOCK = threading.Lock()
+
+
+def feature_columns(lookback: int) -> List[str]:
+    return [f"lag_{i}" for i in range(1, lookback + 1)] + [
+        "ma_7",
+        "ma_14",
+        "ma_30",
+        "volatility",
+        "price_change",
+    ]
+
+
+def _window_counts(valid: np.ndarray, window: int) -> np.ndarray:
+    """Non-missing closes in each trailing window (shorter at the start)."""
+    cumulative = np.concatenate(([0], np.cumsum(valid)))
+    positions = np.arange(1, len(valid) + 1)
+    return cumulative[positions] - cumulative[np.maximum(positions - window, 0)]
+
+
+def _moving_averages(close: np.ndarray) -> List[np.ndarray]:
+    """Trailing means over the closes present in each window (pandas ``min_periods=1``).
+
+    Missing closes are masked out of one cumulative sum, so a NaN only
+    affects the windows that contain it, as with pandas ``rolling``.
+    """
+    valid = ~np.isnan(close)
+    cumulative = np.concatenate(([0.0], np.cumsum(np.where(valid, close, 0.0))))
+    positions = np.arange(1, len(close) + 1)
+    averages = []
+    for window in MOVING_AVERAGE_WINDOWS:
+        starts = np.maximum(positions - window, 0)
+        counts = _window_counts(valid, window)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = (cumulative[positions] - cumulative[starts]) / counts
+        mean[counts == 0] = np.nan
+        averages.append(mean)
+    return averages
+
+
+def _rolling_std(close: np.ndarray, window: int, *, min_periods: int) -> np.ndarray:
+    n = len(close)
+    out = np.full(n, np.nan)
+    if not np.isnan(close).any():
+        if n >= window:
+            out[window - 1:] = sliding_window_view(close, window).std(axis=1, ddof=1)
+        for end in range(max(min_periods, 2), min(window, n + 1)):
+            out[end - 1] = close[:end].std(ddof=1)
+        return out
+    padded = np.concatenate((np.full(window - 1, np.nan), close))
+    windows = sliding_window_view(padded, window)
+    counts = window - np.isnan(windows).sum(axis=1)
+    enough = counts >= max(min_periods, 2)
+    if enough.any():
+        with np.errstate(invalid="ignore"):
+            out[enough] = np.nanstd(windows[enough], axis=1, ddof=1)
+    return out
+
+
+def _partial_window_matrix(close: np.ndarray, lookback: int) -> np.ndarray:
+    n = len(close)
+    matrix = np.empty((n, lookback + 5), dtype=float)
+
+    padded = np.concatenate((np.full(lookback, np.nan), close))
+    windows = sliding_window_view(padded, lookback + 1)[:n]
+    matrix[:, :lookback] = windows[:, lookback - 1::-1]
+
+    for offset, average in enumerate(_moving_averages(close)):
+        matrix[:, lookback + offset] = average
+    matrix[:, lookback + 3] = _rolling_std(close, VOLATILITY_WINDOW, min_periods=2)
+    if n:
+        matrix[0, lookback + 4] = np.nan
+    with np.errstate(divide="ignore", invalid="ignore"):
+        matrix[1:, lookback + 4] = close[1:] / close[:-1] - 1.0
+    return matrix
+
+
+def _full_window_matrix(partial: np.ndarray, close: np.ndarray, lookback: int) -> np.ndarray:
+    """Derive the full-window variant from the partial-window matrix.
+
+    Where a window holds all of its closes the two agree; everywhere else a
+    full-window statistic is NaN. Short histories use the full-sample mean
+    for the longest window, as the options classifier always has.
+    """
+    matrix = partial.copy()
+    valid = ~np.isnan(close)
+    for offset, window in enumerate((*MOVING_AVERAGE_WINDOWS, VOLATILITY_WINDOW)):
+        matrix[_window_counts(valid, window) < window, lookback + offset] = np.nan
+    if len(close) <= MOVING_AVERAGE_WINDOWS[-1]:
+        matrix[:, lookback + 2] = np.nanmean(close) if valid.any() else np.nan
+    return matrix
+
+
+def build_feature_matrix(close: np.ndarray, lookback: int = 14, *, partial_windows: bool = True) -> np.ndarray:
+    """Feature matrix aligned to ``close`` (rows with missing lags are NaN).
+
+    ``partial_windows`` mirrors pandas ``min_periods``: True averages whatever
+    history exists (models.py semantics); False leaves incomplete windows NaN
+    (options_model semantics).
+    """
+    close = np.asarray(close, dtype=float)
+    matrix = _partial_window_matrix(close, lookback)
+    return matrix if partial_windows else _full_window_matrix(matrix, close, lookback)
+
+
+def _cache_key(df: pd.DataFrame, close: np.ndarray, lookback: int) -> Tuple[Any, ...]:
+    digest = hashlib.blake2b(close.tobytes(), digest_size=16).hexdigest()
+    watermark = (len(df), df.index[-1] if len(df) else None)
+    return (df.attrs.get("ticker"), watermark, digest, int(lookback))
+
+
+def _memoized(key: Tuple[Any, ...], index: pd.Index, lookback: int, build) -> pd.DataFrame:
+    with _CACHE_LOCK:
+        cached = _CACHE.get(key)
+        if cached is not None:
+            _CACHE.move_to_end(key)
+            return cached
+
+    matrix = build()
+    matrix.setflags(write=False)
+    features = pd.DataFrame(matrix, index=index, columns=feature_columns(lookback), copy=False)
+    with _CACHE_LOCK:
+        _CACHE[key] = features
+        while len(_CACHE) > CACHE_MAX_ENTRIES:
+            _CACHE.popitem(last=False)
+    return features
+
+
+def feature_frame(df: pd.DataFrame, lookback: int = 14, *, partial_windows: bool = True) -> pd.DataFrame:
+    """Memoized feature columns for ``df`` (read-only, aligned to its index).
+
+    Both window modes come from one memoized partial-window matrix; the
+    full-window variant is derived from it rather than rebuilt.
+    """
+    close = df["Close"].to_numpy(dtype=float)
+    key = _cache_key(df, close, lookback)
+    partial = _memoized(key, df.index, lookback, lambda: _partial_window_matrix(close, lookback))
+    if partial_windows:
+        return partial
+    return _memoized(
+        key + ("full_windows",),
+        df.index,
+        lookback,
+        lambda: _full_window_matrix(partial.to_numpy(), close, lookback),
+    )
+
+
+def create_features(df: pd.DataFrame, lookback: int = 14, *, partial_windows: bool = True) -> pd.DataFrame:
+    """``df`` plus the lag/rolling feature columns, with incomplete rows dropped."""
+    features = feature_frame(df, lookback, partial_windows=partial_windows)
+    return pd.concat([df, features], axis=1).dropna()
+
+
+def clear_cache() -> None:
+    with _CACHE_LOCK:
+        _CACHE.clear()
@@ -0,0 +1,401 @@
+"""Forecast cache backends for the prediction stack.
+
+prediction_service caches fitted forecasts, ensemble weights, canonical OHLCV
+and evaluation payloads. Values are stored *frozen* (the cache keeps its own
+read-only copy of every numpy array and frame) and handed back with fresh
+containers around shared leaves, so a cache hit never deep-copies fitted
+estimators; frames are copied on the way out, which is a buffer copy.
+
+The local tier is a per-process LRU bounded by entry count and estimated byte
+size. An optional shared tier (a directory on local disk or a Redis URL) lets
+Gunicorn workers on one host reuse each other's expensive fits; only the
+namespaces listed in ``SHARED_NAMESPACES`` are written there.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import pickle
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from threading import RLock
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import redis as redis_module  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency at runtime
+    redis_module = None
+
+
+DEFAULT_TTL_SECONDS = 300
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+DEFAULT_SHARED_MAX_BYTES = 2 * 1024 * 1024 * 1024
+SWEEP_INTERVAL_SECONDS = 60
+SHARED_NAMESPACES = (
+    "ml_forecast",
+    "ml_forecast_global",
+    "stats_forecast",
+    "ensemble_weights",
+    "rolling_backtest",
+)
+KEY_PREFIX = "marketmind-forecast"
+
+
+def freeze_value(value: Any) -> Any:
+    """Read-only copies of numpy leaves and frames, so cached values can be shared safely.
+
+    The caller's own arrays are left writable; leaves that are already
+    read-only (values read back from the cache) are not copied again.
+    """
+    if isinstance(value, np.ndarray):
+        if not value.flags.writeable:
+            return value
+        frozen = value.copy()
+        frozen.setflags(write=False)
+        return frozen
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy(deep=True)
+    if isinstance(value, dict):
+        return {key: freeze_value(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [freeze_value(item) for item in value]
+    if isinstance(value, tuple):
+        return tuple(freeze_value(item) for item in value)
+    return value
+
+
+def thaw_value(value: Any) -> Any:
+    """Return fresh containers around the shared (read-only) cached leaves.
+
+    JSON-style payloads can then be mutated by callers without touching the
+    cached copy. Arrays (read-only) and estimators are shared; frames get a
+    copy of their buffers, since pandas allows in-place edits of shared data.
+    """
+    if isinstance(value, dict):
+        return {key: thaw_value(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [thaw_value(item) for item in value]
+    if isinstance(value, tuple):
+        return tuple(thaw_value(item) for item in value)
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy(deep=True)
+    return value
+
+
+def estimate_nbytes(value: Any, _depth: int = 0) -> int:
+    """Approximate footprint without serializing anything.
+
+    Fitted estimators are sized by walking their attributes a few levels
+    deep, which catches the numpy coefficient/tree arrays that dominate them;
+    memory held natively by a library (a Booster's C buffers) is not counted.
+    """
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(index=True, deep=False)
+        return int(usage.sum() if hasattr(usage, "sum") else usage)
+    if value is None or isinstance(value, (str, bytes, int, float, bool, pd.Timestamp)):
+        return sys.getsizeof(value)
+    if _depth >= 4:
+        return sys.getsizeof(value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            estimate_nbytes(key, _depth + 1) + estimate_nbytes(item, _depth + 1) for key, item in value.items()
+        )
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_nbytes(item, _depth + 1) for item in value)
+    attributes = getattr(value, "__dict__", None)
+    if isinstance(attributes, dict):
+        return sys.getsizeof(value) + sum(estimate_nbytes(item, _depth + 1) for item in attributes.values())
+    return sys.getsizeof(value)
+
+
+def serialize_key(key: Tuple[Any, ...]) -> str:
+    namespace = str(key[0]) if key else "default"
+    digest = hashlib.sha256(repr(key).encode("utf-8")).hexdigest()
+    return f"{KEY_PREFIX}:{namespace}:{digest}"
+
+
+class InMemoryForecastCache:
+    def __init__(
+        self,
+        *,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        ttl_seconds: int = DEFAULT_TTL_SECONDS,
+    ) -> None:
+        self.max_entries = max(int(max_entries), 1)
+        self.max_bytes = max(int(max_bytes), 1)
+        self.ttl_seconds = max(int(ttl_seconds), 1)
+        self._store: "OrderedDict[Any, tuple[float, int, Any]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = RLock()
+
+    def get(self, key: Any) -> Any | None:
+        now = time.time()
+        with self._lock:
+            item = self._store.get(key)
+            if item is None:
+                return None
+            stored_at, _size, value = item
+            if now - stored_at > self.ttl_seconds:
+                self._pop(key)
+                return None
+            self._store.move_to_end(key)
+            return value
+
+    def set(self, key: Any, value: Any, *, stored_at: Optional[float] = None) -> None:
+        size = estimate_nbytes(value)
+        with self._lock:
+            self._pop(key)
+            if size > self.max_bytes:
+                return
+            self._store[key] = (time.time() if stored_at is None else stored_at, size, value)
+            self._bytes += size
+            while self._store and (len(self._store) > self.max_entries or self._bytes > self.max_bytes):
+                evicted_key = next(iter(self._store))
+                self._pop(evicted_key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._store.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._store), "bytes": self._bytes}
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+    def _pop(self, key: Any) -> None:
+        item = self._store.pop(key, None)
+        if item is not None:
+            self._bytes -= item[1]
+
+
+class DiskForecastCache:
+    """Host-local shared tier: one pickle file per entry, written atomically.
+
+    Writes sweep the directory at most every ``SWEEP_INTERVAL_SECONDS``:
+    expired files go first, then the oldest until the tier fits ``max_bytes``.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        *,
+        ttl_seconds: int = DEFAULT_TTL_SECONDS,
+        max_bytes: int = DEFAULT_SHARED_MAX_BYTES,
+    ) -> None:
+        self.directory = directory
+        self.ttl_seconds = max(int(ttl_seconds), 1)
+        self.max_bytes = max(int(max_bytes), 1)
+        self._swept_at = 0.0
+        self._sweep_lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        _prefix, namespace, digest = key.split(":", 2)
+        return os.path.join(self.directory, namespace, f"{digest}.pkl")
+
+    def get(self, key: str) -> tuple[float, Any] | None:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as handle:
+                stored_at, value = pickle.load(handle)
+        except (FileNotFoundError, EOFError, OSError, pickle.UnpicklingError, ValueError):
+            return None
+        if time.time() - stored_at > self.ttl_seconds:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            return None
+        return stored_at, value
+
+    def set(self, key: str, value: Any, *, stored_at: float) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        handle = tempfile.NamedTemporaryFile("wb", dir=os.path.dirname(path), suffix=".tmp", delete=False)
+        try:
+            with handle:
+                pickle.dump((stored_at, value), handle, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(handle.name, path)
+        except BaseException:
+            try:
+                os.remove(handle.name)
+            except FileNotFoundError:
+                pass
+            raise
+        self._maybe_sweep()
+
+    def _maybe_sweep(self) -> None:
+        now = time.time()
+        if now - self._swept_at < SWEEP_INTERVAL_SECONDS or not self._sweep_lock.acquire(blocking=False):
+            return
+        try:
+            self._swept_at = now
+            self.sweep(now=now)
+        finally:
+            self._sweep_lock.release()
+
+    def sweep(self, *, now: Optional[float] = None) -> int:
+        """Remove expired entries, then the oldest past ``max_bytes``; returns files removed."""
+        now = time.time() if now is None else now
+        entries = []
+        for root, _dirs, files in os.walk(self.directory):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+        total = sum(size for _mtime, size, _path in entries)
+        removed = 0
+        for mtime, size, path in entries:
+            if now - mtime <= self.ttl_seconds and total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        return removed
+
+
+class RedisForecastCache:
+    def __init__(self, cache_url: str, *, ttl_seconds: int = DEFAULT_TTL_SECONDS) -> None:
+        if redis_module is None:
+            raise RuntimeError("redis package is not installed")
+        self._client = redis_module.from_url(cache_url)
+        self.ttl_seconds = max(int(ttl_seconds), 1)
+
+    def get(self, key: str) -> tuple[float, Any] | None:
+        raw = self._client.get(key)
+        if raw is None:
+            return None
+        return pickle.loads(raw)
+
+    def set(self, key: str, value: Any, *, stored_at: float) -> None:
+        self._client.setex(key, self.ttl_seconds, pickle.dumps((stored_at, value), protocol=pickle.HIGHEST_PROTOCOL))
+
+
+class TieredForecastCache:
+    """Local LRU in front of an optional shared tier.
+
+    ``get``/``set`` take the tuple keys prediction_service already uses; the
+    first element is the namespace that decides whether the shared tier is
+    consulted. Shared-tier failures are logged and treated as misses so a
+    flaky Redis never fails a forecast.
+    """
+
+    def __init__(
+        self,
+        local: InMemoryForecastCache,
+        *,
+        shared: Any | None = None,
+        shared_namespaces: Iterable[str] = SHARED_NAMESPACES,
+        logger=logging.getLogger("marketmind_api"),
+    ) -> None:
+        self.local = local
+        self.shared = shared
+        self.shared_namespaces = frozenset(shared_namespaces)
+        self.logger = logger
+
+    def _uses_shared(self, key: Tuple[Any, ...]) -> bool:
+        return self.shared is not None and bool(key) and key[0] in self.shared_namespaces
+
+    def get(self, key: Tuple[Any, ...]) -> Any | None:
+        value = self.local.get(key)
+        if value is not None:
+            return thaw_value(value)
+        if not self._uses_shared(key):
+            return None
+        try:
+            item = self.shared.get(serialize_key(key))
+        except Exception as exc:
+            self.logger.warning("Shared forecast cache read failed: %s", exc)
+            return None
+        if item is None:
+            return None
+        stored_at, value = item
+        value = freeze_value(value)
+        self.local.set(key, value, stored_at=stored_at)
+        return thaw_value(value)
+
+    def set(self, key: Tuple[Any, ...], value: Any) -> Any:
+        frozen = freeze_value(value)
+        stored_at = time.time()
+        self.local.set(key, frozen, stored_at=stored_at)
+        if self._uses_shared(key):
+            try:
+                self.shared.set(serialize_key(key), frozen, stored_at=stored_at)
+            except Exception as exc:
+                self.logger.warning("Shared forecast cache write failed: %s", exc)
+        return thaw_value(frozen)
+
+    def clear(self) -> None:
+        """Drop the process-local tier; shared entries expire by TTL."""
+        self.local.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        payload: Dict[str, Any] = dict(self.local.stats())
+        payload["sharedBackend"] = type(self.shared).__name__ if self.shared is not None else None
+        return payload
+
+    def __len__(self) -> int:
+        return len(self.local)
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(int(os.getenv(name, str(default))), 1)
+    except (TypeError, ValueError):
+        return default
+
+
+def build_shared_backend(
+    shared_url: str,
+    *,
+    ttl_seconds: int,
+    max_bytes: int = DEFAULT_SHARED_MAX_BYTES,
+    logger=logging.getLogger("marketmind_api"),
+) -> Any | None:
+    url = str(shared_url or "").strip()
+    if not url:
+        return None
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        try:
+            return RedisForecastCache(url, ttl_seconds=ttl_seconds)
+        except Exception as exc:  # pragma: no cover - depends on optional runtime dependency
+            logger.warning("Shared forecast cache unavailable (%s). Using the local tier only.", exc)
+            return None
+    if url.startswith("file://"):
+        url = url[len("file://"):]
+    return DiskForecastCache(url, ttl_seconds=ttl_seconds, max_bytes=max_bytes)
+
+
+def build_forecast_cache(*, ttl_seconds: int = DEFAULT_TTL_SECONDS, logger=logging.getLogger("marketmind_api")) -> TieredForecastCache:
+    local = InMemoryForecastCache(
+        max_entries=_env_int("PREDICTION_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES),
+        max_bytes=_env_int("PREDICTION_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES),
+        ttl_seconds=ttl_seconds,
+    )
+    shared = build_shared_backend(
+        os.getenv("PREDICTION_CACHE_SHARED_URL", ""),
+        ttl_seconds=ttl_seconds,
+        max_bytes=_env_int("PREDICTION_CACHE_SHARED_MAX_BYTES", DEFAULT_SHARED_MAX_BYTES),
+        logger=logger,
+    )
+    return TieredForecastCache(local, shared=shared, logger=logger)
@@ -0,0 +1,159 @@
+"""On-disk store for trained deep-learning forecasters.
+
+models.lstm_train / models.transformer_train persist the network weights and
+the fitted MinMaxScaler parameters here, keyed by ticker, model kind, feature
+spec version and hyperparameters. Each artifact also records the data
+watermark (last bar date and row count) it was trained on, so callers can
+serve pure inference when nothing changed and warm-start when new bars
+arrived.
+
+Payloads are plain pickles of numpy arrays and scalars (no torch objects), so
+this module stays free of the ML stack. Files are written atomically and the
+store is pruned by age and total size after every save. Persistence is off
+unless ``MODEL_ARTIFACT_DIR`` names a data/cache directory.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import threading
+import time
+from typing import Any, Dict, Optional
+
+DEFAULT_MAX_AGE_SECONDS = 7 * 24 * 60 * 60
+DEFAULT_MAX_TOTAL_BYTES = 512 * 1024 * 1024
+ARTIFACT_SUFFIX = ".artifact.pkl"
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(int(os.getenv(name, str(default))), 1)
+    except (TypeError, ValueError):
+        return default
+
+
+def artifact_key(ticker: str, model_kind: str, feature_spec_version: str, hyperparameters: Dict[str, Any]) -> str:
+    canonical = json.dumps(
+        {"spec": feature_spec_version, "hyperparameters": hyperparameters},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    digest = hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:24]
+    safe_ticker = "".join(ch if ch.isalnum() else "_" for ch in str(ticker).upper())
+    return f"{safe_ticker}-{model_kind}-{digest}"
+
+
+def scaler_state(scaler) -> Dict[str, Any]:
+    return {
+        "feature_range": tuple(scaler.feature_range),
+        "min_": scaler.min_,
+        "scale_": scaler.scale_,
+        "data_min_": scaler.data_min_,
+        "data_max_": scaler.data_max_,
+        "data_range_": scaler.data_range_,
+        "n_features_in_": scaler.n_features_in_,
+        "n_samples_seen_": scaler.n_samples_seen_,
+    }
+
+
+def restore_scaler(state: Dict[str, Any]):
+    from sklearn.preprocessing import MinMaxScaler
+
+    scaler = MinMaxScaler(feature_range=tuple(state["feature_range"]))
+    for attribute, value in state.items():
+        if attribute != "feature_range":
+            setattr(scaler, attribute, value)
+    return scaler
+
+
+class ModelArtifactStore:
+    def __init__(
+        self,
+        directory: str,
+        *,
+        max_age_seconds: int = DEFAULT_MAX_AGE_SECONDS,
+        max_total_bytes: int = DEFAULT_MAX_TOTAL_BYTES,
+        logger=logging.getLogger("marketmind_api"),
+    ) -> None:
+        self.directory = directory
+        self.max_age_seconds = max(int(max_age_seconds), 1)
+        self.max_total_bytes = max(int(max_total_bytes), 1)
+        self.logger = logger
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}{ARTIFACT_SUFFIX}")
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.max_age_seconds:
+                self._remove(path)
+                return None
+            with open(path, "rb") as handle:
+                return pickle.load(handle)
+        except FileNotFoundError:
+            return None
+        except (EOFError, OSError, pickle.UnpicklingError, ValueError, AttributeError) as exc:
+            self.logger.warning("Discarding unreadable model artifact %s: %s", key, exc)
+            self._remove(path)
+            return None
+
+    def save(self, key: str, payload: Dict[str, Any]) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        # Per process and thread: the pooled and per-ticker fits of one worker
+        # can save the same key concurrently.
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as handle:
+            pickle.dump(dict(payload, saved_at=time.time()), handle, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def evict(self) -> Dict[str, int]:
+        """Drop artifacts older than the age limit, then the oldest until under the size budget."""
+        try:
+            names = [name for name in os.listdir(self.directory) if name.endswith(ARTIFACT_SUFFIX)]
+        except FileNotFoundError:
+            return {"artifacts": 0, "bytes": 0}
+        entries = []
+        now = time.time()
+        for name in names:
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            if now - stat.st_mtime > self.max_age_seconds:
+                self._remove(path)
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+        total = sum(size for _mtime, size, _path in entries)
+        while entries and total > self.max_total_bytes:
+            _mtime, size, path = entries.pop(0)
+            self._remove(path)
+            total -= size
+        return {"artifacts": len(entries), "bytes": total}
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def build_artifact_store(logger=logging.getLogger("marketmind_api")) -> Optional[ModelArtifactStore]:
+    directory = os.getenv("MODEL_ARTIFACT_DIR", "").strip()
+    if not directory:
+        return None
+    return ModelArtifactStore(
+        directory,
+        max_age_seconds=_env_int("MODEL_ARTIFACT_MAX_AGE_SECONDS", DEFAULT_MAX_AGE_SECONDS),
+        max_total_bytes=_env_int("MODEL_ARTIFACT_MAX_BYTES", DEFAULT_MAX_TOTAL_BYTES),
+        logger=logger,
+    )
@@ -0,0 +1,146 @@
+"""Per-ticker pruning of ensemble members that never earn weight.
+
+The production ensemble weights its members by inverse recent MAE, and on most
+tickers several members end up with almost no weight while still being fitted
+on every refresh. ``ModelSelector`` watches those weights per ticker: a model
+whose weight stays below ``threshold`` for ``patience`` consecutive refreshes
+(new data watermarks) is skipped from then on, and every ``retest_every``
+refreshes all candidates run again so a pruned model can earn its way back.
+
+Fit timings recorded with ``record_fit`` let ``report`` estimate the compute the
+current selection saves against the last run of the full model set.
+"""
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Optional, Tuple
+
+
+class ModelSelector:
+    def __init__(
+        self,
+        *,
+        threshold: float = 0.01,
+        patience: int = 3,
+        retest_every: int = 10,
+        max_tickers: int = 512,
+        enabled: bool = True,
+    ) -> None:
+        self.threshold = max(float(threshold), 0.0)
+        self.patience = max(int(patience), 1)
+        self.retest_every = max(int(retest_every), 1)
+        self.max_tickers = max(int(max_tickers), 1)
+        self.enabled = bool(enabled)
+        self._states: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _state(self, ticker: str) -> Dict[str, Any]:
+        state = self._states.get(ticker)
+        if state is None:
+            state = self._states[ticker] = {
+                "watermark": None,
+                "observed": None,
+                "refreshes": 0,
+                "streaks": {},
+                "candidates": (),
+                "active": (),
+                "retest": False,
+                "fits": {},
+            }
+        self._states.move_to_end(ticker)
+        while len(self._states) > self.max_tickers:
+            self._states.popitem(last=False)
+        return state
+
+    def select(self, ticker: str, watermark: Hashable, candidates: Iterable[str]) -> Tuple[str, ...]:
+        """Models to run for ``ticker`` at this data watermark (stable within a watermark)."""
+        candidates = tuple(candidates)
+        if not self.enabled:
+            return candidates
+        with self._lock:
+            state = self._state(ticker)
+            if state["watermark"] != watermark or state["candidates"] != candidates:
+                if state["watermark"] != watermark:
+                    state["refreshes"] += 1
+                state["watermark"] = watermark
+                state["candidates"] = candidates
+                state["retest"] = state["refreshes"] % self.retest_every == 0
+                state["active"] = tuple(
+                    name
+                    for name in candidates
+                    if state["retest"] or state["streaks"].get(name, 0) < self.patience
+                ) or candidates
+            return state["active"]
+
+    def observe(self, ticker: str, watermark: Hashable, weights: Dict[str, float]) -> None:
+        """Count this refresh's low-weight models; each watermark is observed once.
+
+        An active member missing from ``weights`` was fitted but contributes
+        nothing to the weighted ensemble (gradient boosting and the sequence
+        models are not CV-scored), so it counts as a weight of zero.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            state = self._state(ticker)
+            if state["watermark"] != watermark or state["observed"] == watermark:
+                return
+            state["observed"] = watermark
+            for name in state["active"]:
+                if float(weights.get(name, 0.0)) < self.threshold:
+                    state["streaks"][name] = state["streaks"].get(name, 0) + 1
+                else:
+                    state["streaks"][name] = 0
+
+    def record_fit(self, ticker: str, group: str, seconds: Optional[float], *, complete: bool) -> None:
+        """Fit time of one model group; ``complete`` runs (nothing pruned) set the baseline."""
+        if seconds is None:
+            return
+        with self._lock:
+            fit = self._state(ticker)["fits"].setdefault(group, {"last": 0.0, "baseline": None})
+            fit["last"] = float(seconds)
+            if complete:
+                fit["baseline"] = float(seconds)
+
+    def report(self, ticker: str) -> Dict[str, Any]:
+        with self._lock:
+            state = self._states.get(ticker)
+            if state is None:
+                return {"enabled": self.enabled, "active": [], "pruned": [], "retest": False}
+            active = list(state["active"])
+            pruned = [name for name in state["candidates"] if name not in state["active"]]
+            fits = [dict(fit) for fit in state["fits"].values()]
+            retest = bool(state["retest"])
+        fit_seconds = sum(fit["last"] for fit in fits)
+        baselines = [fit for fit in fits if fit["baseline"] is not None]
+        return {
+            "enabled": self.enabled,
+            "active": active,
+            "pruned": pruned,
+            "retest": retest,
+            "weightThreshold": self.threshold,
+            "patience": self.patience,
+            "retestEvery": self.retest_every,
+            "computeSaved": {
+                "modelsSkipped": len(pruned),
+                "fitSeconds": round(fit_seconds, 3),
+                "baselineFitSeconds": round(sum(fit["baseline"] for fit in baselines), 3) if baselines else None,
+                "estimatedSecondsSaved": round(sum(max(fit["baseline"] - fit["last"], 0.0) for fit in baselines), 3),
+            },
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._states.clear()
+
+
+def build_model_selector() -> ModelSelector:
+    return ModelSelector(
+        threshold=float(os.getenv("MODEL_PRUNING_WEIGHT_THRESHOLD", "0.01")),
+        patience=int(os.getenv("MODEL_PRUNING_PATIENCE", "3")),
+        retest_every=int(os.getenv("MODEL_PRUNING_RETEST_EVERY", "10")),
+        max_tickers=int(os.getenv("MODEL_PRUNING_MAX_TICKERS", "512")),
+        enabled=os.getenv("MODEL_PRUNING_ENABLED", "true").strip().lower() in {"1", "true", "yes", "on"},
+    )
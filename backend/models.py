@@ -7,12 +7,35 @@ top of it: the LSTM and Transformer networks (with their feature preparation)
 and ``ensemble_predict``, an extended ensemble that averages the base ensemble
 together with the LSTM and Transformer predictions.
 """
+import logging
+import math
+import os
+import time
 import warnings
 warnings.filterwarnings('ignore')
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 from sklearn.preprocessing import MinMaxScaler
+import compute_budget
+import feature_engineering
+import model_artifact_store
 import prediction_service
 
+logger = logging.getLogger("marketmind_api")
+
+# Trained LSTM/Transformer weights are persisted per ticker (see
+# model_artifact_store). Unchanged data is served from the artifact; new bars
+# trigger a short fine-tune on the most recent sequences instead of a full
+# retrain, and a full retrain happens after MODEL_MAX_FINE_TUNES warm starts.
+FINE_TUNE_EPOCHS = max(int(os.getenv("MODEL_FINE_TUNE_EPOCHS", "5")), 1)
+MAX_FINE_TUNES = max(int(os.getenv("MODEL_MAX_FINE_TUNES", "20")), 0)
+FINE_TUNE_SEQUENCES = 128
+DEFAULT_HYPERPARAMETERS = {
+    "lstm": {"hidden_size": 64, "layer_size": 2},
+    "transformer": {"d_model": 64, "nhead": 4, "num_layers": 2},
+}
+_ARTIFACT_STORE = model_artifact_store.build_artifact_store()
+
 # torch is a heavy dependency. It (and the nn.Module subclasses that need it at
 # class-definition time) are loaded lazily via _torch() so that `import models`
 # — and therefore `import api` — does not boot torch. Only the LSTM/Transformer
@@ -113,28 +136,9 @@ def _torch():
 def create_features(df, lookback=14):
     """
     Create features for ML models including lagged prices and basic technical indicators
+    (see feature_engineering; the matrix is shared with the options classifier).
     """
-    df = df.copy()
-
-    # Lagged features (previous days' prices)
-    for i in range(1, lookback + 1):
-        df[f'lag_{i}'] = df['Close'].shift(i)
-
-    # Moving averages
-    df['ma_7']  = df['Close'].rolling(window=7,  min_periods=1).mean()
-    df['ma_14'] = df['Close'].rolling(window=14, min_periods=1).mean()
-    df['ma_30'] = df['Close'].rolling(window=30, min_periods=1).mean()
-
-    # Volatility
-    df['volatility'] = df['Close'].rolling(window=7, min_periods=2).std()
-
-    # Price change
-    df['price_change'] = df['Close'].pct_change()
-
-    # Drop rows with NaN values
-    df = df.dropna()
-
-    return df
+    return feature_engineering.create_features(df, lookback)
 
 # General function to prepare data for ML models that require no training
 def prepare_ml_data(df, lookback=14):
@@ -150,34 +154,34 @@ def prepare_ml_data(df, lookback=14):
 
     return X, y, df_features
 
-def ensemble_predict(df, days_ahead=7, lookback=14, seq_len=30):
+def ensemble_predict(df, days_ahead=7, lookback=14, seq_len=30, ticker=None):
     """
     Extended ensemble that includes LSTM and Transformer
-    alongside prediction_service's ensemble
+    alongside prediction_service's ensemble. ``ticker`` (or ``df.attrs["ticker"]``)
+    keys the persisted LSTM/Transformer artifacts. A sequence model that
+    prediction_service has pruned for this ticker is not trained.
     """
     # Get prediction_service ensemble (arima, lr, rf, xgb)
     base_ensemble, base_breakdown = prediction_service.ensemble_predict(df, days_ahead=days_ahead)
-
-    # Train and run LSTM
-    lstm_model, scaler_X, scaler_y, device = lstm_train(
-        df, lookback=lookback, seq_len=seq_len, days_ahead=days_ahead
-    )
-    lstm_pred = lstm_predict(df, lstm_model, scaler_X, scaler_y, device,
-                             lookback=lookback, seq_len=seq_len)
-
-    # Train and run Transformer
-    tf_model, scaler_X, scaler_y, device = transformer_train(
-        df, lookback=lookback, seq_len=seq_len, days_ahead=days_ahead
-    )
-    tf_pred = transformer_predict(df, tf_model, scaler_X, scaler_y, device,
-                                  lookback=lookback, seq_len=seq_len)
-
-    # Merge all predictions
+    active = prediction_service.active_ensemble_models(df)
+    fit_ticker = ticker or df.attrs.get("ticker") or "AAPL"
     all_predictions = dict(base_breakdown)
-    if lstm_pred is not None:
-        all_predictions['lstm'] = lstm_pred
-    if tf_pred is not None:
-        all_predictions['transformer'] = tf_pred
+
+    for name, train_fn, predict_fn in (
+        ("lstm", lstm_train, lstm_predict),
+        ("transformer", transformer_train, transformer_predict),
+    ):
+        if name not in active:
+            prediction_service.record_model_fit(fit_ticker, name, 0.0, complete=False)
+            continue
+        started = time.perf_counter()
+        model, scaler_X, scaler_y, device = train_fn(
+            df, lookback=lookback, seq_len=seq_len, days_ahead=days_ahead, ticker=ticker
+        )
+        pred = predict_fn(df, model, scaler_X, scaler_y, device, lookback=lookback, seq_len=seq_len)
+        prediction_service.record_model_fit(fit_ticker, name, time.perf_counter() - started, complete=True)
+        if pred is not None:
+            all_predictions[name] = pred
 
     # Recompute ensemble average across everything
     full_ensemble = np.mean(list(all_predictions.values()), axis=0)
@@ -197,177 +201,426 @@ def create_sequences(X, y, seq_len, forecast_horizon):
     Returns:
         X_seq: (n_sequences, seq_len, n_features)
         y_seq: (n_sequences, forecast_horizon)
+    Both are read-only strided views into X and y; nothing is copied.
     """
-    Xs, ys = [], []
-    for i in range(len(X) - seq_len - forecast_horizon + 1):
-        Xs.append(X[i : i + seq_len])
-        ys.append(y[i + seq_len : i + seq_len + forecast_horizon, 0])
-    return np.array(Xs), np.array(ys)
-
-# Train LSTM model
-def lstm_train(df, lookback=14, seq_len=30, days_ahead=7, hidden_size=64, layer_size=2, epochs=50, batch_size=32, lr=0.001):
-    '''Train an LSTM model for stock price prediction'''
+    n_sequences = len(X) - seq_len - forecast_horizon + 1
+    if n_sequences <= 0:
+        return np.empty((0, seq_len, X.shape[1]), dtype=X.dtype), np.empty((0, forecast_horizon), dtype=y.dtype)
+    X_seq = sliding_window_view(X, seq_len, axis=0)[:n_sequences].transpose(0, 2, 1)
+    y_seq = sliding_window_view(y[:, 0], forecast_horizon)[seq_len:seq_len + n_sequences]
+    return X_seq, y_seq
+
+def _training_arrays(df, lookback, seq_len, days_ahead, scaler_X=None, scaler_y=None):
+    """Scaled float32 training sequences; fits new scalers unless existing ones are passed.
+
+    Rows are scaled once and then windowed instead of scaling every overlapping
+    window. The scalers are fitted on exactly the rows the windows cover, so the
+    ranges match a window-by-window fit.
+    """
+    X, y, _ = prepare_ml_data(df, lookback)
+    n_sequences = len(X) - seq_len - days_ahead + 1
+    if n_sequences <= 0:
+        raise ValueError("Not enough history to build training sequences.")
+    if scaler_X is None or scaler_y is None:
+        scaler_X = MinMaxScaler().fit(X[: n_sequences + seq_len - 1])
+        scaler_y = MinMaxScaler().fit(y[seq_len : seq_len + n_sequences + days_ahead - 1].reshape(-1, 1))
+
+    X_rows = scaler_X.transform(X).astype(np.float32, copy=False)
+    y_rows = scaler_y.transform(y.reshape(-1, 1)).astype(np.float32, copy=False)
+    X_seq, y_seq = create_sequences(X_rows, y_rows, seq_len, days_ahead)
+    return np.ascontiguousarray(X_seq), np.ascontiguousarray(y_seq), scaler_X, scaler_y
+
+
+def _latest_window(df, scaler_X, lookback, seq_len):
+    """The last ``seq_len`` feature rows, scaled, as a float32 (seq_len, n_features) array."""
+    features = create_features(df, lookback).iloc[-seq_len:]
+    if len(features) < seq_len:
+        raise ValueError("Not enough history for a prediction window.")
+    window = features[[col for col in features.columns if col != 'Close']].to_numpy()
+    return scaler_X.transform(window).astype(np.float32, copy=False)
+
+
+def _lstm_forward(model, xb):
+    return model(xb, xb.device)
+
+
+def _transformer_forward(model, xb):
+    return model(xb)
+
+
+def _forward_batch(model, forward, windows, device):
+    """One no-grad forward pass over a (batch, seq_len, n_features) array."""
+    torch = _torch()["torch"]
+    compute_budget.apply_torch_threads(torch)
+    model.eval()
+    batch = torch.from_numpy(np.ascontiguousarray(windows, dtype=np.float32)).to(device)
+    with torch.no_grad():
+        return forward(model, batch).cpu().numpy()
+
+
+def _model_builder(model_kind, days_ahead, hyperparameters):
+    classes = _torch()
+    if model_kind == "lstm":
+        return (
+            lambda n_features: classes["LSTM"](n_features, hyperparameters["hidden_size"], hyperparameters["layer_size"], days_ahead),
+            _lstm_forward,
+        )
+    if model_kind == "transformer":
+        return (
+            lambda n_features: classes["TransformerModel"](input_size=n_features, output_size=days_ahead, **hyperparameters),
+            _transformer_forward,
+        )
+    raise ValueError(f"Unknown sequence model: {model_kind}")
+
+
+def _run_epochs(model, forward, X_scaled, y_scaled, *, epochs, batch_size, lr, device):
     _t = _torch()
-    torch, nn, LSTM = _t["torch"], _t["nn"], _t["LSTM"]
+    torch, nn = _t["torch"], _t["nn"]
     DataLoader, TensorDataset = _t["DataLoader"], _t["TensorDataset"]
-    # Prepare data
-    X, y, _ = prepare_ml_data(df, lookback)
-    y = y.reshape(-1, 1)
-    
-    X_seq, y_seq = create_sequences(X, y, seq_len, days_ahead)
-    
-    n_samples, seq_len_, n_features = X_seq.shape
-    scaler_X = MinMaxScaler()
-    scaler_y = MinMaxScaler()
-    
-    X_scaled = scaler_X.fit_transform(X_seq.reshape(-1, n_features)).reshape(n_samples, seq_len_, n_features)
-    y_scaled = scaler_y.fit_transform(y_seq.reshape(-1, 1)).reshape(y_seq.shape)
-    
-    X_tensor = torch.FloatTensor(X_scaled)
-    y_tensor = torch.FloatTensor(y_scaled)
-
-    # Model
-    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-    input_size = n_features
-    model = LSTM(input_size, hidden_size, layer_size, days_ahead).to(device)
+    X_tensor = torch.from_numpy(np.ascontiguousarray(X_scaled, dtype=np.float32))
+    y_tensor = torch.from_numpy(np.ascontiguousarray(y_scaled, dtype=np.float32))
 
     optimizer = torch.optim.Adam(model.parameters(), lr=lr)
     criterion = nn.MSELoss()
     loader = DataLoader(TensorDataset(X_tensor, y_tensor), batch_size=batch_size, shuffle=True)
 
-    # Training loop
     for epoch in range(epochs):
         model.train()
-        total_loss = 0
         for xb, yb in loader:
             xb, yb = xb.to(device), yb.to(device)
-            pred = model(xb, device)
+            pred = forward(model, xb)
             loss = criterion(pred, yb)
             optimizer.zero_grad()
             loss.backward()
             optimizer.step()
-            total_loss += loss.item()
 
-        if (epoch + 1) % 10 == 0:
-            # print(f"Epoch {epoch+1}/{epochs} | Train Loss: {total_loss/len(loader):.6f}")
-            pass
 
-    return model, scaler_X, scaler_y, device
-
-# Long Short-Term Memory (LSTM) prediction function
-def lstm_predict(df, model, scaler_X, scaler_y, device, lookback=14, seq_len=30):
-    '''Predict future stock prices using the trained LSTM model'''
+def _artifact_status(artifact, df):
+    """'fresh' when the artifact saw the latest bar, 'stale' when it can be warm-started, else None."""
+    if not artifact or len(df) == 0:
+        return None
+    last_index = artifact["watermark"]["last_index"]
     try:
-        torch = _torch()["torch"]
-        model.eval()
+        if last_index not in df.index:
+            return None
+        close_at_watermark = float(df.loc[last_index, "Close"])
+    except (TypeError, ValueError, KeyError):
+        return None
+    if not math.isclose(close_at_watermark, artifact["watermark"]["last_close"], rel_tol=1e-9):
+        return None
+    if last_index == df.index[-1]:
+        return "fresh"
+    if artifact.get("fine_tunes", 0) >= MAX_FINE_TUNES:
+        return None
+    return "stale"
 
-        # Build features
-        X_features, _, _ = prepare_ml_data(df, lookback)
 
-        # Take last seq_len rows
-        last_window_raw = X_features[-seq_len:]
-        n_features = last_window_raw.shape[1]
-        last_window_scaled = scaler_X.transform(last_window_raw.reshape(-1, n_features)).reshape(1, seq_len, n_features)
-        last_window_tensor = torch.FloatTensor(last_window_scaled).to(device)
+def _sequence_artifact(model_kind, df, *, ticker, hyperparameters):
+    """``(store, key, artifact, status)`` for one sequence model; store and key are None when nothing persists."""
+    ticker = ticker or df.attrs.get("ticker")
+    store = _ARTIFACT_STORE if ticker else None
+    if store is None:
+        return None, None, None, None
+    key = model_artifact_store.artifact_key(ticker, model_kind, prediction_service.FEATURE_SPEC_VERSION, hyperparameters)
+    artifact = store.load(key)
+    return store, key, artifact, _artifact_status(artifact, df)
 
-        # Predict
-        with torch.no_grad():
-            pred_scaled = model(last_window_tensor, device).cpu().numpy()
 
-        # Inverse transform
-        pred_prices = scaler_y.inverse_transform(pred_scaled.reshape(-1, 1)).flatten()
+def _fit_sequence_model(model_kind, df, build_model, forward, *, ticker, lookback, seq_len, days_ahead, epochs, batch_size, lr, hyperparameters):
+    """Train, warm-start or reload a sequence model, persisting it when the ticker is known."""
+    torch = _torch()["torch"]
+    compute_budget.apply_torch_threads(torch)
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    store, key, artifact, status = _sequence_artifact(
+        model_kind,
+        df,
+        ticker=ticker,
+        hyperparameters=dict(hyperparameters, lookback=lookback, seq_len=seq_len, days_ahead=days_ahead, epochs=epochs, batch_size=batch_size, lr=lr),
+    )
+    if status is not None:
+        scaler_X = model_artifact_store.restore_scaler(artifact["scaler_X"])
+        scaler_y = model_artifact_store.restore_scaler(artifact["scaler_y"])
+        model = build_model(artifact["n_features"]).to(device)
+        model.load_state_dict({name: torch.from_numpy(value) for name, value in artifact["state_dict"].items()})
+        if status == "fresh":
+            return model, scaler_X, scaler_y, device
+        X_scaled, y_scaled, _, _ = _training_arrays(df, lookback, seq_len, days_ahead, scaler_X, scaler_y)
+        _run_epochs(
+            model,
+            forward,
+            X_scaled[-FINE_TUNE_SEQUENCES:],
+            y_scaled[-FINE_TUNE_SEQUENCES:],
+            epochs=FINE_TUNE_EPOCHS,
+            batch_size=batch_size,
+            lr=lr,
+            device=device,
+        )
+        fine_tunes = artifact.get("fine_tunes", 0) + 1
+    else:
+        X_scaled, y_scaled, scaler_X, scaler_y = _training_arrays(df, lookback, seq_len, days_ahead)
+        model = build_model(X_scaled.shape[2]).to(device)
+        _run_epochs(model, forward, X_scaled, y_scaled, epochs=epochs, batch_size=batch_size, lr=lr, device=device)
+        fine_tunes = 0
+
+    if store is not None:
+        try:
+            store.save(
+                key,
+                {
+                    "state_dict": {name: value.detach().cpu().numpy() for name, value in model.state_dict().items()},
+                    "scaler_X": model_artifact_store.scaler_state(scaler_X),
+                    "scaler_y": model_artifact_store.scaler_state(scaler_y),
+                    "n_features": int(X_scaled.shape[2]),
+                    "watermark": {"last_index": df.index[-1], "last_close": float(df["Close"].iloc[-1])},
+                    "fine_tunes": fine_tunes,
+                },
+            )
+        except OSError as exc:
+            logger.warning("Could not persist %s artifact for %s: %s", model_kind, ticker, exc)
+    return model, scaler_X, scaler_y, device
 
-        # Return predictions
-        predictions = np.array(pred_prices)
 
-        return predictions
+# Train LSTM model
+def lstm_train(df, lookback=14, seq_len=30, days_ahead=7, hidden_size=64, layer_size=2, epochs=50, batch_size=32, lr=0.001, ticker=None):
+    '''Train (or warm-start from the artifact store) an LSTM model for stock price prediction'''
+    hyperparameters = {"hidden_size": hidden_size, "layer_size": layer_size}
+    build_model, forward = _model_builder("lstm", days_ahead, hyperparameters)
+    return _fit_sequence_model(
+        "lstm",
+        df,
+        build_model,
+        forward,
+        ticker=ticker,
+        lookback=lookback,
+        seq_len=seq_len,
+        days_ahead=days_ahead,
+        epochs=epochs,
+        batch_size=batch_size,
+        lr=lr,
+        hyperparameters=hyperparameters,
+    )
+
+# Long Short-Term Memory (LSTM) prediction function
+def lstm_predict(df, model, scaler_X, scaler_y, device, lookback=14, seq_len=30):
+    '''Predict future stock prices using the trained LSTM model'''
+    try:
+        window = _latest_window(df, scaler_X, lookback, seq_len)
+        pred_scaled = _forward_batch(model, _lstm_forward, window[np.newaxis], device)
+        return scaler_y.inverse_transform(pred_scaled.reshape(-1, 1)).flatten()
 
     except Exception as e:
         print(f"LSTM error: {e}")
         return None
 
 # Train Transformer model
-def transformer_train(df, lookback=14, seq_len=30, days_ahead=7, d_model=64, nhead=4, num_layers=2, epochs=50, batch_size=32, lr=0.001):
-    '''Train a Transformer model for stock price prediction'''
-    _t = _torch()
-    torch, nn, TransformerModel = _t["torch"], _t["nn"], _t["TransformerModel"]
-    DataLoader, TensorDataset = _t["DataLoader"], _t["TensorDataset"]
-   # Prepare data
-    X, y, _ = prepare_ml_data(df, lookback)
-    y = y.reshape(-1, 1)
+def transformer_train(df, lookback=14, seq_len=30, days_ahead=7, d_model=64, nhead=4, num_layers=2, epochs=50, batch_size=32, lr=0.001, ticker=None):
+    '''Train (or warm-start from the artifact store) a Transformer model for stock price prediction'''
+    hyperparameters = {"d_model": d_model, "nhead": nhead, "num_layers": num_layers}
+    build_model, forward = _model_builder("transformer", days_ahead, hyperparameters)
+    return _fit_sequence_model(
+        "transformer",
+        df,
+        build_model,
+        forward,
+        ticker=ticker,
+        lookback=lookback,
+        seq_len=seq_len,
+        days_ahead=days_ahead,
+        epochs=epochs,
+        batch_size=batch_size,
+        lr=lr,
+        hyperparameters=hyperparameters,
+    )
 
-    X_seq, y_seq = create_sequences(X, y, seq_len, days_ahead)
+def transformer_predict(df, model, scaler_X, scaler_y, device, lookback=14, seq_len=30):
+    '''Predict future stock prices using the trained Transformer model'''
+    try:
+        window = _latest_window(df, scaler_X, lookback, seq_len)
+        pred_scaled = _forward_batch(model, _transformer_forward, window[np.newaxis], device)
+        return scaler_y.inverse_transform(pred_scaled.reshape(-1, 1)).flatten()
 
-    n_samples, seq_len_, n_features = X_seq.shape
-    scaler_X = MinMaxScaler()
-    scaler_y = MinMaxScaler()
-    
-    X_scaled = scaler_X.fit_transform(X_seq.reshape(-1, n_features)).reshape(n_samples, seq_len_, n_features)
-    y_scaled = scaler_y.fit_transform(y_seq.reshape(-1, 1)).reshape(y_seq.shape)
-    
-    X_tensor = torch.FloatTensor(X_scaled)
-    y_tensor = torch.FloatTensor(y_scaled)
+    except Exception as e:
+        print(f"Transformer error: {e}")
+        return None
 
-    # Model
-    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-    model = TransformerModel(
-        input_size=n_features,
-        d_model=d_model,
-        nhead=nhead,
-        num_layers=num_layers,
-        output_size=days_ahead
-    ).to(device)
 
-    optimizer = torch.optim.Adam(model.parameters(), lr=lr)
-    criterion = nn.MSELoss()
-    loader = DataLoader(TensorDataset(X_tensor, y_tensor), batch_size=batch_size, shuffle=True)
+def _pooled_training_arrays(frames_by_ticker, tickers, lookback, seq_len, days_ahead):
+    arrays = {}
+    for ticker in tickers:
+        try:
+            arrays[ticker] = _training_arrays(frames_by_ticker[ticker], lookback, seq_len, days_ahead)
+        except ValueError:
+            continue
+    if arrays:
+        n_features = next(iter(arrays.values()))[0].shape[2]
+        arrays = {ticker: parts for ticker, parts in arrays.items() if parts[0].shape[2] == n_features}
+    return arrays
 
-    # Training loop
-    for epoch in range(epochs):
-        model.train()
-        total_loss = 0
-        for xb, yb in loader:
-            xb, yb = xb.to(device), yb.to(device)
-            pred = model(xb)
-            loss = criterion(pred, yb)
-            optimizer.zero_grad()
-            loss.backward()
-            optimizer.step()
-            total_loss += loss.item()
 
-        if (epoch + 1) % 10 == 0:
-            # print(f"Epoch {epoch+1}/{epochs} | Train Loss: {total_loss/len(loader):.6f}")
-            pass
+def _pooled_artifact_status(artifact, frames_by_ticker):
+    """'fresh' when every pooled ticker's latest bar is unchanged, 'stale' when all can be warm-started, else None."""
+    if not artifact:
+        return None
+    statuses = set()
+    for ticker, watermark in artifact["watermarks"].items():
+        df = frames_by_ticker.get(ticker)
+        if df is None:
+            return None
+        statuses.add(_artifact_status({"watermark": watermark, "fine_tunes": artifact.get("fine_tunes", 0)}, df))
+    if not statuses or None in statuses:
+        return None
+    return "fresh" if statuses == {"fresh"} else "stale"
+
+
+def _fine_tune_pooled(model, forward, frames_by_ticker, scalers, *, lookback, seq_len, days_ahead, batch_size, lr, device):
+    """Warm-start the pooled model on each ticker's most recent sequences, scaled with its stored scalers."""
+    X_parts, y_parts = [], []
+    for ticker, (scaler_X, scaler_y) in scalers.items():
+        X_scaled, y_scaled, _, _ = _training_arrays(frames_by_ticker[ticker], lookback, seq_len, days_ahead, scaler_X, scaler_y)
+        X_parts.append(X_scaled[-FINE_TUNE_SEQUENCES:])
+        y_parts.append(y_scaled[-FINE_TUNE_SEQUENCES:])
+    _run_epochs(
+        model,
+        forward,
+        np.concatenate(X_parts),
+        np.concatenate(y_parts),
+        epochs=FINE_TUNE_EPOCHS,
+        batch_size=batch_size,
+        lr=lr,
+        device=device,
+    )
 
-    return model, scaler_X, scaler_y, device
 
-def transformer_predict(df, model, scaler_X, scaler_y, device, lookback=14, seq_len=30):
-    '''Predict future stock prices using the trained Transformer model'''
+def _save_pooled_artifact(store, key, model, scalers, n_features, frames_by_ticker, fine_tunes, model_kind):
     try:
-        torch = _torch()["torch"]
-        model.eval()
-
-        # Build features
-        X_features, _, _ = prepare_ml_data(df, lookback)
-
-        # Take last seq_len rows
-        last_window_raw = X_features[-seq_len:]
-        n_features = last_window_raw.shape[1]
-        last_window_scaled = scaler_X.transform(last_window_raw.reshape(-1, n_features)).reshape(1, seq_len, n_features)
-        last_window_tensor = torch.FloatTensor(last_window_scaled).to(device)
-
-        # Predict
-        with torch.no_grad():
-            pred_scaled = model(last_window_tensor).cpu().numpy()
-
-        # Inverse transform
-        pred_prices = scaler_y.inverse_transform(pred_scaled.reshape(-1, 1)).flatten()
+        store.save(
+            key,
+            {
+                "state_dict": {name: value.detach().cpu().numpy() for name, value in model.state_dict().items()},
+                "scalers": {
+                    ticker: {
+                        "scaler_X": model_artifact_store.scaler_state(scaler_X),
+                        "scaler_y": model_artifact_store.scaler_state(scaler_y),
+                    }
+                    for ticker, (scaler_X, scaler_y) in scalers.items()
+                },
+                "n_features": int(n_features),
+                "watermarks": {
+                    ticker: {
+                        "last_index": frames_by_ticker[ticker].index[-1],
+                        "last_close": float(frames_by_ticker[ticker]["Close"].iloc[-1]),
+                    }
+                    for ticker in scalers
+                },
+                "fine_tunes": fine_tunes,
+            },
+        )
+    except OSError as exc:
+        logger.warning("Could not persist pooled %s artifact: %s", model_kind, exc)
+
+
+def forecast_many(frames_by_ticker, model_kind="lstm", lookback=14, seq_len=30, days_ahead=7, epochs=50, batch_size=32, lr=0.001, hyperparameters=None):
+    """
+    Forecast several tickers with one pooled sequence model and a single batched forward pass.
+
+    Every ticker keeps its own scalers, so differently priced stocks share one
+    network. The pooled model is persisted like the per-ticker ones: it is
+    reused while every ticker's latest bar is unchanged, fine-tuned on the
+    recent sequences when tickers gained new bars, and retrained on all
+    tickers' sequences after MODEL_MAX_FINE_TUNES warm starts or when any
+    ticker's history was revised. Returns ``{ticker: predictions or None}``.
+    """
+    if model_kind not in DEFAULT_HYPERPARAMETERS:
+        raise ValueError(f"Unknown sequence model: {model_kind}")
+    hyperparameters = dict(DEFAULT_HYPERPARAMETERS[model_kind], **(hyperparameters or {}))
+    build_model, forward = _model_builder(model_kind, days_ahead, hyperparameters)
+    torch = _torch()["torch"]
+    compute_budget.apply_torch_threads(torch)
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
 
-        return np.array(pred_prices)
+    results = {ticker: None for ticker in frames_by_ticker}
+    tickers = sorted(ticker for ticker, df in frames_by_ticker.items() if df is not None and len(df))
+    store = _ARTIFACT_STORE if tickers else None
+    key = model_artifact_store.artifact_key(
+        "GLOBAL",
+        model_kind,
+        prediction_service.FEATURE_SPEC_VERSION,
+        dict(hyperparameters, tickers=tickers, lookback=lookback, seq_len=seq_len, days_ahead=days_ahead, epochs=epochs, batch_size=batch_size, lr=lr),
+    )
+    artifact = store.load(key) if store is not None else None
+    status = _pooled_artifact_status(artifact, frames_by_ticker)
+
+    if status is not None:
+        n_features = artifact["n_features"]
+        model = build_model(n_features).to(device)
+        model.load_state_dict({name: torch.from_numpy(value) for name, value in artifact["state_dict"].items()})
+        scalers = {
+            ticker: (model_artifact_store.restore_scaler(state["scaler_X"]), model_artifact_store.restore_scaler(state["scaler_y"]))
+            for ticker, state in artifact["scalers"].items()
+        }
+        fine_tunes = artifact.get("fine_tunes", 0)
+        if status == "stale":
+            _fine_tune_pooled(
+                model,
+                forward,
+                frames_by_ticker,
+                scalers,
+                lookback=lookback,
+                seq_len=seq_len,
+                days_ahead=days_ahead,
+                batch_size=batch_size,
+                lr=lr,
+                device=device,
+            )
+            fine_tunes += 1
+    else:
+        arrays = _pooled_training_arrays(frames_by_ticker, tickers, lookback, seq_len, days_ahead)
+        if not arrays:
+            return results
+        X_all = np.concatenate([parts[0] for parts in arrays.values()])
+        y_all = np.concatenate([parts[1] for parts in arrays.values()])
+        n_features = X_all.shape[2]
+        model = build_model(n_features).to(device)
+        _run_epochs(model, forward, X_all, y_all, epochs=epochs, batch_size=batch_size, lr=lr, device=device)
+        scalers = {ticker: (parts[2], parts[3]) for ticker, parts in arrays.items()}
+        fine_tunes = 0
+    if store is not None and status != "fresh":
+        _save_pooled_artifact(store, key, model, scalers, n_features, frames_by_ticker, fine_tunes, model_kind)
+
+    windows, ordered = [], []
+    for ticker, (scaler_X, _scaler_y) in scalers.items():
+        try:
+            windows.append(_latest_window(frames_by_ticker[ticker], scaler_X, lookback, seq_len))
+        except ValueError:
+            continue
+        ordered.append(ticker)
+    if not windows:
+        return results
+    pred_scaled = _forward_batch(model, forward, np.stack(windows), device)
+    for ticker, row in zip(ordered, pred_scaled):
+        results[ticker] = scalers[ticker][1].inverse_transform(row.reshape(-1, 1)).flatten()
+    return results
+
+
+def sequence_forecast_many(tickers, days_ahead=7, period="1y", model_kinds=("lstm", "transformer")):
+    """
+    LSTM/Transformer forecasts for several tickers, one pooled model per kind.
 
-    except Exception as e:
-        print(f"Transformer error: {e}")
-        return None
+    Loads each ticker's history through prediction_service.create_dataset and
+    runs forecast_many once per model kind. Returns ``{ticker: {kind: [prices]}}``
+    for the tickers that produced a forecast.
+    """
+    frames = {}
+    for ticker in tickers:
+        df = prediction_service.create_dataset(ticker, period=period)
+        if df is not None and len(df):
+            frames[ticker] = df
+    forecasts = {}
+    for model_kind in model_kinds:
+        for ticker, pred in forecast_many(frames, model_kind=model_kind, days_ahead=days_ahead).items():
+            if pred is not None:
+                forecasts.setdefault(ticker, {})[model_kind] = [float(value) for value in pred]
+    return forecasts
 
 
 # Main for testing individual models and the full ensemble
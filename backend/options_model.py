@@ -8,6 +8,9 @@ from sklearn.ensemble import RandomForestClassifier
 from datetime import datetime
 import warnings
 from http_policy import DEFAULT_HTTP_TIMEOUT
+import bar_store
+import compute_budget
+import feature_engineering
 warnings.filterwarnings('ignore')
 
 # --- 1. QUANTITATIVE ML MODEL (CLASSIFICATION) ---
@@ -16,20 +19,7 @@ def create_features(df, lookback=14):
     """
     Create features for ML models including lagged prices and basic technical indicators
     """
-    df = df.copy()
-    
-    for i in range(1, lookback + 1):
-        df[f'lag_{i}'] = df['Close'].shift(i)
-    
-    df['ma_7'] = df['Close'].rolling(window=7).mean()
-    df['ma_14'] = df['Close'].rolling(window=14).mean()
-    df['ma_30'] = df['Close'].rolling(window=30).mean() if len(df) > 30 else df['Close'].mean()
-    
-    df['volatility'] = df['Close'].rolling(window=7).std()
-    df['price_change'] = df['Close'].pct_change()
-    
-    df = df.dropna()
-    return df
+    return feature_engineering.create_features(df, lookback, partial_windows=False)
 
 def random_forest_classifier_predict(df, lookback=14, forecast_horizon=5):
     """
@@ -53,7 +43,7 @@ def random_forest_classifier_predict(df, lookback=14, forecast_horizon=5):
         y_train = df_train['Target'].values
         
         # Train Classifier
-        rf_model = RandomForestClassifier(n_estimators=100, max_depth=5, random_state=42, n_jobs=-1)
+        rf_model = RandomForestClassifier(n_estimators=100, max_depth=5, random_state=42, n_jobs=compute_budget.threads_per_job())
         rf_model.fit(X_train, y_train)
         
         # Predict the most recent day
@@ -71,7 +61,9 @@ def get_ml_prediction_signal(ticker, current_price):
     Analyzes the probability and returns a directional signal.
     """
     try:
-        df = yf.download(ticker, period="2y", auto_adjust=False, progress=False)[['Close']].copy()
+        # Two years of split/dividend-adjusted closes: the store keeps adjusted
+        # bars only, so the classifier trains on total-return price moves.
+        df = bar_store.tail_period(bar_store.get_bar_store().get(ticker), '2y')[['Close']].copy()
         if df.empty or len(df) < 50:
             return {'direction': 'Neutral', 'prob': 0.5}
             
@@ -272,7 +264,7 @@ def select_option_contract(stock, signal, stock_price):
 def generate_suggestion(ticker):
     try:
         stock = yf.Ticker(ticker)
-        hist = stock.history(period="1y")
+        hist = bar_store.tail_period(bar_store.get_bar_store().get(ticker), '1y')
         if hist.empty: return {"error": "Could not get stock history"}
         
         info = stock.info
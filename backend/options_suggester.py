@@ -4,6 +4,7 @@ import os # Import for API Key
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 from datetime import datetime
 from http_policy import DEFAULT_HTTP_TIMEOUT
+import bar_store
 
 # --- MODIFIED IMPORT ---
 # We now import from our new, dedicated model
@@ -46,7 +47,7 @@ def generate_suggestion(ticker):
     try:
         # 1. Get Stock Data
         stock = yf.Ticker(ticker)
-        hist = stock.history(period="1y")
+        hist = bar_store.get_bar_store().get(ticker).tail(252)
         if hist.empty:
             return {"error": "Could not get stock history"}
         
@@ -10,6 +10,7 @@ import numpy as np
 import pandas as pd
 import yfinance as yf
 
+import bar_store
 import prediction_service
 
 TRADING_DAYS_PER_YEAR = 252
@@ -172,10 +173,11 @@ def _load_market_inputs(
     metadata: Dict[str, Dict[str, Any]] = {}
     warnings: List[str] = []
     period = _history_period_for_lookback(lookback_days)
+    stored_bars = bar_store.get_bar_store().get_many(tickers)
 
     for ticker in tickers:
         ticker_client = yf.Ticker(ticker)
-        history = ticker_client.history(period=period, interval="1d", auto_adjust=True)
+        history = bar_store.tail_period(stored_bars.get(ticker.upper()), period)
         closes = pd.Series(dtype=float)
         if isinstance(history, pd.DataFrame) and not history.empty and "Close" in history:
             closes = history["Close"].dropna()
@@ -225,8 +227,9 @@ def _build_prediction_views(
     used_views: List[Dict[str, Any]] = []
     warnings: List[str] = []
 
+    snapshots = prediction_service.forecast_many(tickers)
     for ticker in tickers:
-        snapshot = prediction_service.get_prediction_snapshot(ticker)
+        snapshot = snapshots.get(str(ticker).upper())
         if not snapshot:
             warnings.append(f"{ticker}: no MarketMind prediction view was available.")
             continue
@@ -0,0 +1,313 @@
+"""Asynchronous prediction and evaluation jobs.
+
+Submitting a job returns immediately with a job ID; a small local thread pool
+runs the forecasting call (the evaluation stages themselves still fan out to
+the evaluation_executor process pool) and writes the outcome to a status
+store that clients poll. With SQL persistence the store is the
+``prediction_jobs`` table, so every worker sees the same statuses; otherwise a
+bounded in-process store stands in.
+
+Jobs belong to the user who submitted them and only that user can poll them.
+Identical in-flight submissions by one user (same kind and parameters) share
+a job; the SQL store enforces that with a unique key, so it holds across
+Gunicorn workers too. Running jobs heartbeat their ``updatedAt``; a queued or
+running job that has not been touched for ``PREDICTION_JOB_STALE_SECONDS``
+(its worker died or restarted) is marked failed.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import user_state_store
+
+ACTIVE_STATUSES = ("queued", "running")
+DEFAULT_MAX_WORKERS = 2
+DEFAULT_RETENTION_SECONDS = 3600
+DEFAULT_STALE_SECONDS = 900
+DEFAULT_MAX_LOCAL_JOBS = 1000
+ABANDONED_ERROR = "Job abandoned: its worker stopped before finishing."
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(int(os.getenv(name, str(default))), 1)
+    except (TypeError, ValueError):
+        return default
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def dedupe_key(kind: str, params: Dict[str, Any], owner_id: Optional[str] = None) -> str:
+    canonical = json.dumps(
+        {"kind": kind, "params": params, "owner": owner_id},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return f"{kind}:{hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:48]}"
+
+
+class InMemoryJobStore:
+    """Process-local stand-in for the prediction_jobs table."""
+
+    def __init__(
+        self,
+        *,
+        max_jobs: int = DEFAULT_MAX_LOCAL_JOBS,
+        retention_seconds: int = DEFAULT_RETENTION_SECONDS,
+    ) -> None:
+        self.max_jobs = max(int(max_jobs), 1)
+        self.retention_seconds = max(int(retention_seconds), 1)
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def claim(
+        self,
+        *,
+        kind: str,
+        dedupe_key: str,
+        params: Dict[str, Any],
+        owner_id: Optional[str] = None,
+    ) -> Tuple[Dict[str, Any], bool]:
+        with self._lock:
+            for job in reversed(self._jobs.values()):
+                if job["dedupeKey"] == dedupe_key and job["status"] in ACTIVE_STATUSES:
+                    return dict(job), False
+            now = _utcnow().isoformat()
+            job = {
+                "id": str(uuid.uuid4()),
+                "kind": kind,
+                "dedupeKey": dedupe_key,
+                "ownerId": owner_id,
+                "status": "queued",
+                "params": dict(params),
+                "result": None,
+                "error": None,
+                "createdAt": now,
+                "updatedAt": now,
+                "finishedAt": None,
+            }
+            self._prune()
+            self._jobs[job["id"]] = job
+            return dict(job), True
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(str(job_id))
+            return dict(job) if job is not None else None
+
+    def update(self, job_id: str, *, status: str, result: Any = None, error: Optional[str] = None) -> None:
+        now = _utcnow().isoformat()
+        with self._lock:
+            job = self._jobs.get(str(job_id))
+            if job is None:
+                return
+            job.update({"status": status, "result": result, "error": error, "updatedAt": now})
+            if status not in ACTIVE_STATUSES:
+                job["finishedAt"] = now
+
+    def touch(self, job_ids) -> None:
+        now = _utcnow().isoformat()
+        with self._lock:
+            for job_id in job_ids:
+                job = self._jobs.get(str(job_id))
+                if job is not None and job["status"] in ACTIVE_STATUSES:
+                    job["updatedAt"] = now
+
+    def expire_stale(self, *, stale_seconds: int) -> None:
+        cutoff = (_utcnow() - timedelta(seconds=stale_seconds)).isoformat()
+        now = _utcnow().isoformat()
+        with self._lock:
+            for job in self._jobs.values():
+                if job["status"] in ACTIVE_STATUSES and job["updatedAt"] < cutoff:
+                    job.update({"status": "failed", "error": ABANDONED_ERROR, "updatedAt": now, "finishedAt": now})
+
+    def _prune(self) -> None:
+        cutoff = (_utcnow() - timedelta(seconds=self.retention_seconds)).isoformat()
+        for job_id in [job_id for job_id, job in self._jobs.items() if job["finishedAt"] and job["finishedAt"] < cutoff]:
+            del self._jobs[job_id]
+        while len(self._jobs) >= self.max_jobs:
+            finished = next((job_id for job_id, job in self._jobs.items() if job["finishedAt"]), None)
+            del self._jobs[finished if finished is not None else next(iter(self._jobs))]
+
+
+class SqlJobStore:
+    """Job statuses in the shared prediction_jobs table."""
+
+    def __init__(self, database_url: str, *, retention_seconds: int = DEFAULT_RETENTION_SECONDS) -> None:
+        self.database_url = database_url
+        self.retention_seconds = max(int(retention_seconds), 1)
+
+    def claim(
+        self,
+        *,
+        kind: str,
+        dedupe_key: str,
+        params: Dict[str, Any],
+        owner_id: Optional[str] = None,
+    ) -> Tuple[Dict[str, Any], bool]:
+        with user_state_store.session_scope(self.database_url) as session:
+            user_state_store.delete_finished_prediction_jobs(
+                session,
+                finished_before=_utcnow() - timedelta(seconds=self.retention_seconds),
+            )
+            job, created = user_state_store.claim_prediction_job(
+                session,
+                kind=kind,
+                dedupe_key=dedupe_key,
+                params=params,
+                owner_id=owner_id,
+            )
+            return user_state_store.prediction_job_to_dict(job), created
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with user_state_store.session_scope(self.database_url) as session:
+            job = user_state_store.get_prediction_job(session, job_id)
+            return user_state_store.prediction_job_to_dict(job) if job is not None else None
+
+    def update(self, job_id: str, *, status: str, result: Any = None, error: Optional[str] = None) -> None:
+        with user_state_store.session_scope(self.database_url) as session:
+            user_state_store.update_prediction_job(session, job_id, status=status, result=result, error=error)
+
+    def touch(self, job_ids) -> None:
+        with user_state_store.session_scope(self.database_url) as session:
+            user_state_store.touch_prediction_jobs(session, job_ids)
+
+    def expire_stale(self, *, stale_seconds: int) -> None:
+        with user_state_store.session_scope(self.database_url) as session:
+            user_state_store.expire_stale_prediction_jobs(
+                session,
+                updated_before=_utcnow() - timedelta(seconds=stale_seconds),
+                error=ABANDONED_ERROR,
+            )
+
+
+class PredictionJobQueue:
+    def __init__(
+        self,
+        store,
+        runners: Dict[str, Callable[..., Any]],
+        *,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        stale_seconds: int = DEFAULT_STALE_SECONDS,
+        logger=logging.getLogger("marketmind_api"),
+    ) -> None:
+        self.store = store
+        self.runners = dict(runners)
+        self.stale_seconds = max(int(stale_seconds), 1)
+        self.logger = logger
+        self._pool = ThreadPoolExecutor(max_workers=max(int(max_workers), 1), thread_name_prefix="prediction-job")
+        self._running: set = set()
+        self._running_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._heartbeat: Optional[threading.Thread] = None
+
+    def submit(self, kind: str, params: Dict[str, Any], *, owner_id: Optional[str] = None) -> Tuple[Dict[str, Any], bool]:
+        """Queue a job, or return the owner's matching in-flight job. Returns ``(job, deduplicated)``."""
+        if kind not in self.runners:
+            raise ValueError(f"Unknown job kind: {kind}")
+        self.store.expire_stale(stale_seconds=self.stale_seconds)
+        job, created = self.store.claim(
+            kind=kind,
+            dedupe_key=dedupe_key(kind, params, owner_id),
+            params=params,
+            owner_id=owner_id,
+        )
+        if not created:
+            return job, True
+        self._start_heartbeat()
+        self._pool.submit(self._run, job["id"], kind, dict(params))
+        return job, False
+
+    def get(self, job_id: str, *, owner_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """The job, or ``None`` when it does not exist or belongs to another user."""
+        job = self.store.get(job_id)
+        if job is None or job.get("ownerId") != owner_id:
+            return None
+        if job["status"] in ACTIVE_STATUSES:
+            stale_before = (_utcnow() - timedelta(seconds=self.stale_seconds)).isoformat()
+            if job["updatedAt"] < stale_before:
+                self.store.expire_stale(stale_seconds=self.stale_seconds)
+                job = self.store.get(job_id)
+        return job
+
+    def _start_heartbeat(self) -> None:
+        with self._running_lock:
+            if self._heartbeat is None:
+                self._heartbeat = threading.Thread(target=self._beat, name="prediction-job-heartbeat", daemon=True)
+                self._heartbeat.start()
+
+    def _beat(self) -> None:
+        while not self._stopped.wait(max(self.stale_seconds / 3.0, 0.05)):
+            with self._running_lock:
+                job_ids = sorted(self._running)
+            if not job_ids:
+                continue
+            try:
+                self.store.touch(job_ids)
+            except Exception as exc:
+                self.logger.warning(f"Prediction job heartbeat failed: {exc}")
+
+    def _run(self, job_id: str, kind: str, params: Dict[str, Any]) -> None:
+        started = time.perf_counter()
+        with self._running_lock:
+            self._running.add(job_id)
+        try:
+            self.store.update(job_id, status="running")
+            result = self.runners[kind](**params)
+            if result is None:
+                self._fail(job_id, kind, "Insufficient historical data.")
+                return
+            # Storing the result can fail too (serialization, database); the
+            # job must still leave the running state.
+            self.store.update(job_id, status="succeeded", result=result)
+        except Exception as exc:
+            self.logger.error(f"Prediction job {job_id} ({kind}) failed: {exc}")
+            self._fail(job_id, kind, str(exc))
+            return
+        finally:
+            with self._running_lock:
+                self._running.discard(job_id)
+        self.logger.info(f"Prediction job {job_id} ({kind}) finished in {time.perf_counter() - started:.2f}s")
+
+    def _fail(self, job_id: str, kind: str, error: str) -> None:
+        try:
+            self.store.update(job_id, status="failed", error=error)
+        except Exception as exc:
+            self.logger.error(f"Could not record the failure of prediction job {job_id} ({kind}): {exc}")
+
+    def shutdown(self, *, wait: bool = False) -> None:
+        self._stopped.set()
+        self._pool.shutdown(wait=wait)
+
+
+def build_job_queue(
+    runners: Dict[str, Callable[..., Any]],
+    *,
+    database_url: str = "",
+    logger=logging.getLogger("marketmind_api"),
+) -> PredictionJobQueue:
+    retention_seconds = _env_int("PREDICTION_JOB_RETENTION_SECONDS", DEFAULT_RETENTION_SECONDS)
+    if database_url:
+        store = SqlJobStore(database_url, retention_seconds=retention_seconds)
+    else:
+        store = InMemoryJobStore(retention_seconds=retention_seconds)
+    return PredictionJobQueue(
+        store,
+        runners,
+        max_workers=_env_int("PREDICTION_JOB_WORKERS", DEFAULT_MAX_WORKERS),
+        stale_seconds=_env_int("PREDICTION_JOB_STALE_SECONDS", DEFAULT_STALE_SECONDS),
+        logger=logger,
+    )
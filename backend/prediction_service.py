@@ -1,9 +1,13 @@
 from __future__ import annotations
 
-import copy
+import logging
 import math
+import os
+import tempfile
+import threading
 import time
-from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Optional, Tuple
 
 if TYPE_CHECKING:
     # Imported only for return-type annotations; the real imports are done
@@ -21,19 +25,26 @@ from sklearn.metrics import (
     mean_absolute_error,
     mean_absolute_percentage_error,
     mean_squared_error,
-    r2_score,
 )
 
 # NOTE: shap, mlforecast and statsforecast are heavy optional-at-import
 # dependencies. They are imported lazily inside the functions that use them
-# (_summarize_shap_explainability, _build_mlforecast, _build_statsforecast) so
+# (explainability.ExplainabilityEngine, _build_mlforecast, _build_statsforecast) so
 # that `import prediction_service` (and therefore `import api`) stays cheap and
 # does not boot the full ML stack. Return-type annotations referencing these
 # libraries remain valid because this module uses `from __future__ import
 # annotations` (annotations are never evaluated at runtime).
 
+import backtest_metrics
+import bar_store
+import compute_budget
+import evaluation_executor
 import exchange_session_service
-from data_fetcher import fetch_from_yfinance, get_stock_data_with_fallback, prepare_data_for_ml
+import explainability
+import forecast_cache
+import model_selection
+import single_flight
+from data_fetcher import get_stock_data_with_fallback, prepare_data_for_ml
 
 try:
     import xgboost as xgb
@@ -57,6 +68,7 @@ except Exception:
     CatBoostRegressor = None
     CATBOOST_AVAILABLE = False
 
+logger = logging.getLogger("marketmind_api")
 
 FEATURE_SPEC_VERSION = "prediction-stack-v2"
 PREDICTION_HORIZON = 7
@@ -89,23 +101,90 @@ PRODUCTION_ENSEMBLE_MODELS = (
 
 BENCHMARK_MODELS = ("naive", "seasonal_naive_5", "auto_arima")
 ML_MODELS = ("linear_regression", "random_forest", "xgboost", "gradient_boosting", "lightgbm", "catboost", "lstm", "transformer")
+# Trained by models.ensemble_predict rather than by MLForecast here.
+SEQUENCE_MODELS = ("lstm", "transformer")
+# ML models whose one-step CV errors feed the inverse-MAE ensemble weights.
+CV_SCORED_MODELS = ("linear_regression", "random_forest", "xgboost", "lightgbm", "catboost")
+
+# Process-local LRU (bounded by PREDICTION_CACHE_MAX_ENTRIES/_MAX_BYTES) with an
+# optional host-shared tier from PREDICTION_CACHE_SHARED_URL. Cached values are
+# frozen rather than deep-copied; see forecast_cache.
+_CACHE = forecast_cache.build_forecast_cache(ttl_seconds=CACHE_TTL_SECONDS)
+
+# Rolling per-ticker buffers of one-step-ahead signed errors (actual - predicted)
+# used for the inverse-MAE ensemble weights and the conformal forecast
+# intervals. Unlike _CACHE entries they outlive the forecast TTL, so a new daily
+# bar only evaluates the newest window(s).
+ERROR_BUFFER_MAX_TICKERS = max(int(os.getenv("PREDICTION_ERROR_BUFFER_MAX_TICKERS", "512")), 1)
+_ERROR_BUFFERS: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_ERROR_BUFFERS_LOCK = threading.Lock()
+
+# Concurrent identical forecasts/evaluations share one computation. Workers
+# coordinate through lock files only when they share a forecast cache tier;
+# without one, waiting on another worker's fit would not save this one.
+_SINGLE_FLIGHT = single_flight.SingleFlight(
+    lock_dir=(
+        os.getenv("PREDICTION_SINGLE_FLIGHT_LOCK_DIR")
+        or os.path.join(tempfile.gettempdir(), "marketmind-single-flight")
+    )
+    if _CACHE.shared is not None
+    else None,
+    wait_seconds=float(os.getenv("PREDICTION_SINGLE_FLIGHT_WAIT_SECONDS", str(single_flight.DEFAULT_WAIT_SECONDS))),
+)
+
+# Per-ticker pruning of ensemble members whose weight stays negligible; see
+# model_selection.
+_MODEL_SELECTOR = model_selection.build_model_selector()
 
-_CACHE: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+# SHAP explainers and summaries, reused across evaluations of unchanged data.
+# With EXPLAINABILITY_MODE=background, evaluations return a pending marker and
+# the summaries are computed off the request path.
+_EXPLAINABILITY = explainability.build_explainability_engine()
+
+# Target coverage of the split-conformal bands returned with forecasts; the
+# response reports the coverage the calibration size actually guarantees.
+PREDICTION_INTERVAL_COVERAGE = min(max(float(os.getenv("PREDICTION_INTERVAL_COVERAGE", "0.8")), 0.5), 0.99)
 
 
 def _cache_get(key: Tuple[Any, ...]) -> Any:
-    entry = _CACHE.get(key)
-    if not entry:
-        return None
-    if time.time() - entry["ts"] > CACHE_TTL_SECONDS:
-        _CACHE.pop(key, None)
-        return None
-    return copy.deepcopy(entry["value"])
+    return _CACHE.get(key)
 
 
 def _cache_set(key: Tuple[Any, ...], value: Any) -> Any:
-    _CACHE[key] = {"ts": time.time(), "value": copy.deepcopy(value)}
-    return value
+    return _CACHE.set(key, value)
+
+
+def _coalesced(
+    cache_key: Tuple[Any, ...],
+    compute: Callable[..., Any],
+    *,
+    should_cancel: Optional[Callable[[], bool]] = None,
+) -> Any:
+    """Cached value for ``cache_key``, computing it at most once across concurrent callers.
+
+    With ``should_cancel``, ``compute`` receives a probe that is true only once
+    every caller sharing the computation has cancelled.
+    """
+    cached = _cache_get(cache_key)
+    if cached is not None:
+        _SINGLE_FLIGHT.count("cacheHits")
+        return cached
+
+    def _lead(*probe: Callable[[], bool]) -> Any:
+        # Another worker may have filled the shared tier while this one waited
+        # on its lock.
+        filled = _cache_get(cache_key)
+        if filled is not None:
+            _SINGLE_FLIGHT.count("sharedHits")
+            return filled
+        _SINGLE_FLIGHT.count("cacheMisses")
+        return compute(*probe)
+
+    return forecast_cache.thaw_value(_SINGLE_FLIGHT.do(cache_key, _lead, should_cancel=should_cancel))
+
+
+def single_flight_stats() -> Dict[str, Any]:
+    return _SINGLE_FLIGHT.stats()
 
 
 def _clean_float(value: Any, digits: Optional[int] = None) -> Optional[float]:
@@ -126,34 +205,9 @@ def _normalize_ticker(ticker: str) -> str:
     return str(ticker or "").split(":", 1)[0].strip().upper()
 
 
-def _standardize_ohlcv(df: Optional[pd.DataFrame]) -> pd.DataFrame:
-    if df is None or getattr(df, "empty", True):
-        return pd.DataFrame(columns=["Open", "High", "Low", "Close", "Volume"])
-    standardized = df.copy()
-    if isinstance(standardized.columns, pd.MultiIndex):
-        standardized.columns = [col[0] for col in standardized.columns]
-    if "Close" not in standardized.columns:
-        if len(standardized.columns) == 1:
-            standardized.columns = ["Close"]
-        else:
-            return pd.DataFrame(columns=["Open", "High", "Low", "Close", "Volume"])
-    for column in ("Open", "High", "Low"):
-        if column not in standardized.columns:
-            standardized[column] = standardized["Close"]
-    if "Volume" not in standardized.columns:
-        standardized["Volume"] = 1.0
-    standardized = standardized[["Open", "High", "Low", "Close", "Volume"]].copy()
-    standardized.index = pd.to_datetime(standardized.index)
-    standardized = standardized.sort_index()
-    for column in standardized.columns:
-        standardized[column] = pd.to_numeric(standardized[column], errors="coerce")
-    standardized["Close"] = standardized["Close"].ffill().bfill()
-    standardized["Open"] = standardized["Open"].ffill().bfill().fillna(standardized["Close"])
-    standardized["High"] = standardized["High"].ffill().bfill().fillna(standardized["Close"])
-    standardized["Low"] = standardized["Low"].ffill().bfill().fillna(standardized["Close"])
-    standardized["Volume"] = standardized["Volume"].ffill().bfill().fillna(1.0)
-    standardized = standardized.dropna(subset=["Close"])
-    return standardized
+# Bars are standardized when bar_store writes them; inputs handed in by callers
+# (e.g. models.py frames) still go through the same normalization.
+_standardize_ohlcv = bar_store.standardize_ohlcv
 
 
 def _load_canonical_ohlcv(ticker: str) -> pd.DataFrame:
@@ -167,7 +221,7 @@ def _load_canonical_ohlcv(ticker: str) -> pd.DataFrame:
     if df is None or df.empty:
         df = get_stock_data_with_fallback(normalized_ticker, min_days=120)
     if df is None or df.empty:
-        df = fetch_from_yfinance(normalized_ticker, period="2y")
+        df = bar_store.get_bar_store().get(normalized_ticker)
     standardized = _standardize_ohlcv(df)
     return _cache_set(cache_key, standardized)
 
@@ -259,55 +313,67 @@ def _build_mlforecast(models: Dict[str, Any]) -> MLForecast:
     )
 
 
-def _build_ml_models() -> Dict[str, Any]:
-    models: Dict[str, Any] = {
-        "linear_regression": LinearRegression(),
-        "random_forest": RandomForestRegressor(
+def _ml_model_factories(threads: int) -> Dict[str, Callable[[], Any]]:
+    factories: Dict[str, Callable[[], Any]] = {
+        "linear_regression": LinearRegression,
+        "random_forest": lambda: RandomForestRegressor(
             n_estimators=200,
             max_depth=12,
             min_samples_split=4,
             min_samples_leaf=2,
             random_state=42,
-            n_jobs=-1,
+            n_jobs=threads,
         ),
-        "gradient_boosting": GradientBoostingRegressor(
+        "gradient_boosting": lambda: GradientBoostingRegressor(
             n_estimators=200,
             max_depth=4,
             learning_rate=0.05,
             random_state=42
-        )
+        ),
     }
     if XGBOOST_AVAILABLE:
-        models["xgboost"] = xgb.XGBRegressor(
+        factories["xgboost"] = lambda: xgb.XGBRegressor(
             n_estimators=200,
             max_depth=6,
             learning_rate=0.05,
             subsample=0.85,
             colsample_bytree=0.85,
             random_state=42,
-            n_jobs=1,
+            n_jobs=threads,
         )
     if LIGHTGBM_AVAILABLE:
-        models["lightgbm"] = lgb.LGBMRegressor(
+        factories["lightgbm"] = lambda: lgb.LGBMRegressor(
             n_estimators=200,
             max_depth=6,
             learning_rate=0.05,
             subsample=0.85,
             colsample_bytree=0.85,
             random_state=42,
-            n_jobs=1,
+            n_jobs=threads,
             verbose=-1,
         )
     if CATBOOST_AVAILABLE:
-        models["catboost"] = CatBoostRegressor(
+        factories["catboost"] = lambda: CatBoostRegressor(
             iterations=200,
             depth=6,
             learning_rate=0.05,
             random_seed=42,
             verbose=0,
             allow_writing_files=False,
+            thread_count=threads,
         )
-    return models
+    return factories
+
+
+def _available_ml_models() -> Tuple[str, ...]:
+    return tuple(_ml_model_factories(1))
+
+
+def _build_ml_models(model_names: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """Fresh estimators for ``model_names`` (every available model by default), in registry order."""
+    factories = _ml_model_factories(compute_budget.threads_per_job())
+    wanted = set(factories if model_names is None else model_names)
+    return {name: factory() for name, factory in factories.items() if name in wanted}
 
 
 def _build_statsforecast() -> StatsForecast:
@@ -332,19 +398,29 @@ def _forecast_ml_models(
     horizon: int = PREDICTION_HORIZON,
     ticker: str = "AAPL",
 ) -> Dict[str, Any]:
-    requested = tuple(name for name in (model_names or ML_MODELS) if name in _build_ml_models())
+    available = _available_ml_models()
+    requested = tuple(name for name in (model_names or ML_MODELS) if name in available)
     cache_key = ("ml_forecast", _normalize_ticker(ticker), tuple(sorted(requested)), len(ohlcv), horizon)
-    cached = _cache_get(cache_key)
-    if cached is not None:
-        return cached
+    return _coalesced(cache_key, lambda: _fit_ml_models(ohlcv, requested, horizon=horizon, ticker=ticker, cache_key=cache_key))
 
+
+def _fit_ml_models(
+    ohlcv: pd.DataFrame,
+    requested: Tuple[str, ...],
+    *,
+    horizon: int,
+    ticker: str,
+    cache_key: Tuple[Any, ...],
+) -> Dict[str, Any]:
+    started = time.perf_counter()
     long_df = _build_long_frame(ohlcv, ticker)
     future_dates = _future_session_dates(ohlcv.index[-1], horizon)
     future_x = _build_future_exogenous(long_df, future_dates)
-    models = {name: estimator for name, estimator in _build_ml_models().items() if name in requested}
+    models = _build_ml_models(requested)
     fcst = _build_mlforecast(models)
     fcst.fit(long_df.reset_index(drop=True), static_features=[])
     predictions = fcst.predict(h=horizon, X_df=future_x)
+    fit_seconds = time.perf_counter() - started
     processed_X, processed_y = fcst.preprocess(long_df.reset_index(drop=True), static_features=[], return_X_y=True)
     result = {
         "predictions": {
@@ -356,6 +432,7 @@ def _forecast_ml_models(
         "feature_frame": processed_X.reset_index(drop=True),
         "target": np.asarray(processed_y, dtype=float),
         "models": fcst.models_,
+        "fit_seconds": fit_seconds,
     }
     return _cache_set(cache_key, result)
 
@@ -366,22 +443,92 @@ def _forecast_statistical_models(
     horizon: int = PREDICTION_HORIZON,
     ticker: str = "AAPL",
 ) -> Dict[str, Any]:
-    cache_key = ("stats_forecast", _normalize_ticker(ticker), len(ohlcv), horizon)
+    normalized_ticker = _normalize_ticker(ticker)
+    return _forecast_statistical_models_many({normalized_ticker: ohlcv}, horizon=horizon)[normalized_ticker]
+
+
+def _forecast_statistical_models_many(
+    ohlcv_by_ticker: Dict[str, pd.DataFrame],
+    *,
+    horizon: int = PREDICTION_HORIZON,
+) -> Dict[str, Dict[str, Any]]:
+    """Forecast the benchmark models for many series with one StatsForecast call.
+
+    StatsForecast fits a local model per ``unique_id``, so stacking the panel
+    gives the same forecasts as per-ticker calls while paying the engine setup
+    once. Results are cached per ticker under the single-series key.
+    """
+    results: Dict[str, Dict[str, Any]] = {}
+    pending: List[str] = []
+    for ticker, ohlcv in ohlcv_by_ticker.items():
+        cached = _cache_get(("stats_forecast", ticker, len(ohlcv), horizon))
+        if cached is not None:
+            results[ticker] = cached
+        else:
+            pending.append(ticker)
+    if not pending:
+        return results
+
+    panel = pd.concat(
+        [_build_long_frame(ohlcv_by_ticker[ticker], ticker)[["unique_id", "ds", "y"]] for ticker in pending],
+        ignore_index=True,
+    )
+    forecast = _build_statsforecast().forecast(h=horizon, df=panel)
+    if "unique_id" not in forecast.columns:
+        forecast = forecast.reset_index()
+    for ticker in pending:
+        rows = forecast[forecast["unique_id"] == ticker]
+        result = {
+            "predictions": {
+                model_name: rows[model_name].to_numpy(dtype=float)
+                for model_name in BENCHMARK_MODELS
+                if model_name in rows.columns
+            },
+        }
+        results[ticker] = _cache_set(("stats_forecast", ticker, len(ohlcv_by_ticker[ticker]), horizon), result)
+    return results
+
+
+def _forecast_ml_models_global(
+    ohlcv_by_ticker: Dict[str, pd.DataFrame],
+    *,
+    horizon: int = PREDICTION_HORIZON,
+) -> Dict[str, Dict[str, Any]]:
+    """Fit each ML model once on the stacked panel (a global model) and forecast every series."""
+    models = _build_ml_models(ML_MODELS)
+    model_names = tuple(sorted(models))
+    panel_key = tuple(sorted((ticker, len(ohlcv)) for ticker, ohlcv in ohlcv_by_ticker.items()))
+    cache_key = ("ml_forecast_global", panel_key, model_names, horizon)
     cached = _cache_get(cache_key)
     if cached is not None:
         return cached
 
-    long_df = _build_long_frame(ohlcv, ticker)[["unique_id", "ds", "y"]].reset_index(drop=True)
-    sf = _build_statsforecast()
-    forecast = sf.forecast(h=horizon, df=long_df)
-    result = {
-        "predictions": {
-            model_name: forecast[model_name].to_numpy(dtype=float)
-            for model_name in BENCHMARK_MODELS
-            if model_name in forecast.columns
-        },
-    }
-    return _cache_set(cache_key, result)
+    long_frames = []
+    future_frames = []
+    future_dates_by_ticker: Dict[str, List[pd.Timestamp]] = {}
+    for ticker, ohlcv in ohlcv_by_ticker.items():
+        long_df = _build_long_frame(ohlcv, ticker)
+        future_dates = _future_session_dates(ohlcv.index[-1], horizon)
+        long_frames.append(long_df.reset_index(drop=True))
+        future_frames.append(_build_future_exogenous(long_df, future_dates))
+        future_dates_by_ticker[ticker] = future_dates
+
+    fcst = _build_mlforecast(models)
+    fcst.fit(pd.concat(long_frames, ignore_index=True), static_features=[])
+    predictions = fcst.predict(h=horizon, X_df=pd.concat(future_frames, ignore_index=True))
+
+    results: Dict[str, Dict[str, Any]] = {}
+    for ticker, future_dates in future_dates_by_ticker.items():
+        rows = predictions[predictions["unique_id"] == ticker]
+        results[ticker] = {
+            "predictions": {
+                model_name: rows[model_name].to_numpy(dtype=float)
+                for model_name in model_names
+                if model_name in rows.columns
+            },
+            "future_dates": future_dates,
+        }
+    return _cache_set(cache_key, results)
 
 
 def _compute_weighted_ensemble(model_predictions: Dict[str, np.ndarray], weights: Dict[str, float]) -> np.ndarray:
@@ -402,20 +549,19 @@ def _default_live_weight_windows(series_length: int) -> int:
     return max(3, min(8, max(1, series_length // 30)))
 
 
-def _ensemble_weights_from_recent_cv(ohlcv: pd.DataFrame, ticker: str) -> Dict[str, float]:
-    cache_key = ("ensemble_weights", _normalize_ticker(ticker), len(ohlcv))
-    cached = _cache_get(cache_key)
-    if cached is not None:
-        return cached
-
-    try:
-        long_df = _build_long_frame(ohlcv, ticker)
-        n_windows = _default_live_weight_windows(len(long_df))
-        input_size = min(max(len(long_df) - n_windows, 60), 180)
-
-        ml_models = _build_ml_models()
-        ml_fcst = _build_mlforecast(ml_models)
-        ml_cv = ml_fcst.cross_validation(
+def _recent_cv_errors(
+    long_df: pd.DataFrame,
+    *,
+    n_windows: int,
+    input_size: int,
+    model_names: Iterable[str] = ML_MODELS,
+) -> Dict[str, np.ndarray]:
+    """One-step-ahead signed errors (actual - predicted) for the last ``n_windows`` bars, oldest first."""
+    errors: Dict[str, np.ndarray] = {}
+    # Only scored models feed the weights, so the others are not refitted per window.
+    models = _build_ml_models(name for name in model_names if name in CV_SCORED_MODELS)
+    if models:
+        ml_cv = _build_mlforecast(models).cross_validation(
             df=long_df.reset_index(drop=True),
             n_windows=n_windows,
             h=1,
@@ -423,32 +569,138 @@ def _ensemble_weights_from_recent_cv(ohlcv: pd.DataFrame, ticker: str) -> Dict[s
             refit=1,
             static_features=[],
             input_size=input_size,
-        )
+        ).sort_values("ds")
+        for model_name in CV_SCORED_MODELS:
+            if model_name in ml_cv.columns:
+                errors[model_name] = ml_cv["y"].to_numpy(dtype=float) - ml_cv[model_name].to_numpy(dtype=float)
 
-        sf = _build_statsforecast()
-        sf_cv = sf.cross_validation(
-            h=1,
-            df=long_df[["unique_id", "ds", "y"]].reset_index(drop=True),
-            n_windows=n_windows,
-            step_size=1,
-            refit=1,
-            input_size=input_size,
-        )
+    sf_cv = _build_statsforecast().cross_validation(
+        h=1,
+        df=long_df[["unique_id", "ds", "y"]].reset_index(drop=True),
+        n_windows=n_windows,
+        step_size=1,
+        refit=1,
+        input_size=input_size,
+    ).sort_values("ds")
+    if "auto_arima" in sf_cv.columns:
+        errors["auto_arima"] = sf_cv["y"].to_numpy(dtype=float) - sf_cv["auto_arima"].to_numpy(dtype=float)
+    return errors
 
-        errors: Dict[str, float] = {}
-        for model_name in ("linear_regression", "random_forest", "xgboost", "lightgbm", "catboost"):
-            if model_name in ml_cv.columns:
-                errors[model_name] = float(mean_absolute_error(ml_cv["y"], ml_cv[model_name]))
-        if "auto_arima" in sf_cv.columns:
-            errors["auto_arima"] = float(mean_absolute_error(sf_cv["y"], sf_cv["auto_arima"]))
 
-        valid = {name: err for name, err in errors.items() if math.isfinite(err) and err > 0}
-        if not valid:
-            raise ValueError("No valid validation errors were produced.")
+def _bars_since_error_buffer(buffer: Optional[Dict[str, Any]], ohlcv: pd.DataFrame) -> Optional[int]:
+    """Bars appended since ``buffer`` was filled, or None when the history was rewritten."""
+    if not buffer or buffer["last_date"] not in ohlcv.index:
+        return None
+    position = ohlcv.index.get_loc(buffer["last_date"])
+    if not isinstance(position, (int, np.integer)):
+        return None
+    if not math.isclose(float(ohlcv["Close"].iloc[position]), buffer["last_close"], rel_tol=1e-9):
+        return None
+    return len(ohlcv) - 1 - int(position)
+
+
+def _inverse_mae_weights(errors: Dict[str, Tuple[float, ...]]) -> Dict[str, float]:
+    maes = {name: float(np.mean(np.abs(values))) for name, values in errors.items() if values}
+    valid = {name: err for name, err in maes.items() if math.isfinite(err) and err > 0}
+    if not valid:
+        raise ValueError("No valid validation errors were produced.")
+    inverse = {name: 1.0 / err for name, err in valid.items()}
+    total = sum(inverse.values())
+    return {name: value / total for name, value in inverse.items()}
+
+
+def _ensemble_residuals(errors: Dict[str, Tuple[float, ...]], weights: Dict[str, float]) -> Tuple[float, ...]:
+    """Signed one-step errors of the weighted ensemble over the buffered windows.
+
+    Each window's error uses inverse-MAE weights fit on the *other* windows, so
+    a residual never scores the weights it helped choose (``weights`` are used
+    as-is when there is only one window). Only models with a full buffer
+    contribute.
+    """
+    window_count = max((len(values) for values in errors.values()), default=0)
+    members = [name for name in weights if len(errors.get(name, ())) == window_count]
+    if not window_count or not members:
+        return ()
+    stacked = np.array([errors[name] for name in members], dtype=float)
+    if window_count == 1:
+        member_weights = np.array([weights[name] for name in members], dtype=float)
+        total = member_weights.sum()
+        return (float(member_weights @ stacked[:, 0] / total),) if total > 0 else ()
+    absolute = np.abs(stacked)
+    held_out_mae = (absolute.sum(axis=1, keepdims=True) - absolute) / (window_count - 1)
+    with np.errstate(divide="ignore"):
+        inverse = np.where(np.isfinite(held_out_mae) & (held_out_mae > 0), 1.0 / held_out_mae, 0.0)
+    totals = inverse.sum(axis=0)
+    residuals = np.where(totals > 0, (inverse * stacked).sum(axis=0) / np.where(totals > 0, totals, 1.0), stacked.mean(axis=0))
+    return tuple(float(value) for value in residuals)
+
+
+def _buffered_cv_errors(
+    buffer: Optional[Dict[str, Any]],
+    ohlcv: pd.DataFrame,
+    long_df: pd.DataFrame,
+    model_names: Tuple[str, ...],
+    *,
+    n_windows: int,
+) -> Dict[str, Tuple[float, ...]]:
+    """The last ``n_windows`` CV errors per model, evaluating only bars the buffer lacks.
+
+    Models outside ``model_names`` (pruned) are dropped; bringing one back
+    re-evaluates every window, since its buffered errors are stale.
+    """
+    input_size = min(max(len(long_df) - n_windows, 60), 180)
+    new_bars = _bars_since_error_buffer(buffer, ohlcv)
+    if new_bars is not None and not set(model_names) <= set(buffer.get("models", model_names)):
+        new_bars = None
+    if new_bars is None or new_bars >= n_windows:
+        previous: Dict[str, Tuple[float, ...]] = {}
+        new_errors = _recent_cv_errors(long_df, n_windows=n_windows, input_size=input_size, model_names=model_names)
+    elif new_bars > 0:
+        previous = buffer["errors"]
+        new_errors = _recent_cv_errors(long_df, n_windows=new_bars, input_size=input_size, model_names=model_names)
+    else:
+        previous = buffer["errors"]
+        new_errors = {}
 
-        inverse = {name: 1.0 / err for name, err in valid.items()}
-        total = sum(inverse.values())
-        weights = {name: value / total for name, value in inverse.items()}
+    errors: Dict[str, Tuple[float, ...]] = {}
+    for name in dict.fromkeys([*new_errors, *previous]):
+        if name in ML_MODELS and name not in model_names:
+            continue
+        combined = tuple(previous.get(name, ())) + tuple(float(value) for value in new_errors.get(name, ()))
+        errors[name] = combined[-n_windows:]
+    return errors
+
+
+def _ensemble_weights_from_recent_cv(ohlcv: pd.DataFrame, ticker: str) -> Dict[str, float]:
+    normalized_ticker = _normalize_ticker(ticker)
+    cache_key = ("ensemble_weights", normalized_ticker, len(ohlcv))
+    cached = _cache_get(cache_key)
+    if cached is not None:
+        return cached
+
+    try:
+        long_df = _build_long_frame(ohlcv, ticker)
+        n_windows = _default_live_weight_windows(len(long_df))
+        model_names = _active_ml_models(ohlcv, normalized_ticker)
+
+        with _ERROR_BUFFERS_LOCK:
+            buffer = _ERROR_BUFFERS.get(normalized_ticker)
+        errors = _buffered_cv_errors(buffer, ohlcv, long_df, model_names, n_windows=n_windows)
+        weights = _inverse_mae_weights(errors)
+        residuals = _ensemble_residuals(errors, weights)
+        with _ERROR_BUFFERS_LOCK:
+            _ERROR_BUFFERS[normalized_ticker] = {
+                "last_date": ohlcv.index[-1],
+                "last_close": float(ohlcv["Close"].iloc[-1]),
+                "models": model_names,
+                "errors": errors,
+                "residuals": residuals,
+            }
+            _ERROR_BUFFERS.move_to_end(normalized_ticker)
+            while len(_ERROR_BUFFERS) > ERROR_BUFFER_MAX_TICKERS:
+                _ERROR_BUFFERS.popitem(last=False)
+        _cache_set(("ensemble_residuals", normalized_ticker, len(ohlcv)), residuals)
+        _MODEL_SELECTOR.observe(normalized_ticker, _data_watermark(ohlcv), weights)
     except Exception:
         available = [name for name in PRODUCTION_ENSEMBLE_MODELS if name != "xgboost" or XGBOOST_AVAILABLE]
         weights = {name: 1.0 / len(available) for name in available}
@@ -456,14 +708,126 @@ def _ensemble_weights_from_recent_cv(ohlcv: pd.DataFrame, ticker: str) -> Dict[s
     return _cache_set(cache_key, weights)
 
 
+def _recent_ensemble_residuals(ohlcv: pd.DataFrame, ticker: str) -> Tuple[float, ...]:
+    """Residuals stored by the weighting pass for this exact history (empty if none)."""
+    normalized_ticker = _normalize_ticker(ticker)
+    cached = _cache_get(("ensemble_residuals", normalized_ticker, len(ohlcv)))
+    if cached is not None:
+        return tuple(cached)
+    with _ERROR_BUFFERS_LOCK:
+        buffer = _ERROR_BUFFERS.get(normalized_ticker)
+    if _bars_since_error_buffer(buffer, ohlcv) != 0:
+        return ()
+    return tuple(buffer.get("residuals", ()))
+
+
+def _conformal_rank(calibration_size: int, coverage: float = PREDICTION_INTERVAL_COVERAGE) -> Optional[int]:
+    """Rank of the conformal score for ``coverage``, or None when too few scores attain it."""
+    rank = int(math.ceil((calibration_size + 1) * coverage))
+    return rank if 1 <= rank <= calibration_size else None
+
+
+def conformal_coverage(calibration_size: int, coverage: float = PREDICTION_INTERVAL_COVERAGE) -> Optional[float]:
+    """Marginal coverage the split-conformal band actually guarantees: rank / (n + 1)."""
+    rank = _conformal_rank(calibration_size, coverage)
+    return None if rank is None else rank / (calibration_size + 1)
+
+
+def _conformal_bounds(
+    predictions: np.ndarray,
+    residuals: Tuple[float, ...],
+    coverage: float = PREDICTION_INTERVAL_COVERAGE,
+) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """Split-conformal band around ``predictions`` from one-step CV residuals.
+
+    The half-width is the ceil((n + 1) * coverage)-th smallest absolute
+    residual, widened by sqrt(h) for step h since the residuals are
+    one-step-ahead. Returns None when the buffer is too short for that rank to
+    exist, since no band from it would reach ``coverage``.
+    """
+    scores = np.sort(np.abs(np.asarray(residuals, dtype=float)))
+    scores = scores[np.isfinite(scores)]
+    rank = _conformal_rank(len(scores), coverage)
+    if rank is None or predictions is None or len(predictions) == 0:
+        return None
+    half_width = scores[rank - 1] * np.sqrt(np.arange(1, len(predictions) + 1))
+    center = np.asarray(predictions, dtype=float)
+    return center - half_width, center + half_width
+
+
+def prediction_interval_bounds(df: pd.DataFrame, predictions: np.ndarray) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """Conformal bounds for ``predictions`` made from ``df`` (as passed to ``ensemble_predict``).
+
+    Reuses the residuals from the ensemble-weighting CV, so it never fits a
+    model; returns None when that pass has not run for this history.
+    """
+    ohlcv = _coerce_ohlcv_from_input(df)
+    if ohlcv.empty:
+        return None
+    ticker = str(df.attrs.get("ticker") or "AAPL")
+    return _conformal_bounds(predictions, _recent_ensemble_residuals(ohlcv, ticker))
+
+
+def _data_watermark(ohlcv: pd.DataFrame) -> Tuple[int, str]:
+    return len(ohlcv), str(ohlcv.index[-1])
+
+
+def _ensemble_candidates() -> Tuple[str, ...]:
+    available = _available_ml_models()
+    return tuple(name for name in ML_MODELS if name in available or name in SEQUENCE_MODELS)
+
+
+def _active_ml_models(ohlcv: pd.DataFrame, ticker: str) -> Tuple[str, ...]:
+    """Ensemble members (ML and sequence models) to run for this history."""
+    return _MODEL_SELECTOR.select(_normalize_ticker(ticker), _data_watermark(ohlcv), _ensemble_candidates())
+
+
+def active_ensemble_models(df: pd.DataFrame) -> Tuple[str, ...]:
+    """Members ``ensemble_predict`` runs for ``df`` after per-ticker pruning."""
+    ohlcv = _coerce_ohlcv_from_input(df)
+    if ohlcv.empty:
+        return _ensemble_candidates()
+    return _active_ml_models(ohlcv, str(df.attrs.get("ticker") or "AAPL"))
+
+
+def record_model_fit(ticker: str, group: str, seconds: Optional[float], *, complete: bool) -> None:
+    _MODEL_SELECTOR.record_fit(_normalize_ticker(ticker), group, seconds, complete=complete)
+
+
+def model_selection_report(ticker: str) -> Dict[str, Any]:
+    """Active/pruned ensemble members for ``ticker`` and the fit time the pruning saves."""
+    return _MODEL_SELECTOR.report(_normalize_ticker(ticker))
+
+
+def _forecast_active_ml_models(ohlcv: pd.DataFrame, *, horizon: int, ticker: str) -> Dict[str, Any]:
+    active = _active_ml_models(ohlcv, ticker)
+    built = [name for name in _ensemble_candidates() if name not in SEQUENCE_MODELS]
+    names = tuple(name for name in active if name in built)
+    if names:
+        ml_result = _forecast_ml_models(ohlcv, model_names=names, horizon=horizon, ticker=ticker)
+    else:
+        ml_result = {"predictions": {}, "future_dates": _future_session_dates(ohlcv.index[-1], horizon), "fit_seconds": 0.0}
+    record_model_fit(ticker, "ml", ml_result.get("fit_seconds"), complete=len(names) == len(built))
+    return ml_result
+
+
 def _predict_production_components(
     ohlcv: pd.DataFrame,
     *,
     horizon: int = PREDICTION_HORIZON,
     ticker: str = "AAPL",
 ) -> Tuple[np.ndarray, Dict[str, np.ndarray], List[pd.Timestamp], Dict[str, float]]:
-    ml_result = _forecast_ml_models(ohlcv, model_names=ML_MODELS, horizon=horizon, ticker=ticker)
+    ml_result = _forecast_active_ml_models(ohlcv, horizon=horizon, ticker=ticker)
     stats_result = _forecast_statistical_models(ohlcv, horizon=horizon, ticker=ticker)
+    return _combine_production_components(ohlcv, ticker, ml_result, stats_result)
+
+
+def _combine_production_components(
+    ohlcv: pd.DataFrame,
+    ticker: str,
+    ml_result: Dict[str, Any],
+    stats_result: Dict[str, Any],
+) -> Tuple[np.ndarray, Dict[str, np.ndarray], List[pd.Timestamp], Dict[str, float]]:
     predictions = dict(ml_result["predictions"])
     if "auto_arima" in stats_result["predictions"]:
         predictions["auto_arima"] = stats_result["predictions"]["auto_arima"]
@@ -587,84 +951,86 @@ def calculate_metrics(actual: np.ndarray, predicted: np.ndarray) -> Dict[str, fl
     }
 
 
-def _evaluation_metrics(actual: np.ndarray, predicted: np.ndarray) -> Dict[str, float]:
-    mae = mean_absolute_error(actual, predicted)
-    rmse = math.sqrt(mean_squared_error(actual, predicted))
-    mape = mean_absolute_percentage_error(actual, predicted) * 100
-    r_squared = r2_score(actual, predicted)
-    if len(predicted) > 1:
-        pred_direction = np.diff(predicted) > 0
-        actual_direction = np.diff(actual) > 0
-        directional_accuracy = float(np.mean(pred_direction == actual_direction) * 100)
-    else:
-        directional_accuracy = 0.0
+def _rounded_forecast_metrics(metrics: Dict[str, np.ndarray], row: int = 0) -> Dict[str, float]:
     return {
-        "mae": round(float(mae), 2),
-        "rmse": round(float(rmse), 2),
-        "mape": round(float(mape), 2),
-        "r_squared": round(float(r_squared), 4),
-        "directional_accuracy": round(directional_accuracy, 2),
+        "mae": round(float(metrics["mae"][row]), 2),
+        "rmse": round(float(metrics["rmse"][row]), 2),
+        "mape": round(float(metrics["mape"][row]), 2),
+        "r_squared": round(float(metrics["r_squared"][row]), 4),
+        "directional_accuracy": round(float(metrics["directional_accuracy"][row]), 2),
     }
 
 
-def calculate_trading_returns(predictions: np.ndarray, actuals: np.ndarray, initial_capital: float = 10000) -> Optional[Dict[str, Any]]:
-    if len(predictions) < 2:
+def _evaluation_metrics(actual: np.ndarray, predicted: np.ndarray) -> Dict[str, float]:
+    return _rounded_forecast_metrics(backtest_metrics.forecast_metrics(actual, predicted))
+
+
+def calculate_trading_returns(
+    predictions: np.ndarray,
+    actuals: np.ndarray,
+    initial_capital: float = 10000,
+    *,
+    transaction_cost_bps: float = 0.0,
+    slippage_bps: float = 0.0,
+) -> Optional[Dict[str, Any]]:
+    simulation = backtest_metrics.simulate_trading(
+        predictions,
+        actuals,
+        initial_capital=initial_capital,
+        transaction_cost_bps=transaction_cost_bps,
+        slippage_bps=slippage_bps,
+    )
+    if simulation is None:
         return None
+    return backtest_metrics.trading_summary(simulation)
 
-    capital = float(initial_capital)
-    shares = 0.0
-    portfolio_values = [float(initial_capital)]
-    num_trades = 0
-
-    for index in range(len(predictions) - 1):
-        pred_return = 0.0 if predictions[index] == 0 else (predictions[index + 1] - predictions[index]) / predictions[index]
-        actual_price = float(actuals[index])
-        next_price = float(actuals[index + 1])
-
-        if pred_return > 0.005 and shares == 0 and capital > 0:
-            shares = capital / actual_price
-            capital = 0.0
-            num_trades += 1
-        elif pred_return < -0.005 and shares > 0:
-            capital = shares * actual_price
-            shares = 0.0
-            num_trades += 1
-
-        portfolio_values.append(capital + (shares * next_price))
-
-    if shares > 0:
-        capital = shares * float(actuals[-1])
-
-    total_return = ((capital - initial_capital) / initial_capital) * 100
-    buy_hold_final = (initial_capital / float(actuals[0])) * float(actuals[-1])
-    buy_hold_return = ((buy_hold_final - initial_capital) / initial_capital) * 100
-    returns_series = np.diff(portfolio_values) / np.maximum(np.array(portfolio_values[:-1]), 1e-9)
-    sharpe_ratio = (np.mean(returns_series) / np.std(returns_series)) * math.sqrt(TRADING_DAYS_PER_YEAR) if np.std(returns_series) > 0 else 0.0
-    portfolio_array = np.array(portfolio_values)
-    running_max = np.maximum.accumulate(portfolio_array)
-    drawdown = (portfolio_array - running_max) / np.maximum(running_max, 1e-9) * 100
-    max_drawdown = float(np.min(drawdown))
 
-    return {
-        "initial_capital": round(float(initial_capital), 2),
-        "final_value": round(float(capital), 2),
-        "total_return": round(float(total_return), 2),
-        "buy_hold_return": round(float(buy_hold_return), 2),
-        "outperformance": round(float(total_return - buy_hold_return), 2),
-        "sharpe_ratio": round(float(sharpe_ratio), 2),
-        "max_drawdown": round(max_drawdown, 2),
-        "num_trades": int(num_trades),
-        "portfolio_values": [round(float(value), 2) for value in portfolio_values],
+def _snapshot_from_components(
+    ohlcv: pd.DataFrame,
+    ensemble_preds: Optional[np.ndarray],
+    model_breakdown: Dict[str, np.ndarray],
+    future_dates: List[pd.Timestamp],
+    horizon: int,
+    ticker: str,
+) -> Optional[Dict[str, Any]]:
+    if ensemble_preds is None or len(ensemble_preds) == 0:
+        return None
+    recent_close = float(ohlcv["Close"].iloc[-1])
+    residuals = _recent_ensemble_residuals(ohlcv, ticker)
+    bounds = _conformal_bounds(ensemble_preds[:horizon], residuals)
+    predictions = []
+    for index, pred in enumerate(ensemble_preds[:horizon]):
+        point = {"day": index + 1, "predictedClose": round(float(pred), 2), "date": future_dates[index].strftime("%Y-%m-%d")}
+        if bounds is not None:
+            point["lower"] = round(float(bounds[0][index]), 2)
+            point["upper"] = round(float(bounds[1][index]), 2)
+        predictions.append(point)
+    snapshot = {
+        "recentClose": round(recent_close, 2),
+        "recentPredicted": round(float(ensemble_preds[0]), 2),
+        "confidence": _confidence_from_model_breakdown(model_breakdown, recent_close),
+        "modelsUsed": list(model_breakdown.keys()),
+        "predictions": predictions,
+        "modelSelection": model_selection_report(ticker),
     }
+    if bounds is not None:
+        snapshot["interval"] = {
+            "method": "split_conformal",
+            "coverage": round(conformal_coverage(len(residuals)), 4),
+            "targetCoverage": PREDICTION_INTERVAL_COVERAGE,
+            "calibrationWindows": len(residuals),
+        }
+    return snapshot
 
 
 def get_prediction_snapshot(ticker: str) -> Optional[Dict[str, Any]]:
     normalized_ticker = _normalize_ticker(ticker)
     cache_key = ("prediction_snapshot", normalized_ticker)
-    cached = _cache_get(cache_key)
-    if cached is not None:
-        return cached
+    return _coalesced(cache_key, lambda: _compute_prediction_snapshot(normalized_ticker, cache_key))
+
 
+@compute_budget.forecast_request
+def _compute_prediction_snapshot(normalized_ticker: str, cache_key: Tuple[Any, ...]) -> Optional[Dict[str, Any]]:
     ohlcv = _load_canonical_ohlcv(normalized_ticker)
     if ohlcv.empty or len(ohlcv) < MIN_PRODUCTION_HISTORY_ROWS:
         return None
@@ -673,22 +1039,109 @@ def get_prediction_snapshot(ticker: str) -> Optional[Dict[str, Any]]:
         horizon=PREDICTION_PREVIEW_HORIZON,
         ticker=normalized_ticker,
     )
-    if ensemble_preds is None or len(ensemble_preds) == 0:
+    snapshot = _snapshot_from_components(
+        ohlcv,
+        ensemble_preds,
+        model_breakdown,
+        future_dates,
+        PREDICTION_PREVIEW_HORIZON,
+        normalized_ticker,
+    )
+    if snapshot is None:
         return None
-    recent_close = float(ohlcv["Close"].iloc[-1])
-    snapshot = {
-        "recentClose": round(recent_close, 2),
-        "recentPredicted": round(float(ensemble_preds[0]), 2),
-        "confidence": _confidence_from_model_breakdown(model_breakdown, recent_close),
-        "modelsUsed": list(model_breakdown.keys()),
-        "predictions": [
-            {"day": index + 1, "predictedClose": round(float(pred), 2), "date": future_dates[index].strftime("%Y-%m-%d")}
-            for index, pred in enumerate(ensemble_preds[:PREDICTION_PREVIEW_HORIZON])
-        ],
-    }
     return _cache_set(cache_key, snapshot)
 
 
+@compute_budget.forecast_request
+def forecast_many(
+    tickers: Iterable[str],
+    horizon: int = PREDICTION_PREVIEW_HORIZON,
+    *,
+    global_model: bool = False,
+) -> Dict[str, Optional[Dict[str, Any]]]:
+    """Forecast several tickers at once, returning one snapshot per ticker.
+
+    Each value has the same shape as ``get_prediction_snapshot`` (``None`` when
+    a ticker lacks history). The benchmark models run as one StatsForecast
+    panel. By default the ML models stay local to each ticker (sharing the
+    per-ticker forecast cache); ``global_model=True`` instead fits each ML
+    model once across the stacked panel.
+    """
+    normalized = list(dict.fromkeys(_normalize_ticker(ticker) for ticker in tickers if _normalize_ticker(ticker)))
+    horizon = max(1, min(int(horizon), PREDICTION_HORIZON))
+    use_snapshot_cache = horizon == PREDICTION_PREVIEW_HORIZON and not global_model
+    results: Dict[str, Optional[Dict[str, Any]]] = {}
+    ohlcv_by_ticker: Dict[str, pd.DataFrame] = {}
+
+    for ticker in normalized:
+        cached = _cache_get(("prediction_snapshot", ticker)) if use_snapshot_cache else None
+        if cached is not None:
+            results[ticker] = cached
+            continue
+        ohlcv = _load_canonical_ohlcv(ticker)
+        if ohlcv.empty or len(ohlcv) < MIN_PRODUCTION_HISTORY_ROWS:
+            results[ticker] = None
+            continue
+        ohlcv_by_ticker[ticker] = ohlcv
+
+    if ohlcv_by_ticker:
+        stats_results = _forecast_statistical_models_each(ohlcv_by_ticker, horizon=horizon)
+        ml_results = None
+        if global_model:
+            try:
+                ml_results = _forecast_ml_models_global(ohlcv_by_ticker, horizon=horizon)
+            except Exception as exc:
+                # One bad series can sink the stacked panel; fit per ticker instead.
+                logger.warning("Global ML forecast failed for %s, falling back to per-ticker models: %s", sorted(ohlcv_by_ticker), exc)
+        for ticker, ohlcv in ohlcv_by_ticker.items():
+            if ticker not in stats_results:
+                continue
+            try:
+                if ml_results is not None and ticker in ml_results:
+                    ml_result = ml_results[ticker]
+                else:
+                    ml_result = _forecast_active_ml_models(ohlcv, horizon=horizon, ticker=ticker)
+                ensemble_preds, model_breakdown, future_dates, _weights = _combine_production_components(
+                    ohlcv,
+                    ticker,
+                    ml_result,
+                    stats_results[ticker],
+                )
+                snapshot = _snapshot_from_components(ohlcv, ensemble_preds, model_breakdown, future_dates, horizon, ticker)
+            except Exception as exc:
+                # A failing ticker has no view; it must not sink the rest of the batch.
+                logger.warning("Batch forecast failed for %s: %s", ticker, exc)
+                continue
+            if snapshot is not None and use_snapshot_cache:
+                snapshot = _cache_set(("prediction_snapshot", ticker), snapshot)
+            results[ticker] = snapshot
+
+    return {ticker: results.get(ticker) for ticker in normalized}
+
+
+def _forecast_statistical_models_each(
+    ohlcv_by_ticker: Dict[str, pd.DataFrame],
+    *,
+    horizon: int,
+) -> Dict[str, Dict[str, Any]]:
+    """The StatsForecast panel, falling back to one series at a time if the panel fails.
+
+    Tickers whose own forecast still fails are left out of the result.
+    """
+    try:
+        return _forecast_statistical_models_many(ohlcv_by_ticker, horizon=horizon)
+    except Exception as exc:
+        logger.warning("StatsForecast panel failed for %s, forecasting one series at a time: %s", sorted(ohlcv_by_ticker), exc)
+    results: Dict[str, Dict[str, Any]] = {}
+    for ticker, ohlcv in ohlcv_by_ticker.items():
+        try:
+            results[ticker] = _forecast_statistical_models(ohlcv, horizon=horizon, ticker=ticker)
+        except Exception as exc:
+            logger.warning("Statistical forecast failed for %s: %s", ticker, exc)
+            continue
+    return results
+
+
 def get_future_prediction_dates(df: pd.DataFrame, horizon: int) -> List[pd.Timestamp]:
     ohlcv = _coerce_ohlcv_from_input(df)
     if ohlcv.empty:
@@ -709,50 +1162,18 @@ def _summarize_shap_explainability(
     model: Any,
     feature_frame: pd.DataFrame,
     latest_features: pd.DataFrame,
+    *,
+    cache_key: Tuple[Any, ...],
 ) -> Optional[Dict[str, Any]]:
-    if feature_frame is None or feature_frame.empty or latest_features is None or latest_features.empty:
-        return None
-    try:
-        import shap
-
-        background = feature_frame.tail(min(len(feature_frame), 200))
-        if model_name == "linear_regression":
-            explainer = shap.LinearExplainer(model, background)
-        else:
-            explainer = shap.TreeExplainer(model, data=background)
-
-        background_values = np.asarray(explainer.shap_values(background))
-        latest_values = np.asarray(explainer.shap_values(latest_features))
-        if background_values.ndim == 1:
-            background_values = background_values.reshape(1, -1)
-        if latest_values.ndim == 1:
-            latest_values = latest_values.reshape(1, -1)
-
-        mean_abs = np.abs(background_values).mean(axis=0)
-        top_indices = np.argsort(mean_abs)[::-1][:5]
-        latest_row = latest_features.iloc[0]
-        latest_impacts = latest_values[0]
-        latest_indices = np.argsort(np.abs(latest_impacts))[::-1][:5]
-
-        return {
-            "global_top_features": [
-                {
-                    "feature": str(feature_frame.columns[idx]),
-                    "meanAbsImpact": _clean_float(mean_abs[idx], 4),
-                }
-                for idx in top_indices
-            ],
-            "latest_prediction_contributors": [
-                _serialize_feature_importance(
-                    feature_frame.columns[idx],
-                    latest_row.iloc[idx],
-                    latest_impacts[idx],
-                )
-                for idx in latest_indices
-            ],
-        }
-    except Exception:
-        return None
+    return _EXPLAINABILITY.summarize(
+        model_name,
+        model,
+        feature_frame,
+        latest_features,
+        cache_key=cache_key,
+        serialize_fn=_serialize_feature_importance,
+        clean_fn=_clean_float,
+    )
 
 
 def _build_evaluation_explainability(
@@ -770,19 +1191,26 @@ def _build_evaluation_explainability(
     latest_index = max(0, min(len(feature_frame) - 1, int(evaluation_ds) - 2))
     latest_features = feature_frame.iloc[[latest_index]].copy()
 
+    cache_key = (ticker, explainability.data_watermark(ohlcv), int(evaluation_ds))
     for model_name, model in ml_result["models"].items():
-        explainability = _summarize_shap_explainability(model_name, model, feature_frame, latest_features)
-        if explainability:
-            explanations[model_name] = explainability
+        summary = _summarize_shap_explainability(
+            model_name,
+            model,
+            feature_frame,
+            latest_features,
+            cache_key=cache_key,
+        )
+        if summary:
+            explanations[model_name] = summary
     return explanations
 
 
 def _merge_cv_frames(
     stat_cv: pd.DataFrame,
-    ml_cv: pd.DataFrame,
+    *ml_cvs: pd.DataFrame,
 ) -> pd.DataFrame:
     merged = stat_cv[["unique_id", "ds", "cutoff", "y"]].copy()
-    for frame in (stat_cv, ml_cv):
+    for frame in (stat_cv, *ml_cvs):
         for column in frame.columns:
             if column in {"unique_id", "ds", "cutoff", "y"}:
                 continue
@@ -790,14 +1218,47 @@ def _merge_cv_frames(
     return merged.sort_values("ds").reset_index(drop=True)
 
 
-def _prepare_cv_frames(
+def _stats_cv_stage(long_df: pd.DataFrame, *, n_windows: int, refit: int, input_size: Optional[int]) -> pd.DataFrame:
+    return _build_statsforecast().cross_validation(
+        h=1,
+        df=long_df[["unique_id", "ds", "y"]].reset_index(drop=True),
+        n_windows=n_windows,
+        step_size=1,
+        refit=refit,
+        input_size=input_size,
+    )
+
+
+def _ml_model_cv_stage(
+    long_df: pd.DataFrame,
+    model_name: str,
+    *,
+    n_windows: int,
+    refit: int,
+    input_size: Optional[int],
+) -> pd.DataFrame:
+    ml_fcst = _build_mlforecast(_build_ml_models([model_name]))
+    return ml_fcst.cross_validation(
+        df=long_df.reset_index(drop=True),
+        n_windows=n_windows,
+        h=1,
+        step_size=1,
+        refit=refit,
+        static_features=[],
+        input_size=input_size,
+    )
+
+
+def _evaluation_stage_tasks(
     ticker: str,
     *,
     ohlcv: pd.DataFrame,
     test_days: int,
     retrain_frequency: int,
     max_train_rows: Optional[int],
-) -> pd.DataFrame:
+    include_explanations: bool,
+) -> Dict[str, evaluation_executor.StageTask]:
+    """Independent evaluation stages: the stats CV, one CV per ML model and SHAP."""
     long_df = _build_long_frame(ohlcv, ticker)
     if len(long_df) <= max(test_days + 30, 60):
         raise ValueError("Insufficient data for evaluation.")
@@ -806,29 +1267,69 @@ def _prepare_cv_frames(
     if n_windows < 5:
         raise ValueError("Insufficient backtest windows.")
 
-    input_size = min(max_train_rows, len(long_df) - 1) if max_train_rows else None
+    cv_options = {
+        "n_windows": n_windows,
+        "refit": max(1, retrain_frequency),
+        "input_size": min(max_train_rows, len(long_df) - 1) if max_train_rows else None,
+    }
+    tasks: Dict[str, evaluation_executor.StageTask] = {
+        "stats_cv": (_stats_cv_stage, (long_df,), cv_options),
+    }
+    for model_name in _available_ml_models():
+        tasks[f"ml_cv:{model_name}"] = (_ml_model_cv_stage, (long_df, model_name), cv_options)
+    if include_explanations:
+        tasks["explainability"] = (
+            _build_evaluation_explainability,
+            (ohlcv, ticker, int(long_df["ds"].iloc[-1])),
+            {},
+        )
+    return tasks
 
-    stats_cv = _build_statsforecast().cross_validation(
-        h=1,
-        df=long_df[["unique_id", "ds", "y"]].reset_index(drop=True),
-        n_windows=n_windows,
-        step_size=1,
-        refit=max(1, retrain_frequency),
-        input_size=input_size,
-    )
 
-    ml_models = _build_ml_models()
-    ml_fcst = _build_mlforecast(ml_models)
-    ml_cv = ml_fcst.cross_validation(
-        df=long_df.reset_index(drop=True),
-        n_windows=n_windows,
-        h=1,
-        step_size=1,
-        refit=max(1, retrain_frequency),
-        static_features=[],
-        input_size=input_size,
+def _prepare_cv_frames(
+    ticker: str,
+    *,
+    ohlcv: pd.DataFrame,
+    test_days: int,
+    retrain_frequency: int,
+    max_train_rows: Optional[int],
+    include_explanations: bool = False,
+    should_cancel: Optional[Callable[[], bool]] = None,
+) -> Tuple[pd.DataFrame, Dict[str, Dict[str, Any]], Dict[str, float]]:
+    """Run the evaluation stages on the shared pool and merge the CV frames.
+
+    Returns ``(merged_cv, explainability, stage_timings)``.
+    """
+    tasks = _evaluation_stage_tasks(
+        ticker,
+        ohlcv=ohlcv,
+        test_days=test_days,
+        retrain_frequency=retrain_frequency,
+        max_train_rows=max_train_rows,
+        include_explanations=include_explanations,
+    )
+    # SHAP stays in this process so its explainer and summary caches are reused.
+    results, timings = evaluation_executor.get_evaluation_executor().run(
+        tasks,
+        should_cancel=should_cancel,
+        in_process=("explainability",),
     )
-    return _merge_cv_frames(stats_cv, ml_cv)
+    ml_frames = [results[name] for name in tasks if name.startswith("ml_cv:")]
+    merged = _merge_cv_frames(results["stats_cv"], *ml_frames)
+    return merged, results.get("explainability", {}), timings
+
+
+def evaluation_defaults(
+    fast_mode: bool,
+    retrain_frequency: Optional[int] = None,
+    max_train_rows: Optional[int] = None,
+) -> Tuple[int, Optional[int]]:
+    """Retrain cadence and training-window cap for a fast or full evaluation."""
+    if retrain_frequency is None:
+        retrain_frequency = 10 if fast_mode else 5
+    if max_train_rows is None and fast_mode:
+        max_train_rows = 450
+    return int(retrain_frequency), max_train_rows
 
 
 def rolling_window_backtest(
@@ -838,6 +1339,9 @@ def rolling_window_backtest(
     fast_mode: bool = True,
     max_train_rows: Optional[int] = None,
     include_explanations: Optional[bool] = None,
+    should_cancel: Optional[Callable[[], bool]] = None,
+    transaction_cost_bps: float = 0.0,
+    slippage_bps: float = 0.0,
 ) -> Optional[Dict[str, Any]]:
     normalized_ticker = _normalize_ticker(ticker)
     if include_explanations is None:
@@ -851,21 +1355,127 @@ def rolling_window_backtest(
         bool(fast_mode),
         int(max_train_rows) if max_train_rows else None,
         bool(include_explanations),
+        float(transaction_cost_bps),
+        float(slippage_bps),
     )
-    cached = _cache_get(cache_key)
-    if cached is not None:
-        return cached
+    result = _coalesced(
+        cache_key,
+        lambda *probe: _compute_rolling_window_backtest(
+            normalized_ticker,
+            cache_key,
+            test_days=test_days,
+            retrain_frequency=retrain_frequency,
+            fast_mode=fast_mode,
+            max_train_rows=max_train_rows,
+            include_explanations=bool(include_explanations),
+            should_cancel=probe[0] if probe else None,
+            transaction_cost_bps=transaction_cost_bps,
+            slippage_bps=slippage_bps,
+        ),
+        should_cancel=should_cancel,
+    )
+    return _with_ready_explainability(result)
+
 
+def _explainability_key(ticker: str, end_date: str) -> Tuple[str, str, str]:
+    return ("evaluation", ticker, end_date)
+
+
+def _shared_explainability_key(key: Tuple[str, str, str]) -> Tuple[str, ...]:
+    return ("evaluation_explainability", *key[1:])
+
+
+def _request_evaluation_explainability(
+    ohlcv: pd.DataFrame,
+    ticker: str,
+    end_date: str,
+    evaluation_ds: int,
+) -> Tuple[str, Dict[str, Any]]:
+    """Queue (or compute, outside background mode) the SHAP summaries for an evaluation.
+
+    Finished summaries are also written to the forecast cache, so a worker that
+    served the pending evaluation from the shared tier can pick them up.
+    """
+    key = _explainability_key(ticker, end_date)
+
+    def _compute() -> Dict[str, Any]:
+        explanations = _build_evaluation_explainability(ohlcv, ticker, evaluation_ds)
+        _cache_set(_shared_explainability_key(key), explanations)
+        return explanations
+
+    return _EXPLAINABILITY.request(key, _compute)
+
+
+def _rerequest_evaluation_explainability(result: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Queue SHAP here for a pending evaluation another worker computed."""
+    ticker, end_date = result["ticker"], result["test_period"]["end_date"]
+    if _EXPLAINABILITY.is_pending(_explainability_key(ticker, end_date)):
+        return None
+    ohlcv = _load_canonical_ohlcv(ticker)
+    if ohlcv.empty:
+        return None
+    sessions = pd.to_datetime(ohlcv.index).tz_localize(None).strftime("%Y-%m-%d")
+    positions = np.flatnonzero(sessions == end_date)
+    if not len(positions):
+        return None
+    status, explanations = _request_evaluation_explainability(ohlcv, ticker, end_date, int(positions[-1]) + 1)
+    return explanations if status == explainability.READY else None
+
+
+def _with_ready_explainability(result: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Swap the pending SHAP markers of a cached evaluation for finished summaries.
+
+    Summaries come from this worker's engine or the shared forecast cache; when
+    neither has them and this worker is not already computing them, they are
+    requested here rather than left pending until the evaluation expires.
+    """
+    if not result or result.get("evaluationOptions", {}).get("explainabilityStatus") != explainability.PENDING:
+        return result
+    key = _explainability_key(result["ticker"], result["test_period"]["end_date"])
+    explanations = _EXPLAINABILITY.ready(key)
+    if explanations is None:
+        explanations = _cache_get(_shared_explainability_key(key))
+    if explanations is None:
+        explanations = _rerequest_evaluation_explainability(result)
+    if explanations is None:
+        return result
+    explanations = forecast_cache.thaw_value(explanations)
+    for model_name, payload in result["models"].items():
+        if model_name in explanations:
+            payload["explainability"] = explanations[model_name]
+        else:
+            payload.pop("explainability", None)
+    result["evaluationOptions"]["explainabilityStatus"] = explainability.READY
+    return result
+
+
+def _compute_rolling_window_backtest(
+    normalized_ticker: str,
+    cache_key: Tuple[Any, ...],
+    *,
+    test_days: int,
+    retrain_frequency: int,
+    fast_mode: bool,
+    max_train_rows: Optional[int],
+    include_explanations: bool,
+    should_cancel: Optional[Callable[[], bool]],
+    transaction_cost_bps: float,
+    slippage_bps: float,
+) -> Optional[Dict[str, Any]]:
     ohlcv = _load_canonical_ohlcv(normalized_ticker)
     if ohlcv.empty or len(ohlcv) < 120:
         return None
 
-    merged_cv = _prepare_cv_frames(
+    started = time.perf_counter()
+    explain_later = include_explanations and _EXPLAINABILITY.background
+    merged_cv, explanations, stage_timings = _prepare_cv_frames(
         normalized_ticker,
         ohlcv=ohlcv,
         test_days=test_days,
         retrain_frequency=retrain_frequency,
         max_train_rows=max_train_rows,
+        include_explanations=include_explanations and not explain_later,
+        should_cancel=should_cancel,
     )
 
     actuals = merged_cv["y"].to_numpy(dtype=float)
@@ -874,13 +1484,20 @@ def rolling_window_backtest(
         for index, session_date in enumerate(pd.to_datetime(ohlcv.index).tz_localize(None))
     }
     dates = [date_lookup[int(ds)].strftime("%Y-%m-%d") for ds in merged_cv["ds"]]
+    explainability_status = explainability.READY if include_explanations else None
+    if explain_later:
+        explainability_status, explanations = _request_evaluation_explainability(
+            ohlcv, normalized_ticker, dates[-1], int(merged_cv["ds"].iloc[-1])
+        )
 
     model_predictions = {
         model_name: merged_cv[model_name].to_numpy(dtype=float)
         for model_name in BENCHMARK_MODELS + ML_MODELS
         if model_name in merged_cv.columns
     }
+    weights_started = time.perf_counter()
     ensemble_weights = _ensemble_weights_from_recent_cv(ohlcv, normalized_ticker)
+    stage_timings["ensemble_weights"] = time.perf_counter() - weights_started
     model_predictions["ensemble"] = _compute_weighted_ensemble(model_predictions, ensemble_weights)
 
     results = {
@@ -899,32 +1516,40 @@ def rolling_window_backtest(
             "retrainFrequency": int(retrain_frequency),
             "maxTrainRows": int(max_train_rows) if max_train_rows else None,
             "includeExplanations": bool(include_explanations),
+            "explainabilityStatus": explainability_status,
+            "transactionCostBps": float(transaction_cost_bps),
+            "slippageBps": float(slippage_bps),
+            "stageTimings": {name: round(float(seconds), 3) for name, seconds in stage_timings.items()},
         },
     }
 
-    explainability = (
-        _build_evaluation_explainability(ohlcv, normalized_ticker, int(merged_cv["ds"].iloc[-1]))
-        if include_explanations
-        else {}
+    # Score every model in one pass over a (models x days) matrix.
+    scored = [name for name, predictions in model_predictions.items() if predictions is not None and len(predictions)]
+    prediction_matrix = np.vstack([model_predictions[name] for name in scored])
+    forecast_metrics = backtest_metrics.forecast_metrics(actuals, prediction_matrix)
+    simulation = backtest_metrics.simulate_trading(
+        np.round(prediction_matrix, 2),
+        actuals,
+        transaction_cost_bps=transaction_cost_bps,
+        slippage_bps=slippage_bps,
     )
-
-    for model_name, predictions in model_predictions.items():
-        if predictions is None or len(predictions) == 0:
-            continue
+    for row, model_name in enumerate(scored):
         payload = {
-            "predictions": [round(float(prediction), 2) for prediction in predictions],
-            "metrics": _evaluation_metrics(actuals, predictions),
+            "predictions": np.round(prediction_matrix[row], 2).tolist(),
+            "metrics": _rounded_forecast_metrics(forecast_metrics, row),
         }
-        if model_name in explainability:
-            payload["explainability"] = explainability[model_name]
+        if simulation is not None:
+            payload["returns"] = backtest_metrics.trading_summary(simulation, row)
+        if model_name in explanations:
+            payload["explainability"] = explanations[model_name]
+        elif explainability_status == explainability.PENDING and model_name in ML_MODELS:
+            payload["explainability"] = {"status": explainability.PENDING}
         results["models"][model_name] = payload
 
-    results["returns"] = calculate_trading_returns(
-        np.asarray(results["models"]["ensemble"]["predictions"], dtype=float),
-        actuals,
-    )
+    results["returns"] = results["models"]["ensemble"].get("returns")
     results["best_model"] = min(
         results["models"].items(),
         key=lambda item: item[1]["metrics"]["mape"],
     )[0]
+    results["evaluationOptions"]["stageTimings"]["total"] = round(time.perf_counter() - started, 3)
     return _cache_set(cache_key, results)
@@ -0,0 +1,194 @@
+"""Load benchmark: alert-engine sweeps over a seeded user-state store.
+
+Run from the repository root:
+
+    backend/.venv/bin/python backend/profiling/benchmarks/alert_sweep_benchmark.py --users 2000 --alerts-per-user 5
+
+Seeds N synthetic users with M price alerts each through user_state_store
+(a temporary SQLite file unless --database-url points at Postgres), then runs
+--sweeps alert_engine.run_alert_tick sweeps wired the way api.check_alerts is,
+against a deterministic in-process price feed in place of yfinance. Between
+sweeps --edits users re-save their alerts so the change feed is exercised.
+
+Per sweep it reports wall time, SQL statements sent to the database, upstream
+calls (bulk price downloads and news lookups) and triggered alerts; the first
+sweep includes the full index load. --shards N times one worker's share of a
+deployment running ALERT_WORKER_SHARDS=N.
+"""
+from __future__ import annotations
+
+import argparse
+import math
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+import pandas as pd
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+import alert_engine  # noqa: E402
+import api_state  # noqa: E402
+import user_state_store  # noqa: E402
+
+
+class StatementCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args, **kwargs):
+        self.count += 1
+
+
+class DeterministicFeed:
+    """yfinance stand-in: each ticker's close oscillates around 100 with the sweep number."""
+
+    def __init__(self):
+        self.sweep = 0
+        self.downloads = 0
+        self.lookups = 0
+
+    def price(self, ticker: str) -> float:
+        return 100.0 + 20.0 * math.sin((self.sweep + 1) * (int(ticker[1:]) + 1) * 0.37)
+
+    def download(self, tickers, **kwargs):
+        self.downloads += 1
+        columns = pd.MultiIndex.from_tuples([("Close", ticker) for ticker in tickers])
+        return pd.DataFrame([[self.price(ticker) for ticker in tickers]], columns=columns)
+
+    def Ticker(self, ticker):
+        self.lookups += 1
+        return type("Ticker", (), {"news": []})()
+
+
+def synthetic_alerts(rng: random.Random, tickers: int, count: int, news_share: float):
+    alerts = []
+    for _ in range(count):
+        ticker = f"T{rng.randrange(tickers):05d}"
+        if rng.random() < news_share:
+            alerts.append({"ticker": ticker, "type": "news", "condition": "news_release", "target_price": 0})
+        else:
+            alerts.append({"ticker": ticker, "condition": rng.choice(("above", "below")), "target_price": round(rng.uniform(70.0, 130.0), 2)})
+    return alerts
+
+
+def seed_store(database_url: str, *, users: int, alerts_per_user: int, tickers: int, news_share: float, rng: random.Random):
+    for offset in range(0, users, 500):
+        with user_state_store.session_scope(database_url) as session:
+            for position in range(offset, min(offset + 500, users)):
+                user_state_store.save_notifications(
+                    session,
+                    f"user_{position:06d}",
+                    {"active": synthetic_alerts(rng, tickers, alerts_per_user, news_share), "triggered": []},
+                )
+
+
+def sweep_wiring(database_url: str):
+    state = {
+        "sql_enabled": True,
+        "ensure_user_state_storage_ready_fn": lambda: None,
+        "session_scope": user_state_store.session_scope,
+        "database_url": database_url,
+    }
+
+    def load_changes(cursor):
+        return api_state.load_alert_changes(
+            cursor,
+            load_alert_rule_changes_db_fn=user_state_store.load_alert_rule_changes,
+            iter_user_ids_fn=None,
+            get_notifications_file_fn=None,
+            load_notifications_fn=None,
+            **state,
+        )
+
+    def apply_triggers(batch):
+        return api_state.apply_alert_triggers(
+            batch,
+            apply_alert_triggers_db_fn=user_state_store.apply_alert_triggers,
+            json_mirror_enabled=False,
+            load_notifications_fn=None,
+            save_notifications_fn=None,
+            save_notifications_json_fn=None,
+            **state,
+        )
+
+    return load_changes, apply_triggers
+
+
+class _QuietLogger:
+    def info(self, *args, **kwargs):
+        pass
+
+    warning = error = info
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--alerts-per-user", type=int, default=5)
+    parser.add_argument("--tickers", type=int, default=500)
+    parser.add_argument("--news-share", type=float, default=0.1)
+    parser.add_argument("--sweeps", type=int, default=5)
+    parser.add_argument("--edits", type=int, default=20)
+    parser.add_argument("--shards", type=int, default=1)
+    parser.add_argument("--database-url", default="")
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        database_url = args.database_url or f"sqlite:///{os.path.join(tmpdir, 'alerts.db')}"
+        started = time.perf_counter()
+        seed_store(database_url, users=args.users, alerts_per_user=args.alerts_per_user, tickers=args.tickers, news_share=args.news_share, rng=rng)
+        print(f"users={args.users} alerts={args.users * args.alerts_per_user} tickers={args.tickers} shards={args.shards} seeded in {time.perf_counter() - started:.2f} s")
+
+        statements = StatementCounter()
+        event.listen(Engine, "before_cursor_execute", statements)
+        feed = DeterministicFeed()
+        load_changes, apply_triggers = sweep_wiring(database_url)
+        index = alert_engine.AlertIndex(shard=(0, args.shards) if args.shards > 1 else None)
+        latencies = []
+        try:
+            for sweep in range(args.sweeps):
+                feed.sweep = sweep
+                before = (statements.count, feed.downloads, feed.lookups)
+                started = time.perf_counter()
+                summary = alert_engine.run_alert_tick(
+                    index=index,
+                    load_changes_fn=load_changes,
+                    apply_triggers_fn=apply_triggers,
+                    yf_module=feed,
+                    logger=_QuietLogger(),
+                    news_poller=alert_engine.NewsPoller(poll_seconds=0),
+                )
+                latencies.append(time.perf_counter() - started)
+                print(
+                    f"sweep {sweep}: {latencies[-1] * 1000:9.1f} ms  "
+                    f"sql={statements.count - before[0]:5d}  downloads={feed.downloads - before[1]:3d}  "
+                    f"news lookups={feed.lookups - before[2]:4d}  reloaded users={summary['reloadedUsers']:6d}  "
+                    f"indexed alerts={summary['alerts']:7d}  triggered={summary['triggered']:6d}"
+                )
+                edited = rng.sample(range(args.users), min(args.edits, args.users))
+                with user_state_store.session_scope(database_url) as session:
+                    for position in edited:
+                        user_state_store.save_notifications(
+                            session,
+                            f"user_{position:06d}",
+                            {"active": synthetic_alerts(rng, args.tickers, args.alerts_per_user, args.news_share), "triggered": []},
+                        )
+        finally:
+            event.remove(Engine, "before_cursor_execute", statements)
+            user_state_store.reset_runtime_state()
+
+    if len(latencies) > 1:
+        print(f"cold sweep       : {latencies[0] * 1000:9.1f} ms")
+        print(f"warm sweep median: {statistics.median(latencies[1:]) * 1000:9.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,93 @@
+"""Microbenchmark: vectorized backtest metrics vs the per-model Python loop.
+
+Run from the repository root:
+
+    backend/.venv/bin/python backend/profiling/benchmarks/backtest_metrics_benchmark.py --models 10 --days 250
+
+Reports the median wall time of scoring every model one at a time (sklearn
+metrics plus the day-by-day trading loop) against one backtest_metrics pass
+over the (models x days) matrix, and checks the equity curves agree.
+"""
+from __future__ import annotations
+
+import argparse
+import math
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+from sklearn.metrics import mean_absolute_error, mean_absolute_percentage_error, mean_squared_error, r2_score
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+import backtest_metrics  # noqa: E402
+
+
+def legacy_metrics(actual, predicted):
+    return {
+        "mae": mean_absolute_error(actual, predicted),
+        "rmse": math.sqrt(mean_squared_error(actual, predicted)),
+        "mape": mean_absolute_percentage_error(actual, predicted) * 100,
+        "r_squared": r2_score(actual, predicted),
+        "directional_accuracy": float(np.mean((np.diff(predicted) > 0) == (np.diff(actual) > 0)) * 100),
+    }
+
+
+def legacy_equity(predictions, actuals, initial_capital=10000.0):
+    capital, shares, values = float(initial_capital), 0.0, [float(initial_capital)]
+    for index in range(len(predictions) - 1):
+        pred_return = 0.0 if predictions[index] == 0 else (predictions[index + 1] - predictions[index]) / predictions[index]
+        if pred_return > 0.005 and shares == 0 and capital > 0:
+            shares, capital = capital / actuals[index], 0.0
+        elif pred_return < -0.005 and shares > 0:
+            capital, shares = shares * actuals[index], 0.0
+        values.append(capital + shares * actuals[index + 1])
+    return np.array(values)
+
+
+def _median_ms(fn, repeats: int) -> float:
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000.0)
+    return statistics.median(samples)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--models", type=int, default=10)
+    parser.add_argument("--days", type=int, default=250)
+    parser.add_argument("--repeats", type=int, default=25)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    actuals = 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.01, args.days)))
+    predictions = actuals * (1.0 + rng.normal(0.0, 0.01, (args.models, args.days)))
+
+    simulation = backtest_metrics.simulate_trading(predictions, actuals)
+    for row in range(args.models):
+        np.testing.assert_allclose(simulation["equity"][row], legacy_equity(predictions[row], actuals))
+
+    def _legacy():
+        for row in predictions:
+            legacy_metrics(actuals, row)
+            legacy_equity(row, actuals)
+
+    def _vectorized():
+        backtest_metrics.forecast_metrics(actuals, predictions)
+        backtest_metrics.simulate_trading(predictions, actuals)
+
+    legacy_ms = _median_ms(_legacy, args.repeats)
+    vectorized_ms = _median_ms(_vectorized, args.repeats)
+
+    print(f"models={args.models} days={args.days} repeats={args.repeats}")
+    print(f"per-model loop : {legacy_ms:8.3f} ms")
+    print(f"matrix pass    : {vectorized_ms:8.3f} ms ({legacy_ms / vectorized_ms:.1f}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
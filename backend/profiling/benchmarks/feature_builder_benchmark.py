@@ -0,0 +1,85 @@
+"""Microbenchmark: shared feature builder vs the per-lag pandas loop.
+
+Run from the repository root:
+
+    backend/.venv/bin/python backend/profiling/benchmarks/feature_builder_benchmark.py --rows 2500 --lookback 14
+
+Reports the median wall time of the legacy implementation (one ``shift`` per
+lag plus pandas rolling windows), a cold feature_engineering build, and a warm
+(memoized) call, and checks that the cold build matches the legacy output.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+import feature_engineering  # noqa: E402
+
+
+def legacy_create_features(df, lookback=14):
+    df = df.copy()
+    for i in range(1, lookback + 1):
+        df[f"lag_{i}"] = df["Close"].shift(i)
+    df["ma_7"] = df["Close"].rolling(window=7, min_periods=1).mean()
+    df["ma_14"] = df["Close"].rolling(window=14, min_periods=1).mean()
+    df["ma_30"] = df["Close"].rolling(window=30, min_periods=1).mean()
+    df["volatility"] = df["Close"].rolling(window=7, min_periods=2).std()
+    df["price_change"] = df["Close"].pct_change()
+    return df.dropna()
+
+
+def _frame(rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    close = 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.01, rows)))
+    frame = pd.DataFrame({"Close": close}, index=pd.bdate_range("2015-01-02", periods=rows))
+    frame.attrs["ticker"] = "BENCH"
+    return frame
+
+
+def _median_ms(fn, repeats: int) -> float:
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000.0)
+    return statistics.median(samples)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2500)
+    parser.add_argument("--lookback", type=int, default=14)
+    parser.add_argument("--repeats", type=int, default=25)
+    args = parser.parse_args()
+
+    frame = _frame(args.rows)
+    expected = legacy_create_features(frame, args.lookback)
+    actual = feature_engineering.create_features(frame, args.lookback)
+    np.testing.assert_allclose(actual.to_numpy(), expected.to_numpy(), rtol=1e-9, atol=1e-9)
+
+    def _cold():
+        feature_engineering.clear_cache()
+        feature_engineering.create_features(frame, args.lookback)
+
+    legacy_ms = _median_ms(lambda: legacy_create_features(frame, args.lookback), args.repeats)
+    cold_ms = _median_ms(_cold, args.repeats)
+    feature_engineering.create_features(frame, args.lookback)
+    warm_ms = _median_ms(lambda: feature_engineering.create_features(frame, args.lookback), args.repeats)
+
+    print(f"rows={args.rows} lookback={args.lookback} repeats={args.repeats}")
+    print(f"legacy pandas loop : {legacy_ms:8.3f} ms")
+    print(f"shared builder cold: {cold_ms:8.3f} ms ({legacy_ms / cold_ms:.1f}x)")
+    print(f"shared builder warm: {warm_ms:8.3f} ms ({legacy_ms / warm_ms:.1f}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,89 @@
+"""Microbenchmark: columnar screener snapshot build vs a per-ticker loop.
+
+Run from the repository root:
+
+    backend/.venv/bin/python backend/profiling/benchmarks/screener_snapshot_benchmark.py --tickers 3000
+
+Reports the wall time of the per-ticker pattern the snapshot used to follow
+(convert each pandas history to Polars, sort it and pull factors out as
+scalars) against one screener_snapshot_service._build_snapshot query over the
+stacked histories, written to Parquet.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+import polars as pl
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+import screener_snapshot_service  # noqa: E402
+
+
+def synthetic_histories(count: int, rows: int):
+    rng = np.random.default_rng(11)
+    index = pd.bdate_range("2024-01-01", periods=rows)
+    histories = {}
+    for position in range(count):
+        close = 50.0 * np.exp(np.cumsum(rng.normal(0.0, 0.02, rows)))
+        histories[f"T{position:05d}"] = pd.DataFrame(
+            {"High": close * 1.01, "Low": close * 0.99, "Close": close, "Volume": rng.integers(1, 10**6, rows).astype(float)},
+            index=index,
+        )
+    return histories
+
+
+def per_ticker_loop(histories):
+    rows = []
+    for ticker, history in histories.items():
+        frame = pl.from_pandas(history.reset_index(names="date")).sort("date")
+        frame = frame.with_columns(((pl.col("Close") / pl.col("Close").shift(1)) - 1.0).alias("daily_return"))
+        close = frame.get_column("Close")
+        rows.append(
+            {
+                "symbol": ticker,
+                "price": float(close[-1]),
+                "percent_change": float(close[-1] / close[-2] - 1.0),
+                "avg_volume_20d": frame.select(pl.col("Volume").tail(20).mean()).item(),
+                "avg_dollar_volume_30d": frame.select((pl.col("Close") * pl.col("Volume")).tail(30).mean()).item(),
+                "momentum_3m": float(close[-1] / close[-63] - 1.0),
+                "year_high": frame.get_column("High").tail(252).max(),
+                "volatility_30d": frame.select(pl.col("daily_return").drop_nulls().tail(30).std()).item(),
+            }
+        )
+    return pl.DataFrame(rows)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tickers", type=int, default=3000)
+    parser.add_argument("--rows", type=int, default=260)
+    args = parser.parse_args()
+
+    histories = synthetic_histories(args.tickers, args.rows)
+    universe = [{"symbol": ticker, "name": ticker, "sector": "Technology"} for ticker in histories]
+
+    started = time.perf_counter()
+    per_ticker_loop(histories)
+    loop_seconds = time.perf_counter() - started
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        started = time.perf_counter()
+        snapshot = screener_snapshot_service._build_snapshot(histories=histories, metadata={}, universe=universe)
+        written = screener_snapshot_service._write_snapshot_atomic(os.path.join(tmpdir, "snapshot.parquet"), snapshot)
+        columnar_seconds = time.perf_counter() - started
+
+    print(f"tickers={args.tickers} rows={args.rows} written={len(written)}")
+    print(f"per-ticker loop  : {loop_seconds:8.3f} s")
+    print(f"columnar + write : {columnar_seconds:8.3f} s ({loop_seconds / columnar_seconds:.1f}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
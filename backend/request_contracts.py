@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from functools import wraps
-from typing import Literal
+from typing import Annotated, Literal
 
 from flask import g, jsonify, request
 from pydantic import BaseModel, ConfigDict, Field, HttpUrl, ValidationError, model_validator
@@ -36,6 +36,30 @@ class PortfolioOptimizationPayload(RequestPayload):
     max_weight: float | None = Field(default=None, gt=0, le=1)
 
 
+class BatchEnsemblePredictionPayload(RequestPayload):
+    tickers: list[Annotated[str, Field(min_length=1, max_length=32, pattern=r"^[A-Za-z0-9.^:=_-]+$")]] = Field(
+        min_length=1,
+        max_length=25,
+    )
+    horizon: int = Field(default=3, ge=1, le=7)
+    global_model: bool = Field(default=False, alias="globalModel")
+    sequence_models: bool = Field(default=False, alias="sequenceModels")
+
+
+class PredictionJobPayload(RequestPayload):
+    ticker: str = Field(min_length=1, max_length=32, pattern=r"^[A-Za-z0-9.^:=_-]+$")
+
+
+class EvaluationJobPayload(PredictionJobPayload):
+    test_days: int = Field(default=60, ge=5, le=500)
+    retrain_frequency: int | None = Field(default=None, ge=1, le=60)
+    fast_mode: bool = True
+    max_train_rows: int | None = Field(default=None, ge=60, le=5_000)
+    include_explanations: bool | None = None
+    transaction_cost_bps: float = Field(default=0.0, ge=0, le=500)
+    slippage_bps: float = Field(default=0.0, ge=0, le=500)
+
+
 class NotificationPayload(RequestPayload):
     ticker: str = Field(min_length=1, max_length=32, pattern=r"^[A-Za-z0-9.^:=_-]+$")
     condition: Literal["above", "below"]
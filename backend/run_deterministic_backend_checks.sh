@@ -44,6 +44,7 @@ fi
 # subset.
 "$PYTHON_BIN" -m coverage run --branch --source=backend --omit='backend/tests/*' -m unittest \
   backend.tests.test_akshare_service \
+  backend.tests.test_alert_engine \
   backend.tests.test_alert_worker \
   backend.tests.test_api_auth_security \
   backend.tests.test_api_contracts \
@@ -53,20 +54,31 @@ fi
   backend.tests.test_auth_isolation \
   backend.tests.test_authz \
   backend.tests.test_backfill_postgres \
+  backend.tests.test_backtest_metrics \
+  backend.tests.test_bar_store \
   backend.tests.test_chart_prediction_append \
   backend.tests.test_complexity_guard \
+  backend.tests.test_compute_budget \
   backend.tests.test_deliverables_api \
+  backend.tests.test_evaluation_executor \
+  backend.tests.test_evaluation_warehouse \
   backend.tests.test_exchange_session_routes \
   backend.tests.test_exchange_session_service \
+  backend.tests.test_explainability \
+  backend.tests.test_feature_engineering \
+  backend.tests.test_forecast_cache \
   backend.tests.test_http_policy \
   backend.tests.test_import_is_ml_free \
   backend.tests.test_macro_overview_handler \
   backend.tests.test_marketmind_ai_api \
+  backend.tests.test_model_artifact_store \
+  backend.tests.test_model_selection \
   backend.tests.test_maintainability_units \
   backend.tests.test_paper_trading_security \
   backend.tests.test_paper_trade_transactions \
   backend.tests.test_portfolio_optimization_route \
   backend.tests.test_portfolio_optimization_service \
+  backend.tests.test_prediction_jobs \
   backend.tests.test_prediction_market_analysis \
   backend.tests.test_prediction_market_analysis_api \
   backend.tests.test_prediction_service \
@@ -83,6 +95,8 @@ fi
   backend.tests.test_sec_filings_service \
   backend.tests.test_security \
   backend.tests.test_sentiment_service \
+  backend.tests.test_sequence_models \
+  backend.tests.test_single_flight \
   backend.tests.test_user_journey_harness \
   backend.tests.test_user_journey_state \
   backend.tests.test_user_state_persistence_modes
@@ -4,6 +4,8 @@ import yfinance as yf
 import logging
 
 import math
+import os
+import threading
 from typing import Any, Dict, List, Optional, Tuple
 
 import duckdb
@@ -76,6 +78,10 @@ PRESETS: Dict[str, Dict[str, Any]] = {
     },
 }
 
+MOVERS_PRESETS = ("gainers", "losers", "active")
+_ENGINES: Dict[str, "ScreenerQueryEngine"] = {}
+_ENGINES_LOCK = threading.Lock()
+
 SUPPORTED_SORTS = {
     "symbol",
     "name",
@@ -203,6 +209,140 @@ def _sanitize_rows(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     return sanitized
 
 
+class ScreenerQueryEngine:
+    """One process-wide DuckDB database holding the current screener snapshot.
+
+    The Parquet snapshot is loaded into the ``snapshot`` table once per
+    snapshot version (the snapshot and meta files' stat) and replaced inside a
+    single ``CREATE OR REPLACE`` when either changes, so a concurrent query
+    sees the old table or the new one, never a mix. Queries run on their own
+    cursors with bound parameters.
+    """
+
+    def __init__(self, snapshot_path: str, meta_path: str) -> None:
+        self.snapshot_path = snapshot_path
+        self.meta_path = meta_path
+        self._connection = duckdb.connect(database=":memory:")
+        self._version: Optional[Tuple[Any, ...]] = None
+        self._sectors: List[str] = []
+        self._lock = threading.Lock()
+
+    def _current_version(self) -> Tuple[Any, ...]:
+        version: List[Any] = []
+        for path in (self.snapshot_path, self.meta_path):
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                version.append(None)
+                continue
+            version.append((stat.st_mtime_ns, stat.st_size))
+        return tuple(version)
+
+    def refresh(self) -> None:
+        """Reload the snapshot table when the files on disk changed."""
+        version = self._current_version()
+        if version == self._version:
+            return
+        with self._lock:
+            if version == self._version:
+                return
+            if version[0] is None:
+                raise screener_snapshot_service.ScreenerSnapshotError("Screener snapshot is not available yet.")
+            self._load()
+            self._version = version
+
+    def _load(self) -> None:
+        cursor = self._connection.cursor()
+        try:
+            cursor.execute("CREATE OR REPLACE TABLE snapshot AS SELECT * FROM read_parquet(?)", [self.snapshot_path])
+            sectors = cursor.execute(
+                "SELECT DISTINCT sector FROM snapshot WHERE sector IS NOT NULL AND sector <> '' ORDER BY sector"
+            ).fetchall()
+        finally:
+            cursor.close()
+        self._sectors = [str(row[0]) for row in sectors]
+
+    def sectors(self) -> List[str]:
+        self.refresh()
+        return list(self._sectors)
+
+    def scan(self, where_sql: str, params: List[Any], order_sql: str, limit: int, offset: int) -> Tuple[List[Dict[str, Any]], int]:
+        """One page of matching rows plus the total match count, in a single pass."""
+        self.refresh()
+        cursor = self._connection.cursor()
+        try:
+            frame = cursor.execute(
+                f"SELECT *, COUNT(*) OVER () AS __total FROM snapshot WHERE {where_sql} ORDER BY {order_sql} LIMIT ? OFFSET ?",
+                [*params, limit, offset],
+            ).fetchdf()
+            if frame.empty and offset:
+                # Past the last page the window has no row to report the total on.
+                total = int(cursor.execute(f"SELECT COUNT(*) FROM snapshot WHERE {where_sql}", params).fetchone()[0])
+            else:
+                total = int(frame["__total"].iloc[0]) if not frame.empty else 0
+        finally:
+            cursor.close()
+        return frame.drop(columns="__total").to_dict(orient="records"), total
+
+    def top_by_preset(self, presets: Tuple[str, ...], limit: int) -> Dict[str, List[Dict[str, Any]]]:
+        """The first ``limit`` rows of several presets (default sort) from one query."""
+        self.refresh()
+        selects: List[str] = []
+        params: List[Any] = []
+        for position, preset_key in enumerate(presets):
+            sort_key, sort_dir = _normalize_sort(preset_key, None, None)
+            clauses, clause_params = _build_where_clauses(preset_key, {})
+            selects.append(
+                f"SELECT * FROM (SELECT {position} AS __preset, "
+                f"row_number() OVER (ORDER BY {sort_key} {sort_dir.upper()} NULLS LAST, symbol ASC) AS __rank, * "
+                f"FROM snapshot WHERE {' AND '.join(clauses)}) WHERE __rank <= ?"
+            )
+            params.extend([*clause_params, limit])
+        cursor = self._connection.cursor()
+        try:
+            frame = cursor.execute(" UNION ALL ".join(selects) + " ORDER BY __preset, __rank", params).fetchdf()
+        finally:
+            cursor.close()
+        grouped: Dict[str, List[Dict[str, Any]]] = {preset_key: [] for preset_key in presets}
+        for row in frame.to_dict(orient="records"):
+            preset_key = presets[int(row.pop("__preset"))]
+            row.pop("__rank")
+            grouped[preset_key].append(row)
+        return grouped
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+            self._version = None
+
+
+def get_query_engine(*, base_dir: str) -> ScreenerQueryEngine:
+    snapshot = screener_snapshot_service.snapshot_path(base_dir=base_dir)
+    with _ENGINES_LOCK:
+        engine = _ENGINES.get(snapshot)
+        if engine is None:
+            engine = _ENGINES[snapshot] = ScreenerQueryEngine(snapshot, screener_snapshot_service.meta_path(base_dir=base_dir))
+        return engine
+
+
+def reset_runtime_state() -> None:
+    with _ENGINES_LOCK:
+        engines = list(_ENGINES.values())
+        _ENGINES.clear()
+    for engine in engines:
+        engine.close()
+
+
+def _snapshot_meta(meta: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "asOf": meta.get("asOf"),
+        "lastRefresh": meta.get("lastRefresh"),
+        "snapshotStatus": meta.get("snapshotStatus", "fresh"),
+        "universeSize": meta.get("universeSize"),
+        "warnings": list(meta.get("warnings", [])),
+    }
+
+
 def scan(
     *,
     base_dir: str,
@@ -221,35 +361,20 @@ def scan(
     offset = max(0, int(offset or 0))
 
     meta = screener_snapshot_service.ensure_snapshot(base_dir=base_dir, yf_module=yf_module, logger=logger)
-    snapshot = screener_snapshot_service.snapshot_path(base_dir=base_dir)
-    sectors = screener_snapshot_service.available_sectors(base_dir=base_dir)
+    engine = get_query_engine(base_dir=base_dir)
 
     sort_key, sort_dir = _normalize_sort(normalized_preset, sort, direction)
     clauses, params = _build_where_clauses(normalized_preset, filters)
 
     order_sql = f"{sort_key} {sort_dir.upper()} NULLS LAST, symbol ASC"
-    base_sql = f"FROM read_parquet(?) WHERE {' AND '.join(clauses)}"
-    query_params = [snapshot, *params]
-
-    connection = duckdb.connect(database=":memory:")
-    try:
-        total = int(connection.execute(f"SELECT COUNT(*) {base_sql}", query_params).fetchone()[0])
-        rows = connection.execute(
-            f"SELECT * {base_sql} ORDER BY {order_sql} LIMIT ? OFFSET ?",
-            [*query_params, limit, offset],
-        ).fetchdf().to_dict(orient="records")
-    finally:
-        connection.close()
+    rows, total = engine.scan(" AND ".join(clauses), params, order_sql, limit, offset)
+    sectors = engine.sectors()
 
     payload_meta = {
-        "asOf": meta.get("asOf"),
-        "lastRefresh": meta.get("lastRefresh"),
-        "snapshotStatus": meta.get("snapshotStatus", "fresh"),
+        **_snapshot_meta(meta),
         "total": total,
         "limit": limit,
         "offset": offset,
-        "universeSize": meta.get("universeSize"),
-        "warnings": list(meta.get("warnings", [])),
         "sort": sort_key,
         "dir": sort_dir,
     }
@@ -272,19 +397,15 @@ def scan(
     }
 
 
+def available_sectors(*, base_dir: str) -> List[str]:
+    return get_query_engine(base_dir=base_dir).sectors()
+
+
 def movers_payload(*, base_dir: str, yf_module=yf, logger=logging.getLogger("marketmind_api"), limit: int = 8) -> Dict[str, Any]:
-    gainers = scan(base_dir=base_dir, yf_module=yf_module, logger=logger, preset="gainers", limit=limit, offset=0)
-    losers = scan(base_dir=base_dir, yf_module=yf_module, logger=logger, preset="losers", limit=limit, offset=0)
-    active = scan(base_dir=base_dir, yf_module=yf_module, logger=logger, preset="active", limit=limit, offset=0)
+    meta = screener_snapshot_service.ensure_snapshot(base_dir=base_dir, yf_module=yf_module, logger=logger)
+    limit = max(1, min(int(limit or 8), 200))
+    movers = get_query_engine(base_dir=base_dir).top_by_preset(MOVERS_PRESETS, limit)
     return {
-        "gainers": gainers["rows"],
-        "losers": losers["rows"],
-        "active": active["rows"],
-        "meta": {
-            "asOf": gainers["meta"].get("asOf"),
-            "lastRefresh": gainers["meta"].get("lastRefresh"),
-            "snapshotStatus": gainers["meta"].get("snapshotStatus", "fresh"),
-            "universeSize": gainers["meta"].get("universeSize"),
-            "warnings": gainers["meta"].get("warnings", []),
-        },
+        **{preset_key: _sanitize_rows(rows) for preset_key, rows in movers.items()},
+        "meta": _snapshot_meta(meta),
     }
@@ -3,17 +3,22 @@ from __future__ import annotations
 import logging
 import yfinance as yf
 
+import atexit
 import json
 import math
 import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 from datetime import datetime, timezone
 from threading import RLock
+from types import SimpleNamespace
 from typing import Any, Dict, List, Optional
 
 import polars as pl
 
+import bar_store
 import screener_universe_service
 
 
@@ -21,15 +26,22 @@ SNAPSHOT_TTL_SECONDS = 60 * 60
 METADATA_TTL_SECONDS = 24 * 60 * 60
 LOCK_STALE_SECONDS = 10 * 60
 LOCK_WAIT_SECONDS = 15
-DOWNLOAD_CHUNK_SIZE = 40
+METADATA_RETRY_SECONDS = 5 * 60
 TRADING_LOOKBACK = 252
 CACHE_DIRNAME = "screener_cache"
 SNAPSHOT_FILENAME = "latest_snapshot.parquet"
-METADATA_FILENAME = "latest_metadata.json"
+METADATA_FILENAME = "latest_metadata.parquet"
+LEGACY_METADATA_FILENAME = "latest_metadata.json"
 META_FILENAME = "snapshot_meta.json"
 LOCK_FILENAME = ".refresh.lock"
+METADATA_LOCK_FILENAME = ".metadata.lock"
 
 _RUNTIME_LOCK = RLock()
+_METADATA_RATE_LIMITER: Optional[bar_store.RateLimiter] = None
+_METADATA_REFRESH_LOCK = threading.Lock()
+_METADATA_REFRESH_STARTED: Dict[str, float] = {}
+_METADATA_REFRESH_CANCEL = threading.Event()
+_METADATA_REFRESH_THREAD: Optional[threading.Thread] = None
 
 
 class ScreenerSnapshotError(RuntimeError):
@@ -51,6 +63,10 @@ def metadata_path(*, base_dir: str) -> str:
     return os.path.join(cache_dir(base_dir=base_dir), METADATA_FILENAME)
 
 
+def legacy_metadata_path(*, base_dir: str) -> str:
+    return os.path.join(cache_dir(base_dir=base_dir), LEGACY_METADATA_FILENAME)
+
+
 def meta_path(*, base_dir: str) -> str:
     return os.path.join(cache_dir(base_dir=base_dir), META_FILENAME)
 
@@ -59,13 +75,20 @@ def lock_path(*, base_dir: str) -> str:
     return os.path.join(cache_dir(base_dir=base_dir), LOCK_FILENAME)
 
 
+def metadata_lock_path(*, base_dir: str) -> str:
+    return os.path.join(cache_dir(base_dir=base_dir), METADATA_LOCK_FILENAME)
+
+
 def clear_runtime_cache(*, base_dir: str) -> None:
     with _RUNTIME_LOCK:
+        _METADATA_REFRESH_STARTED.pop(base_dir, None)
         for path in (
             snapshot_path(base_dir=base_dir),
             metadata_path(base_dir=base_dir),
+            legacy_metadata_path(base_dir=base_dir),
             meta_path(base_dir=base_dir),
             lock_path(base_dir=base_dir),
+            metadata_lock_path(base_dir=base_dir),
         ):
             try:
                 os.remove(path)
@@ -98,13 +121,6 @@ def _write_json_atomic(path: str, payload: Dict[str, Any]) -> None:
     os.replace(tmp_path, path)
 
 
-def _write_parquet_atomic(path: str, frame: pl.DataFrame) -> None:
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    tmp_path = f"{path}.tmp"
-    frame.write_parquet(tmp_path)
-    os.replace(tmp_path, path)
-
-
 def _age_seconds(iso_timestamp: Optional[str], *, now_dt: datetime) -> float:
     if not iso_timestamp:
         return float("inf")
@@ -198,244 +214,505 @@ def _normalize_history_frame(raw_frame: Any) -> Optional[Any]:
     return frame
 
 
-def _extract_downloaded_histories(raw_download: Any, tickers: List[str]) -> Dict[str, Any]:
-    try:
-        import pandas as pd
-    except ImportError as exc:  # pragma: no cover
-        raise ScreenerSnapshotError("pandas is required to extract screener histories.") from exc
-
+def _fetch_histories(
+    *,
+    tickers: List[str],
+    base_dir: Optional[str] = None,
+    force_refresh: bool = False,
+    yf_module=yf,
+    logger=logging.getLogger("marketmind_api"),
+) -> Dict[str, Any]:
+    """Screener-window histories from the shared bar store (refreshed incrementally)."""
+    period = _history_period_for_lookback(TRADING_LOOKBACK)
+    bars = bar_store.get_bar_store(base_dir).get_many(
+        tickers,
+        download_fn=yf_module.download,
+        max_age_seconds=0 if force_refresh else None,
+        allow_stale=False,
+    )
     histories: Dict[str, Any] = {}
-    if not isinstance(raw_download, pd.DataFrame) or raw_download.empty:
-        return histories
-
-    if isinstance(raw_download.columns, pd.MultiIndex):
-        first_level = list(raw_download.columns.get_level_values(0))
-        if set(first_level).intersection({"Open", "High", "Low", "Close", "Volume"}):
-            level_zero_fields = {"Open", "High", "Low", "Close", "Volume"}
-            for ticker in tickers:
-                columns = [field for field in ("Open", "High", "Low", "Close", "Volume") if (field, ticker) in raw_download.columns]
-                if not columns:
-                    continue
-                frame = raw_download.loc[:, [(field, ticker) for field in columns]].copy()
-                frame.columns = columns
-                normalized = _normalize_history_frame(frame)
-                if normalized is not None:
-                    histories[ticker] = normalized
-            return histories
-
-        for ticker in tickers:
-            if ticker not in raw_download.columns.get_level_values(0):
-                continue
-            frame = raw_download[ticker].copy()
-            normalized = _normalize_history_frame(frame)
-            if normalized is not None:
-                histories[ticker] = normalized
-        return histories
-
-    if len(tickers) == 1:
-        normalized = _normalize_history_frame(raw_download)
+    for ticker in tickers:
+        normalized = _normalize_history_frame(bar_store.tail_period(bars.get(ticker.upper()), period))
         if normalized is not None:
-            histories[tickers[0]] = normalized
+            histories[ticker] = normalized
+    if len(histories) < len(tickers):
+        logger.warning("Screener history unavailable for %d of %d tickers.", len(tickers) - len(histories), len(tickers))
     return histories
 
 
-def _fetch_histories(*, tickers: List[str], yf_module=yf, logger=logging.getLogger("marketmind_api")) -> Dict[str, Any]:
-    histories: Dict[str, Any] = {}
-    period = _history_period_for_lookback(TRADING_LOOKBACK)
+METADATA_SCHEMA = {
+    "symbol": pl.Utf8, "name": pl.Utf8, "sector": pl.Utf8, "market_cap": pl.Int64, "pe_forward": pl.Float64,
+    "target_mean_price": pl.Float64, "eps_ttm": pl.Float64, "currency": pl.Utf8, "exchange": pl.Utf8,
+    "refreshed_at": pl.Float64,
+}
 
-    for start in range(0, len(tickers), DOWNLOAD_CHUNK_SIZE):
-        chunk = tickers[start:start + DOWNLOAD_CHUNK_SIZE]
+
+@contextmanager
+def _metadata_refresh_lock(*, base_dir: str):
+    """Yield whether this process took the metadata lock; never waits for another holder."""
+    path = metadata_lock_path(base_dir=base_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    try:
+        if time.time() - os.path.getmtime(path) > LOCK_STALE_SECONDS:
+            os.remove(path)
+    except FileNotFoundError:
+        pass
+    try:
+        fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        yield False
+        return
+    os.write(fd, str(os.getpid()).encode("utf-8"))
+    os.close(fd)
+    try:
+        yield True
+    finally:
         try:
-            downloaded = yf_module.download(
-                chunk,
-                period=period,
-                interval="1d",
-                auto_adjust=True,
-                progress=False,
-                group_by="ticker",
-                threads=False,
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def _env_number(name: str, default: float) -> float:
+    try:
+        return max(float(os.getenv(name, str(default))), 0.0)
+    except (TypeError, ValueError):
+        return default
+
+
+def _metadata_rate_limiter() -> bar_store.RateLimiter:
+    """Token bucket shared by every metadata lookup in the process."""
+    global _METADATA_RATE_LIMITER
+    with _RUNTIME_LOCK:
+        if _METADATA_RATE_LIMITER is None:
+            _METADATA_RATE_LIMITER = bar_store.RateLimiter(
+                _env_number("SCREENER_METADATA_RATE_PER_SECOND", 4.0),
+                burst=int(_env_number("SCREENER_METADATA_WORKERS", 8)) or 1,
             )
-        except Exception as exc:
-            logger.warning("Screener history download failed for chunk %s: %s", ",".join(chunk), exc)
-            continue
+        return _METADATA_RATE_LIMITER
 
-        histories.update(_extract_downloaded_histories(downloaded, chunk))
 
-    return histories
+def _lookup_metadata(record: Dict[str, object], *, yf_module, logger, limiter: bar_store.RateLimiter) -> Optional[Dict[str, Any]]:
+    """One symbol's fundamentals, or ``None`` when the lookup failed or came back empty."""
+    ticker = str(record["symbol"])
+    if _METADATA_REFRESH_CANCEL.is_set():
+        return None
+    limiter.acquire()
+    try:
+        info = getattr(yf_module.Ticker(ticker), "info", {}) or {}
+    except Exception as exc:
+        logger.warning("Screener metadata lookup failed for %s: %s", ticker, exc)
+        return None
+    if not info:
+        logger.warning("Screener metadata lookup returned nothing for %s", ticker)
+        return None
+    return {
+        "symbol": ticker,
+        "name": info.get("longName") or info.get("shortName") or str(record.get("name") or ticker),
+        "sector": info.get("sector") or str(record.get("sector") or "Unknown"),
+        "market_cap": _coerce_int(info.get("marketCap")),
+        "pe_forward": _coerce_float(info.get("forwardPE")),
+        "target_mean_price": _coerce_float(info.get("targetMeanPrice")),
+        "eps_ttm": _coerce_float(info.get("trailingEps")),
+        "currency": info.get("currency") or "USD",
+        "exchange": info.get("exchange") or "XNYS",
+    }
 
 
-def _fetch_metadata(*, universe: List[Dict[str, object]], yf_module=yf, logger=logging.getLogger("marketmind_api")) -> Dict[str, Dict[str, Any]]:
-    metadata: Dict[str, Dict[str, Any]] = {}
+def _fetch_metadata(
+    *,
+    universe: List[Dict[str, object]],
+    yf_module=yf,
+    logger=logging.getLogger("marketmind_api"),
+    workers: Optional[int] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """Fundamentals for ``universe`` looked up on a bounded, rate-limited thread pool.
 
-    for record in universe:
-        ticker = str(record["symbol"])
-        fallback_name = str(record.get("name") or ticker)
-        fallback_sector = str(record.get("sector") or "Unknown")
-        try:
-            info = getattr(yf_module.Ticker(ticker), "info", {}) or {}
-        except Exception as exc:
-            logger.warning("Screener metadata lookup failed for %s: %s", ticker, exc)
-            info = {}
-
-        metadata[ticker] = {
-            "name": info.get("longName") or info.get("shortName") or fallback_name,
-            "sector": info.get("sector") or fallback_sector,
-            "market_cap": _coerce_int(info.get("marketCap")),
-            "pe_forward": _coerce_float(info.get("forwardPE")),
-            "target_mean_price": _coerce_float(info.get("targetMeanPrice")),
-            "eps_ttm": _coerce_float(info.get("trailingEps")),
-            "currency": info.get("currency") or "USD",
-            "exchange": info.get("exchange") or "XNYS",
+    Symbols whose lookup failed are left out so their stored row is kept.
+    """
+    if not universe:
+        return {}
+    workers = workers or int(_env_number("SCREENER_METADATA_WORKERS", 8)) or 1
+    limiter = _metadata_rate_limiter()
+    with ThreadPoolExecutor(max_workers=min(workers, len(universe)), thread_name_prefix="screener-metadata") as pool:
+        rows = list(pool.map(lambda record: _lookup_metadata(record, yf_module=yf_module, logger=logger, limiter=limiter), universe))
+    return {row.pop("symbol"): row for row in rows if row is not None}
+
+
+def _metadata_frame(metadata: Any, *, refreshed_at: Optional[float] = None) -> pl.DataFrame:
+    """Normalize per-symbol metadata records (or an existing frame) to ``METADATA_SCHEMA``."""
+    if isinstance(metadata, pl.DataFrame):
+        return metadata.select(
+            pl.col(name).cast(dtype) if name in metadata.columns else pl.lit(None, dtype=dtype).alias(name)
+            for name, dtype in METADATA_SCHEMA.items()
+        )
+    rows = [
+        {
+            "symbol": str(symbol).upper(),
+            "name": info.get("name"),
+            "sector": info.get("sector"),
+            "market_cap": _coerce_int(info.get("market_cap")),
+            "pe_forward": _coerce_float(info.get("pe_forward")),
+            "target_mean_price": _coerce_float(info.get("target_mean_price")),
+            "eps_ttm": _coerce_float(info.get("eps_ttm")),
+            "currency": info.get("currency"),
+            "exchange": info.get("exchange"),
+            "refreshed_at": refreshed_at,
         }
+        for symbol, info in metadata.items()
+        if isinstance(info, dict)
+    ]
+    return pl.DataFrame(rows, schema=METADATA_SCHEMA)
 
-    return metadata
+
+def _load_existing_metadata(*, base_dir: str) -> pl.DataFrame:
+    """The stored metadata frame; a legacy JSON file is read as entirely due for refresh."""
+    try:
+        return _metadata_frame(pl.read_parquet(metadata_path(base_dir=base_dir)))
+    except (FileNotFoundError, OSError, pl.exceptions.PolarsError):
+        return _metadata_frame(_read_json(legacy_metadata_path(base_dir=base_dir)))
+
+
+def _due_metadata_symbols(
+    stored: pl.DataFrame,
+    universe: List[Dict[str, object]],
+    *,
+    now_ts: float,
+    batch_size: Optional[int],
+) -> List[str]:
+    """Universe symbols without metadata first, then the stalest past ``METADATA_TTL_SECONDS``.
+
+    ``batch_size`` caps one refresh so the sweep rolls over several snapshot
+    builds instead of blocking one of them; ``None`` refreshes every symbol.
+    """
+    symbols = [str(record["symbol"]) for record in universe]
+    if batch_size is None:
+        return symbols
+    refreshed = dict(zip(stored.get_column("symbol").to_list(), stored.get_column("refreshed_at").to_list()))
+    missing = [symbol for symbol in symbols if symbol not in refreshed]
+    stale = sorted(
+        (symbol for symbol in symbols if symbol in refreshed and now_ts - (refreshed[symbol] or 0.0) > METADATA_TTL_SECONDS),
+        key=lambda symbol: refreshed[symbol] or 0.0,
+    )
+    return (missing + stale)[:batch_size]
+
+
+def _refresh_metadata(
+    *,
+    base_dir: str,
+    universe: List[Dict[str, object]],
+    yf_module,
+    logger,
+    now_ts: float,
+    force_refresh: bool = False,
+) -> pl.DataFrame:
+    """Refresh the due slice of the metadata and merge it into the columnar file.
+
+    Rows whose lookup failed keep their previous values and ``refreshed_at``,
+    so they stay due and are retried by the next refresh.
+    """
+    stored = _load_existing_metadata(base_dir=base_dir)
+    batch_size = None if force_refresh else int(_env_number("SCREENER_METADATA_REFRESH_BATCH", 200)) or 1
+    due = set(_due_metadata_symbols(stored, universe, now_ts=now_ts, batch_size=batch_size))
+    if not due and os.path.exists(metadata_path(base_dir=base_dir)):
+        return stored
+    fetched = _metadata_frame(
+        _fetch_metadata(
+            universe=[record for record in universe if str(record["symbol"]) in due],
+            yf_module=yf_module,
+            logger=logger,
+        ),
+        refreshed_at=now_ts,
+    )
+    if fetched.is_empty() and os.path.exists(metadata_path(base_dir=base_dir)):
+        return stored
+    merged = pl.concat([stored.filter(~pl.col("symbol").is_in(fetched.get_column("symbol"))), fetched]).sort("symbol")
+    path = metadata_path(base_dir=base_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    merged.write_parquet(tmp_path)
+    os.replace(tmp_path, path)
+    return merged
+
+
+def _run_metadata_refresh(*, base_dir: str, yf_module, logger, force_refresh: bool) -> None:
+    with _metadata_refresh_lock(base_dir=base_dir) as acquired:
+        if not acquired:
+            return
+        _refresh_metadata(
+            base_dir=base_dir,
+            universe=screener_universe_service.load_universe(),
+            yf_module=yf_module,
+            logger=logger,
+            now_ts=time.time(),
+            force_refresh=force_refresh,
+        )
 
 
-def _load_existing_metadata(*, base_dir: str) -> Dict[str, Dict[str, Any]]:
-    payload = _read_json(metadata_path(base_dir=base_dir))
-    if not isinstance(payload, dict):
-        return {}
-    normalized: Dict[str, Dict[str, Any]] = {}
-    for key, value in payload.items():
-        if isinstance(value, dict):
-            normalized[str(key).upper()] = dict(value)
-    return normalized
+def start_metadata_refresh(*, base_dir: str, yf_module=yf, logger=logging.getLogger("marketmind_api"), force_refresh: bool = False) -> bool:
+    """Refresh the due metadata off the request path unless a refresh is already running.
+
+    The refresh runs in a daemon thread, or in the caller with
+    ``SCREENER_METADATA_REFRESH_MODE=inline``; snapshot builds pick up
+    whatever it has written by the next time they check the file. Unforced
+    refreshes start at most once per ``METADATA_RETRY_SECONDS`` so symbols
+    whose lookups keep failing are not retried on every request.
+    """
+    global _METADATA_REFRESH_THREAD
+    if not _METADATA_REFRESH_LOCK.acquire(blocking=False):
+        return False
+    started = _METADATA_REFRESH_STARTED.get(base_dir)
+    if not force_refresh and started is not None and time.time() - started < METADATA_RETRY_SECONDS:
+        _METADATA_REFRESH_LOCK.release()
+        return False
+    _METADATA_REFRESH_STARTED[base_dir] = time.time()
+    inline = os.getenv("SCREENER_METADATA_REFRESH_MODE", "background").strip().lower() == "inline"
+    if not inline:
+        # Bind the lookup now: the thread may outlive a caller's patched module.
+        yf_module = SimpleNamespace(Ticker=yf_module.Ticker)
+
+    def _run() -> None:
+        try:
+            _run_metadata_refresh(base_dir=base_dir, yf_module=yf_module, logger=logger, force_refresh=force_refresh)
+        except Exception as exc:
+            logger.warning("Screener metadata refresh failed: %s", exc)
+        finally:
+            _METADATA_REFRESH_LOCK.release()
+
+    if inline:
+        _run()
+    else:
+        _METADATA_REFRESH_THREAD = threading.Thread(target=_run, name="screener-metadata-refresh", daemon=True)
+        _METADATA_REFRESH_THREAD.start()
+    return True
+
+
+@atexit.register
+def stop_metadata_refresh(timeout: Optional[float] = LOCK_WAIT_SECONDS) -> None:
+    """Skip the remaining lookups of a running background refresh and wait for it to exit."""
+    thread = _METADATA_REFRESH_THREAD
+    if thread is None:
+        return
+    _METADATA_REFRESH_CANCEL.set()
+    try:
+        thread.join(timeout)
+    finally:
+        _METADATA_REFRESH_CANCEL.clear()
 
 
-def _safe_round(value: Optional[float], digits: int = 4) -> Optional[float]:
-    if value is None:
+def _metadata_version(*, base_dir: str) -> Optional[float]:
+    """Modification time of the metadata file, so snapshots notice a finished refresh."""
+    try:
+        return os.path.getmtime(metadata_path(base_dir=base_dir))
+    except OSError:
         return None
-    return round(value, digits)
 
 
-def _compute_row(record: Dict[str, object], history, metadata: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-    history_df = pl.from_pandas(history.reset_index(names="date"))
-    if history_df.height < 2:
+def _metadata_next_due(metadata: pl.DataFrame, universe: List[Dict[str, object]]) -> Optional[float]:
+    """Epoch time the next universe symbol needs a metadata refresh (``None``: one already does)."""
+    refreshed = metadata.filter(pl.col("symbol").is_in([str(record["symbol"]) for record in universe])).get_column("refreshed_at")
+    if len(refreshed) < len(universe) or refreshed.null_count():
         return None
-
-    history_df = history_df.sort("date")
-    history_df = history_df.with_columns(
-        (
-            (pl.col("Close") / pl.col("Close").shift(1)) - 1.0
-        ).alias("daily_return")
+    return float(refreshed.min()) + METADATA_TTL_SECONDS
+
+
+HISTORY_COLUMNS = ("High", "Low", "Close", "Volume")
+MOMENTUM_WINDOWS = {"momentum_1m": 21, "momentum_3m": 63, "momentum_6m": 126}
+SNAPSHOT_COLUMNS = (
+    "symbol", "name", "sector", "index_membership", "price", "change", "percent_change", "market_cap",
+    "volume", "avg_volume_20d", "avg_dollar_volume_30d", "relative_volume_20d", "momentum_1m",
+    "momentum_3m", "momentum_6m", "distance_from_52w_high_pct", "distance_from_52w_low_pct",
+    "volatility_30d", "pe_forward", "target_mean_price", "target_upside_pct", "eps_ttm", "year_high",
+    "year_low", "currency", "exchange",
+)
+
+
+def _long_history_frame(histories: Dict[str, Any]) -> pl.LazyFrame:
+    """Every history stacked into one long (symbol, ts, High, Low, Close, Volume) frame.
+
+    Per ticker this only slices numpy arrays; a missing High/Low column falls
+    back to Close and a missing Volume column to nulls.
+    """
+    import numpy as np
+
+    symbols: List[str] = []
+    lengths: List[int] = []
+    stamps: List[Any] = []
+    blocks: List[Any] = []
+    for ticker, history in histories.items():
+        columns = [column if column in history.columns or column == "Volume" else "Close" for column in HISTORY_COLUMNS]
+        block = history.reindex(columns=columns).to_numpy(dtype=float)
+        symbols.append(ticker)
+        lengths.append(len(block))
+        stamps.append(history.index.asi8 if hasattr(history.index, "asi8") else np.arange(len(block)))
+        blocks.append(block)
+    if not blocks:
+        return pl.LazyFrame(schema={"symbol": pl.Utf8, "ts": pl.Int64, **{column: pl.Float64 for column in HISTORY_COLUMNS}})
+
+    values = np.concatenate(blocks)
+    frame = pl.DataFrame(
+        {
+            "symbol": np.repeat(np.asarray(symbols, dtype=object), lengths),
+            "ts": np.concatenate(stamps),
+            **{column: values[:, index] for index, column in enumerate(HISTORY_COLUMNS)},
+        }
+    )
+    return frame.lazy().with_columns(pl.col(HISTORY_COLUMNS).fill_nan(None)).sort(["symbol", "ts"])
+
+
+def _history_factors(long_frame: pl.LazyFrame) -> pl.LazyFrame:
+    """Price/volume factors for every symbol in one group_by pass."""
+    close = pl.col("Close")
+    volume = pl.col("Volume")
+    rows = pl.len()
+    daily_return = (close / close.shift(1)) - 1.0
+    return (
+        long_frame.group_by("symbol")
+        .agg(
+            rows.alias("rows"),
+            close.last().alias("price"),
+            close.tail(2).first().alias("previous_close"),
+            volume.last().cast(pl.Int64).alias("volume"),
+            volume.tail(20).mean().alias("avg_volume_20d"),
+            (close * volume).tail(30).mean().alias("avg_dollar_volume_30d"),
+            *[
+                pl.when(rows > days).then(close.tail(days).first()).alias(f"{name}_base")
+                for name, days in MOMENTUM_WINDOWS.items()
+            ],
+            pl.col("High").tail(TRADING_LOOKBACK).max().alias("year_high"),
+            pl.col("Low").tail(TRADING_LOOKBACK).min().alias("year_low"),
+            (daily_return.drop_nulls().tail(30).std() * math.sqrt(252)).alias("volatility_30d"),
+        )
+        .filter((pl.col("rows") >= 2) & (pl.col("previous_close") != 0))
     )
 
-    close_values = history_df.get_column("Close")
-    volume_values = history_df.get_column("Volume") if "Volume" in history_df.columns else None
-    high_values = history_df.get_column("High") if "High" in history_df.columns else close_values
-    low_values = history_df.get_column("Low") if "Low" in history_df.columns else close_values
 
-    current_price = _coerce_float(close_values[-1])
-    previous_close = _coerce_float(close_values[-2])
-    volume = _coerce_int(volume_values[-1]) if volume_values is not None else None
+def _static_frame(universe: List[Dict[str, object]], metadata: Any) -> pl.LazyFrame:
+    """Per-symbol universe columns joined to the metadata columns, in universe order."""
+    records = pl.LazyFrame(
+        {
+            "position": list(range(len(universe))),
+            "symbol": [str(record["symbol"]) for record in universe],
+            "universe_name": [record.get("name") or str(record["symbol"]) for record in universe],
+            "universe_sector": [record.get("sector") or "Unknown" for record in universe],
+            "index_membership": ["|".join(record.get("index_membership") or []) for record in universe],
+        },
+        schema={"position": pl.Int64, "symbol": pl.Utf8, "universe_name": pl.Utf8, "universe_sector": pl.Utf8, "index_membership": pl.Utf8},
+    )
+    return (
+        records.join(_metadata_frame(metadata).lazy(), on="symbol", how="left", coalesce=True)
+        .with_columns(
+            pl.coalesce("name", "universe_name").alias("name"),
+            pl.coalesce("sector", "universe_sector").alias("sector"),
+            pl.col("currency").fill_null("USD"),
+            pl.col("exchange").fill_null("XNYS"),
+        )
+        .drop("universe_name", "universe_sector", "refreshed_at")
+    )
 
-    if current_price is None or previous_close in (None, 0):
-        return None
 
-    day_change = current_price - previous_close
-    day_change_pct = day_change / previous_close
+def _finite(expr: pl.Expr) -> pl.Expr:
+    return pl.when(expr.is_finite()).then(expr)
+
+
+def _build_snapshot(*, histories: Dict[str, Any], metadata: Dict[str, Dict[str, Any]], universe: List[Dict[str, object]]) -> pl.LazyFrame:
+    """The screener snapshot as one lazy query over all histories (universe order)."""
+    price = pl.col("price")
+    year_high = pl.col("year_high")
+    year_low = pl.col("year_low")
+    target = pl.col("target_mean_price")
+    change = price - pl.col("previous_close")
+    return (
+        _static_frame(universe, metadata)
+        .join(_history_factors(_long_history_frame(histories)), on="symbol", how="inner")
+        .sort("position")
+        .with_columns(
+            change.alias("change"),
+            (change / pl.col("previous_close")).alias("percent_change"),
+            pl.when(pl.col("avg_volume_20d") != 0).then(pl.col("volume") / pl.col("avg_volume_20d")).alias("relative_volume_20d"),
+            *[
+                pl.when(pl.col(f"{name}_base") != 0).then(price / pl.col(f"{name}_base") - 1.0).alias(name)
+                for name in MOMENTUM_WINDOWS
+            ],
+            pl.when(year_high != 0).then(pl.max_horizontal(pl.lit(0.0), (year_high - price) / year_high * 100.0)).alias("distance_from_52w_high_pct"),
+            pl.when(year_low != 0).then(pl.max_horizontal(pl.lit(0.0), (price - year_low) / year_low * 100.0)).alias("distance_from_52w_low_pct"),
+            pl.when((target != 0) & (price != 0)).then((target - price) / price * 100.0).alias("target_upside_pct"),
+        )
+        .with_columns(
+            _finite(pl.col(name)).round(digits).alias(name)
+            for name, digits in (
+                ("price", 2), ("change", 2), ("percent_change", 6), ("avg_volume_20d", 2),
+                ("avg_dollar_volume_30d", 2), ("relative_volume_20d", 4), ("momentum_1m", 6),
+                ("momentum_3m", 6), ("momentum_6m", 6), ("distance_from_52w_high_pct", 4),
+                ("distance_from_52w_low_pct", 4), ("volatility_30d", 6), ("pe_forward", 4),
+                ("target_mean_price", 2), ("target_upside_pct", 4), ("eps_ttm", 4),
+                ("year_high", 2), ("year_low", 2),
+            )
+        )
+        .select(SNAPSHOT_COLUMNS)
+    )
 
-    avg_volume_20d = None
-    avg_dollar_volume_30d = None
-    relative_volume_20d = None
-    if volume_values is not None:
-        volume_tail_20 = history_df.select(pl.col("Volume").tail(20).mean()).item()
-        avg_volume_20d = _coerce_float(volume_tail_20)
-        if avg_volume_20d not in (None, 0) and volume is not None:
-            relative_volume_20d = volume / avg_volume_20d
 
-        dollar_frame = history_df.with_columns(
-            (pl.col("Close") * pl.col("Volume")).alias("dollar_volume")
-        )
-        avg_dollar_volume_30d = _coerce_float(dollar_frame.select(pl.col("dollar_volume").tail(30).mean()).item())
-
-    momentum_1m = None
-    momentum_3m = None
-    momentum_6m = None
-    if history_df.height > 21:
-        base = _coerce_float(close_values[-21])
-        if base not in (None, 0):
-            momentum_1m = (current_price / base) - 1.0
-    if history_df.height > 63:
-        base = _coerce_float(close_values[-63])
-        if base not in (None, 0):
-            momentum_3m = (current_price / base) - 1.0
-    if history_df.height > 126:
-        base = _coerce_float(close_values[-126])
-        if base not in (None, 0):
-            momentum_6m = (current_price / base) - 1.0
-
-    year_high = _coerce_float(pl.Series(high_values).tail(min(252, len(high_values))).max())
-    year_low = _coerce_float(pl.Series(low_values).tail(min(252, len(low_values))).min())
-
-    distance_from_52w_high_pct = None
-    if year_high not in (None, 0):
-        distance_from_52w_high_pct = max(0.0, ((year_high - current_price) / year_high) * 100.0)
-
-    distance_from_52w_low_pct = None
-    if year_low not in (None, 0):
-        distance_from_52w_low_pct = max(0.0, ((current_price - year_low) / year_low) * 100.0)
-
-    returns_tail = history_df.select(pl.col("daily_return").drop_nulls().tail(30).std()).item()
-    volatility_30d = None
-    if returns_tail is not None:
-        volatility_30d = _coerce_float(float(returns_tail) * math.sqrt(252))
-
-    target_mean_price = _coerce_float(metadata.get("target_mean_price"))
-    target_upside_pct = None
-    if target_mean_price not in (None, 0) and current_price:
-        target_upside_pct = ((target_mean_price - current_price) / current_price) * 100.0
+def _write_snapshot_atomic(path: str, snapshot: pl.LazyFrame) -> List[str]:
+    """Stream ``snapshot`` to Parquet and return the symbols written.
 
-    return {
-        "symbol": str(record["symbol"]),
-        "name": metadata.get("name") or record.get("name") or str(record["symbol"]),
-        "sector": metadata.get("sector") or record.get("sector") or "Unknown",
-        "index_membership": "|".join(record.get("index_membership") or []),
-        "price": _safe_round(current_price, 2),
-        "change": _safe_round(day_change, 2),
-        "percent_change": _safe_round(day_change_pct, 6),
-        "market_cap": metadata.get("market_cap"),
-        "volume": volume,
-        "avg_volume_20d": _safe_round(avg_volume_20d, 2),
-        "avg_dollar_volume_30d": _safe_round(avg_dollar_volume_30d, 2),
-        "relative_volume_20d": _safe_round(relative_volume_20d, 4),
-        "momentum_1m": _safe_round(momentum_1m, 6),
-        "momentum_3m": _safe_round(momentum_3m, 6),
-        "momentum_6m": _safe_round(momentum_6m, 6),
-        "distance_from_52w_high_pct": _safe_round(distance_from_52w_high_pct, 4),
-        "distance_from_52w_low_pct": _safe_round(distance_from_52w_low_pct, 4),
-        "volatility_30d": _safe_round(volatility_30d, 6),
-        "pe_forward": _safe_round(_coerce_float(metadata.get("pe_forward")), 4),
-        "target_mean_price": _safe_round(target_mean_price, 2),
-        "target_upside_pct": _safe_round(target_upside_pct, 4),
-        "eps_ttm": _safe_round(_coerce_float(metadata.get("eps_ttm")), 4),
-        "year_high": _safe_round(year_high, 2),
-        "year_low": _safe_round(year_low, 2),
-        "currency": metadata.get("currency") or "USD",
-        "exchange": metadata.get("exchange") or "XNYS",
-    }
+    The previous snapshot is only replaced when at least one row was built.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    try:
+        snapshot.sink_parquet(tmp_path)
+    except pl.exceptions.InvalidOperationError:
+        # Older Polars cannot stream group_by/window plans into a sink.
+        snapshot.collect(streaming=True).write_parquet(tmp_path)
+    symbols = pl.read_parquet(tmp_path, columns=["symbol"]).get_column("symbol").to_list()
+    if not symbols:
+        os.remove(tmp_path)
+        raise ScreenerSnapshotError("Unable to build a screener snapshot from the current market data inputs.")
+    os.replace(tmp_path, path)
+    return symbols
 
 
-def _build_snapshot(*, histories: Dict[str, Any], metadata: Dict[str, Dict[str, Any]], universe: List[Dict[str, object]]) -> tuple[pl.DataFrame, List[str]]:
-    rows: List[Dict[str, Any]] = []
+def _snapshot_warnings(universe: List[Dict[str, object]], histories: Dict[str, Any], written: List[str]) -> List[str]:
+    written_symbols = set(written)
     warnings: List[str] = []
-
     for record in universe:
         ticker = str(record["symbol"])
-        history = histories.get(ticker)
-        if history is None:
+        if ticker not in histories:
             warnings.append(f"{ticker}: no usable daily history was available for the screener snapshot.")
-            continue
-        row = _compute_row(record, history, metadata.get(ticker, {}))
-        if row is None:
+        elif ticker not in written_symbols:
             warnings.append(f"{ticker}: history was too sparse to compute screener factors.")
-            continue
-        rows.append(row)
+    return warnings
 
-    if not rows:
-        raise ScreenerSnapshotError("Unable to build a screener snapshot from the current market data inputs.")
 
-    return pl.DataFrame(rows), warnings
+def _metadata_next_due_iso(metadata: pl.DataFrame, universe: List[Dict[str, object]]) -> Optional[str]:
+    next_due = _metadata_next_due(metadata, universe)
+    return None if next_due is None else _isoformat(datetime.fromtimestamp(next_due, tz=timezone.utc))
+
+
+def _metadata_refreshed_iso(metadata: pl.DataFrame) -> Optional[str]:
+    refreshed = metadata.get_column("refreshed_at").drop_nulls()
+    return None if refreshed.is_empty() else _isoformat(datetime.fromtimestamp(float(refreshed.max()), tz=timezone.utc))
+
+
+def _metadata_due(current_meta: Dict[str, Any], *, now_dt: datetime) -> bool:
+    """Whether some symbol's metadata is missing or past its TTL.
+
+    Snapshots written before rolling refresh only carry ``metadataRefreshedAt``.
+    """
+    if "metadataNextDueAt" not in current_meta:
+        return _age_seconds(current_meta.get("metadataRefreshedAt"), now_dt=now_dt) > METADATA_TTL_SECONDS
+    next_due = current_meta["metadataNextDueAt"]
+    return next_due is None or _age_seconds(next_due, now_dt=now_dt) > 0
+
+
+def _needs_rebuild(current_meta: Dict[str, Any], *, base_dir: str, now_dt: datetime, force_refresh: bool) -> bool:
+    """Prices past their TTL, no snapshot yet, or metadata on disk newer than the snapshot's."""
+    if force_refresh or not current_meta or not os.path.exists(snapshot_path(base_dir=base_dir)):
+        return True
+    if _age_seconds(current_meta.get("lastRefresh"), now_dt=now_dt) > SNAPSHOT_TTL_SECONDS:
+        return True
+    return current_meta.get("metadataVersion") != _metadata_version(base_dir=base_dir)
 
 
 def ensure_snapshot(*, base_dir: str, yf_module=yf, logger=logging.getLogger("marketmind_api"), force_refresh: bool = False) -> Dict[str, Any]:
@@ -443,15 +720,10 @@ def ensure_snapshot(*, base_dir: str, yf_module=yf, logger=logging.getLogger("ma
     os.makedirs(cache_dir(base_dir=base_dir), exist_ok=True)
 
     current_meta = _read_json(meta_path(base_dir=base_dir))
-    existing_snapshot = os.path.exists(snapshot_path(base_dir=base_dir))
-    existing_metadata = os.path.exists(metadata_path(base_dir=base_dir))
-    price_age = _age_seconds(current_meta.get("lastRefresh"), now_dt=now_dt)
-    metadata_age = _age_seconds(current_meta.get("metadataRefreshedAt"), now_dt=now_dt)
-
-    needs_price_refresh = force_refresh or (not existing_snapshot) or price_age > SNAPSHOT_TTL_SECONDS
-    needs_metadata_refresh = force_refresh or (not existing_metadata) or metadata_age > METADATA_TTL_SECONDS
+    if force_refresh or not os.path.exists(metadata_path(base_dir=base_dir)) or _metadata_due(current_meta, now_dt=now_dt):
+        start_metadata_refresh(base_dir=base_dir, yf_module=yf_module, logger=logger, force_refresh=force_refresh)
 
-    if not needs_price_refresh and not needs_metadata_refresh and current_meta:
+    if not _needs_rebuild(current_meta, base_dir=base_dir, now_dt=now_dt, force_refresh=force_refresh):
         payload = dict(current_meta)
         payload.setdefault("snapshotStatus", "fresh")
         payload.setdefault("warnings", [])
@@ -460,39 +732,37 @@ def ensure_snapshot(*, base_dir: str, yf_module=yf, logger=logging.getLogger("ma
     try:
         with _refresh_lock(base_dir=base_dir):
             current_meta = _read_json(meta_path(base_dir=base_dir))
-            existing_snapshot = os.path.exists(snapshot_path(base_dir=base_dir))
-            existing_metadata = os.path.exists(metadata_path(base_dir=base_dir))
-            price_age = _age_seconds(current_meta.get("lastRefresh"), now_dt=now_dt)
-            metadata_age = _age_seconds(current_meta.get("metadataRefreshedAt"), now_dt=now_dt)
-            needs_price_refresh = force_refresh or (not existing_snapshot) or price_age > SNAPSHOT_TTL_SECONDS
-            needs_metadata_refresh = force_refresh or (not existing_metadata) or metadata_age > METADATA_TTL_SECONDS
-
-            if not needs_price_refresh and not needs_metadata_refresh and current_meta:
+            if not _needs_rebuild(current_meta, base_dir=base_dir, now_dt=now_dt, force_refresh=force_refresh):
                 payload = dict(current_meta)
                 payload.setdefault("snapshotStatus", "fresh")
                 payload.setdefault("warnings", [])
                 return payload
 
             universe = screener_universe_service.load_universe()
+            metadata_version = _metadata_version(base_dir=base_dir)
             metadata = _load_existing_metadata(base_dir=base_dir)
-            if needs_metadata_refresh or not metadata:
-                metadata = _fetch_metadata(universe=universe, yf_module=yf_module, logger=logger)
-                _write_json_atomic(metadata_path(base_dir=base_dir), metadata)
 
             histories = _fetch_histories(
                 tickers=[str(record["symbol"]) for record in universe],
+                base_dir=base_dir,
+                force_refresh=force_refresh,
                 yf_module=yf_module,
                 logger=logger,
             )
-            snapshot_df, warnings = _build_snapshot(histories=histories, metadata=metadata, universe=universe)
-            _write_parquet_atomic(snapshot_path(base_dir=base_dir), snapshot_df)
+            written = _write_snapshot_atomic(
+                snapshot_path(base_dir=base_dir),
+                _build_snapshot(histories=histories, metadata=metadata, universe=universe),
+            )
+            warnings = _snapshot_warnings(universe, histories, written)
 
             meta_payload = {
                 "asOf": _isoformat(now_dt),
                 "lastRefresh": _isoformat(now_dt),
-                "metadataRefreshedAt": _isoformat(now_dt if needs_metadata_refresh or not current_meta.get("metadataRefreshedAt") else datetime.fromisoformat(current_meta["metadataRefreshedAt"].replace("Z", "+00:00"))),
+                "metadataRefreshedAt": _metadata_refreshed_iso(metadata),
+                "metadataNextDueAt": _metadata_next_due_iso(metadata, universe),
+                "metadataVersion": metadata_version,
                 "snapshotStatus": "fresh",
-                "rowCount": snapshot_df.height,
+                "rowCount": len(written),
                 "universeSize": len(universe),
                 "warnings": warnings[:25],
             }
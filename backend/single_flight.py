@@ -0,0 +1,165 @@
+"""Request coalescing for expensive forecast computations.
+
+When a ticker trends, many requests miss the forecast cache at the same moment
+and each would start its own fit. ``SingleFlight.do(key, fn)`` runs ``fn`` once
+per key: concurrent callers with the same key wait for the in-flight call and
+share its result (or its exception).
+
+With a ``lock_dir`` the leader also holds an ``fcntl`` lock file for the key,
+so the leaders in other Gunicorn workers on the host wait for it. Once they
+get the lock, they re-check the shared forecast cache tier before computing.
+Waiting on another process is bounded by ``wait_seconds``. After that the
+caller computes anyway, so a stuck worker can't stall the rest. The leader
+removes its lock file before releasing it; a waiter that then wins the lock on
+the unlinked file retries on the current one.
+
+Callers may pass ``should_cancel``. The leader's ``fn`` then receives a probe
+that turns true only once every caller sharing the flight has cancelled (and
+never while one of them joined without a probe), so one client hanging up does
+not cancel the work its coalesced waiters are still waiting for.
+
+Counters (``stats()``): ``leaders`` ran the computation, ``coalesced`` waited
+on a call in the same process, ``crossProcessWaits`` waited on another
+process's lock and ``lockTimeouts`` gave up waiting. Callers add their own
+cache counters with ``count``.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional
+
+DEFAULT_WAIT_SECONDS = 120.0
+LOCK_POLL_SECONDS = 0.05
+
+
+class _Flight:
+    __slots__ = ("done", "value", "error", "cancel_probes", "uncancellable")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+        self.cancel_probes: List[Callable[[], bool]] = []
+        self.uncancellable = False
+
+    def join(self, should_cancel: Optional[Callable[[], bool]]) -> None:
+        if should_cancel is None:
+            self.uncancellable = True
+        else:
+            self.cancel_probes.append(should_cancel)
+
+
+class SingleFlight:
+    def __init__(self, *, lock_dir: Optional[str] = None, wait_seconds: float = DEFAULT_WAIT_SECONDS) -> None:
+        self.lock_dir = lock_dir
+        self.wait_seconds = max(float(wait_seconds), 0.0)
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+        self._counters: Counter = Counter()
+        if lock_dir:
+            os.makedirs(lock_dir, exist_ok=True)
+
+    def count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[name] += amount
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            payload: Dict[str, Any] = dict(self._counters)
+            payload["inFlight"] = len(self._flights)
+        payload["crossProcess"] = bool(self.lock_dir)
+        return payload
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *, should_cancel: Optional[Callable[[], bool]] = None) -> Any:
+        """Run ``fn`` once per concurrent ``key``; with ``should_cancel`` it is called as ``fn(all_cancelled)``."""
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self._counters["coalesced"] += 1
+            flight.join(should_cancel)
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        self.count("leaders")
+        try:
+            with self._process_lock(key):
+                flight.value = fn(lambda: self._all_cancelled(flight)) if should_cancel is not None else fn()
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+        return flight.value
+
+    def _all_cancelled(self, flight: _Flight) -> bool:
+        with self._lock:
+            if flight.uncancellable:
+                return False
+            probes = list(flight.cancel_probes)
+        return all(probe() for probe in probes)
+
+    @contextmanager
+    def _process_lock(self, key: Hashable) -> Iterator[None]:
+        if not self.lock_dir:
+            yield
+            return
+        import fcntl
+
+        digest = hashlib.blake2b(repr(key).encode("utf-8"), digest_size=16).hexdigest()
+        path = os.path.join(self.lock_dir, f"{digest}.lock")
+        deadline = time.monotonic() + self.wait_seconds
+        while True:
+            handle = open(path, "a+")
+            acquired = self._acquire(fcntl, handle.fileno(), deadline)
+            if not acquired or _still_linked(handle, path):
+                break
+            # The previous holder removed this file after we opened it.
+            fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+            handle.close()
+        try:
+            yield
+        finally:
+            if acquired:
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+            handle.close()
+
+    def _acquire(self, fcntl, fileno: int, deadline: float) -> bool:
+        waited = False
+        while True:
+            try:
+                fcntl.flock(fileno, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return True
+            except BlockingIOError:
+                if not waited:
+                    self.count("crossProcessWaits")
+                    waited = True
+                if time.monotonic() >= deadline:
+                    self.count("lockTimeouts")
+                    return False
+                time.sleep(LOCK_POLL_SECONDS)
+
+
+def _still_linked(handle, path: str) -> bool:
+    try:
+        current = os.stat(path)
+    except FileNotFoundError:
+        return False
+    opened = os.fstat(handle.fileno())
+    return (current.st_dev, current.st_ino) == (opened.st_dev, opened.st_ino)
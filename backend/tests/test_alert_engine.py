@@ -0,0 +1,376 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+from datetime import datetime
+
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import alert_engine
+import api_scheduler
+import api_state
+from user_state_store import (
+    AlertRuleChange,
+    apply_alert_triggers,
+    load_alert_rule_changes,
+    load_notifications,
+    reset_runtime_state,
+    save_notifications,
+    session_scope,
+    utcnow,
+)
+
+
+class _Logger:
+    def info(self, *args, **kwargs):
+        pass
+
+    warning = error = info
+
+
+class _Downloads:
+    def __init__(self, closes):
+        self.closes = closes
+        self.calls = []
+
+    def __call__(self, tickers, **kwargs):
+        self.calls.append(list(tickers))
+        columns = pd.MultiIndex.from_tuples([("Close", ticker) for ticker in tickers if ticker in self.closes])
+        return pd.DataFrame([[self.closes[ticker] for ticker in tickers if ticker in self.closes]], columns=columns)
+
+
+def _alert(user_id, alert_id, ticker, condition, target):
+    return {"user_id": user_id, "id": alert_id, "ticker": ticker, "condition": condition, "target_price": target}
+
+
+def _full_feed(alerts):
+    def _load(cursor):
+        by_user = {}
+        for alert in alerts:
+            by_user.setdefault(alert["user_id"], []).append(alert)
+        return 1, by_user, cursor is None
+
+    return _load
+
+
+class AlertEngineTests(unittest.TestCase):
+    def test_one_tick_fetches_each_ticker_once_and_batches_triggers(self):
+        alerts = [
+            _alert("user_a", "a1", "AAPL", "above", 150.0),
+            _alert("user_a", "a2", "MSFT", "below", 300.0),
+            _alert("user_b", "b1", "AAPL", "below", 150.0),
+            _alert("user_b", "b2", "NVDA", "above", 100.0),
+            _alert("user_c", "c1", "AAPL", "above", None),
+        ]
+        downloads = _Downloads({"AAPL": 180.0, "MSFT": 290.0})
+        yf_module = type("FakeYF", (), {"download": staticmethod(downloads)})
+        batches = []
+
+        index = alert_engine.AlertIndex()
+        summary = alert_engine.run_alert_tick(
+            index=index,
+            load_changes_fn=_full_feed(alerts),
+            apply_triggers_fn=batches.append,
+            yf_module=yf_module,
+            logger=_Logger(),
+            chunk_size=2,
+            batch_size=1,
+        )
+
+        self.assertEqual(downloads.calls, [["AAPL", "MSFT"], ["NVDA"]])
+        self.assertEqual(summary, {"alerts": 2, "reloadedUsers": 3, "tickers": 3, "prices": 2, "triggered": 2})
+        self.assertEqual([[trigger["alert_id"] for trigger in batch] for batch in batches], [["a1"], ["a2"]])
+        self.assertEqual(batches[0][0]["message"], "AAPL is now $180.00 (above your target of $150.00)")
+        self.assertEqual(batches[1][0]["message"], "MSFT is now $290.00 (below your target of $300.00)")
+
+    def test_index_finds_crossed_thresholds_and_follows_user_changes(self):
+        index = alert_engine.AlertIndex()
+        index.replace_user("user_a", [_alert("user_a", f"up{target}", "AAPL", "above", target) for target in (100, 150, 200)])
+        index.replace_user("user_b", [_alert("user_b", f"down{target}", "AAPL", "below", target) for target in (120, 180)])
+
+        self.assertEqual([rule["id"] for rule in index.crossed("AAPL", 150.0)], ["up100", "down180"])
+        self.assertEqual([rule["id"] for rule in index.crossed("AAPL", 250.0)], ["up100", "up150", "up200"])
+        self.assertEqual(index.crossed("MSFT", 250.0), [])
+
+        index.remove("user_a", "up100")
+        index.replace_user("user_b", [_alert("user_b", "down160", "AAPL", "below", 160)])
+        self.assertEqual([rule["id"] for rule in index.crossed("AAPL", 150.0)], ["down160"])
+        index.replace_user("user_a", [])
+        index.replace_user("user_b", [])
+        self.assertEqual((len(index), index.price_tickers()), (0, []))
+
+    def test_news_poller_polls_each_ticker_once_and_fans_out_only_unseen_headlines(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        lookups = []
+        news = {"items": [{"title": "Guidance raised", "providerPublishTime": datetime.now().timestamp() - 60}]}
+
+        def _ticker(symbol):
+            lookups.append(symbol)
+            return type("Ticker", (), {"news": list(news["items"])})()
+
+        yf_module = type("FakeYF", (), {"Ticker": staticmethod(_ticker)})
+        alerts = [
+            {"user_id": user_id, "id": f"{user_id}-{ticker}", "ticker": ticker, "type": "news", "condition": "news_release", "target_price": 0}
+            for user_id in ("user_a", "user_b", "user_c")
+            for ticker in ("TSLA",)
+        ]
+        state_path = os.path.join(tmpdir.name, "news_cursors.json")
+        poller = alert_engine.NewsPoller(poll_seconds=0, state_path=state_path)
+        index = alert_engine.AlertIndex()
+        batches = []
+
+        def _tick():
+            return alert_engine.run_alert_tick(
+                index=index,
+                load_changes_fn=lambda cursor: _full_feed(alerts)(cursor) if cursor is None else (1, {}, False),
+                apply_triggers_fn=batches.append,
+                yf_module=yf_module,
+                logger=_Logger(),
+                news_poller=poller,
+            )
+
+        _tick()
+        self.assertEqual(lookups, ["TSLA"])
+        self.assertEqual([trigger["message"] for trigger in batches[0]], ["NEWS: Guidance raised (TSLA)"] * 3)
+
+        index.replace_user("user_a", [alerts[0]])
+        _tick()
+        self.assertEqual(len(batches), 1)
+
+        news["items"] = [{"content": {"title": "Recall announced", "pubDate": "2099-01-01T00:00:00Z"}}, *news["items"]]
+        _tick()
+        self.assertEqual([trigger["alert_id"] for trigger in batches[1]], ["user_a-TSLA"])
+        self.assertEqual(batches[1][0]["message"], "NEWS: Recall announced (TSLA)")
+        self.assertEqual(alert_engine.NewsPoller(state_path=state_path).cursor("TSLA"), 4070908800.0)
+
+        throttled = alert_engine.NewsPoller(poll_seconds=300)
+        throttled.poll(["TSLA"], yf_module=yf_module, now_ts=1_000.0)
+        throttled.poll(["TSLA"], yf_module=yf_module, now_ts=1_200.0)
+        self.assertEqual(len(lookups), 4)
+
+        with patch.dict(os.environ, {"ALERT_NEWS_CURSOR_PATH": state_path, "ALERT_NEWS_POLL_SECONDS": "300"}):
+            shard_pollers = [alert_engine.build_news_poller(tmpdir.name, shard=(shard, 2)) for shard in range(2)]
+        now_ts = datetime.now().timestamp()
+        polls = [poller.poll(["TSLA", "NVDA"], yf_module=yf_module, now_ts=now_ts) for poller in shard_pollers]
+        self.assertEqual(sorted(lookups[4:]), ["NVDA", "TSLA"])
+        self.assertEqual(polls[0], polls[1])
+        self.assertEqual(polls[1]["TSLA"][0], "Recall announced")
+        self.assertNotEqual(shard_pollers[0].state_path, shard_pollers[1].state_path)
+
+    def test_sharded_indexes_split_users_and_cadence_follows_market_hours(self):
+        alerts = [_alert(f"user_{position}", "x", f"T{position}", "above", 1.0) for position in range(40)]
+        shards = [alert_engine.AlertIndex(shard=(shard, 3)) for shard in range(3)]
+        for index in shards:
+            index.sync(_full_feed(alerts))
+        self.assertEqual(sum(len(index) for index in shards), 40)
+        self.assertTrue(all(len(index) for index in shards))
+        self.assertEqual(sorted(ticker for index in shards for ticker in index.price_tickers()), sorted(alert["ticker"] for alert in alerts))
+
+        shards[0].assign_shard((1, 3))
+        self.assertEqual((len(shards[0]), shards[0].cursor), (0, None))
+        shards[0].sync(_full_feed(alerts))
+        self.assertEqual(shards[0].price_tickers(), shards[1].price_tickers())
+        shards[0].adopt_shard(2)
+        self.assertEqual((len(shards[0]), shards[0].cursor), (0, None))
+        shards[0].sync(_full_feed(alerts))
+        self.assertEqual(len(shards[0]), len(shards[1]) + len(shards[2]))
+        self.assertTrue(shards[0].holds_shard(2))
+        shards[0].release_shard(2)
+        self.assertEqual((len(shards[0]), shards[0].holds_shard(2), shards[0].holds_shard(0)), (0, False, False))
+        shards[0].sync(_full_feed(alerts))
+        self.assertEqual(len(shards[0]), len(shards[1]))
+
+        sessions = {
+            "US": {"status": "closed", "nextOpen": "2026-10-19T09:30:00-04:00"},
+            "HK": {"status": "open", "nextOpen": None},
+        }
+        cadence = alert_engine.AlertCadence(
+            markets=["US"],
+            open_seconds=10,
+            closed_seconds=900,
+            session_fn=lambda market, now=None: sessions[market],
+        )
+        self.assertEqual(cadence.next_interval(datetime(2026, 10, 18, 12, 0)), 900)
+        self.assertEqual(cadence.next_interval(datetime(2026, 10, 19, 13, 25)), 300)
+        self.assertEqual(cadence.next_interval(datetime(2026, 10, 19, 13, 30)), 10)
+        cadence.markets = ("US", "HK")
+        self.assertEqual(cadence.next_interval(datetime(2026, 10, 18, 12, 0)), 10)
+        cadence.session_fn = lambda market, now=None: {}["missing"]
+        cadence.logger = _Logger()
+        self.assertEqual(cadence.next_interval(), alert_engine.FALLBACK_INTERVAL_SECONDS)
+
+    def test_scheduler_ticks_on_the_cadence_interval(self):
+        class _Clock:
+            now = 0.0
+            sleeps = 0
+
+            def monotonic(self):
+                return self.now
+
+            def sleep(self, seconds):
+                self.sleeps += 1
+                if self.sleeps > 200:
+                    raise StopIteration
+                self.now += max(seconds, 0.5)
+
+        clock = _Clock()
+        ticks = []
+        schedule_module = type("FakeSchedule", (), {"run_pending": staticmethod(lambda: None)})
+        cadence = type("Cadence", (), {"next_interval": lambda self: 15.0})()
+        with self.assertRaises(StopIteration):
+            api_scheduler.run_scheduler(
+                schedule_module=schedule_module,
+                check_alerts_fn=lambda: ticks.append(clock.now),
+                cadence=cadence,
+                time_module=clock,
+            )
+        self.assertEqual(ticks[:4], [0.0, 15.0, 30.0, 45.0])
+
+    def test_evaluation_refresh_follows_whichever_worker_holds_shard_zero(self):
+        import api as backend_api
+
+        captured, refreshes = {}, []
+        cycles = iter([([0], []), ([], [0])])
+        with patch.object(backend_api.api_scheduler_helpers, "run_scheduler", lambda **kwargs: captured.update(kwargs)), patch.object(
+            backend_api, "refresh_evaluation_warehouse", lambda: refreshes.append(sorted(backend_api._ALERT_INDEX.adopted))
+        ), patch.object(backend_api, "_ALERT_INDEX", alert_engine.AlertIndex()), patch.object(
+            backend_api.alert_engine, "build_news_poller", lambda base_dir, shard: None
+        ), patch.object(backend_api, "_NEWS_POLLER", None):
+            backend_api.run_scheduler(shard=(1, 3), adopt_shards_fn=lambda: next(cycles))
+            for _ in range(2):
+                captured["evaluation_refresh_fn"]()
+                captured["adopt_shards_fn"]()
+            captured["evaluation_refresh_fn"]()
+        self.assertEqual(refreshes, [[0]])
+
+    def test_json_feed_reloads_only_users_whose_notifications_file_changed(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        paths = {user_id: os.path.join(tmpdir.name, f"{user_id}.json") for user_id in ("user_a", "user_b")}
+        for user_id, path in paths.items():
+            with open(path, "w", encoding="utf-8") as handle:
+                handle.write("{}")
+        loads = []
+
+        def _changes(cursor):
+            return api_state.load_alert_changes(
+                cursor,
+                sql_enabled=False,
+                ensure_user_state_storage_ready_fn=None,
+                session_scope=None,
+                database_url="",
+                load_alert_rule_changes_db_fn=None,
+                iter_user_ids_fn=lambda: sorted(paths),
+                get_notifications_file_fn=paths.get,
+                load_notifications_fn=lambda user_id: loads.append(user_id) or {"active": [_alert(user_id, "x", "AAPL", "above", 1.0)]},
+            )
+
+        index = alert_engine.AlertIndex()
+        self.assertEqual(index.sync(_changes), 2)
+        os.utime(paths["user_b"], ns=(1, 1))
+        self.assertEqual(index.sync(_changes), 1)
+        self.assertEqual(loads, ["user_a", "user_b", "user_b"])
+        self.assertEqual(len(index), 2)
+
+    def test_sql_store_lists_every_rule_and_applies_a_batch_in_one_transaction(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        database_url = f"sqlite:///{os.path.join(tmpdir.name, 'state.db')}"
+        reset_runtime_state()
+        self.addCleanup(reset_runtime_state)
+        with session_scope(database_url) as session:
+            for user_id, target in (("user_a", 150.0), ("user_b", 250.0)):
+                save_notifications(
+                    session,
+                    user_id,
+                    {"active": [{"ticker": "AAPL", "condition": "above", "target_price": target}], "triggered": []},
+                )
+
+        state = {"sql_enabled": True, "ensure_user_state_storage_ready_fn": lambda: None, "session_scope": session_scope, "database_url": database_url}
+
+        def _changes(cursor):
+            return api_state.load_alert_changes(
+                cursor,
+                load_alert_rule_changes_db_fn=load_alert_rule_changes,
+                iter_user_ids_fn=None,
+                get_notifications_file_fn=None,
+                load_notifications_fn=None,
+                **state,
+            )
+
+        index = alert_engine.AlertIndex()
+        self.assertEqual(index.sync(_changes), 2)
+        self.assertEqual(index.sync(_changes), 0)
+        yf_module = type("FakeYF", (), {"download": staticmethod(_Downloads({"AAPL": 200.0}))})
+        alert_engine.run_alert_tick(
+            index=index,
+            load_changes_fn=_changes,
+            apply_triggers_fn=lambda batch: api_state.apply_alert_triggers(
+                batch,
+                apply_alert_triggers_db_fn=apply_alert_triggers,
+                json_mirror_enabled=False,
+                load_notifications_fn=None,
+                save_notifications_fn=None,
+                save_notifications_json_fn=None,
+                **state,
+            ),
+            yf_module=yf_module,
+            logger=_Logger(),
+        )
+
+        with session_scope(database_url) as session:
+            user_a = load_notifications(session, "user_a")
+            user_b = load_notifications(session, "user_b")
+        self.assertEqual(user_a["active"], [])
+        self.assertEqual([alert["message"] for alert in user_a["triggered"]], ["AAPL is now $200.00 (above your target of $150.00)"])
+        self.assertEqual(len(user_b["active"]), 1)
+        self.assertEqual(user_b["triggered"], [])
+
+        with session_scope(database_url) as session:
+            save_notifications(
+                session,
+                "user_b",
+                {"active": [*user_b["active"], {"ticker": "MSFT", "condition": "below", "target_price": 400.0}], "triggered": []},
+            )
+        self.assertEqual(index.sync(_changes), 2)
+        self.assertEqual(index.price_tickers(), ["AAPL", "MSFT"])
+        self.assertEqual(len(index), 2)
+
+
+    def test_sql_feed_picks_up_a_lower_change_id_that_commits_late(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        database_url = f"sqlite:///{os.path.join(tmpdir.name, 'state.db')}"
+        reset_runtime_state()
+        self.addCleanup(reset_runtime_state)
+        with session_scope(database_url) as session:
+            save_notifications(session, "user_a", {"active": [{"ticker": "AAPL", "condition": "above", "target_price": 1.0}], "triggered": []})
+        with session_scope(database_url) as session:
+            save_notifications(session, "user_b", {"active": [{"ticker": "MSFT", "condition": "above", "target_price": 1.0}], "triggered": []})
+            session.add(AlertRuleChange(id=5, clerk_user_id="user_c", changed_at=utcnow()))
+
+        def _changes(cursor):
+            with session_scope(database_url) as session:
+                return load_alert_rule_changes(session, cursor)
+
+        cursor, rules, full = _changes(None)
+        self.assertTrue(full)
+        self.assertEqual(sorted(rules), ["user_a", "user_b"])
+        cursor, rules, full = _changes(cursor)
+        self.assertEqual((rules, full), ({}, False))
+
+        with session_scope(database_url) as session:
+            session.add(AlertRuleChange(id=4, clerk_user_id="user_a", changed_at=utcnow()))
+        cursor, rules, full = _changes(cursor)
+        self.assertFalse(full)
+        self.assertEqual(list(rules), ["user_a"])
+        self.assertEqual(cursor[0], 5)
+        self.assertEqual(_changes(cursor)[1], {})
+
+
+if __name__ == "__main__":
+    unittest.main()
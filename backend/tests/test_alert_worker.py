@@ -5,7 +5,7 @@ import unittest
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from alert_worker import run_alert_worker, scheduler_leader_lock
+from alert_worker import ShardClaims, claim_alert_shard, run_alert_worker, scheduler_leader_lock, standby_signal
 
 
 class AlertWorkerTests(unittest.TestCase):
@@ -53,6 +53,94 @@ class AlertWorkerTests(unittest.TestCase):
         self.assertEqual(result, 0)
         self.assertEqual(calls, [])
 
+    def test_sharded_workers_each_claim_a_different_shard(self):
+        with claim_alert_shard("", shard_count=2, lock_path=self.lock_path) as first:
+            with claim_alert_shard("", shard_count=2, lock_path=self.lock_path) as second:
+                with claim_alert_shard("", shard_count=2, lock_path=self.lock_path) as third:
+                    self.assertEqual((first, second, third), ((0, 2), (1, 2), None))
+                    shards = []
+                    result = run_alert_worker(
+                        database_url="",
+                        lock_path=self.lock_path,
+                        initialize_fn=lambda: None,
+                        run_scheduler_fn=lambda shard, adopt_shards_fn: shards.append(shard),
+                        blocking_lock=False,
+                        shard_count=2,
+                    )
+                    self.assertEqual((result, shards), (0, []))
+
+            result = run_alert_worker(
+                database_url="",
+                lock_path=self.lock_path,
+                initialize_fn=lambda: None,
+                run_scheduler_fn=lambda shard, adopt_shards_fn: shards.append(shard),
+                blocking_lock=False,
+                shard_count=2,
+            )
+        self.assertEqual((result, shards), (0, [(1, 2)]))
+
+    def test_running_worker_adopts_shards_no_worker_holds(self):
+        with claim_alert_shard("", shard_count=3, lock_path=self.lock_path) as other:
+            adopt = []
+            run_alert_worker(
+                database_url="",
+                lock_path=self.lock_path,
+                initialize_fn=lambda: None,
+                run_scheduler_fn=lambda shard, adopt_shards_fn: adopt.append((shard, adopt_shards_fn(), adopt_shards_fn())),
+                blocking_lock=False,
+                shard_count=3,
+            )
+            self.assertEqual(other, (0, 3))
+            self.assertEqual(adopt, [((1, 3), ([2], []), ([], []))])
+
+            with ShardClaims("", shard_count=3, lock_path=self.lock_path) as claims:
+                self.assertEqual(claims.claim(limit=1), [1])
+                with ShardClaims("", shard_count=3, lock_path=self.lock_path) as standby:
+                    self.assertEqual(standby.claim(limit=1), [2])
+                    self.assertEqual(claims.adopt_orphans(), ([], []))
+                self.assertEqual(claims.adopt_orphans(), ([2], []))
+                self.assertEqual(claims.owned, [1, 2])
+
+    def test_running_worker_hands_an_adopted_shard_back_to_a_waiting_standby(self):
+        with ShardClaims("", shard_count=3, lock_path=self.lock_path) as claims:
+            self.assertEqual(claims.claim(limit=1), [0])
+            self.assertEqual(claims.adopt_orphans(), ([1, 2], []))
+            with standby_signal("", lock_path=self.lock_path) as waiting:
+                self.assertTrue(waiting)
+                self.assertEqual(claims.adopt_orphans(), ([], [2]))
+                self.assertEqual(claims.owned, [0, 1])
+                with claim_alert_shard("", shard_count=3, lock_path=self.lock_path) as restarted:
+                    self.assertEqual(restarted, (2, 3))
+                self.assertEqual(claims.adopt_orphans(), ([], [1]))
+                self.assertEqual(claims.adopt_orphans(), ([], []))
+                self.assertEqual(claims.owned, [0])
+            self.assertEqual(claims.adopt_orphans(), ([1, 2], []))
+
+    def test_standby_signals_while_it_waits_for_a_shard(self):
+        sleeps = []
+
+        class _Clock:
+            @staticmethod
+            def sleep(seconds):
+                with ShardClaims("", shard_count=1, lock_path=self.lock_path) as probe:
+                    sleeps.append(probe.standby_waiting())
+                if len(sleeps) == 2:
+                    owner.close()
+
+        owner = ShardClaims("", shard_count=2, lock_path=self.lock_path)
+        owner.claim()
+        shards = []
+        run_alert_worker(
+            database_url="",
+            lock_path=self.lock_path,
+            initialize_fn=lambda: None,
+            run_scheduler_fn=lambda shard, adopt_shards_fn: shards.append((shard, adopt_shards_fn.__self__.standby_waiting())),
+            shard_count=2,
+            time_module=_Clock,
+        )
+        self.assertEqual(sleeps, [True, True])
+        self.assertEqual(shards, [((0, 2), False)])
+
 
 if __name__ == "__main__":
     unittest.main()
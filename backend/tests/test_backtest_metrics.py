@@ -0,0 +1,70 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import backtest_metrics
+import prediction_service
+
+
+def _legacy_trading_returns(predictions, actuals, initial_capital=10000.0):
+    capital, shares, values, trades = float(initial_capital), 0.0, [float(initial_capital)], 0
+    for index in range(len(predictions) - 1):
+        pred_return = 0.0 if predictions[index] == 0 else (predictions[index + 1] - predictions[index]) / predictions[index]
+        if pred_return > 0.005 and shares == 0 and capital > 0:
+            shares, capital, trades = capital / actuals[index], 0.0, trades + 1
+        elif pred_return < -0.005 and shares > 0:
+            capital, shares, trades = shares * actuals[index], 0.0, trades + 1
+        values.append(capital + shares * actuals[index + 1])
+    return np.array(values), trades
+
+
+class BacktestMetricsTests(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        self.actuals = 100.0 + np.cumsum(rng.normal(0.0, 1.0, 250))
+        self.predictions = self.actuals + rng.normal(0.0, 1.5, (9, 250))
+
+    def test_matrix_simulation_matches_the_per_model_loop(self):
+        simulation = backtest_metrics.simulate_trading(self.predictions, self.actuals)
+
+        self.assertEqual(simulation["equity"].shape, (9, 250))
+        for row, predictions in enumerate(self.predictions):
+            values, trades = _legacy_trading_returns(predictions, self.actuals)
+            np.testing.assert_allclose(simulation["equity"][row], values)
+            self.assertEqual(simulation["num_trades"][row], trades)
+
+    def test_forecast_metrics_match_single_model_definitions(self):
+        metrics = backtest_metrics.forecast_metrics(self.actuals, self.predictions)
+        expected = prediction_service.calculate_metrics(self.actuals, self.predictions[3])
+
+        self.assertEqual(metrics["mae"].shape, (9,))
+        self.assertAlmostEqual(round(float(metrics["mae"][3]), 2), expected["mae"])
+        self.assertAlmostEqual(round(float(metrics["rmse"][3]), 2), expected["rmse"])
+        self.assertAlmostEqual(round(float(metrics["mape"][3]), 2), expected["mape"])
+        perfect = backtest_metrics.forecast_metrics(self.actuals, self.actuals)
+        self.assertEqual(float(perfect["r_squared"][0]), 1.0)
+        self.assertEqual(float(perfect["directional_accuracy"][0]), 100.0)
+
+    def test_costs_and_slippage_charge_every_position_change(self):
+        actuals = np.array([100.0, 101.0, 102.0, 101.0, 100.0])
+        predictions = np.array([100.0, 102.0, 103.0, 100.0, 99.0])
+
+        free = prediction_service.calculate_trading_returns(predictions, actuals)
+        costly = prediction_service.calculate_trading_returns(
+            predictions, actuals, transaction_cost_bps=10.0, slippage_bps=5.0
+        )
+
+        # Long at 100 (day 0), flat at 102 (day 2): two trades at 15 bps each.
+        self.assertEqual(free["num_trades"], 2)
+        self.assertEqual(free["final_value"], 10200.0)
+        self.assertAlmostEqual(costly["final_value"], round(10000 * 0.9985 * 1.02 * 0.9985, 2))
+        self.assertEqual(costly["slippage_bps"], 5.0)
+        self.assertIsNone(prediction_service.calculate_trading_returns(predictions[:1], actuals[:1]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,188 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import api_handlers_paper
+import bar_store
+
+
+def _bars(start="2025-01-02", periods=60, base=100.0, tickers=("AAPL",)):
+    index = pd.bdate_range(start, periods=periods)
+    frames = {}
+    for offset, ticker in enumerate(tickers):
+        close = base + offset * 50.0 + np.arange(periods, dtype=float)
+        for field, values in (
+            ("Open", close - 0.5),
+            ("High", close + 1.0),
+            ("Low", close - 1.0),
+            ("Close", close),
+            ("Volume", np.full(periods, 1_000_000.0)),
+        ):
+            frames[(ticker, field)] = values
+    return pd.DataFrame(frames, index=index)
+
+
+class _Downloads:
+    def __init__(self, frame):
+        self.frame = frame
+        self.calls = []
+        self.fail = False
+
+    def __call__(self, tickers, **kwargs):
+        self.calls.append((tickers, kwargs))
+        if self.fail:
+            raise RuntimeError("upstream unavailable")
+        frame = self.frame
+        if kwargs.get("start"):
+            frame = frame[frame.index >= pd.Timestamp(kwargs["start"])]
+        names = tickers if isinstance(tickers, list) else [tickers]
+        return frame.loc[:, [column for column in frame.columns if column[0] in names]]
+
+
+class BarStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def _store(self, downloads):
+        return bar_store.BarStore(self.tmpdir.name, refresh_seconds=60, download_fn=downloads)
+
+    def _age(self, store, ticker, seconds=120):
+        past = time.time() - seconds
+        os.utime(store.path(ticker), (past, past))
+
+    def test_serves_stored_bars_and_appends_only_new_sessions(self):
+        downloads = _Downloads(_bars(tickers=("AAPL", "MSFT")))
+        store = self._store(downloads)
+
+        first = store.get_many(["aapl", "MSFT"])
+        self.assertEqual(len(downloads.calls), 1)
+        self.assertEqual(downloads.calls[0][1]["period"], bar_store.DEFAULT_FULL_PERIOD)
+        self.assertEqual(len(first["AAPL"]), 60)
+        self.assertFalse(first["AAPL"]["Close"].to_numpy().flags.writeable)
+
+        store.get("AAPL")
+        self.assertEqual(len(downloads.calls), 1)
+
+        downloads.frame = _bars(periods=65, tickers=("AAPL", "MSFT"))
+        self._age(store, "AAPL")
+        refreshed = store.get("AAPL")
+        self.assertEqual(len(downloads.calls), 2)
+        self.assertEqual(downloads.calls[1][0], "AAPL")
+        self.assertEqual(downloads.calls[1][1]["start"], (first["AAPL"].index[-1] - pd.Timedelta(days=7)).strftime("%Y-%m-%d"))
+        self.assertEqual(len(refreshed), 65)
+        self.assertEqual(store.watermark("AAPL"), downloads.frame.index[-1])
+        self.assertEqual(len(store.read("MSFT")), 60)
+
+    def test_revised_history_triggers_a_full_refetch(self):
+        downloads = _Downloads(_bars())
+        store = self._store(downloads)
+        store.get("AAPL")
+
+        revised = _bars(periods=62)
+        revised[("AAPL", "Close")] *= 0.98
+        downloads.frame = revised
+        self._age(store, "AAPL")
+        bars = store.get("AAPL")
+
+        self.assertIn("start", downloads.calls[1][1])
+        self.assertIn("period", downloads.calls[2][1])
+        np.testing.assert_allclose(bars["Close"].to_numpy(), revised[("AAPL", "Close")].to_numpy())
+
+    def test_failed_refresh_serves_stored_bars_only_when_allowed(self):
+        downloads = _Downloads(_bars())
+        store = self._store(downloads)
+        store.get("AAPL")
+        downloads.fail = True
+        self._age(store, "AAPL")
+
+        self.assertEqual(len(store.get("AAPL")), 60)
+        self.assertEqual(store.get_many(["AAPL"], allow_stale=False), {})
+        self.assertTrue(store.get("NEWCO").empty)
+
+    def test_provider_calls_are_serialized_and_failed_or_missing_tickers_are_retried(self):
+        tickers = tuple(f"T{position:03d}" for position in range(bar_store.DOWNLOAD_CHUNK_SIZE * 2 + 5))
+        downloads = _Downloads(_bars(tickers=tickers))
+        flaky = {"failures": 1, "dropped": 1}
+        active, overlapping = [0], []
+        guard = threading.Lock()
+
+        def _flaky(chunk, **kwargs):
+            with guard:
+                active[0] += 1
+                overlapping.append(active[0])
+            try:
+                time.sleep(0.01)
+                if flaky["failures"] and chunk[0] == tickers[0]:
+                    flaky["failures"] -= 1
+                    raise RuntimeError("rate limited")
+                raw = downloads(chunk, **kwargs)
+                if flaky["dropped"] and chunk[-1] == tickers[-1]:
+                    flaky["dropped"] -= 1
+                    raw = raw.drop(columns=[column for column in raw.columns if column[0] == tickers[-1]])
+                return raw
+            finally:
+                with guard:
+                    active[0] -= 1
+
+        store = bar_store.BarStore(
+            self.tmpdir.name, refresh_seconds=60, download_fn=_flaky, download_workers=3, retries=1, backoff_seconds=0
+        )
+        workers = [
+            threading.Thread(target=lambda group=group: store.get_many(list(group)))
+            for group in (tickers[:45], tickers[45:])
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(10)
+
+        self.assertEqual(max(overlapping), 1)
+        self.assertEqual(len(store.get_many(list(tickers))), len(tickers))
+        requested = [call[0] for call in downloads.calls]
+        self.assertEqual(sorted(len(chunk) for chunk in requested if isinstance(chunk, list)), [5, 40, 40])
+        self.assertIn(tickers[-1], requested)
+        self.assertEqual({call[1]["threads"] for call in downloads.calls}, {3, False})
+
+    def test_rate_limiter_spaces_requests_after_the_burst(self):
+        limiter = bar_store.RateLimiter(20, burst=2)
+
+        waits = [limiter.acquire() for _ in range(4)]
+
+        self.assertEqual(waits[:2], [0.0, 0.0])
+        self.assertGreater(waits[2], 0.0)
+        self.assertEqual(bar_store.RateLimiter(0).acquire(), 0.0)
+        self.assertIs(bar_store.provider_rate_limiter("yfinance"), bar_store.provider_rate_limiter("yfinance"))
+
+    def test_paper_history_reads_closes_from_the_store_when_it_covers_the_window(self):
+        stored = {"AAPL": bar_store.standardize_ohlcv(_bars()["AAPL"])}
+        closes = api_handlers_paper._stored_close_prices(
+            lambda tickers: stored,
+            ["AAPL"],
+            start=pd.Timestamp("2025-01-10"),
+            end=pd.Timestamp("2025-01-20"),
+            pd_module=pd,
+        )
+        self.assertEqual(list(closes.columns), ["AAPL"])
+        self.assertEqual(closes.index[0], pd.Timestamp("2025-01-10"))
+        self.assertIsNone(
+            api_handlers_paper._stored_close_prices(
+                lambda tickers: stored,
+                ["AAPL"],
+                start=pd.Timestamp("2024-12-01"),
+                end=pd.Timestamp("2025-01-20"),
+                pd_module=pd,
+            )
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
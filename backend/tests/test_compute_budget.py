@@ -0,0 +1,131 @@
+import json
+import os
+import sys
+import threading
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import api_handlers_market_data as market_data_handlers
+import compute_budget
+import evaluation_executor
+import prediction_service
+
+
+class _FakeTorch:
+    def __init__(self, threads):
+        self.threads = threads
+        self.calls = []
+
+    def get_num_threads(self):
+        return self.threads
+
+    def set_num_threads(self, threads):
+        self.calls.append(threads)
+        self.threads = threads
+
+
+class ComputeBudgetTests(unittest.TestCase):
+    def test_splits_cores_across_workers_and_concurrent_forecasts(self):
+        budget = compute_budget.ComputeBudget(core_budget=16, workers=2)
+        self.assertEqual(budget.threads_per_job(), 8)
+
+        with budget.forecast_slot() as first:
+            self.assertEqual(first, 8)
+            with budget.forecast_slot() as second, budget.forecast_slot():
+                self.assertEqual(second, 4)
+                self.assertEqual(budget.threads_per_job(), 2)
+                self.assertEqual(budget.snapshot()["activeForecasts"], 3)
+
+        snapshot = budget.snapshot()
+        self.assertEqual(snapshot["activeForecasts"], 0)
+        self.assertEqual(snapshot["peakForecasts"], 3)
+        self.assertEqual(snapshot["allocation"]["catboostThreadCount"], 8)
+        self.assertEqual(compute_budget.ComputeBudget(core_budget=2, workers=4).threads_per_job(), 1)
+
+    def test_pinned_processes_and_torch_threads(self):
+        budget = compute_budget.ComputeBudget(core_budget=8)
+        torch = _FakeTorch(threads=32)
+        self.assertEqual(budget.apply_torch_threads(torch), 8)
+        budget.pin(3)
+        with budget.forecast_slot(), budget.forecast_slot():
+            self.assertEqual(budget.apply_torch_threads(torch), 3)
+        budget.apply_torch_threads(torch)
+        self.assertEqual(torch.calls, [8, 3])
+        self.assertEqual(budget.snapshot()["torchThreadsApplied"], 3)
+
+    def test_model_builders_and_forecast_entry_points_use_the_budget(self):
+        budget = compute_budget.ComputeBudget(core_budget=6)
+        seen = []
+        release = threading.Event()
+        with mock.patch.object(compute_budget, "_BUDGET", budget):
+            models = prediction_service._build_ml_models()
+            self.assertEqual(models["random_forest"].n_jobs, 6)
+            self.assertEqual(list(prediction_service._build_ml_models(["random_forest", "unknown"])), ["random_forest"])
+
+            def _load(ticker):
+                seen.append(budget.snapshot()["activeForecasts"])
+                release.wait(5)
+                raise RuntimeError("stop")
+
+            with mock.patch.object(prediction_service, "_cache_get", return_value=None), mock.patch.object(
+                prediction_service, "_load_canonical_ohlcv", side_effect=_load
+            ):
+                worker = threading.Thread(target=lambda: self.assertRaises(RuntimeError, prediction_service.get_prediction_snapshot, "AAPL"))
+                worker.start()
+                with budget.forecast_slot():
+                    while not seen:
+                        threading.Event().wait(0.01)
+                    self.assertEqual(prediction_service._build_ml_models()["random_forest"].n_jobs, 3)
+                    release.set()
+                worker.join(5)
+        self.assertEqual(budget.snapshot()["activeForecasts"], 0)
+
+    def test_default_evaluation_pool_is_bounded_by_the_worker_share(self):
+        for core_budget, workers, expected in ((64, 4, evaluation_executor.DEFAULT_MAX_POOL_WORKERS), (8, 4, 2), (2, 8, 1)):
+            with mock.patch.object(compute_budget, "_BUDGET", compute_budget.ComputeBudget(core_budget=core_budget, workers=workers)):
+                self.assertEqual(evaluation_executor.EvaluationExecutor(mode="thread").max_workers, expected)
+
+    def test_process_pool_work_reserves_its_cores_in_the_parent(self):
+        budget = compute_budget.ComputeBudget(core_budget=8)
+        with budget.reserve(6):
+            self.assertEqual(budget.threads_per_job(), 2)
+            self.assertEqual(budget.snapshot()["reservedCores"], 6)
+        self.assertEqual(budget.threads_per_job(), 8)
+
+        seen = []
+
+        class _Pool:
+            def submit(self, fn, *args):
+                seen.append(budget.threads_per_job())
+                future = evaluation_executor.Future()
+                future.set_result((0.0, None))
+                return future
+
+        with mock.patch.object(compute_budget, "_BUDGET", budget):
+            executor = evaluation_executor.EvaluationExecutor(mode="process", max_workers=2)
+            with mock.patch.object(executor, "_get_pool", return_value=_Pool()):
+                executor.run({"a": (len, ((),), {}), "b": (len, ((),), {}), "c": (len, ((),), {})})
+        self.assertEqual(executor.process_threads, 4)
+        self.assertEqual(seen, [1, 1, 1])
+        self.assertEqual(budget.threads_per_job(), 8)
+
+    def test_diagnostics_handler_reports_allocation_and_pool_share(self):
+        budget = compute_budget.ComputeBudget(core_budget=8, workers=2)
+        executor = evaluation_executor.EvaluationExecutor(mode="thread", max_workers=2)
+        response = market_data_handlers.compute_diagnostics_handler(
+            get_compute_budget_fn=lambda: budget,
+            get_evaluation_executor_fn=lambda: executor,
+            single_flight_stats_fn=lambda: {"leaders": 3, "coalesced": 9},
+            jsonify_fn=lambda payload: json.loads(json.dumps(payload)),
+        )
+
+        self.assertEqual(response["workerCores"], 4)
+        self.assertEqual(response["allocation"]["torchNumThreads"], 4)
+        self.assertEqual(response["evaluationPool"], {"mode": "thread", "maxWorkers": 2, "maxConcurrentJobs": 2, "threadsPerProcess": 2})
+        self.assertEqual(response["singleFlight"]["coalesced"], 9)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import os
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import evaluation_executor
+
+
+def _sleep_then_return(value, delay=0.0):
+    time.sleep(delay)
+    return value
+
+
+class EvaluationExecutorTests(unittest.TestCase):
+    def test_thread_mode_runs_stages_concurrently_and_times_each(self):
+        executor = evaluation_executor.EvaluationExecutor(mode="thread", max_workers=3)
+        self.addCleanup(executor.shutdown)
+        tasks = {
+            "stats_cv": (_sleep_then_return, ("stats",), {"delay": 0.2}),
+            "ml_cv:linear_regression": (_sleep_then_return, ("lr",), {"delay": 0.2}),
+            "explainability": (_sleep_then_return, ("shap",), {"delay": 0.2}),
+        }
+
+        started = time.perf_counter()
+        results, timings = executor.run(tasks)
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(results, {"stats_cv": "stats", "ml_cv:linear_regression": "lr", "explainability": "shap"})
+        self.assertEqual(set(timings), set(tasks))
+        self.assertGreaterEqual(min(timings.values()), 0.15)
+        self.assertLess(elapsed, 0.5)
+
+    def test_process_mode_runs_picklable_stages(self):
+        executor = evaluation_executor.EvaluationExecutor(mode="process", max_workers=2)
+        self.addCleanup(executor.shutdown)
+
+        results, _timings = executor.run({"a": (pow, (2, 10), {}), "b": (pow, (3, 3), {})})
+
+        self.assertEqual(results, {"a": 1024, "b": 27})
+
+        parent_cache = {"explainer": "warm"}
+        results, _timings = executor.run(
+            {
+                "pooled": (os.getpid, (), {}),
+                "explainability": (lambda: (os.getpid(), parent_cache["explainer"]), (), {}),
+            },
+            in_process=("explainability",),
+        )
+        self.assertNotEqual(results["pooled"], os.getpid())
+        self.assertEqual(results["explainability"], (os.getpid(), "warm"))
+
+    def test_cancellation_stops_waiting_and_drops_pending_stages(self):
+        executor = evaluation_executor.EvaluationExecutor(mode="thread", max_workers=1)
+        self.addCleanup(executor.shutdown)
+        tasks = {f"stage_{index}": (_sleep_then_return, (index,), {"delay": 0.3}) for index in range(5)}
+
+        started = time.perf_counter()
+        with self.assertRaises(evaluation_executor.EvaluationCancelled):
+            executor.run(tasks, should_cancel=lambda: time.perf_counter() - started > 0.1)
+        self.assertLess(time.perf_counter() - started, 1.0)
+
+        inline = evaluation_executor.EvaluationExecutor(mode="inline")
+        with self.assertRaises(evaluation_executor.EvaluationCancelled):
+            inline.run(tasks, should_cancel=lambda: True)
+
+    def test_concurrency_cap_limits_simultaneous_evaluations(self):
+        executor = evaluation_executor.EvaluationExecutor(mode="thread", max_workers=4, max_concurrent_jobs=1)
+        self.addCleanup(executor.shutdown)
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def _tracked():
+            with lock:
+                active.append(1)
+                peak.append(len(active))
+            time.sleep(0.05)
+            with lock:
+                active.pop()
+            return True
+
+        threads = [
+            threading.Thread(target=executor.run, args=({"only": (_tracked, (), {})},))
+            for _ in range(3)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(max(peak), 1)
+
+    def test_client_disconnect_probe_without_socket_never_cancels(self):
+        self.assertFalse(evaluation_executor.client_disconnected_fn({})())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import compute_budget
+import evaluation_executor
+import evaluation_warehouse
+
+
+def _backtest_result(ticker, mape_offset=0.0):
+    def _model(mape, total_return):
+        return {
+            "predictions": [100.0, 101.0],
+            "metrics": {"mae": 1.0, "rmse": 1.2, "mape": mape, "r_squared": 0.8, "directional_accuracy": 55.0},
+            "returns": {
+                "initial_capital": 10000.0,
+                "final_value": 10000.0 + total_return * 100,
+                "total_return": total_return,
+                "buy_hold_return": 1.0,
+                "outperformance": total_return - 1.0,
+                "sharpe_ratio": 1.1,
+                "max_drawdown": -2.0,
+                "num_trades": 3,
+                "transaction_cost_bps": 0.0,
+                "slippage_bps": 0.0,
+                "portfolio_values": [10000.0, 10000.0 + total_return * 100],
+            },
+        }
+
+    models = {"ensemble": _model(1.5 + mape_offset, 2.0), "naive": _model(2.5 + mape_offset, -1.0)}
+    return {
+        "ticker": ticker,
+        "featureSpecVersion": "prediction-stack-v2",
+        "test_period": {"start_date": "2026-01-02", "end_date": "2026-03-27", "days": 60},
+        "models": models,
+        "returns": models["ensemble"]["returns"],
+        "best_model": "ensemble",
+    }
+
+
+class EvaluationWarehouseTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.warehouse = evaluation_warehouse.EvaluationWarehouse(self.tmpdir.name)
+
+    def test_run_universe_checkpoints_each_ticker_and_resumes(self):
+        calls = []
+
+        def _evaluate(ticker, options):
+            calls.append(ticker)
+            if ticker == "BROKEN":
+                raise RuntimeError("upstream unavailable")
+            if ticker == "TINY":
+                return []
+            return evaluation_warehouse.result_rows(ticker, _backtest_result(ticker), options, time.time())
+
+        first = evaluation_warehouse.run_universe(
+            ["aapl", "MSFT", "TINY", "BROKEN", "AAPL"],
+            warehouse=self.warehouse,
+            mode="thread",
+            max_workers=2,
+            evaluate_fn=_evaluate,
+        )
+        second = evaluation_warehouse.run_universe(
+            ["AAPL", "MSFT", "NVDA"], warehouse=self.warehouse, mode="inline", evaluate_fn=_evaluate
+        )
+
+        self.assertEqual(sorted(calls[:4]), ["AAPL", "BROKEN", "MSFT", "TINY"])
+        self.assertEqual((first["universe"], first["evaluated"], first["skipped"]), (4, 2, 0))
+        self.assertEqual(first["insufficientData"], ["TINY"])
+        self.assertIn("BROKEN", first["failed"])
+        self.assertEqual(calls[4:], ["NVDA"])
+        self.assertEqual((second["evaluated"], second["skipped"]), (1, 2))
+
+        evaluation_warehouse.run_universe(
+            ["AAPL"], warehouse=self.warehouse, mode="inline", fast_mode=False, evaluate_fn=_evaluate
+        )
+        self.assertEqual(calls[-1], "AAPL")
+
+    def test_load_result_round_trips_the_backtest_shape(self):
+        options = evaluation_warehouse.evaluation_options(60, True)
+        self.warehouse.write("AAPL", evaluation_warehouse.result_rows("AAPL", _backtest_result("AAPL"), options, time.time()))
+
+        result = self.warehouse.load_result("AAPL", test_days=60, fast_mode=True)
+
+        self.assertEqual(result["best_model"], "ensemble")
+        self.assertEqual(result["test_period"]["days"], 60)
+        self.assertEqual(result["models"]["naive"]["metrics"]["mape"], 2.5)
+        self.assertEqual(result["returns"]["num_trades"], 3)
+        self.assertEqual(result["returns"]["portfolio_values"], [10000.0, 10200.0])
+        self.assertIsNone(self.warehouse.load_result("AAPL", test_days=30, fast_mode=True))
+        self.assertIsNone(self.warehouse.load_result("MSFT"))
+
+        stale = evaluation_warehouse.result_rows("AAPL", _backtest_result("AAPL"), options, time.time() - 10 * 86400)
+        self.warehouse.write("AAPL", stale)
+        self.assertIsNone(self.warehouse.load_result("AAPL"))
+
+    def test_leaderboard_ranks_tickers_across_files(self):
+        options = evaluation_warehouse.evaluation_options()
+        for offset, ticker in enumerate(["AAPL", "MSFT", "NVDA"]):
+            rows = evaluation_warehouse.result_rows(ticker, _backtest_result(ticker, mape_offset=2.0 - offset), options, time.time())
+            self.warehouse.write(ticker, rows)
+
+        board = self.warehouse.leaderboard(metric="mape", limit=2)
+
+        self.assertEqual([row["ticker"] for row in board], ["NVDA", "MSFT"])
+        self.assertAlmostEqual(board[0]["value"], 1.5)
+        with self.assertRaises(ValueError):
+            self.warehouse.leaderboard(metric="ticker; DROP")
+
+
+    def test_reads_never_create_the_directory_and_the_default_pool_is_bounded(self):
+        missing = os.path.join(self.tmpdir.name, "missing")
+        warehouse = evaluation_warehouse.EvaluationWarehouse(missing)
+        self.assertIsNone(warehouse.load_result("AAPL"))
+        self.assertEqual(warehouse.leaderboard(), [])
+        self.assertFalse(os.path.exists(missing))
+
+        pools = []
+
+        def _build_pool(mode, max_workers):
+            pools.append(max_workers)
+            return evaluation_warehouse.ThreadPoolExecutor(max_workers=max_workers)
+
+        budget = compute_budget.ComputeBudget(core_budget=64)
+        tickers = [f"T{index}" for index in range(10)]
+        with mock.patch.object(compute_budget, "_BUDGET", budget), mock.patch.object(
+            evaluation_warehouse, "_build_pool", side_effect=_build_pool
+        ), mock.patch.dict(os.environ, {}, clear=False):
+            os.environ.pop("EVALUATION_MAX_WORKERS", None)
+            summary = evaluation_warehouse.run_universe(tickers, warehouse=warehouse, mode="thread", evaluate_fn=lambda ticker, options: [])
+
+        self.assertEqual(pools, [evaluation_executor.DEFAULT_MAX_POOL_WORKERS])
+        self.assertEqual(len(summary["insufficientData"]), 10)
+        self.assertFalse(os.path.exists(missing))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import os
+import sys
+import threading
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LinearRegression
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import explainability
+import prediction_service
+
+
+def _features(rows=300):
+    rng = np.random.default_rng(3)
+    frame = pd.DataFrame(rng.normal(size=(rows, 4)), columns=["lag1", "lag2", "ma5", "volume"])
+    target = 3.0 * frame["lag1"] - 1.0 * frame["ma5"] + rng.normal(scale=0.1, size=rows)
+    return frame, LinearRegression().fit(frame, target)
+
+
+class ExplainabilityEngineTests(unittest.TestCase):
+    def test_systematic_sample_spans_the_whole_history(self):
+        frame = pd.DataFrame({"value": np.arange(1000)})
+
+        sample = explainability.systematic_sample(frame, 32)
+
+        self.assertEqual(len(sample), 32)
+        self.assertEqual(sample["value"].iloc[0], 0)
+        self.assertEqual(sample["value"].iloc[-1], 999)
+        self.assertEqual(len(explainability.systematic_sample(frame.head(10), 32)), 10)
+
+    def test_summaries_are_memoized_and_explainers_reused(self):
+        frame, model = _features()
+        engine = explainability.ExplainabilityEngine(background_samples=16, explain_rows=24)
+        kwargs = {"serialize_fn": prediction_service._serialize_feature_importance, "clean_fn": prediction_service._clean_float}
+
+        with mock.patch.object(engine, "_explainer", wraps=engine._explainer) as build:
+            first = engine.summarize("linear_regression", model, frame, frame.tail(1), cache_key=("AAPL", (300,), 300), **kwargs)
+            again = engine.summarize("linear_regression", model, frame, frame.tail(1), cache_key=("AAPL", (300,), 300), **kwargs)
+            engine.summarize("linear_regression", model, frame, frame.iloc[[-2]], cache_key=("AAPL", (300,), 299), **kwargs)
+
+        self.assertIs(first, again)
+        self.assertEqual(build.call_count, 2)
+        self.assertEqual(len(engine._explainers), 1)
+        self.assertEqual(first["global_top_features"][0]["feature"], "lag1")
+        self.assertEqual(len(first["latest_prediction_contributors"]), 4)
+
+    def test_failed_summaries_are_not_memoized(self):
+        frame, model = _features()
+        engine = explainability.ExplainabilityEngine(background_samples=16, explain_rows=24)
+        kwargs = {"serialize_fn": prediction_service._serialize_feature_importance, "clean_fn": prediction_service._clean_float}
+
+        with mock.patch.object(engine, "_explainer", side_effect=RuntimeError("shap unavailable")):
+            self.assertIsNone(engine.summarize("linear_regression", model, frame, frame.tail(1), cache_key=("AAPL", (300,), 300), **kwargs))
+        summary = engine.summarize("linear_regression", model, frame, frame.tail(1), cache_key=("AAPL", (300,), 300), **kwargs)
+
+        self.assertEqual(summary["global_top_features"][0]["feature"], "lag1")
+
+    def test_background_mode_returns_pending_until_the_summary_is_ready(self):
+        engine = explainability.ExplainabilityEngine(background=True)
+        release = threading.Event()
+        calls = []
+
+        def _compute():
+            calls.append(1)
+            release.wait(5)
+            return {"linear_regression": {"global_top_features": []}}
+
+        self.assertEqual(engine.request("key", _compute), (explainability.PENDING, {}))
+        self.assertEqual(engine.request("key", _compute), (explainability.PENDING, {}))
+        release.set()
+        engine._pool.shutdown(wait=True)
+
+        status, explanations = engine.request("key", _compute)
+        self.assertEqual(status, explainability.READY)
+        self.assertIn("linear_regression", explanations)
+        self.assertEqual(len(calls), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
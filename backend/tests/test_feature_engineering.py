@@ -0,0 +1,118 @@
+import os
+import sys
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import feature_engineering
+import models
+import options_model
+
+
+def _legacy_features(df, lookback=14, *, partial_windows=True):
+    df = df.copy()
+    for i in range(1, lookback + 1):
+        df[f"lag_{i}"] = df["Close"].shift(i)
+    if partial_windows:
+        df["ma_7"] = df["Close"].rolling(window=7, min_periods=1).mean()
+        df["ma_14"] = df["Close"].rolling(window=14, min_periods=1).mean()
+        df["ma_30"] = df["Close"].rolling(window=30, min_periods=1).mean()
+        df["volatility"] = df["Close"].rolling(window=7, min_periods=2).std()
+    else:
+        df["ma_7"] = df["Close"].rolling(window=7).mean()
+        df["ma_14"] = df["Close"].rolling(window=14).mean()
+        df["ma_30"] = df["Close"].rolling(window=30).mean() if len(df) > 30 else df["Close"].mean()
+        df["volatility"] = df["Close"].rolling(window=7).std()
+    df["price_change"] = df["Close"].pct_change()
+    return df.dropna()
+
+
+def _ohlcv(rows, ticker="AAPL"):
+    index = pd.bdate_range("2025-01-02", periods=rows)
+    close = 100.0 + np.cumsum(np.sin(np.arange(rows)) + 0.2)
+    frame = pd.DataFrame({"Close": close, "Volume": np.arange(rows, dtype=float) + 1_000}, index=index)
+    frame.attrs["ticker"] = ticker
+    return frame
+
+
+class FeatureEngineeringTests(unittest.TestCase):
+    def setUp(self):
+        feature_engineering.clear_cache()
+        self.addCleanup(feature_engineering.clear_cache)
+
+    def test_matches_legacy_pandas_features_for_both_window_modes(self):
+        for rows in (5, 20, 31, 45, 250):
+            for partial_windows in (True, False):
+                with self.subTest(rows=rows, partial_windows=partial_windows):
+                    frame = _ohlcv(rows)
+                    expected = _legacy_features(frame, 14, partial_windows=partial_windows)
+                    actual = feature_engineering.create_features(frame, 14, partial_windows=partial_windows)
+                    self.assertEqual(list(actual.columns), list(expected.columns))
+                    self.assertTrue(actual.index.equals(expected.index))
+                    np.testing.assert_allclose(actual.to_numpy(), expected.to_numpy(), rtol=1e-9, atol=1e-9)
+
+    def test_models_and_options_share_the_memoized_matrix(self):
+        frame = _ohlcv(120)
+        build = mock.Mock(wraps=feature_engineering._partial_window_matrix)
+        with mock.patch.object(feature_engineering, "_partial_window_matrix", build):
+            first = models.create_features(frame)
+            second = models.create_features(frame.copy())
+            options_model.create_features(frame)
+
+        build.assert_called_once()
+        self.assertEqual(len(feature_engineering._CACHE), 2)
+        pd.testing.assert_frame_equal(first, second)
+        cached = feature_engineering.feature_frame(frame)
+        with self.assertRaises(ValueError):
+            cached.to_numpy()[0, 0] = 0.0
+
+        first["Target"] = 1
+        self.assertNotIn("Target", models.create_features(frame).columns)
+
+    def test_options_signal_trains_on_the_trailing_two_years_of_stored_bars(self):
+        frame = _ohlcv(800)
+        seen = []
+        store = mock.Mock(get=mock.Mock(return_value=frame))
+        with mock.patch.object(options_model.bar_store, "get_bar_store", return_value=store), mock.patch.object(
+            options_model, "random_forest_classifier_predict", side_effect=lambda df: seen.append(df) or 0.7
+        ):
+            signal = options_model.get_ml_prediction_signal("AAPL", 100.0)
+
+        self.assertEqual(signal, {"direction": "Buy", "prob": 0.7})
+        self.assertEqual(list(seen[0].columns), ["Close"])
+        self.assertEqual(seen[0].index[-1], frame.index[-1])
+        self.assertGreater(seen[0].index[0], frame.index[-1] - pd.DateOffset(years=2))
+        self.assertLess(len(seen[0]), len(frame))
+
+    def test_missing_closes_only_affect_the_windows_that_contain_them(self):
+        for rows, missing in ((120, (40,)), (120, (10, 11, 90)), (25, (3,))):
+            frame = _ohlcv(rows)
+            frame.iloc[list(missing), 0] = np.nan
+            for partial_windows in (True, False):
+                with self.subTest(rows=rows, missing=missing, partial_windows=partial_windows):
+                    feature_engineering.clear_cache()
+                    expected = _legacy_features(frame, 14, partial_windows=partial_windows)
+                    actual = feature_engineering.create_features(frame, 14, partial_windows=partial_windows)
+                    self.assertTrue(actual.index.equals(expected.index))
+                    np.testing.assert_allclose(actual.to_numpy(), expected.to_numpy(), rtol=1e-9, atol=1e-9)
+
+    def test_new_bars_or_revised_closes_miss_the_cache(self):
+        frame = _ohlcv(120)
+        feature_engineering.create_features(frame)
+        revised = frame.copy()
+        revised.iloc[-1, 0] += 1.0
+
+        features = feature_engineering.create_features(revised)
+        feature_engineering.create_features(_ohlcv(121))
+
+        self.assertEqual(len(feature_engineering._CACHE), 3)
+        self.assertAlmostEqual(features["lag_1"].iloc[-1], frame["Close"].iloc[-2])
+        self.assertAlmostEqual(features["ma_7"].iloc[-1], revised["Close"].iloc[-7:].mean())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,142 @@
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import forecast_cache
+
+
+class _FittedModel:
+    def __init__(self, payload_size=1_000):
+        self.coef_ = np.ones(payload_size)
+
+
+class ForecastCacheTests(unittest.TestCase):
+    def test_local_tier_evicts_least_recently_used_entries(self):
+        cache = forecast_cache.TieredForecastCache(
+            forecast_cache.InMemoryForecastCache(max_entries=2, max_bytes=10_000_000, ttl_seconds=60)
+        )
+        cache.set(("ohlcv", "AAPL"), {"close": np.arange(3.0)})
+        cache.set(("ohlcv", "MSFT"), {"close": np.arange(3.0)})
+        self.assertIsNotNone(cache.get(("ohlcv", "AAPL")))
+        cache.set(("ohlcv", "NVDA"), {"close": np.arange(3.0)})
+
+        self.assertIsNotNone(cache.get(("ohlcv", "AAPL")))
+        self.assertIsNone(cache.get(("ohlcv", "MSFT")))
+        self.assertIsNotNone(cache.get(("ohlcv", "NVDA")))
+
+    def test_local_tier_respects_byte_budget(self):
+        local = forecast_cache.InMemoryForecastCache(max_entries=100, max_bytes=20_000, ttl_seconds=60)
+        local.set("a", np.zeros(1_000))
+        local.set("b", np.zeros(1_000))
+        local.set("c", np.zeros(1_000))
+        local.set("too-big", np.zeros(10_000))
+
+        self.assertLessEqual(local.stats()["bytes"], 20_000)
+        self.assertIsNone(local.get("a"))
+        self.assertIsNone(local.get("too-big"))
+        self.assertIsNotNone(local.get("c"))
+
+    def test_entries_expire_after_ttl(self):
+        local = forecast_cache.InMemoryForecastCache(ttl_seconds=60)
+        local.set("key", {"value": 1}, stored_at=0.0)
+        self.assertIsNone(local.get("key"))
+        self.assertEqual(len(local), 0)
+
+    def test_hits_share_frozen_leaves_instead_of_deep_copying(self):
+        cache = forecast_cache.TieredForecastCache(forecast_cache.InMemoryForecastCache())
+        model = _FittedModel()
+        frame = pd.DataFrame({"lag1": [1.0, 2.0]})
+        cache.set(("ml_forecast", "AAPL"), {"predictions": {"linear_regression": np.array([1.0, 2.0])}, "models": {"lr": model}, "feature_frame": frame})
+
+        first = cache.get(("ml_forecast", "AAPL"))
+        second = cache.get(("ml_forecast", "AAPL"))
+
+        self.assertIs(first["models"]["lr"], model)
+        self.assertIs(first["predictions"]["linear_regression"], second["predictions"]["linear_regression"])
+        self.assertFalse(first["predictions"]["linear_regression"].flags.writeable)
+        with self.assertRaises(ValueError):
+            first["predictions"]["linear_regression"][0] = 99.0
+
+        first["predictions"]["extra"] = np.array([0.0])
+        first["feature_frame"]["new_column"] = 1.0
+        third = cache.get(("ml_forecast", "AAPL"))
+        self.assertNotIn("extra", third["predictions"])
+        self.assertNotIn("new_column", third["feature_frame"].columns)
+
+    def test_freezing_leaves_the_callers_values_writable_and_detached(self):
+        cache = forecast_cache.TieredForecastCache(forecast_cache.InMemoryForecastCache())
+        values = np.array([1.0, 2.0])
+        frame = pd.DataFrame({"lag1": [1.0, 2.0]})
+        cache.set(("ohlcv", "AAPL"), {"values": values, "frame": frame})
+
+        values[0] = 50.0
+        frame.iloc[0, 0] = 50.0
+        hit = cache.get(("ohlcv", "AAPL"))
+        hit["frame"].iloc[1, 0] = 70.0
+
+        self.assertTrue(values.flags.writeable)
+        fresh = cache.get(("ohlcv", "AAPL"))
+        self.assertEqual(fresh["values"].tolist(), [1.0, 2.0])
+        self.assertEqual(fresh["frame"]["lag1"].tolist(), [1.0, 2.0])
+        self.assertGreater(forecast_cache.estimate_nbytes({"lr": _FittedModel(10_000)}), 80_000)
+
+    def test_disk_shared_tier_is_reused_across_workers_for_shared_namespaces(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            shared = forecast_cache.build_shared_backend(f"file://{tmpdir}", ttl_seconds=60)
+            worker_a = forecast_cache.TieredForecastCache(forecast_cache.InMemoryForecastCache(), shared=shared)
+            worker_b = forecast_cache.TieredForecastCache(
+                forecast_cache.InMemoryForecastCache(),
+                shared=forecast_cache.DiskForecastCache(tmpdir, ttl_seconds=60),
+            )
+
+            worker_a.set(("ensemble_weights", "AAPL", 250), {"auto_arima": 0.4, "linear_regression": 0.6})
+            worker_a.set(("prediction_snapshot", "AAPL"), {"recentClose": 140.0})
+
+            self.assertEqual(
+                worker_b.get(("ensemble_weights", "AAPL", 250)),
+                {"auto_arima": 0.4, "linear_regression": 0.6},
+            )
+            self.assertIsNone(worker_b.get(("prediction_snapshot", "AAPL")))
+            self.assertEqual(len(worker_b), 1)
+
+    def test_disk_tier_sweeps_expired_and_over_budget_entries(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            shared = forecast_cache.DiskForecastCache(tmpdir, ttl_seconds=60, max_bytes=2_500)
+            for position in range(4):
+                key = forecast_cache.serialize_key(("stats_forecast", f"T{position}"))
+                shared.set(key, np.zeros(100), stored_at=0.0)
+                os.utime(shared._path(key), (1_000.0 + position, 1_000.0 + position))
+
+            self.assertEqual(shared.sweep(now=1_010.0), 2)
+            self.assertIsNone(shared.get(forecast_cache.serialize_key(("stats_forecast", "T0"))))
+            self.assertTrue(os.path.exists(shared._path(forecast_cache.serialize_key(("stats_forecast", "T3")))))
+            self.assertEqual(shared.sweep(now=2_000.0), 2)
+            self.assertEqual(os.listdir(os.path.join(tmpdir, "stats_forecast")), [])
+
+    def test_shared_tier_failures_degrade_to_local_cache(self):
+        class _BrokenShared:
+            def get(self, key):
+                raise ConnectionError("redis down")
+
+            def set(self, key, value, *, stored_at):
+                raise ConnectionError("redis down")
+
+        logger = type("Logger", (), {"warning": lambda *args, **kwargs: None})()
+        cache = forecast_cache.TieredForecastCache(
+            forecast_cache.InMemoryForecastCache(),
+            shared=_BrokenShared(),
+            logger=logger,
+        )
+        self.assertIsNone(cache.get(("stats_forecast", "AAPL", 250, 7)))
+        cache.set(("stats_forecast", "AAPL", 250, 7), {"predictions": {}})
+        self.assertEqual(cache.get(("stats_forecast", "AAPL", 250, 7)), {"predictions": {}})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,143 @@
+import importlib.util
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import MinMaxScaler
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import model_artifact_store
+import models
+
+_TORCH_AVAILABLE = importlib.util.find_spec("torch") is not None
+
+
+def _close_frame(rows=120, ticker="AAPL"):
+    index = pd.bdate_range("2025-01-02", periods=rows)
+    frame = pd.DataFrame({"Close": np.linspace(100.0, 140.0, rows) + np.sin(np.arange(rows))}, index=index)
+    frame.attrs["ticker"] = ticker
+    return frame
+
+
+class ModelArtifactStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def test_round_trips_weights_and_scaler_parameters(self):
+        store = model_artifact_store.ModelArtifactStore(self.tmpdir.name)
+        scaler = MinMaxScaler().fit(np.array([[1.0, 10.0], [3.0, 30.0]]))
+        key = model_artifact_store.artifact_key("aapl", "lstm", "prediction-stack-v2", {"hidden_size": 64})
+
+        store.save(key, {"state_dict": {"fc.weight": np.ones((2, 2))}, "scaler_X": model_artifact_store.scaler_state(scaler)})
+        loaded = store.load(key)
+
+        restored = model_artifact_store.restore_scaler(loaded["scaler_X"])
+        np.testing.assert_allclose(restored.transform([[2.0, 20.0]]), scaler.transform([[2.0, 20.0]]))
+        np.testing.assert_allclose(loaded["state_dict"]["fc.weight"], np.ones((2, 2)))
+        self.assertTrue(key.startswith("AAPL-lstm-"))
+        self.assertNotEqual(key, model_artifact_store.artifact_key("AAPL", "lstm", "prediction-stack-v2", {"hidden_size": 32}))
+
+    def test_concurrent_saves_of_one_key_do_not_share_a_temporary_file(self):
+        store = model_artifact_store.ModelArtifactStore(self.tmpdir.name)
+        errors = []
+
+        def _save(value):
+            try:
+                for _ in range(20):
+                    store.save("shared", {"blob": np.full(2_000, value)})
+            except OSError as exc:
+                errors.append(exc)
+
+        threads = [threading.Thread(target=_save, args=(value,)) for value in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertIn(float(store.load("shared")["blob"][0]), {0.0, 1.0, 2.0, 3.0})
+        self.assertEqual([name for name in os.listdir(self.tmpdir.name) if name.endswith(".tmp")], [])
+
+    def test_evicts_by_age_and_total_size(self):
+        store = model_artifact_store.ModelArtifactStore(self.tmpdir.name, max_age_seconds=60, max_total_bytes=3_000)
+        store.save("old", {"blob": np.zeros(100)})
+        old_path = store._path("old")
+        os.utime(old_path, (time.time() - 120, time.time() - 120))
+        self.assertIsNone(store.load("old"))
+        self.assertFalse(os.path.exists(old_path))
+
+        for index in range(4):
+            store.save(f"artifact-{index}", {"blob": np.zeros(100)})
+            os.utime(store._path(f"artifact-{index}"), (time.time() - 10 + index, time.time() - 10 + index))
+        summary = store.evict()
+
+        self.assertLessEqual(summary["bytes"], 3_000)
+        self.assertIsNone(store.load("artifact-0"))
+        self.assertIsNotNone(store.load("artifact-3"))
+
+    def test_artifact_status_tracks_data_watermark(self):
+        frame = _close_frame()
+        artifact = {
+            "watermark": {"last_index": frame.index[-1], "last_close": float(frame["Close"].iloc[-1])},
+            "fine_tunes": 0,
+        }
+        self.assertEqual(models._artifact_status(artifact, frame), "fresh")
+
+        newer = pd.concat([frame, _close_frame(122).iloc[-2:] + 5.0])
+        self.assertEqual(models._artifact_status(artifact, newer), "stale")
+        self.assertIsNone(models._artifact_status(dict(artifact, fine_tunes=models.MAX_FINE_TUNES), newer))
+
+        revised = frame.copy()
+        revised.iloc[-1, 0] += 1.0
+        self.assertIsNone(models._artifact_status(artifact, revised))
+        self.assertIsNone(models._artifact_status(None, frame))
+
+    def test_sequence_artifact_lookup_follows_key_and_watermark_without_torch(self):
+        store = model_artifact_store.ModelArtifactStore(self.tmpdir.name)
+        frame = _close_frame()
+        hyperparameters = {"hidden_size": 64, "epochs": 2}
+        with mock.patch.object(models, "_ARTIFACT_STORE", store):
+            _store, key, artifact, status = models._sequence_artifact("lstm", frame, ticker=None, hyperparameters=hyperparameters)
+            self.assertEqual((artifact, status), (None, None))
+            store.save(key, {"watermark": {"last_index": frame.index[-1], "last_close": float(frame["Close"].iloc[-1])}, "fine_tunes": 0})
+
+            self.assertEqual(models._sequence_artifact("lstm", frame, ticker="aapl", hyperparameters=hyperparameters)[3], "fresh")
+            newer = pd.concat([frame, _close_frame(122).iloc[-2:] + 5.0])
+            self.assertEqual(models._sequence_artifact("lstm", newer, ticker="AAPL", hyperparameters=hyperparameters)[3], "stale")
+            self.assertIsNone(models._sequence_artifact("lstm", frame, ticker="AAPL", hyperparameters=dict(hyperparameters, epochs=3))[2])
+            self.assertIsNone(models._sequence_artifact("transformer", frame, ticker="AAPL", hyperparameters=hyperparameters)[2])
+            with mock.patch.object(models.prediction_service, "FEATURE_SPEC_VERSION", "next-spec"):
+                self.assertIsNone(models._sequence_artifact("lstm", frame, ticker="AAPL", hyperparameters=hyperparameters)[2])
+
+        with mock.patch.object(models, "_ARTIFACT_STORE", None):
+            self.assertEqual(models._sequence_artifact("lstm", frame, ticker="AAPL", hyperparameters=hyperparameters), (None, None, None, None))
+        with mock.patch.dict(os.environ, {"MODEL_ARTIFACT_DIR": ""}):
+            self.assertIsNone(model_artifact_store.build_artifact_store())
+        with mock.patch.dict(os.environ, {"MODEL_ARTIFACT_DIR": self.tmpdir.name}):
+            self.assertEqual(model_artifact_store.build_artifact_store().directory, self.tmpdir.name)
+
+    @unittest.skipUnless(_TORCH_AVAILABLE, "torch is not installed")
+    def test_lstm_reuses_artifact_and_warm_starts_on_new_bars(self):
+        store = model_artifact_store.ModelArtifactStore(self.tmpdir.name)
+        frame = _close_frame(160)
+        with mock.patch.object(models, "_ARTIFACT_STORE", store), mock.patch.object(
+            models, "_run_epochs", wraps=models._run_epochs
+        ) as run_epochs:
+            models.lstm_train(frame.iloc[:-2], epochs=2)
+            models.lstm_train(frame.iloc[:-2], epochs=2)
+            models.lstm_train(frame, epochs=2)
+
+        epochs = [call.kwargs["epochs"] for call in run_epochs.call_args_list]
+        self.assertEqual(epochs, [2, models.FINE_TUNE_EPOCHS])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import model_selection
+
+CANDIDATES = ("linear_regression", "random_forest", "lstm")
+
+
+class ModelSelectorTests(unittest.TestCase):
+    def _refresh(self, selector, bar, weights):
+        active = selector.select("AAPL", bar, CANDIDATES)
+        selector.observe("AAPL", bar, weights)
+        return active
+
+    def test_low_weight_models_are_pruned_after_patience_and_retested(self):
+        selector = model_selection.ModelSelector(threshold=0.01, patience=2, retest_every=4)
+        weights = {"linear_regression": 0.7, "random_forest": 0.295, "lstm": 0.005}
+
+        active = [self._refresh(selector, bar, weights) for bar in range(1, 6)]
+
+        self.assertEqual(active[0], CANDIDATES)
+        self.assertEqual(active[1], CANDIDATES)
+        self.assertEqual(active[2], ("linear_regression", "random_forest"))
+        self.assertEqual(active[3], CANDIDATES)
+        self.assertEqual(active[4], ("linear_regression", "random_forest"))
+        self.assertEqual(selector.report("AAPL")["pruned"], ["lstm"])
+
+    def test_a_retested_model_that_earns_weight_comes_back(self):
+        selector = model_selection.ModelSelector(threshold=0.01, patience=1, retest_every=3)
+        self._refresh(selector, 1, {"linear_regression": 1.0})
+        self._refresh(selector, 2, {"linear_regression": 1.0})
+        self._refresh(selector, 3, {"linear_regression": 0.5, "lstm": 0.5})
+
+        self.assertEqual(selector.select("AAPL", 4, CANDIDATES), ("linear_regression", "lstm"))
+
+    def test_fitted_members_the_weighting_gives_nothing_are_pruned(self):
+        selector = model_selection.ModelSelector(threshold=0.01, patience=1, retest_every=100)
+        weights = {"linear_regression": 0.995, "random_forest": 0.005}
+
+        active = [self._refresh(selector, bar, weights) for bar in range(1, 4)]
+
+        self.assertEqual(active[0], CANDIDATES)
+        self.assertEqual(active[-1], ("linear_regression",))
+        self.assertEqual(selector.report("AAPL")["pruned"], ["random_forest", "lstm"])
+
+    def test_each_watermark_is_counted_once(self):
+        selector = model_selection.ModelSelector(threshold=0.01, patience=2)
+        for _ in range(3):
+            self._refresh(selector, 1, {"linear_regression": 1.0})
+
+        self.assertEqual(selector.select("AAPL", 1, CANDIDATES), CANDIDATES)
+
+    def test_report_estimates_fit_time_saved_against_the_full_run(self):
+        selector = model_selection.ModelSelector(threshold=0.01, patience=1)
+        self._refresh(selector, 1, {"linear_regression": 1.0, "random_forest": 0.5, "lstm": 0.001})
+        selector.record_fit("AAPL", "ml", 2.0, complete=True)
+        selector.record_fit("AAPL", "lstm", 6.0, complete=True)
+        self._refresh(selector, 2, {"linear_regression": 1.0, "random_forest": 0.5})
+        selector.record_fit("AAPL", "ml", 1.9, complete=True)
+        selector.record_fit("AAPL", "lstm", 0.0, complete=False)
+
+        report = selector.report("AAPL")
+
+        self.assertEqual(report["pruned"], ["lstm"])
+        self.assertEqual(report["computeSaved"]["fitSeconds"], 1.9)
+        self.assertEqual(report["computeSaved"]["baselineFitSeconds"], 7.9)
+        self.assertEqual(report["computeSaved"]["estimatedSecondsSaved"], 6.0)
+
+    def test_disabled_selector_runs_every_candidate(self):
+        selector = model_selection.ModelSelector(patience=1, enabled=False)
+        for bar in range(1, 4):
+            self.assertEqual(self._refresh(selector, bar, {}), CANDIDATES)
+        self.assertFalse(selector.report("AAPL")["enabled"])
+
+
+if __name__ == "__main__":
+    unittest.main()
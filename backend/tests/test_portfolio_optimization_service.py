@@ -71,8 +71,8 @@ class PortfolioOptimizationServiceTests(unittest.TestCase):
 
         with patch.object(optimization_service, "_load_market_inputs", return_value=(prices, metadata, [])), patch.object(
             optimization_service.prediction_service,
-            "get_prediction_snapshot",
-            side_effect=lambda ticker: prediction_snapshots.get(ticker),
+            "forecast_many",
+            side_effect=lambda tickers: {ticker: prediction_snapshots.get(ticker) for ticker in tickers},
         ):
             payload = optimization_service.optimize_paper_portfolio(
                 self.portfolio,
@@ -99,8 +99,8 @@ class PortfolioOptimizationServiceTests(unittest.TestCase):
 
         with patch.object(optimization_service, "_load_market_inputs", return_value=(prices, metadata, [])), patch.object(
             optimization_service.prediction_service,
-            "get_prediction_snapshot",
-            return_value=None,
+            "forecast_many",
+            return_value={},
         ):
             payload = optimization_service.optimize_paper_portfolio(
                 self.portfolio,
@@ -0,0 +1,156 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import prediction_jobs
+from user_state_store import reset_runtime_state
+
+
+def _wait_for(queue, job_id, timeout=5.0, owner_id=None):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = queue.get(job_id, owner_id=owner_id)
+        if job["status"] not in prediction_jobs.ACTIVE_STATUSES:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+class PredictionJobQueueTests(unittest.TestCase):
+    def _queue(self, store, runners):
+        queue = prediction_jobs.PredictionJobQueue(store, runners, max_workers=2)
+        self.addCleanup(queue.shutdown, wait=True)
+        return queue
+
+    def test_identical_in_flight_submissions_are_deduplicated(self):
+        release = threading.Event()
+        calls = []
+
+        def _evaluate(ticker, test_days):
+            calls.append((ticker, test_days))
+            release.wait(5)
+            return {"ticker": ticker, "days": test_days}
+
+        queue = self._queue(prediction_jobs.InMemoryJobStore(), {"evaluation": _evaluate})
+        first, first_deduplicated = queue.submit("evaluation", {"ticker": "AAPL", "test_days": 60})
+        second, second_deduplicated = queue.submit("evaluation", {"test_days": 60, "ticker": "AAPL"})
+        other, _ = queue.submit("evaluation", {"ticker": "AAPL", "test_days": 30})
+        release.set()
+
+        self.assertFalse(first_deduplicated)
+        self.assertTrue(second_deduplicated)
+        self.assertEqual(first["id"], second["id"])
+        self.assertNotEqual(first["id"], other["id"])
+        finished = _wait_for(queue, first["id"])
+        self.assertEqual(finished["status"], "succeeded")
+        self.assertEqual(finished["result"], {"ticker": "AAPL", "days": 60})
+        _wait_for(queue, other["id"])
+        self.assertEqual(sorted(calls), [("AAPL", 30), ("AAPL", 60)])
+
+        rerun, rerun_deduplicated = queue.submit("evaluation", {"ticker": "AAPL", "test_days": 60})
+        self.assertFalse(rerun_deduplicated)
+        self.assertNotEqual(rerun["id"], first["id"])
+
+    def test_failures_and_missing_results_are_reported(self):
+        def _broken(ticker):
+            raise RuntimeError("stack unavailable")
+
+        queue = self._queue(
+            prediction_jobs.InMemoryJobStore(),
+            {"evaluation": _broken, "prediction": lambda ticker: None},
+        )
+        failed, _ = queue.submit("evaluation", {"ticker": "AAPL"})
+        empty, _ = queue.submit("prediction", {"ticker": "NEWCO"})
+
+        self.assertEqual(_wait_for(queue, failed["id"])["error"], "stack unavailable")
+        self.assertEqual(_wait_for(queue, empty["id"])["status"], "failed")
+        with self.assertRaises(ValueError):
+            queue.submit("unknown", {})
+
+    def test_sql_store_shares_statuses_and_dedupes_across_queues(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            reset_runtime_state()
+            self.addCleanup(reset_runtime_state)
+            database_url = f"sqlite:///{os.path.join(tmpdir, 'jobs.db')}"
+            release = threading.Event()
+
+            def _snapshot(ticker):
+                release.wait(5)
+                return {"recentClose": 140.0, "ticker": ticker}
+
+            worker_a = self._queue(prediction_jobs.SqlJobStore(database_url), {"prediction": _snapshot})
+            worker_b = self._queue(prediction_jobs.SqlJobStore(database_url), {"prediction": _snapshot})
+
+            job, _ = worker_a.submit("prediction", {"ticker": "MSFT"})
+            duplicate, deduplicated = worker_b.submit("prediction", {"ticker": "MSFT"})
+            release.set()
+
+            self.assertTrue(deduplicated)
+            self.assertEqual(duplicate["id"], job["id"])
+            finished = _wait_for(worker_b, job["id"])
+            self.assertEqual(finished["result"], {"recentClose": 140.0, "ticker": "MSFT"})
+            self.assertIsNotNone(finished["finishedAt"])
+            self.assertIsNone(worker_b.get("not-a-job-id"))
+
+    def test_jobs_are_private_to_their_owner(self):
+        queue = self._queue(prediction_jobs.InMemoryJobStore(), {"prediction": lambda ticker: {"ticker": ticker}})
+        mine, _ = queue.submit("prediction", {"ticker": "AAPL"}, owner_id="user_a")
+        theirs, deduplicated = queue.submit("prediction", {"ticker": "AAPL"}, owner_id="user_b")
+
+        self.assertFalse(deduplicated)
+        self.assertNotEqual(mine["id"], theirs["id"])
+        self.assertEqual(_wait_for(queue, mine["id"], owner_id="user_a")["result"], {"ticker": "AAPL"})
+        self.assertIsNone(queue.get(mine["id"], owner_id="user_b"))
+        self.assertIsNone(queue.get(mine["id"]))
+
+    def test_unstorable_results_fail_the_job_and_orphans_expire(self):
+        class _UnserializableStore(prediction_jobs.InMemoryJobStore):
+            def update(self, job_id, *, status, result=None, error=None):
+                if status == "succeeded":
+                    raise TypeError("Object of type Booster is not JSON serializable")
+                super().update(job_id, status=status, result=result, error=error)
+
+        queue = self._queue(_UnserializableStore(), {"prediction": lambda ticker: {"model": object()}})
+        job, _ = queue.submit("prediction", {"ticker": "AAPL"})
+        finished = _wait_for(queue, job["id"])
+        self.assertEqual((finished["status"], finished["error"]), ("failed", "Object of type Booster is not JSON serializable"))
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            reset_runtime_state()
+            self.addCleanup(reset_runtime_state)
+            store = prediction_jobs.SqlJobStore(f"sqlite:///{os.path.join(tmpdir, 'jobs.db')}")
+            orphan, created = store.claim(kind="prediction", dedupe_key="k", params={"ticker": "AAPL"})
+            self.assertTrue(created)
+            self.assertEqual(store.claim(kind="prediction", dedupe_key="k", params={})[0]["id"], orphan["id"])
+
+            restarted = prediction_jobs.PredictionJobQueue(store, {"prediction": lambda ticker: {"ticker": ticker}}, stale_seconds=1)
+            self.addCleanup(restarted.shutdown, wait=True)
+            time.sleep(1.1)
+            expired = restarted.get(orphan["id"])
+            self.assertEqual((expired["status"], expired["error"]), ("failed", prediction_jobs.ABANDONED_ERROR))
+            fresh, created = store.claim(kind="prediction", dedupe_key="k", params={"ticker": "AAPL"})
+            self.assertTrue(created)
+            self.assertNotEqual(fresh["id"], orphan["id"])
+
+    def test_running_jobs_heartbeat_past_the_stale_window(self):
+        release = threading.Event()
+        queue = prediction_jobs.PredictionJobQueue(
+            prediction_jobs.InMemoryJobStore(),
+            {"evaluation": lambda ticker: release.wait(5) and {"ticker": ticker}},
+            stale_seconds=1,
+        )
+        self.addCleanup(queue.shutdown, wait=True)
+        job, _ = queue.submit("evaluation", {"ticker": "AAPL"})
+        time.sleep(1.5)
+        self.assertEqual(queue.get(job["id"])["status"], "running")
+        release.set()
+        self.assertEqual(_wait_for(queue, job["id"])["status"], "succeeded")
+
+
+if __name__ == "__main__":
+    unittest.main()
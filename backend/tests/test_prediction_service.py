@@ -1,6 +1,8 @@
 import os
 import sys
+import threading
 import unittest
+from unittest import mock
 
 import numpy as np
 import pandas as pd
@@ -30,25 +32,35 @@ class PredictionServiceTests(unittest.TestCase):
         self.original = {
             "load_canonical_ohlcv": prediction_service._load_canonical_ohlcv,
             "predict_components": prediction_service._predict_production_components,
-            "prepare_cv_frames": prediction_service._prepare_cv_frames,
             "ensemble_weights": prediction_service._ensemble_weights_from_recent_cv,
             "build_explainability": prediction_service._build_evaluation_explainability,
             "build_long_frame": prediction_service._build_long_frame,
             "build_statsforecast": prediction_service._build_statsforecast,
             "build_mlforecast": prediction_service._build_mlforecast,
+            "forecast_ml_models": prediction_service._forecast_ml_models,
+            "forecast_statistical_models": prediction_service._forecast_statistical_models,
+            "evaluation_stage_tasks": prediction_service._evaluation_stage_tasks,
+            "get_evaluation_executor": prediction_service.evaluation_executor.get_evaluation_executor,
         }
         prediction_service._CACHE.clear()
+        prediction_service._ERROR_BUFFERS.clear()
+        prediction_service._MODEL_SELECTOR.clear()
 
     def tearDown(self):
         prediction_service._load_canonical_ohlcv = self.original["load_canonical_ohlcv"]
         prediction_service._predict_production_components = self.original["predict_components"]
-        prediction_service._prepare_cv_frames = self.original["prepare_cv_frames"]
         prediction_service._ensemble_weights_from_recent_cv = self.original["ensemble_weights"]
         prediction_service._build_evaluation_explainability = self.original["build_explainability"]
         prediction_service._build_long_frame = self.original["build_long_frame"]
         prediction_service._build_statsforecast = self.original["build_statsforecast"]
         prediction_service._build_mlforecast = self.original["build_mlforecast"]
+        prediction_service._forecast_ml_models = self.original["forecast_ml_models"]
+        prediction_service._forecast_statistical_models = self.original["forecast_statistical_models"]
+        prediction_service._evaluation_stage_tasks = self.original["evaluation_stage_tasks"]
+        prediction_service.evaluation_executor.get_evaluation_executor = self.original["get_evaluation_executor"]
         prediction_service._CACHE.clear()
+        prediction_service._ERROR_BUFFERS.clear()
+        prediction_service._MODEL_SELECTOR.clear()
 
     def test_prediction_snapshot_preserves_contract(self):
         ohlcv = _sample_ohlcv()
@@ -73,6 +85,85 @@ class PredictionServiceTests(unittest.TestCase):
         self.assertEqual(snapshot["predictions"][0]["date"], "2026-04-03")
         self.assertIn("confidence", snapshot)
 
+    def test_forecast_many_runs_one_statsforecast_panel_and_matches_snapshot_shape(self):
+        histories = {"AAPL": _sample_ohlcv(), "MSFT": _sample_ohlcv(200), "TINY": _sample_ohlcv(30)}
+        prediction_service._load_canonical_ohlcv = lambda ticker: histories[ticker].copy()
+        prediction_service._ensemble_weights_from_recent_cv = lambda ohlcv_arg, ticker: {
+            "auto_arima": 0.5,
+            "linear_regression": 0.5,
+        }
+        prediction_service._forecast_ml_models = lambda ohlcv_arg, model_names, horizon, ticker: {
+            "predictions": {"linear_regression": np.full(horizon, float(ohlcv_arg["Close"].iloc[-1]) + 1.0)},
+            "future_dates": list(pd.bdate_range("2026-04-03", periods=horizon)),
+        }
+        forecast_calls = []
+
+        class _PanelStatsForecast:
+            def forecast(self, h, df):
+                forecast_calls.append(sorted(df["unique_id"].unique()))
+                frames = [
+                    pd.DataFrame({"unique_id": [uid] * h, "auto_arima": np.full(h, 150.0)})
+                    for uid in df["unique_id"].unique()
+                ]
+                return pd.concat(frames).set_index("unique_id")
+
+        prediction_service._build_statsforecast = lambda: _PanelStatsForecast()
+
+        results = prediction_service.forecast_many(["aapl", "MSFT", "AAPL", "TINY"], horizon=3)
+
+        self.assertEqual(forecast_calls, [["AAPL", "MSFT"]])
+        self.assertEqual(list(results), ["AAPL", "MSFT", "TINY"])
+        self.assertIsNone(results["TINY"])
+        self.assertEqual(results["AAPL"]["recentClose"], 140.0)
+        self.assertEqual(results["AAPL"]["recentPredicted"], 145.5)
+        self.assertEqual(results["AAPL"]["modelsUsed"], ["linear_regression", "auto_arima"])
+        self.assertEqual([point["day"] for point in results["MSFT"]["predictions"]], [1, 2, 3])
+
+        snapshot = prediction_service.get_prediction_snapshot("AAPL")
+        self.assertEqual(snapshot, results["AAPL"])
+        self.assertEqual(len(forecast_calls), 1)
+
+    def test_forecast_many_isolates_a_ticker_whose_forecast_fails(self):
+        histories = {"AAPL": _sample_ohlcv(), "BAD": _sample_ohlcv(), "MSFT": _sample_ohlcv(200)}
+        prediction_service._load_canonical_ohlcv = lambda ticker: histories[ticker].copy()
+        prediction_service._ensemble_weights_from_recent_cv = lambda ohlcv_arg, ticker: {"auto_arima": 1.0}
+        prediction_service._forecast_ml_models = lambda ohlcv_arg, model_names, horizon, ticker: {
+            "predictions": {},
+            "future_dates": list(pd.bdate_range("2026-04-03", periods=horizon)),
+        }
+        forecast_calls = []
+
+        class _FragileStatsForecast:
+            def forecast(self, h, df):
+                unique_ids = sorted(df["unique_id"].unique())
+                forecast_calls.append(unique_ids)
+                if "BAD" in unique_ids:
+                    raise ValueError("series failed to converge")
+                return pd.DataFrame({"unique_id": unique_ids * h, "auto_arima": np.full(h * len(unique_ids), 150.0)}).set_index("unique_id")
+
+        prediction_service._build_statsforecast = lambda: _FragileStatsForecast()
+
+        with self.assertLogs("marketmind_api", level="WARNING") as logs:
+            results = prediction_service.forecast_many(["AAPL", "BAD", "MSFT"], horizon=3)
+
+        self.assertEqual(forecast_calls, [["AAPL", "BAD", "MSFT"], ["AAPL"], ["BAD"], ["MSFT"]])
+        self.assertIsNone(results["BAD"])
+        self.assertEqual(results["AAPL"]["recentPredicted"], 150.0)
+        self.assertEqual(results["MSFT"]["recentPredicted"], 150.0)
+        self.assertTrue(any("Statistical forecast failed for BAD" in line for line in logs.output))
+
+        def _failing_global(ohlcv_by_ticker, horizon):
+            raise ValueError("BAD has a gap in its panel")
+
+        with mock.patch.object(prediction_service, "_forecast_ml_models_global", _failing_global), self.assertLogs(
+            "marketmind_api", level="WARNING"
+        ) as logs:
+            results = prediction_service.forecast_many(["AAPL", "BAD", "MSFT"], horizon=3, global_model=True)
+
+        self.assertIsNone(results["BAD"])
+        self.assertEqual(results["MSFT"]["recentPredicted"], 150.0)
+        self.assertTrue(any("falling back to per-ticker models" in line for line in logs.output))
+
     def test_ensemble_weights_fallback_to_equal_weight_when_cv_fails(self):
         ohlcv = _sample_ohlcv()
         prediction_service._build_long_frame = lambda ohlcv_arg, ticker: pd.DataFrame(
@@ -107,6 +198,139 @@ class PredictionServiceTests(unittest.TestCase):
         for value in weights.values():
             self.assertAlmostEqual(value, first_weight, places=6)
 
+    def test_ensemble_weights_only_evaluate_new_bars_against_error_buffer(self):
+        cv_windows = []
+
+        def _cv_frame(df, n_windows, columns):
+            tail = df.tail(n_windows)
+            frame = pd.DataFrame({"unique_id": tail["unique_id"].to_numpy(), "ds": tail["ds"].to_numpy(), "y": tail["y"].to_numpy()})
+            for name, offset in columns.items():
+                frame[name] = frame["y"] + offset
+            return frame
+
+        class _FakeMLForecast:
+            def cross_validation(self, df, n_windows, **kwargs):
+                cv_windows.append(("ml", n_windows))
+                return _cv_frame(df, n_windows, {"linear_regression": 1.0, "random_forest": 3.0})
+
+        class _FakeStatsForecast:
+            def cross_validation(self, h, df, n_windows, **kwargs):
+                cv_windows.append(("stats", n_windows))
+                return _cv_frame(df, n_windows, {"auto_arima": -2.0})
+
+        prediction_service._build_mlforecast = lambda models: _FakeMLForecast()
+        prediction_service._build_statsforecast = lambda: _FakeStatsForecast()
+
+        history = _sample_ohlcv(221)
+        first = prediction_service._ensemble_weights_from_recent_cv(history.iloc[:-1], "AAPL")
+        second = prediction_service._ensemble_weights_from_recent_cv(history, "AAPL")
+
+        self.assertEqual(cv_windows, [("ml", 7), ("stats", 7), ("ml", 1), ("stats", 1)])
+        self.assertAlmostEqual(first["linear_regression"], 6.0 / 11.0, places=6)
+        self.assertAlmostEqual(first["auto_arima"], 3.0 / 11.0, places=6)
+        self.assertEqual(first, second)
+        self.assertEqual(len(prediction_service._ERROR_BUFFERS["AAPL"]["errors"]["random_forest"]), 7)
+
+        revised = history.copy()
+        revised.iloc[-1, revised.columns.get_loc("Close")] += 1.0
+        prediction_service._CACHE.clear()
+        prediction_service._ensemble_weights_from_recent_cv(revised, "AAPL")
+        self.assertEqual(cv_windows[-2:], [("ml", 7), ("stats", 7)])
+
+    def test_models_with_negligible_weight_are_pruned_from_the_weighting_cv(self):
+        fitted = []
+
+        class _FakeMLForecast:
+            def __init__(self, models):
+                fitted.append(sorted(models))
+                self.models = models
+
+            def cross_validation(self, df, n_windows, **kwargs):
+                tail = df.tail(n_windows)
+                frame = pd.DataFrame({"ds": tail["ds"].to_numpy(), "y": tail["y"].to_numpy()})
+                for name, offset in {"linear_regression": 1.0, "random_forest": 500.0}.items():
+                    if name in self.models:
+                        frame[name] = frame["y"] + offset
+                return frame
+
+        class _FakeStatsForecast:
+            def cross_validation(self, h, df, n_windows, **kwargs):
+                tail = df.tail(n_windows)
+                return pd.DataFrame({"ds": tail["ds"].to_numpy(), "y": tail["y"].to_numpy(), "auto_arima": tail["y"].to_numpy() - 2.0})
+
+        prediction_service._build_mlforecast = _FakeMLForecast
+        prediction_service._build_statsforecast = lambda: _FakeStatsForecast()
+        history = _sample_ohlcv(224)
+
+        for end in range(221, 225):
+            weights = prediction_service._ensemble_weights_from_recent_cv(history.iloc[:end], "AAPL")
+
+        self.assertIn("random_forest", fitted[2])
+        self.assertNotIn("random_forest", fitted[3])
+        self.assertNotIn("random_forest", weights)
+        report = prediction_service.model_selection_report("AAPL")
+        self.assertIn("random_forest", report["pruned"])
+        self.assertIn("linear_regression", report["active"])
+        # The sequence models never receive a weight, so they are pruned too.
+        for name in prediction_service.SEQUENCE_MODELS:
+            self.assertIn(name, report["pruned"])
+        self.assertEqual(report["computeSaved"]["modelsSkipped"], len(report["pruned"]))
+
+    def test_snapshot_carries_conformal_bands_from_weighting_cv(self):
+        ohlcv = _sample_ohlcv()
+        residuals = {
+            "linear_regression": [1.0, -2.0, 0.5, 3.0, -1.0, 1.2, 0.3],
+            "auto_arima": [-1.0, 2.0, 1.5, -3.0, 1.0, 0.2, -0.3],
+        }
+
+        class _FakeMLForecast:
+            def cross_validation(self, df, n_windows, **kwargs):
+                tail = df.tail(n_windows)
+                return pd.DataFrame({"ds": tail["ds"].to_numpy(), "y": tail["y"].to_numpy(), "linear_regression": tail["y"].to_numpy() - residuals["linear_regression"][-n_windows:]})
+
+        class _FakeStatsForecast:
+            def cross_validation(self, h, df, n_windows, **kwargs):
+                tail = df.tail(n_windows)
+                return pd.DataFrame({"ds": tail["ds"].to_numpy(), "y": tail["y"].to_numpy(), "auto_arima": tail["y"].to_numpy() - residuals["auto_arima"][-n_windows:]})
+
+        prediction_service._build_mlforecast = lambda models: _FakeMLForecast()
+        prediction_service._build_statsforecast = lambda: _FakeStatsForecast()
+        prediction_service._load_canonical_ohlcv = lambda ticker: ohlcv.copy()
+        prediction_service._forecast_ml_models = lambda ohlcv_arg, model_names, horizon, ticker: {
+            "predictions": {"linear_regression": np.full(horizon, 141.0)},
+            "future_dates": list(pd.bdate_range("2026-04-03", periods=horizon)),
+        }
+        prediction_service._forecast_statistical_models = lambda ohlcv_arg, horizon, ticker: {
+            "predictions": {"auto_arima": np.full(horizon, 143.0)},
+        }
+
+        snapshot = prediction_service.get_prediction_snapshot("AAPL")
+
+        # Each window's ensemble error uses weights fit on the other six: on the
+        # third window those are 1/7.5 and 1/8.5 of the held-out MAEs, giving
+        # 0.5 * 8.5/16 + 1.5 * 7.5/16 = 1.03125, the largest absolute residual.
+        # 80% coverage of 7 windows takes the 7th smallest, which guarantees 7/8.
+        self.assertEqual(snapshot["recentPredicted"], 142.0)
+        self.assertEqual(snapshot["interval"]["calibrationWindows"], 7)
+        self.assertEqual(snapshot["interval"]["coverage"], 0.875)
+        self.assertEqual(snapshot["interval"]["targetCoverage"], 0.8)
+        first, third = snapshot["predictions"][0], snapshot["predictions"][2]
+        self.assertEqual((first["lower"], first["upper"]), (140.97, 143.03))
+        self.assertEqual((third["lower"], third["upper"]), (round(142.0 - 1.03125 * np.sqrt(3), 2), round(142.0 + 1.03125 * np.sqrt(3), 2)))
+
+        frame = prediction_service.create_dataset("AAPL")
+        lower, upper = prediction_service.prediction_interval_bounds(frame, np.array([150.0]))
+        self.assertEqual((lower[0], upper[0]), (148.96875, 151.03125))
+
+    def test_conformal_band_needs_enough_windows_to_reach_its_coverage(self):
+        predictions = np.array([100.0, 100.0])
+        self.assertIsNone(prediction_service._conformal_bounds(predictions, (1.0, -2.0, 0.5), coverage=0.8))
+        self.assertIsNone(prediction_service.conformal_coverage(3, coverage=0.8))
+        lower, upper = prediction_service._conformal_bounds(predictions, (1.0, -2.0, 0.5, 3.0), coverage=0.8)
+        self.assertEqual((lower[0], upper[0]), (97.0, 103.0))
+        self.assertEqual(prediction_service.conformal_coverage(4, coverage=0.8), 0.8)
+        self.assertAlmostEqual(prediction_service.conformal_coverage(8, coverage=0.8), 8 / 9)
+
     def test_rolling_window_backtest_returns_feature_spec_and_explainability(self):
         ohlcv = _sample_ohlcv()
         merged_cv = pd.DataFrame(
@@ -125,7 +349,20 @@ class PredictionServiceTests(unittest.TestCase):
         )
 
         prediction_service._load_canonical_ohlcv = lambda ticker: ohlcv.copy()
-        prediction_service._prepare_cv_frames = lambda *args, **kwargs: merged_cv.copy()
+        stage_calls = []
+
+        def _fake_stage_tasks(ticker, **kwargs):
+            stage_calls.append(kwargs)
+            return {
+                "stats_cv": (merged_cv.copy, (), {}),
+                "explainability": (prediction_service._build_evaluation_explainability, (ohlcv, ticker, 185), {}),
+            }
+
+        prediction_service._evaluation_stage_tasks = _fake_stage_tasks
+        prediction_service.evaluation_executor.get_evaluation_executor = lambda: prediction_service.evaluation_executor.EvaluationExecutor(
+            mode="thread",
+            max_workers=2,
+        )
         prediction_service._ensemble_weights_from_recent_cv = lambda ohlcv_arg, ticker: {
             "auto_arima": 0.25,
             "linear_regression": 0.25,
@@ -157,6 +394,105 @@ class PredictionServiceTests(unittest.TestCase):
         self.assertEqual(len(result["dates"]), 6)
         self.assertEqual(result["returns"]["initial_capital"], 10000.0)
         self.assertIn(result["best_model"], result["models"])
+        self.assertEqual(stage_calls[0]["include_explanations"], True)
+        self.assertEqual(
+            set(result["evaluationOptions"]["stageTimings"]),
+            {"stats_cv", "explainability", "ensemble_weights", "total"},
+        )
+
+    def test_background_explainability_is_pending_then_filled_in_from_the_engine(self):
+        ohlcv = _sample_ohlcv()
+        merged_cv = pd.DataFrame(
+            {
+                "unique_id": ["AAPL"] * 6,
+                "ds": [180, 181, 182, 183, 184, 185],
+                "cutoff": [179, 180, 181, 182, 183, 184],
+                "y": [131.0, 132.0, 133.0, 134.0, 135.0, 136.0],
+                "naive": [130.8, 131.6, 132.7, 133.8, 134.7, 135.8],
+                "linear_regression": [131.1, 132.1, 133.2, 134.2, 135.1, 136.3],
+            }
+        )
+        stage_calls = []
+
+        def _fake_stage_tasks(ticker, **kwargs):
+            stage_calls.append(kwargs)
+            return {"stats_cv": (merged_cv.copy, (), {})}
+
+        prediction_service._load_canonical_ohlcv = lambda ticker: ohlcv.copy()
+        prediction_service._evaluation_stage_tasks = _fake_stage_tasks
+        prediction_service._ensemble_weights_from_recent_cv = lambda ohlcv_arg, ticker: {"linear_regression": 1.0}
+        release = threading.Event()
+
+        def _slow_explainability(*args):
+            release.wait(5)
+            return {"linear_regression": {"global_top_features": [{"feature": "lag1", "meanAbsImpact": 1.0}]}}
+
+        prediction_service._build_evaluation_explainability = _slow_explainability
+        engine = prediction_service.explainability.ExplainabilityEngine(background=True)
+
+        with mock.patch.object(prediction_service, "_EXPLAINABILITY", engine):
+            pending = prediction_service.rolling_window_backtest("AAPL", test_days=6, fast_mode=False)
+            release.set()
+            engine._pool.shutdown(wait=True)
+            ready = prediction_service.rolling_window_backtest("AAPL", test_days=6, fast_mode=False)
+
+        self.assertEqual(stage_calls[0]["include_explanations"], False)
+        self.assertEqual(len(stage_calls), 1)
+        self.assertEqual(pending["evaluationOptions"]["explainabilityStatus"], "pending")
+        self.assertEqual(pending["models"]["linear_regression"]["explainability"], {"status": "pending"})
+        self.assertEqual(ready["evaluationOptions"]["explainabilityStatus"], "ready")
+        self.assertEqual(
+            ready["models"]["linear_regression"]["explainability"]["global_top_features"][0]["feature"],
+            "lag1",
+        )
+
+
+    def test_pending_evaluation_read_by_another_worker_gets_its_explainability(self):
+        ohlcv = _sample_ohlcv()
+        merged_cv = pd.DataFrame(
+            {
+                "unique_id": ["AAPL"] * 3,
+                "ds": [183, 184, 185],
+                "cutoff": [182, 183, 184],
+                "y": [134.0, 135.0, 136.0],
+                "naive": [133.8, 134.7, 135.8],
+                "linear_regression": [134.2, 135.1, 136.3],
+            }
+        )
+        prediction_service._load_canonical_ohlcv = lambda ticker: ohlcv.copy()
+        prediction_service._evaluation_stage_tasks = lambda ticker, **kwargs: {"stats_cv": (merged_cv.copy, (), {})}
+        prediction_service._ensemble_weights_from_recent_cv = lambda ohlcv_arg, ticker: {"linear_regression": 1.0}
+        release, built = threading.Event(), []
+
+        def _explain(ohlcv_arg, ticker, evaluation_ds):
+            built.append(evaluation_ds)
+            release.wait(5)
+            return {"linear_regression": {"global_top_features": [{"feature": "lag1", "meanAbsImpact": 1.0}]}}
+
+        prediction_service._build_evaluation_explainability = _explain
+        first_worker = prediction_service.explainability.ExplainabilityEngine(background=True)
+        second_worker = prediction_service.explainability.ExplainabilityEngine(background=True)
+        third_worker = prediction_service.explainability.ExplainabilityEngine(background=True)
+
+        with mock.patch.object(prediction_service, "_EXPLAINABILITY", first_worker):
+            prediction_service.rolling_window_backtest("AAPL", test_days=3, fast_mode=False)
+        # The first worker dies before its SHAP job finishes; another worker
+        # serves the cached pending evaluation and queues the job itself.
+        first_worker._pool.shutdown(wait=False, cancel_futures=True)
+        with mock.patch.object(prediction_service, "_EXPLAINABILITY", second_worker):
+            pending = prediction_service.rolling_window_backtest("AAPL", test_days=3, fast_mode=False)
+            release.set()
+            second_worker._pool.shutdown(wait=True)
+            first_worker._pool.shutdown(wait=True)
+        with mock.patch.object(prediction_service, "_EXPLAINABILITY", third_worker):
+            ready = prediction_service.rolling_window_backtest("AAPL", test_days=3, fast_mode=False)
+
+        self.assertEqual(pending["evaluationOptions"]["explainabilityStatus"], "pending")
+        self.assertEqual(built[-1], 185)
+        self.assertEqual(len(built), 2)
+        self.assertIsNone(third_worker._pool)
+        self.assertEqual(ready["evaluationOptions"]["explainabilityStatus"], "ready")
+        self.assertEqual(ready["models"]["linear_regression"]["explainability"]["global_top_features"][0]["feature"], "lag1")
 
 
 if __name__ == "__main__":
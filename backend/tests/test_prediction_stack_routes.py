@@ -1,5 +1,6 @@
 import os
 import sys
+import time
 import unittest
 
 import numpy as np
@@ -25,7 +26,12 @@ class PredictionStackRouteTests(unittest.TestCase):
             "rolling_window_backtest": backend_api.rolling_window_backtest,
             "future_prediction_dates": backend_api.prediction_service.get_future_prediction_dates,
             "verify_clerk_token": backend_api.verify_clerk_token,
+            "forecast_many": backend_api.prediction_service.forecast_many,
+            "sequence_forecast_many": backend_api.sequence_forecast_many,
+            "job_queue": backend_api._PREDICTION_JOB_QUEUE,
+            "limiter_enabled": backend_api.limiter.enabled,
         }
+        backend_api.limiter.enabled = False
         backend_api.app.testing = True
         self.client = backend_api.app.test_client()
 
@@ -66,6 +72,10 @@ class PredictionStackRouteTests(unittest.TestCase):
         backend_api.rolling_window_backtest = self.original["rolling_window_backtest"]
         backend_api.prediction_service.get_future_prediction_dates = self.original["future_prediction_dates"]
         backend_api.verify_clerk_token = self.original["verify_clerk_token"]
+        backend_api.prediction_service.forecast_many = self.original["forecast_many"]
+        backend_api.sequence_forecast_many = self.original["sequence_forecast_many"]
+        backend_api._PREDICTION_JOB_QUEUE = self.original["job_queue"]
+        backend_api.limiter.enabled = self.original["limiter_enabled"]
 
     def test_single_model_prediction_route_uses_trading_session_dates(self):
         response = self.client.get("/predict/LinReg/AAPL", headers=self.headers)
@@ -82,6 +92,114 @@ class PredictionStackRouteTests(unittest.TestCase):
         self.assertIn("auto_arima", payload["modelsUsed"])
         self.assertIn("confidence", payload)
         self.assertEqual(payload["predictions"][-1]["date"], "2026-04-13")
+        self.assertIn("pruned", payload["modelSelection"])
+
+    def test_batch_ensemble_route_returns_snapshot_per_ticker(self):
+        captured = {}
+
+        def _fake_forecast_many(tickers, horizon, global_model):
+            captured.update({"tickers": tickers, "horizon": horizon, "global_model": global_model})
+            return {
+                "AAPL": {"recentClose": 140.0, "recentPredicted": 141.2, "confidence": 90.0, "modelsUsed": ["auto_arima"], "predictions": []},
+                "NEWCO": None,
+            }
+
+        backend_api.prediction_service.forecast_many = _fake_forecast_many
+        response = self.client.post(
+            "/predict/ensemble",
+            json={"tickers": ["aapl", "NEWCO"], "horizon": 5, "globalModel": True},
+            headers=self.headers,
+        )
+
+        self.assertEqual(response.status_code, 200)
+        payload = response.get_json()
+        self.assertEqual(captured, {"tickers": ["AAPL", "NEWCO"], "horizon": 5, "global_model": True})
+        self.assertEqual(payload["results"]["AAPL"]["recentPredicted"], 141.2)
+        self.assertEqual(payload["unavailable"], ["NEWCO"])
+
+        invalid = self.client.post("/predict/ensemble", json={"tickers": [], "horizon": 3}, headers=self.headers)
+        self.assertEqual(invalid.status_code, 400)
+
+    def test_batch_ensemble_route_attaches_pooled_sequence_forecasts(self):
+        sequence_calls = []
+
+        def _fake_sequence_forecast_many(tickers, days_ahead):
+            sequence_calls.append((tickers, days_ahead))
+            return {"AAPL": {"lstm": [141.5, 142.0], "transformer": [141.1, 141.7]}}
+
+        backend_api.prediction_service.forecast_many = lambda tickers, horizon, global_model: {
+            "AAPL": {"recentClose": 140.0, "recentPredicted": 141.2, "predictions": []},
+            "NEWCO": None,
+        }
+        backend_api.sequence_forecast_many = _fake_sequence_forecast_many
+
+        plain = self.client.post("/predict/ensemble", json={"tickers": ["AAPL"], "horizon": 2}, headers=self.headers)
+        self.assertNotIn("sequenceModels", plain.get_json()["results"]["AAPL"])
+        self.assertEqual(sequence_calls, [])
+
+        response = self.client.post(
+            "/predict/ensemble",
+            json={"tickers": ["AAPL", "NEWCO"], "horizon": 2, "sequenceModels": True},
+            headers=self.headers,
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sequence_calls, [(["AAPL"], 2)])
+        self.assertEqual(response.get_json()["results"]["AAPL"]["sequenceModels"]["lstm"], [141.5, 142.0])
+
+        def _failing_sequence_forecast_many(tickers, days_ahead):
+            raise ImportError("torch is not installed")
+
+        backend_api.sequence_forecast_many = _failing_sequence_forecast_many
+        degraded = self.client.post(
+            "/predict/ensemble",
+            json={"tickers": ["AAPL"], "horizon": 2, "sequenceModels": True},
+            headers=self.headers,
+        )
+        self.assertEqual(degraded.status_code, 200)
+        self.assertEqual(degraded.get_json()["results"]["AAPL"]["recentPredicted"], 141.2)
+
+    def test_evaluation_job_routes_queue_dedupe_and_poll(self):
+        captured = []
+
+        def _fake_backtest(**params):
+            captured.append(params)
+            return {"ticker": params["ticker"], "best_model": "ensemble"}
+
+        queue = backend_api.prediction_jobs.PredictionJobQueue(
+            backend_api.prediction_jobs.InMemoryJobStore(),
+            {"evaluation": _fake_backtest},
+            max_workers=1,
+        )
+        self.addCleanup(queue.shutdown, wait=True)
+        backend_api._PREDICTION_JOB_QUEUE = queue
+
+        response = self.client.post("/jobs/evaluation", json={"ticker": "aapl", "test_days": 30}, headers=self.headers)
+        self.assertEqual(response.status_code, 202)
+        job_id = response.get_json()["jobId"]
+
+        for _ in range(200):
+            polled = self.client.get(f"/jobs/{job_id}", headers=self.headers).get_json()
+            if polled["status"] == "succeeded":
+                break
+            time.sleep(0.01)
+        self.assertEqual(polled["result"], {"ticker": "AAPL", "best_model": "ensemble"})
+        self.assertEqual(
+            captured,
+            [
+                {
+                    "ticker": "AAPL",
+                    "test_days": 30,
+                    "retrain_frequency": 10,
+                    "fast_mode": True,
+                    "max_train_rows": 450,
+                    "include_explanations": None,
+                    "transaction_cost_bps": 0.0,
+                    "slippage_bps": 0.0,
+                }
+            ],
+        )
+        self.assertEqual(self.client.get("/jobs/missing", headers=self.headers).status_code, 404)
+        self.assertEqual(self.client.post("/jobs/evaluation", json={"ticker": ""}, headers=self.headers).status_code, 400)
 
     def test_evaluate_route_forwards_include_explanations(self):
         captured = {}
@@ -125,7 +243,7 @@ class PredictionStackRouteTests(unittest.TestCase):
         backend_api.rolling_window_backtest = _fake_backtest
 
         response = self.client.get(
-            "/evaluate/AAPL?fast_mode=false&include_explanations=true&test_days=30",
+            "/evaluate/AAPL?fast_mode=false&include_explanations=true&test_days=30&transaction_cost_bps=5",
             headers=self.headers,
         )
         self.assertEqual(response.status_code, 200)
@@ -133,6 +251,7 @@ class PredictionStackRouteTests(unittest.TestCase):
         self.assertEqual(captured["test_days"], 30)
         self.assertEqual(captured["fast_mode"], False)
         self.assertEqual(captured["include_explanations"], True)
+        self.assertEqual((captured["transaction_cost_bps"], captured["slippage_bps"]), (5.0, 0.0))
         self.assertEqual(response.get_json()["featureSpecVersion"], "prediction-stack-v2")
 
     def test_expensive_prediction_routes_require_authentication(self):
@@ -1,7 +1,12 @@
 import os
 import sys
 import tempfile
+import time
 import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from werkzeug.datastructures import MultiDict
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
@@ -57,6 +62,10 @@ class PublicApiV2Tests(unittest.TestCase):
         }
 
         reset_runtime_state()
+        self.warehouse_dir = os.path.join(self.tmpdir.name, "evaluation_warehouse")
+        env_patch = mock.patch.dict(os.environ, {"EVALUATION_WAREHOUSE_DIR": self.warehouse_dir})
+        env_patch.start()
+        self.addCleanup(env_patch.stop)
         backend_api.DATABASE_URL = self.database_url
         backend_api.PERSISTENCE_MODE = "postgres"
         backend_api.PUBLIC_API_ENABLED = "true"
@@ -738,6 +747,30 @@ class PublicApiV2Tests(unittest.TestCase):
         self.assertNotIn("dates", payload)
         self.assertNotIn("actuals", payload)
 
+    def test_public_v2_evaluation_answers_from_the_warehouse(self):
+        stored = self._stub_evaluation_handler("MSFT", request_obj=self._evaluation_request(30, False), jsonify_fn=lambda payload: payload)
+        stored["models"]["ensemble"]["returns"] = dict(stored["returns"], portfolio_values=[10000.0, 10125.0])
+        options = backend_api.evaluation_warehouse.evaluation_options(30, False)
+        warehouse = backend_api.evaluation_warehouse.get_evaluation_warehouse()
+        warehouse.write("MSFT", backend_api.evaluation_warehouse.result_rows("MSFT", stored, options, time.time()))
+        backend_api.market_data_handlers.evaluate_models_handler = lambda *args, **kwargs: self.fail(
+            "a fresh warehouse result must not trigger a backtest"
+        )
+
+        response = self.client.get("/api/public/v2/evaluations/MSFT?test_days=30&fast_mode=false", headers=self._public_headers())
+
+        self.assertEqual(response.status_code, 200)
+        payload = response.get_json()
+        self.assertEqual(payload["symbol"], "MSFT")
+        self.assertEqual(payload["bestModel"], "ensemble")
+        self.assertEqual(payload["models"]["random_forest"]["metrics"]["mape"], 1.4)
+        self.assertEqual(payload["returns"]["total_return"], 1.25)
+        self.assertEqual(payload["evaluationOptions"], {"testDays": 30, "fastMode": False})
+
+    @staticmethod
+    def _evaluation_request(test_days, fast_mode):
+        return SimpleNamespace(args=MultiDict({"test_days": str(test_days), "fast_mode": str(fast_mode).lower()}))
+
     def test_public_v2_screener_contracts(self):
         presets_response = self.client.get(
             "/api/public/v2/screener/presets",
@@ -37,7 +37,12 @@ class RouteRegistrationSmokeTests(unittest.TestCase):
             "/news": {"GET"},
             "/predict/<string:model>/<string:ticker>": {"GET"},
             "/predict/ensemble/<string:ticker>": {"GET"},
+            "/predict/ensemble": {"POST"},
             "/evaluate/<string:ticker>": {"GET"},
+            "/jobs/evaluation": {"POST"},
+            "/jobs/prediction": {"POST"},
+            "/jobs/<string:job_id>": {"GET"},
+            "/diagnostics/compute": {"GET"},
             "/paper/portfolio": {"GET"},
             "/paper/portfolio/optimize": {"POST"},
             "/paper/buy": {"POST"},
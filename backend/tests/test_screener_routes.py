@@ -87,11 +87,22 @@ class ScreenerRouteTests(unittest.TestCase):
         self.ticker_patch = patch.object(backend_api.yf, "Ticker", side_effect=lambda symbol: _FakeTicker(symbol))
         self.download_patch.start()
         self.ticker_patch.start()
+        self.metadata_limiter_patch = patch.object(
+            backend_api.screener_query_service.screener_snapshot_service,
+            "_METADATA_RATE_LIMITER",
+            backend_api.screener_query_service.screener_snapshot_service.bar_store.RateLimiter(0),
+        )
+        self.metadata_limiter_patch.start()
+        self.metadata_mode_patch = patch.dict(os.environ, {"SCREENER_METADATA_REFRESH_MODE": "inline"})
+        self.metadata_mode_patch.start()
 
     def tearDown(self):
         self.download_patch.stop()
         self.ticker_patch.stop()
+        self.metadata_limiter_patch.stop()
+        self.metadata_mode_patch.stop()
         backend_api.screener_query_service.screener_snapshot_service.clear_runtime_cache(base_dir=self.tmp_root)
+        backend_api.screener_query_service.reset_runtime_state()
         backend_api.BASE_DIR = self.original_state["BASE_DIR"]
         backend_api.DATABASE = self.original_state["DATABASE"]
         backend_api.DATABASE_URL = self.original_state["DATABASE_URL"]
@@ -142,6 +153,31 @@ class ScreenerRouteTests(unittest.TestCase):
         if payload["rows"]:
             self.assertEqual(payload["rows"][0]["sector"], "Technology")
 
+    def test_screener_engine_loads_each_snapshot_version_once(self):
+        query_service = backend_api.screener_query_service
+        first = query_service.scan(base_dir=self.tmp_root, preset="active", limit=3)
+        engine = query_service.get_query_engine(base_dir=self.tmp_root)
+
+        with patch.object(engine, "_load", wraps=engine._load) as loads:
+            second = query_service.scan(base_dir=self.tmp_root, preset="active", limit=3, offset=3)
+            past_end = query_service.scan(base_dir=self.tmp_root, preset="active", limit=3, offset=10_000)
+            movers = query_service.movers_payload(base_dir=self.tmp_root, limit=4)
+        loads.assert_not_called()
+
+        self.assertGreater(first["meta"]["total"], 3)
+        self.assertEqual(second["meta"]["total"], first["meta"]["total"])
+        self.assertEqual(past_end["meta"]["total"], first["meta"]["total"])
+        self.assertEqual(past_end["rows"], [])
+        self.assertEqual([row["symbol"] for row in movers["active"]], [row["symbol"] for row in first["rows"]] + [second["rows"][0]["symbol"]])
+        gainers = query_service.scan(base_dir=self.tmp_root, preset="gainers", limit=4)
+        self.assertEqual(movers["gainers"], gainers["rows"])
+        self.assertNotIn("__total", first["rows"][0])
+
+        backend_api.screener_query_service.screener_snapshot_service.ensure_snapshot(base_dir=self.tmp_root, force_refresh=True)
+        version = engine._version
+        query_service.scan(base_dir=self.tmp_root, preset="active", limit=3)
+        self.assertNotEqual(engine._version, version)
+
 
 if __name__ == "__main__":
     unittest.main()
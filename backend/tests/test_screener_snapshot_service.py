@@ -1,9 +1,12 @@
 import os
 import sys
 import tempfile
+import threading
+import time
 import unittest
 from unittest.mock import patch
 
+import numpy as np
 import pandas as pd
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
@@ -46,8 +49,15 @@ class ScreenerSnapshotServiceTests(unittest.TestCase):
         self.base_dir = self.tmpdir.name
         screener_universe_service.clear_universe_cache()
         screener_snapshot_service.clear_runtime_cache(base_dir=self.base_dir)
+        limiter = patch.object(screener_snapshot_service, "_METADATA_RATE_LIMITER", screener_snapshot_service.bar_store.RateLimiter(0))
+        limiter.start()
+        self.addCleanup(limiter.stop)
+        inline = patch.dict(os.environ, {"SCREENER_METADATA_REFRESH_MODE": "inline"})
+        inline.start()
+        self.addCleanup(inline.stop)
 
     def tearDown(self):
+        screener_snapshot_service.stop_metadata_refresh()
         screener_snapshot_service.clear_runtime_cache(base_dir=self.base_dir)
         self.tmpdir.cleanup()
 
@@ -81,6 +91,167 @@ class ScreenerSnapshotServiceTests(unittest.TestCase):
         self.assertIsNotNone(first_row["price"])
         self.assertIsNotNone(first_row["market_cap"])
 
+    def test_snapshot_factors_are_computed_per_symbol_in_one_pass(self):
+        index = pd.bdate_range("2025-01-01", periods=130)
+        closes = np.linspace(100.0, 164.5, 130) + np.sin(np.arange(130))
+        volumes = np.arange(130, dtype=float) * 1_000 + 50_000
+        histories = {
+            "AAA": pd.DataFrame({"High": closes + 1.0, "Low": closes - 1.0, "Close": closes, "Volume": volumes}, index=index),
+            "BBB": pd.DataFrame({"Close": closes[:30]}, index=index[:30]),
+            "CCC": pd.DataFrame({"Close": [10.0]}, index=index[:1]),
+        }
+        universe = [{"symbol": symbol, "name": symbol, "sector": "Technology"} for symbol in ("CCC", "BBB", "AAA", "DDD")]
+        metadata = {"AAA": {"target_mean_price": 180.0, "market_cap": 5_000_000}}
+
+        snapshot = screener_snapshot_service._build_snapshot(histories=histories, metadata=metadata, universe=universe).collect()
+        written = snapshot.get_column("symbol").to_list()
+        aaa = snapshot.row(written.index("AAA"), named=True)
+        bbb = snapshot.row(written.index("BBB"), named=True)
+
+        returns = closes[1:] / closes[:-1] - 1.0
+        self.assertEqual(written, ["BBB", "AAA"])
+        self.assertEqual(aaa["price"], round(closes[-1], 2))
+        self.assertAlmostEqual(aaa["percent_change"], closes[-1] / closes[-2] - 1.0, places=6)
+        self.assertAlmostEqual(aaa["momentum_3m"], closes[-1] / closes[-63] - 1.0, places=6)
+        self.assertAlmostEqual(aaa["momentum_6m"], closes[-1] / closes[-126] - 1.0, places=6)
+        self.assertAlmostEqual(aaa["volatility_30d"], np.std(returns[-30:], ddof=1) * np.sqrt(252), places=6)
+        self.assertAlmostEqual(aaa["avg_dollar_volume_30d"], np.mean(closes[-30:] * volumes[-30:]), places=2)
+        self.assertEqual(aaa["year_high"], round(float(np.max(closes + 1.0)), 2))
+        self.assertAlmostEqual(aaa["target_upside_pct"], (180.0 - closes[-1]) / closes[-1] * 100.0, places=4)
+        self.assertEqual(aaa["market_cap"], 5_000_000)
+        self.assertIsNone(bbb["volume"])
+        self.assertIsNone(bbb["momentum_3m"])
+        self.assertEqual(bbb["year_high"], round(float(np.max(closes[:30])), 2))
+        self.assertEqual(
+            screener_snapshot_service._snapshot_warnings(universe, histories, written),
+            [
+                "CCC: history was too sparse to compute screener factors.",
+                "DDD: no usable daily history was available for the screener snapshot.",
+            ],
+        )
+
+    def test_metadata_refreshes_due_symbols_in_rolling_batches(self):
+        universe = [{"symbol": symbol, "name": symbol, "sector": "Unknown"} for symbol in ("AAA", "BBB", "CCC")]
+        looked_up = []
+
+        def _ticker(symbol):
+            looked_up.append(symbol)
+            return _FakeTicker(symbol)
+
+        fake_yf = type("FakeYF", (), {"Ticker": staticmethod(_ticker)})
+        logger = type("Logger", (), {"warning": lambda *args, **kwargs: None})()
+        day = screener_snapshot_service.METADATA_TTL_SECONDS
+
+        with patch.dict(os.environ, {"SCREENER_METADATA_REFRESH_BATCH": "2"}):
+            first = screener_snapshot_service._refresh_metadata(
+                base_dir=self.base_dir, universe=universe, yf_module=fake_yf, logger=logger, now_ts=1_000.0
+            )
+            self.assertEqual(sorted(looked_up), ["AAA", "BBB"])
+            self.assertIsNone(screener_snapshot_service._metadata_next_due(first, universe))
+
+            second = screener_snapshot_service._refresh_metadata(
+                base_dir=self.base_dir, universe=universe, yf_module=fake_yf, logger=logger, now_ts=2_000.0
+            )
+            self.assertEqual(looked_up[2:], ["CCC"])
+            self.assertEqual(screener_snapshot_service._metadata_next_due(second, universe), 1_000.0 + day)
+
+            screener_snapshot_service._refresh_metadata(
+                base_dir=self.base_dir, universe=universe, yf_module=fake_yf, logger=logger, now_ts=2_000.0 + day
+            )
+            self.assertEqual(sorted(looked_up[3:]), ["AAA", "BBB"])
+
+        stored = screener_snapshot_service._load_existing_metadata(base_dir=self.base_dir)
+        self.assertEqual(stored.get_column("symbol").to_list(), ["AAA", "BBB", "CCC"])
+        self.assertEqual(stored.get_column("name").to_list(), ["AAA Corporation", "BBB Corporation", "CCC Corporation"])
+        self.assertTrue(screener_snapshot_service.metadata_path(base_dir=self.base_dir).endswith(".parquet"))
+
+    def test_failed_metadata_lookups_keep_the_previous_row_due(self):
+        universe = [{"symbol": symbol, "name": symbol, "sector": "Unknown"} for symbol in ("AAA", "BBB")]
+        logger = type("Logger", (), {"warning": lambda *args, **kwargs: None})()
+        day = screener_snapshot_service.METADATA_TTL_SECONDS
+        healthy_yf = type("FakeYF", (), {"Ticker": staticmethod(lambda symbol: _FakeTicker(symbol))})
+        screener_snapshot_service._refresh_metadata(
+            base_dir=self.base_dir, universe=universe, yf_module=healthy_yf, logger=logger, now_ts=1_000.0
+        )
+
+        def _flaky(symbol):
+            if symbol == "AAA":
+                raise RuntimeError("rate limited")
+            return type("Ticker", (), {"info": {}})()
+
+        refreshed = screener_snapshot_service._refresh_metadata(
+            base_dir=self.base_dir,
+            universe=universe,
+            yf_module=type("FlakyYF", (), {"Ticker": staticmethod(_flaky)}),
+            logger=logger,
+            now_ts=2_000.0 + day,
+        )
+
+        self.assertEqual(refreshed.get_column("name").to_list(), ["AAA Corporation", "BBB Corporation"])
+        self.assertEqual(refreshed.get_column("market_cap").to_list(), [1_000_000_000_000, 1_000_000_000_000])
+        self.assertEqual(refreshed.get_column("refreshed_at").to_list(), [1_000.0, 1_000.0])
+        self.assertEqual(
+            screener_snapshot_service._due_metadata_symbols(refreshed, universe, now_ts=3_000.0 + day, batch_size=10),
+            ["AAA", "BBB"],
+        )
+
+    def test_snapshot_builds_from_stored_metadata_while_the_refresh_runs_in_the_background(self):
+        lookups_may_finish = threading.Event()
+
+        def _slow_ticker(symbol):
+            lookups_may_finish.wait(timeout=10)
+            return _FakeTicker(symbol)
+
+        fake_yf = type(
+            "FakeYF",
+            (),
+            {
+                "download": staticmethod(lambda tickers, **kwargs: _build_download_payload(tickers if isinstance(tickers, list) else [tickers])),
+                "Ticker": staticmethod(_slow_ticker),
+            },
+        )
+        logger = type("Logger", (), {"warning": lambda *args, **kwargs: None})()
+
+        with patch.dict(os.environ, {"SCREENER_METADATA_REFRESH_MODE": "background"}):
+            first = screener_snapshot_service.ensure_snapshot(base_dir=self.base_dir, yf_module=fake_yf, logger=logger)
+            lookups_may_finish.set()
+            deadline = time.time() + 10
+            while screener_snapshot_service._METADATA_REFRESH_LOCK.locked() and time.time() < deadline:
+                time.sleep(0.01)
+            second = screener_snapshot_service.ensure_snapshot(base_dir=self.base_dir, yf_module=fake_yf, logger=logger)
+
+        self.assertIsNone(first["metadataRefreshedAt"])
+        self.assertIsNone(first["metadataVersion"])
+        self.assertIsNotNone(second["metadataRefreshedAt"])
+        self.assertNotEqual(second["lastRefresh"], None)
+        frame = screener_snapshot_service.load_snapshot_frame(base_dir=self.base_dir)
+        self.assertIsNotNone(frame.sort("symbol").row(0, named=True)["market_cap"])
+
+    def test_stopping_the_background_refresh_skips_the_remaining_lookups(self):
+        release = threading.Event()
+        looked_up, patched_in = [], []
+
+        def _blocking_ticker(symbol):
+            looked_up.append(symbol)
+            release.wait(timeout=10)
+            return _FakeTicker(symbol)
+
+        fake_yf = type("FakeYF", (), {"Ticker": staticmethod(_blocking_ticker)})
+        logger = type("Logger", (), {"warning": lambda *args, **kwargs: None})()
+        with patch.dict(os.environ, {"SCREENER_METADATA_REFRESH_MODE": "background", "SCREENER_METADATA_WORKERS": "2"}):
+            self.assertTrue(screener_snapshot_service.start_metadata_refresh(base_dir=self.base_dir, yf_module=fake_yf, logger=logger))
+            fake_yf.Ticker = staticmethod(patched_in.append)
+            deadline = time.time() + 10
+            while not looked_up and time.time() < deadline:
+                time.sleep(0.01)
+            threading.Timer(0.1, release.set).start()
+            screener_snapshot_service.stop_metadata_refresh()
+
+        self.assertFalse(screener_snapshot_service._METADATA_REFRESH_LOCK.locked())
+        self.assertEqual(patched_in, [])
+        self.assertLessEqual(len(looked_up), 2)
+        self.assertLess(len(looked_up), len(screener_universe_service.load_universe()))
+
     def test_serves_last_good_snapshot_when_refresh_fails(self):
         fake_logger = type("Logger", (), {"warning": lambda *args, **kwargs: None})()
         fake_yf = type(
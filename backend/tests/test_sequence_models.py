@@ -0,0 +1,113 @@
+import importlib.util
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import MinMaxScaler
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import feature_engineering
+import model_artifact_store
+import models
+
+_TORCH_AVAILABLE = importlib.util.find_spec("torch") is not None
+
+
+def _close_frame(rows=160, ticker="AAPL", base=100.0):
+    index = pd.bdate_range("2025-01-02", periods=rows)
+    frame = pd.DataFrame({"Close": np.linspace(base, base * 1.4, rows) + np.sin(np.arange(rows))}, index=index)
+    frame.attrs["ticker"] = ticker
+    return frame
+
+
+class SequenceBuildingTests(unittest.TestCase):
+    def setUp(self):
+        feature_engineering.clear_cache()
+
+    def test_create_sequences_returns_views_matching_the_loop(self):
+        X = np.arange(60, dtype=float).reshape(20, 3)
+        y = np.arange(20, dtype=float).reshape(-1, 1) * 10
+        X_seq, y_seq = models.create_sequences(X, y, seq_len=5, forecast_horizon=3)
+
+        expected_X = np.array([X[i : i + 5] for i in range(13)])
+        expected_y = np.array([y[i + 5 : i + 8, 0] for i in range(13)])
+        np.testing.assert_array_equal(X_seq, expected_X)
+        np.testing.assert_array_equal(y_seq, expected_y)
+        self.assertTrue(np.shares_memory(X_seq, X))
+        self.assertTrue(np.shares_memory(y_seq, y))
+        self.assertEqual(models.create_sequences(X[:6], y[:6], 5, 3)[0].shape, (0, 5, 3))
+
+    def test_training_arrays_match_window_by_window_scaling(self):
+        frame = _close_frame()
+        X_scaled, y_scaled, scaler_X, scaler_y = models._training_arrays(frame, 14, 30, 7)
+
+        X, y, _ = models.prepare_ml_data(frame, 14)
+        X_seq = np.array([X[i : i + 30] for i in range(len(X) - 36)])
+        y_seq = np.array([y[i + 30 : i + 37] for i in range(len(X) - 36)])
+        legacy_X = MinMaxScaler().fit(X_seq.reshape(-1, X.shape[1]))
+        legacy_y = MinMaxScaler().fit(y_seq.reshape(-1, 1))
+
+        self.assertEqual(X_scaled.dtype, np.float32)
+        self.assertTrue(X_scaled.flags["C_CONTIGUOUS"])
+        np.testing.assert_allclose(scaler_X.data_min_, legacy_X.data_min_)
+        np.testing.assert_allclose(scaler_y.data_max_, legacy_y.data_max_)
+        np.testing.assert_allclose(
+            X_scaled,
+            legacy_X.transform(X_seq.reshape(-1, X.shape[1])).reshape(X_seq.shape),
+            rtol=1e-6,
+            atol=1e-6,
+        )
+        np.testing.assert_allclose(y_scaled, legacy_y.transform(y_seq.reshape(-1, 1)).reshape(y_seq.shape), atol=1e-6)
+
+        with self.assertRaises(ValueError):
+            models._training_arrays(frame.iloc[:50], 14, 30, 7)
+
+    @unittest.skipUnless(_TORCH_AVAILABLE, "torch is not installed")
+    def test_forecast_many_runs_one_forward_pass_and_reuses_the_pooled_model(self):
+        frames = {
+            "AAPL": _close_frame(ticker="AAPL"),
+            "MSFT": _close_frame(ticker="MSFT", base=400.0),
+            "TINY": _close_frame(rows=20, ticker="TINY"),
+        }
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = model_artifact_store.ModelArtifactStore(tmpdir)
+            with mock.patch.object(models, "_ARTIFACT_STORE", store), mock.patch.object(
+                models, "_forward_batch", wraps=models._forward_batch
+            ) as forward_batch, mock.patch.object(models, "_run_epochs", wraps=models._run_epochs) as run_epochs:
+                first = models.forecast_many(frames, epochs=1)
+                second = models.forecast_many(frames, epochs=1)
+
+        self.assertIsNone(first["TINY"])
+        self.assertEqual(len(first["AAPL"]), 7)
+        self.assertEqual(forward_batch.call_args_list[0].args[2].shape[0], 2)
+        self.assertEqual(run_epochs.call_count, 1)
+        np.testing.assert_allclose(second["MSFT"], first["MSFT"], rtol=1e-5)
+
+    @unittest.skipUnless(_TORCH_AVAILABLE, "torch is not installed")
+    def test_forecast_many_fine_tunes_the_pooled_model_when_tickers_gain_bars(self):
+        full = {"AAPL": _close_frame(rows=161, ticker="AAPL"), "MSFT": _close_frame(rows=161, ticker="MSFT", base=400.0)}
+        earlier = {ticker: frame.iloc[:-1] for ticker, frame in full.items()}
+        revised = {ticker: frame.copy() for ticker, frame in full.items()}
+        revised["MSFT"].iloc[-1, 0] += 5.0
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = model_artifact_store.ModelArtifactStore(tmpdir)
+            with mock.patch.object(models, "_ARTIFACT_STORE", store), mock.patch.object(
+                models, "_run_epochs", wraps=models._run_epochs
+            ) as run_epochs:
+                models.forecast_many(earlier, epochs=2)
+                warm = models.forecast_many(full, epochs=2)
+                models.forecast_many(revised, epochs=2)
+
+        self.assertEqual([call.kwargs["epochs"] for call in run_epochs.call_args_list], [2, models.FINE_TUNE_EPOCHS, 2])
+        per_ticker = min(models.FINE_TUNE_SEQUENCES, len(models._training_arrays(full["AAPL"], 14, 30, 7)[0]))
+        self.assertEqual(run_epochs.call_args_list[1].args[2].shape[0], 2 * per_ticker)
+        self.assertEqual(len(warm["MSFT"]), 7)
+
+
+if __name__ == "__main__":
+    unittest.main()
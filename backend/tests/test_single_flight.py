@@ -0,0 +1,212 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import prediction_service
+import single_flight
+
+
+class SingleFlightTests(unittest.TestCase):
+    def _run_concurrently(self, count, target):
+        threads = [threading.Thread(target=target) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+
+    def test_concurrent_identical_calls_share_one_computation(self):
+        flight = single_flight.SingleFlight()
+        calls, results = [], []
+        release = threading.Event()
+
+        def _compute():
+            calls.append(1)
+            release.wait(5)
+            return {"value": 42}
+
+        def _caller():
+            results.append(flight.do(("prediction_snapshot", "AAPL"), _compute))
+
+        threading.Timer(0.2, release.set).start()
+        self._run_concurrently(8, _caller)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{"value": 42}] * 8)
+        self.assertEqual(flight.stats()["leaders"], 1)
+        self.assertEqual(flight.stats()["coalesced"], 7)
+        self.assertEqual(flight.stats()["inFlight"], 0)
+
+    def test_waiters_receive_the_leaders_exception_and_the_key_is_released(self):
+        flight = single_flight.SingleFlight()
+        started, errors = threading.Event(), []
+
+        def _failing():
+            started.set()
+            time.sleep(0.1)
+            raise RuntimeError("fit failed")
+
+        def _caller():
+            try:
+                flight.do("key", _failing)
+            except RuntimeError as exc:
+                errors.append(str(exc))
+
+        self._run_concurrently(3, _caller)
+
+        self.assertEqual(errors, ["fit failed"] * 3)
+        self.assertEqual(flight.do("key", lambda: "recovered"), "recovered")
+
+    def test_lock_file_makes_other_processes_wait_then_times_out(self):
+        with tempfile.TemporaryDirectory() as lock_dir:
+            holder = single_flight.SingleFlight(lock_dir=lock_dir)
+            other = single_flight.SingleFlight(lock_dir=lock_dir, wait_seconds=0.2)
+            inside = threading.Event()
+            release = threading.Event()
+
+            def _hold():
+                def _compute():
+                    inside.set()
+                    release.wait(5)
+                    return "holder"
+
+                holder.do("key", _compute)
+
+            thread = threading.Thread(target=_hold)
+            thread.start()
+            inside.wait(5)
+            started = time.monotonic()
+            self.assertEqual(other.do("key", lambda: "other"), "other")
+            release.set()
+            thread.join(5)
+
+        self.assertGreaterEqual(time.monotonic() - started, 0.2)
+        self.assertEqual(other.stats()["crossProcessWaits"], 1)
+        self.assertEqual(other.stats()["lockTimeouts"], 1)
+        self.assertTrue(other.stats()["crossProcess"])
+
+    def test_lock_files_are_removed_and_a_waiter_on_a_removed_file_retries(self):
+        with tempfile.TemporaryDirectory() as lock_dir:
+            holder = single_flight.SingleFlight(lock_dir=lock_dir)
+            other = single_flight.SingleFlight(lock_dir=lock_dir)
+            inside, release, entered = threading.Event(), threading.Event(), []
+
+            def _hold():
+                def _compute():
+                    inside.set()
+                    release.wait(5)
+                    entered.append(os.listdir(lock_dir))
+                    return "holder"
+
+                holder.do("key", _compute)
+
+            thread = threading.Thread(target=_hold)
+            thread.start()
+            inside.wait(5)
+            threading.Timer(0.1, release.set).start()
+            self.assertEqual(other.do("key", lambda: entered.append(os.listdir(lock_dir)) or "other"), "other")
+            thread.join(5)
+
+            self.assertEqual(os.listdir(lock_dir), [])
+            self.assertEqual([len(names) for names in entered], [1, 1])
+            self.assertEqual(other.stats()["crossProcessWaits"], 1)
+
+    def test_cancellation_needs_every_coalesced_caller_to_cancel(self):
+        flight = single_flight.SingleFlight()
+        started, release, probes, outcomes = threading.Event(), threading.Event(), [], []
+        gone = {"leader": False, "waiter": False}
+
+        def _compute(all_cancelled):
+            started.set()
+            release.wait(5)
+            probes.append(all_cancelled())
+            gone["waiter"] = True
+            probes.append(all_cancelled())
+            return "done"
+
+        def _waiter():
+            outcomes.append(flight.do("key", _compute, should_cancel=lambda: gone["waiter"]))
+
+        leader = threading.Thread(target=lambda: outcomes.append(flight.do("key", _compute, should_cancel=lambda: gone["leader"])))
+        leader.start()
+        started.wait(5)
+        waiter = threading.Thread(target=_waiter)
+        waiter.start()
+        time.sleep(0.05)
+        gone["leader"] = True
+        release.set()
+        leader.join(5)
+        waiter.join(5)
+
+        self.assertEqual(probes, [False, True])
+        self.assertEqual(outcomes, ["done", "done"])
+        self.assertEqual(flight.do("other", lambda all_cancelled: all_cancelled(), should_cancel=lambda: True), True)
+        shared = single_flight._Flight()
+        shared.join(lambda: True)
+        shared.join(None)
+        self.assertFalse(flight._all_cancelled(shared))
+
+
+class PredictionServiceCoalescingTests(unittest.TestCase):
+    def setUp(self):
+        self.original = {
+            "load_canonical_ohlcv": prediction_service._load_canonical_ohlcv,
+            "predict_components": prediction_service._predict_production_components,
+            "single_flight": prediction_service._SINGLE_FLIGHT,
+        }
+        prediction_service._CACHE.clear()
+        prediction_service._SINGLE_FLIGHT = single_flight.SingleFlight()
+
+    def tearDown(self):
+        prediction_service._load_canonical_ohlcv = self.original["load_canonical_ohlcv"]
+        prediction_service._predict_production_components = self.original["predict_components"]
+        prediction_service._SINGLE_FLIGHT = self.original["single_flight"]
+        prediction_service._CACHE.clear()
+
+    def test_concurrent_snapshot_requests_fit_once(self):
+        index = pd.bdate_range("2025-01-02", periods=220)
+        close = np.linspace(100.0, 140.0, len(index))
+        ohlcv = pd.DataFrame({"Open": close, "High": close, "Low": close, "Close": close, "Volume": 1e6}, index=index)
+        fits = []
+
+        def _slow_components(ohlcv_arg, horizon, ticker):
+            fits.append(ticker)
+            time.sleep(0.2)
+            return (
+                np.array([141.0, 142.0, 143.0]),
+                {"linear_regression": np.array([141.0, 142.0, 143.0])},
+                list(pd.bdate_range("2026-04-03", periods=3)),
+                {"linear_regression": 1.0},
+            )
+
+        prediction_service._load_canonical_ohlcv = lambda ticker: ohlcv
+        prediction_service._predict_production_components = _slow_components
+        snapshots = []
+        threads = [
+            threading.Thread(target=lambda: snapshots.append(prediction_service.get_prediction_snapshot("aapl")))
+            for _ in range(6)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+        prediction_service.get_prediction_snapshot("AAPL")
+
+        self.assertEqual(fits, ["AAPL"])
+        self.assertEqual(len(snapshots), 6)
+        self.assertTrue(all(snapshot["recentPredicted"] == 141.0 for snapshot in snapshots))
+        snapshots[0]["recentPredicted"] = 0.0
+        self.assertEqual(snapshots[1]["recentPredicted"], 141.0)
+        stats = prediction_service.single_flight_stats()
+        self.assertEqual((stats["leaders"], stats["coalesced"], stats["cacheHits"]), (1, 5, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
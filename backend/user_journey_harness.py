@@ -175,6 +175,10 @@ def deterministic_data_shim():
     }
 
     with ExitStack() as stack:
+        # Keep the deterministic bars out of the real local bar store.
+        bar_store_dir = stack.enter_context(tempfile.TemporaryDirectory(prefix="marketmind-bars-"))
+        # Screener metadata lookups must finish while the yfinance stubs are active.
+        stack.enter_context(mock.patch.dict(os.environ, {"BAR_STORE_DIR": bar_store_dir, "SCREENER_METADATA_REFRESH_MODE": "inline"}))
         stack.enter_context(mock.patch.object(backend_api.yf, "Ticker", FakeTicker))
         stack.enter_context(mock.patch.object(backend_api.yf, "download", side_effect=fake_download))
         stack.enter_context(mock.patch.object(backend_api.requests, "get", return_value=FakeNewsResponse()))
@@ -6,9 +6,9 @@ import os
 import threading
 import uuid
 from contextlib import contextmanager, nullcontext
-from datetime import date, datetime, timezone
+from datetime import date, datetime, timedelta, timezone
 from decimal import Decimal
-from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
 
 from sqlalchemy import (
     Date,
@@ -28,10 +28,12 @@ from sqlalchemy import (
     delete,
     event,
     func,
+    or_,
     select,
+    update,
 )
 from sqlalchemy.dialects.postgresql import JSONB
-from sqlalchemy.exc import OperationalError
+from sqlalchemy.exc import IntegrityError, OperationalError
 from sqlalchemy.orm import DeclarativeBase, Mapped, Session, mapped_column, sessionmaker
 from sqlalchemy.orm.exc import StaleDataError
 
@@ -93,6 +95,14 @@ class AlertRule(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
 
 
+class AlertRuleChange(Base):
+    __tablename__ = "alert_rule_changes"
+
+    id: Mapped[int] = mapped_column(SNAPSHOT_ID_TYPE, primary_key=True, autoincrement=True)
+    clerk_user_id: Mapped[str] = mapped_column(Text, nullable=False)
+    changed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True, nullable=False)
+
+
 class TriggeredAlert(Base):
     __tablename__ = "triggered_alerts"
 
@@ -359,6 +369,25 @@ class PublicApiDailyUsage(Base):
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
 
 
+class PredictionJob(Base):
+    __tablename__ = "prediction_jobs"
+
+    id: Mapped[uuid.UUID] = mapped_column(Uuid, primary_key=True, default=uuid.uuid4)
+    kind: Mapped[str] = mapped_column(Text, nullable=False)
+    dedupe_key: Mapped[str] = mapped_column(String(128), index=True, nullable=False)
+    # Set to the dedupe key while the job is queued or running: the unique
+    # index makes concurrent identical submissions from any worker share a job.
+    active_key: Mapped[Optional[str]] = mapped_column(String(128), unique=True, nullable=True)
+    owner_id: Mapped[Optional[str]] = mapped_column(Text, index=True, nullable=True)
+    status: Mapped[str] = mapped_column(Text, nullable=False, default="queued")
+    params: Mapped[Dict[str, Any]] = mapped_column(JSON_VARIANT, nullable=False)
+    result: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON_VARIANT, nullable=True)
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
 _ENGINES: Dict[str, Any] = {}
 _SESSION_FACTORIES: Dict[str, sessionmaker[Session]] = {}
 
@@ -544,6 +573,106 @@ def save_watchlist(session: Session, clerk_user_id: str, tickers: Iterable[Any])
     return normalized
 
 
+def _alert_rule_payload(row: AlertRule) -> Dict[str, Any]:
+    payload = {
+        "id": str(row.id),
+        "ticker": row.ticker,
+        "condition": row.condition,
+        "target_price": _as_float(row.target_price),
+        "created_at": row.created_at.isoformat(),
+    }
+    if row.alert_type:
+        payload["type"] = row.alert_type
+    if row.prompt:
+        payload["prompt"] = row.prompt
+    if row.is_active is not None:
+        payload["active"] = row.is_active
+    return payload
+
+
+def apply_alert_triggers(session: Session, triggers: Iterable[Dict[str, Any]]) -> int:
+    """Move triggered rules into ``triggered_alerts`` for any number of users.
+
+    Each trigger carries ``user_id``, ``alert_id`` (the rule) and the
+    notification fields (``id``, ``message``, ``seen``, ``timestamp``).
+    """
+    triggers = list(triggers)
+    rule_ids: List[uuid.UUID] = []
+    for trigger in triggers:
+        user_id = str(trigger["user_id"])
+        rule_ids.append(_coerce_scoped_uuid(f"alert_rule:{user_id}", trigger["alert_id"]))
+        notification = {key: trigger[key] for key in ("id", "message", "seen", "timestamp") if key in trigger}
+        session.add(
+            TriggeredAlert(
+                id=_coerce_scoped_uuid(f"triggered_alert:{user_id}", notification.get("id") or uuid.uuid4()),
+                clerk_user_id=user_id,
+                message=str(notification.get("message", "")),
+                seen=bool(notification.get("seen", False)),
+                triggered_at=_coerce_datetime(notification.get("timestamp")),
+                payload=notification,
+            )
+        )
+    if rule_ids:
+        session.execute(delete(AlertRule).where(AlertRule.id.in_(rule_ids)))
+        record_alert_rule_changes(session, {str(trigger["user_id"]) for trigger in triggers})
+    return len(rule_ids)
+
+
+def record_alert_rule_changes(session: Session, clerk_user_ids: Iterable[str]) -> None:
+    """Append the users whose alert rules changed to the ``alert_rule_changes`` feed."""
+    now = utcnow()
+    for clerk_user_id in sorted(set(clerk_user_ids)):
+        session.add(AlertRuleChange(clerk_user_id=clerk_user_id, changed_at=now))
+
+
+def load_alert_rule_changes(
+    session: Session,
+    cursor: Optional[Tuple[int, FrozenSet[int]]],
+    *,
+    retain_seconds: int = 86400,
+    overlap_seconds: int = 300,
+) -> Tuple[Tuple[int, FrozenSet[int]], Dict[str, List[Dict[str, Any]]], bool]:
+    """Alert rules of the users changed since ``cursor`` in the change feed.
+
+    Returns ``(cursor, rules by user, full)``. ``full`` means every user's
+    rules are listed: the first call, or a cursor older than the retained
+    feed. Feed entries older than ``retain_seconds`` are pruned here.
+
+    Ids are allocated when a transaction inserts its change, not when it
+    commits, so a lower id can become visible after a higher one was read.
+    The cursor therefore pairs the highest id read with the ids of the last
+    ``overlap_seconds`` already seen; that window is re-read each call and
+    only unseen entries count as changes.
+    """
+    now = utcnow()
+    session.execute(delete(AlertRuleChange).where(AlertRuleChange.changed_at < now - timedelta(seconds=retain_seconds)))
+    oldest, latest = session.execute(select(func.min(AlertRuleChange.id), func.max(AlertRuleChange.id))).one()
+    latest = int(latest or 0)
+    previous, seen = cursor if cursor is not None else (None, frozenset())
+    full = previous is None or previous > latest or (oldest is not None and previous < int(oldest) - 1)
+    recent = AlertRuleChange.changed_at >= now - timedelta(seconds=overlap_seconds)
+    entries = session.execute(
+        select(AlertRuleChange.id, AlertRuleChange.clerk_user_id, recent.label("recent")).where(
+            AlertRuleChange.id <= latest,
+            or_(recent, AlertRuleChange.id > (latest if full else previous)),
+        )
+    ).all()
+    next_cursor = (latest, frozenset(int(entry.id) for entry in entries if entry.recent))
+    if full:
+        changed_users = None
+    else:
+        changed_users = {entry.clerk_user_id for entry in entries if entry.id > previous or entry.id not in seen}
+        if not changed_users:
+            return next_cursor, {}, False
+    statement = select(AlertRule).order_by(AlertRule.clerk_user_id.asc(), AlertRule.created_at.asc())
+    if changed_users is not None:
+        statement = statement.where(AlertRule.clerk_user_id.in_(sorted(changed_users)))
+    rules: Dict[str, List[Dict[str, Any]]] = {user_id: [] for user_id in changed_users or ()}
+    for row in session.scalars(statement).all():
+        rules.setdefault(row.clerk_user_id, []).append({**_alert_rule_payload(row), "user_id": row.clerk_user_id})
+    return next_cursor, rules, full
+
+
 def load_notifications(session: Session, clerk_user_id: str) -> Dict[str, List[Dict[str, Any]]]:
     touch_app_user(session, clerk_user_id)
     active_rows = session.scalars(
@@ -557,22 +686,7 @@ def load_notifications(session: Session, clerk_user_id: str) -> Dict[str, List[D
         .order_by(TriggeredAlert.triggered_at.asc())
     ).all()
 
-    active = []
-    for row in active_rows:
-        payload = {
-            "id": str(row.id),
-            "ticker": row.ticker,
-            "condition": row.condition,
-            "target_price": _as_float(row.target_price),
-            "created_at": row.created_at.isoformat(),
-        }
-        if row.alert_type:
-            payload["type"] = row.alert_type
-        if row.prompt:
-            payload["prompt"] = row.prompt
-        if row.is_active is not None:
-            payload["active"] = row.is_active
-        active.append(payload)
+    active = [_alert_rule_payload(row) for row in active_rows]
 
     triggered = []
     for row in triggered_rows:
@@ -596,6 +710,7 @@ def save_notifications(
     touch_app_user(session, clerk_user_id)
     session.execute(delete(AlertRule).where(AlertRule.clerk_user_id == clerk_user_id))
     session.execute(delete(TriggeredAlert).where(TriggeredAlert.clerk_user_id == clerk_user_id))
+    record_alert_rule_changes(session, [clerk_user_id])
     session.flush()
 
     active = notifications.get("active", []) or []
@@ -2138,3 +2253,121 @@ def list_public_api_daily_usage(
         PublicApiDailyUsage.created_at.asc(),
     )
     return list(session.scalars(stmt).all())
+
+
+def prediction_job_to_dict(job: PredictionJob) -> Dict[str, Any]:
+    return {
+        "id": str(job.id),
+        "kind": job.kind,
+        "dedupeKey": job.dedupe_key,
+        "ownerId": job.owner_id,
+        "status": job.status,
+        "params": dict(job.params or {}),
+        "result": job.result,
+        "error": job.error,
+        "createdAt": _serialize_datetime(job.created_at),
+        "updatedAt": _serialize_datetime(job.updated_at),
+        "finishedAt": _serialize_datetime(job.finished_at),
+    }
+
+
+def claim_prediction_job(
+    session: Session,
+    *,
+    kind: str,
+    dedupe_key: str,
+    params: Dict[str, Any],
+    owner_id: Optional[str] = None,
+) -> Tuple[PredictionJob, bool]:
+    """The active job for ``dedupe_key``, or a new queued one; returns ``(job, created)``.
+
+    The insert runs in a savepoint, so a worker that loses the race on the
+    unique ``active_key`` reads the winner's job instead of duplicating it.
+    """
+    existing = session.scalar(select(PredictionJob).where(PredictionJob.active_key == str(dedupe_key)))
+    if existing is not None:
+        return existing, False
+    now = utcnow()
+    job = PredictionJob(
+        kind=str(kind),
+        dedupe_key=str(dedupe_key),
+        active_key=str(dedupe_key),
+        owner_id=owner_id,
+        status="queued",
+        params=dict(params or {}),
+        created_at=now,
+        updated_at=now,
+    )
+    try:
+        with session.begin_nested():
+            session.add(job)
+    except IntegrityError:
+        existing = session.scalar(select(PredictionJob).where(PredictionJob.active_key == str(dedupe_key)))
+        if existing is None:
+            raise
+        return existing, False
+    return job, True
+
+
+def get_prediction_job(session: Session, job_id: Any) -> Optional[PredictionJob]:
+    try:
+        parsed = uuid.UUID(str(job_id))
+    except (TypeError, ValueError, AttributeError):
+        return None
+    return session.get(PredictionJob, parsed)
+
+
+def update_prediction_job(
+    session: Session,
+    job_id: Any,
+    *,
+    status: str,
+    result: Optional[Dict[str, Any]] = None,
+    error: Optional[str] = None,
+) -> Optional[PredictionJob]:
+    job = get_prediction_job(session, job_id)
+    if job is None:
+        return None
+    now = utcnow()
+    job.status = str(status)
+    job.result = result
+    job.error = error
+    job.updated_at = now
+    if status in {"succeeded", "failed"}:
+        job.finished_at = now
+        job.active_key = None
+    return job
+
+
+def touch_prediction_jobs(session: Session, job_ids: Iterable[Any]) -> int:
+    """Heartbeat: bump ``updated_at`` of the listed jobs that are still active."""
+    parsed = [uuid.UUID(str(job_id)) for job_id in job_ids]
+    if not parsed:
+        return 0
+    result = session.execute(
+        update(PredictionJob)
+        .where(PredictionJob.id.in_(parsed), PredictionJob.active_key.is_not(None))
+        .values(updated_at=utcnow())
+    )
+    return int(result.rowcount or 0)
+
+
+def expire_stale_prediction_jobs(session: Session, *, updated_before: datetime, error: str) -> int:
+    """Fail queued/running jobs whose worker stopped heartbeating (crashed or restarted)."""
+    now = utcnow()
+    result = session.execute(
+        update(PredictionJob)
+        .where(PredictionJob.active_key.is_not(None), PredictionJob.updated_at < updated_before)
+        .values(status="failed", error=error, active_key=None, updated_at=now, finished_at=now)
+    )
+    return int(result.rowcount or 0)
+
+
+def delete_finished_prediction_jobs(session: Session, *, finished_before: datetime) -> int:
+    result = session.execute(
+        delete(PredictionJob).where(
+            PredictionJob.finished_at.is_not(None),
+            PredictionJob.finished_at < finished_before,
+        )
+    )
+    return int(result.rowcount or 0)